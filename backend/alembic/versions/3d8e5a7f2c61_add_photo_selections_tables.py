@@ -0,0 +1,77 @@
+"""add_photo_selections_tables
+
+Revision ID: 3d8e5a7f2c61
+Revises: 8c4f2a6e1b37
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "3d8e5a7f2c61"
+down_revision: Union[str, None] = "8c4f2a6e1b37"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "photo_selections",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("organization_id", sa.Integer(), nullable=False),
+        sa.Column("name", sa.String(length=255), nullable=True),
+        sa.Column("source", sa.String(length=20), nullable=False),
+        sa.Column("filter", sa.JSON(), nullable=True),
+        sa.Column("photo_count", sa.Integer(), nullable=False),
+        sa.Column("created_by", sa.Integer(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("expires_at", sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(
+            ["created_by"],
+            ["users.id"],
+        ),
+        sa.ForeignKeyConstraint(
+            ["organization_id"], ["organizations.id"], ondelete="CASCADE"
+        ),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        op.f("ix_photo_selections_id"), "photo_selections", ["id"], unique=False
+    )
+    op.create_index(
+        op.f("ix_photo_selections_organization_id"),
+        "photo_selections",
+        ["organization_id"],
+        unique=False,
+    )
+    op.create_index(
+        op.f("ix_photo_selections_expires_at"),
+        "photo_selections",
+        ["expires_at"],
+        unique=False,
+    )
+    op.create_table(
+        "photo_selection_members",
+        sa.Column("selection_id", sa.Integer(), nullable=False),
+        sa.Column("photo_id", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(["photo_id"], ["photos.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(
+            ["selection_id"], ["photo_selections.id"], ondelete="CASCADE"
+        ),
+        sa.PrimaryKeyConstraint("selection_id", "photo_id"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("photo_selection_members")
+    op.drop_index(op.f("ix_photo_selections_expires_at"), table_name="photo_selections")
+    op.drop_index(
+        op.f("ix_photo_selections_organization_id"), table_name="photo_selections"
+    )
+    op.drop_index(op.f("ix_photo_selections_id"), table_name="photo_selections")
+    op.drop_table("photo_selections")
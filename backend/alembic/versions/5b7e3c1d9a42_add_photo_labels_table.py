@@ -0,0 +1,105 @@
+"""add_photo_labels_table
+
+Revision ID: 5b7e3c1d9a42
+Revises: d63a04ae57a0
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "5b7e3c1d9a42"
+down_revision: Union[str, None] = "d63a04ae57a0"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "photo_labels",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("photo_id", sa.Integer(), nullable=False),
+        sa.Column("organization_id", sa.Integer(), nullable=False),
+        sa.Column("label", sa.String(length=255), nullable=False),
+        sa.Column("category", sa.String(length=50), nullable=False),
+        sa.Column("confidence", sa.Float(), nullable=False),
+        sa.ForeignKeyConstraint(
+            ["organization_id"], ["organizations.id"], ondelete="CASCADE"
+        ),
+        sa.ForeignKeyConstraint(["photo_id"], ["photos.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(op.f("ix_photo_labels_id"), "photo_labels", ["id"], unique=False)
+    op.create_index(
+        op.f("ix_photo_labels_photo_id"), "photo_labels", ["photo_id"], unique=False
+    )
+    op.create_index(
+        "ix_photo_labels_org_label_photo",
+        "photo_labels",
+        ["organization_id", "label", "photo_id"],
+        unique=False,
+    )
+    op.create_index(
+        "ix_photo_labels_org_category_photo",
+        "photo_labels",
+        ["organization_id", "category", "photo_id"],
+        unique=False,
+    )
+
+    # 既存の分類結果（photos.metadata）からラベルを移行
+    conn = op.get_bind()
+    photos = sa.table(
+        "photos",
+        sa.column("id", sa.Integer),
+        sa.column("organization_id", sa.Integer),
+        sa.column("metadata", sa.JSON),
+    )
+    photo_labels = sa.table(
+        "photo_labels",
+        sa.column("photo_id", sa.Integer),
+        sa.column("organization_id", sa.Integer),
+        sa.column("label", sa.String),
+        sa.column("category", sa.String),
+        sa.column("confidence", sa.Float),
+    )
+
+    rows = []
+    result = conn.execute(
+        sa.select(photos.c.id, photos.c.organization_id, photos.c.metadata).where(
+            photos.c.metadata.isnot(None)
+        )
+    )
+    for photo_id, organization_id, metadata in result:
+        labels = (metadata or {}).get("rekognition_labels") or []
+        categorized = (metadata or {}).get("rekognition_categorized") or {}
+        category_by_label = {
+            name: category for category, names in categorized.items() for name in names
+        }
+        for label in labels:
+            rows.append(
+                {
+                    "photo_id": photo_id,
+                    "organization_id": organization_id,
+                    "label": label["name"],
+                    "category": category_by_label.get(label["name"], "other"),
+                    "confidence": label["confidence"],
+                }
+            )
+        if len(rows) >= 1000:
+            conn.execute(photo_labels.insert(), rows)
+            rows = []
+    if rows:
+        conn.execute(photo_labels.insert(), rows)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_photo_labels_org_category_photo", table_name="photo_labels")
+    op.drop_index("ix_photo_labels_org_label_photo", table_name="photo_labels")
+    op.drop_index(op.f("ix_photo_labels_photo_id"), table_name="photo_labels")
+    op.drop_index(op.f("ix_photo_labels_id"), table_name="photo_labels")
+    op.drop_table("photo_labels")
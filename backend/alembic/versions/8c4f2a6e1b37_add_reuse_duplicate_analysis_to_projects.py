@@ -0,0 +1,56 @@
+"""add_reuse_duplicate_analysis_to_projects
+
+Revision ID: 8c4f2a6e1b37
+Revises: 5b7e3c1d9a42
+Create Date: 2026-10-19 11:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "8c4f2a6e1b37"
+down_revision: Union[str, None] = "5b7e3c1d9a42"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "projects",
+        sa.Column(
+            "reuse_duplicate_analysis",
+            sa.Boolean(),
+            server_default=sa.true(),
+            nullable=False,
+        ),
+    )
+    op.create_index(
+        "ix_photo_duplicates_photo1_status",
+        "photo_duplicates",
+        ["photo1_id", "status"],
+        unique=False,
+    )
+    op.create_index(
+        "ix_photo_duplicates_photo2_status",
+        "photo_duplicates",
+        ["photo2_id", "status"],
+        unique=False,
+    )
+    op.create_index(
+        "uq_photo_duplicates_pair",
+        "photo_duplicates",
+        ["photo1_id", "photo2_id"],
+        unique=True,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("uq_photo_duplicates_pair", table_name="photo_duplicates")
+    op.drop_index("ix_photo_duplicates_photo2_status", table_name="photo_duplicates")
+    op.drop_index("ix_photo_duplicates_photo1_status", table_name="photo_duplicates")
+    op.drop_column("projects", "reuse_duplicate_analysis")
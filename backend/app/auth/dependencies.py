@@ -13,6 +13,8 @@ from app.auth.jwt_handler import JWTHandler
 
 # HTTPBearer認証スキーム
 security = HTTPBearer()
+# 認証が任意のエンドポイント用（ヘッダーがなくてもエラーにしない）
+optional_security = HTTPBearer(auto_error=False)
 
 
 async def get_current_user(
@@ -86,7 +88,7 @@ async def get_current_active_user(
 
 
 def get_optional_current_user(
-    credentials: Optional[HTTPAuthorizationCredentials] = Depends(security),
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(optional_security),
     db: Session = Depends(get_db),
 ) -> Optional[User]:
     """
@@ -60,6 +60,23 @@ class JWTHandler:
         encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
         return encoded_jwt
 
+    @staticmethod
+    def create_download_token(data: Dict[str, Any], expires_delta: timedelta) -> str:
+        """
+        成果物のダウンロードトークンを作成
+
+        Args:
+            data: トークンに含めるデータ（成果物ストアのキー・ファイル名等）
+            expires_delta: 有効期限
+
+        Returns:
+            JWT トークン
+        """
+        to_encode = data.copy()
+        to_encode.update({"exp": datetime.utcnow() + expires_delta, "type": "download"})
+        token: str = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
+        return token
+
     @staticmethod
     def decode_token(token: str) -> Optional[Dict[str, Any]]:
         """
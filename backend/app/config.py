@@ -22,6 +22,14 @@ class Settings:
     AWS_ACCESS_KEY_ID: str = os.getenv("AWS_ACCESS_KEY_ID", "")
     AWS_SECRET_ACCESS_KEY: str = os.getenv("AWS_SECRET_ACCESS_KEY", "")
 
+    # AWSクライアント生成元（aws / fake: Textract・Rekognitionをローカルで模擬）
+    AWS_CLIENT_BACKEND: str = os.getenv("AWS_CLIENT_BACKEND", "aws")
+    FAKE_AWS_LATENCY: str = os.getenv("FAKE_AWS_LATENCY", "lognormal:120:0.4")  # ミリ秒
+    FAKE_AWS_THROTTLE_RATE: float = float(os.getenv("FAKE_AWS_THROTTLE_RATE", "0.0"))
+    FAKE_AWS_MAX_CONCURRENCY: int = int(os.getenv("FAKE_AWS_MAX_CONCURRENCY", "0"))
+    FAKE_AWS_ERROR_RATE: float = float(os.getenv("FAKE_AWS_ERROR_RATE", "0.0"))
+    FAKE_AWS_SEED: int = int(os.getenv("FAKE_AWS_SEED", "0"))
+
     # JWT
     JWT_SECRET_KEY: str = os.getenv("JWT_SECRET_KEY", "your-secret-key-change-in-production")
     JWT_ALGORITHM: str = "HS256"
@@ -36,8 +44,104 @@ class Settings:
     MAX_FILE_SIZE: int = int(os.getenv("MAX_FILE_SIZE", str(10 * 1024 * 1024)))  # 10MB
     ALLOWED_EXTENSIONS: set = {".jpg", ".jpeg", ".tiff", ".tif"}
 
+    # Redis（未設定の場合はインメモリ実装にフォールバック）
+    REDIS_URL: str = os.getenv("REDIS_URL", "")
+
+    # Jobs
+    JOB_MAX_WORKERS: int = int(os.getenv("JOB_MAX_WORKERS", "4"))
+    JOB_TENANT_CONCURRENCY: int = int(os.getenv("JOB_TENANT_CONCURRENCY", "2"))
+    JOB_INTERACTIVE_RESERVED: int = int(os.getenv("JOB_INTERACTIVE_RESERVED", "1"))
+    JOB_TENANT_WEIGHTS: str = os.getenv("JOB_TENANT_WEIGHTS", "")  # 例: "1:2,5:0.5"
+    JOB_EVENT_TTL_SECONDS: int = int(os.getenv("JOB_EVENT_TTL_SECONDS", "3600"))
+    JOB_EVENT_HEARTBEAT_SECONDS: float = float(
+        os.getenv("JOB_EVENT_HEARTBEAT_SECONDS", "15")
+    )
+
+    # PHOTO.XML 写真情報フラグメントキャッシュ
+    PHOTO_XML_FRAGMENT_CACHE_BYTES: int = int(
+        os.getenv("PHOTO_XML_FRAGMENT_CACHE_BYTES", str(128 * 1024 * 1024))
+    )
+    PHOTO_XML_FRAGMENT_CACHE_TTL_SECONDS: int = int(
+        os.getenv("PHOTO_XML_FRAGMENT_CACHE_TTL_SECONDS", str(7 * 24 * 3600))
+    )
+
+    # エクスポート（S3からの写真ファイル先読み数）
+    EXPORT_S3_PREFETCH_CONCURRENCY: int = int(
+        os.getenv("EXPORT_S3_PREFETCH_CONCURRENCY", "8")
+    )
+    # エクスポート（ZIPの並列deflateワーカー数。0の場合はCPUコア数）
+    EXPORT_DEFLATE_WORKERS: int = int(os.getenv("EXPORT_DEFLATE_WORKERS", "0"))
+    # エクスポート（媒体分割時に同時作成する巻数）
+    EXPORT_VOLUME_CONCURRENCY: int = int(os.getenv("EXPORT_VOLUME_CONCURRENCY", "2"))
+    # エクスポート（ストリーミング配信の同時配信数。ジョブスケジューラーとは別枠）
+    EXPORT_STREAM_MAX_CONCURRENCY: int = int(
+        os.getenv("EXPORT_STREAM_MAX_CONCURRENCY", "8")
+    )
+    EXPORT_STREAM_TENANT_CONCURRENCY: int = int(
+        os.getenv("EXPORT_STREAM_TENANT_CONCURRENCY", "2")
+    )
+    # エクスポート（ストリーミング配信で最初のチャンクを待つ秒数。超えた場合は503）
+    EXPORT_STREAM_FIRST_CHUNK_TIMEOUT: float = float(
+        os.getenv("EXPORT_STREAM_FIRST_CHUNK_TIMEOUT", "30")
+    )
+
+    # 写真帳（S3からの画像の先読み数。メモリ上に保持する画像はおおよそ先読み数 + 1部分PDF分）
+    PHOTO_ALBUM_PREFETCH_CONCURRENCY: int = int(
+        os.getenv("PHOTO_ALBUM_PREFETCH_CONCURRENCY", "4")
+    )
+    # 写真帳（部分PDFとして保存する写真ページ数。埋め込んだ画像はこの単位で解放される）
+    PHOTO_ALBUM_PAGES_PER_PART: int = int(os.getenv("PHOTO_ALBUM_PAGES_PER_PART", "10"))
+    # 写真帳（埋め込む画像の印刷解像度dpi。0の場合は縮小しない）
+    PHOTO_ALBUM_IMAGE_DPI: int = int(os.getenv("PHOTO_ALBUM_IMAGE_DPI", "200"))
+    # 写真帳（埋め込む画像のJPEG品質とクロマサブサンプリング 4:4:4/4:2:2/4:2:0）
+    PHOTO_ALBUM_JPEG_QUALITY: int = int(os.getenv("PHOTO_ALBUM_JPEG_QUALITY", "85"))
+    PHOTO_ALBUM_JPEG_SUBSAMPLING: str = os.getenv("PHOTO_ALBUM_JPEG_SUBSAMPLING", "4:2:0")
+
+    # 写真選択セットの有効期限（秒）
+    PHOTO_SELECTION_TTL_SECONDS: int = int(
+        os.getenv("PHOTO_SELECTION_TTL_SECONDS", str(7 * 24 * 3600))
+    )
+
+    # エクスポート・写真帳の成果物ストア（local: ARTIFACT_CACHE_DIR、s3: ARTIFACT_STORE_BUCKET）
+    ARTIFACT_STORE: str = os.getenv("ARTIFACT_STORE", "local")
+    ARTIFACT_STORE_BUCKET: str = os.getenv("ARTIFACT_STORE_BUCKET", "")
+    # ローカルストアの成果物をnginxに配信させる内部ロケーション（例: "/_artifacts/"。空の場合はAPIが配信）
+    ARTIFACT_ACCEL_REDIRECT_PREFIX: str = os.getenv("ARTIFACT_ACCEL_REDIRECT_PREFIX", "")
+    # ダウンロードトークンの有効期限（秒）
+    ARTIFACT_DOWNLOAD_TOKEN_EXPIRE_SECONDS: int = int(
+        os.getenv("ARTIFACT_DOWNLOAD_TOKEN_EXPIRE_SECONDS", str(24 * 3600))
+    )
+    # 成果物の作業ディレクトリ（S3ストアへのアップロード前。未設定の場合は一時ディレクトリ配下）
+    ARTIFACT_SCRATCH_DIR: str = os.getenv("ARTIFACT_SCRATCH_DIR", "")
+    # ノードごとのディスク使用量の上限（作業ディレクトリ + ローカルストアの成果物）
+    ARTIFACT_NODE_QUOTA_BYTES: int = int(
+        os.getenv("ARTIFACT_NODE_QUOTA_BYTES", str(50 * 1024 * 1024 * 1024))
+    )
+    # 保持期間切れの成果物・作業ディレクトリを削除する間隔（秒。0の場合は削除しない）
+    ARTIFACT_SWEEP_INTERVAL_SECONDS: float = float(
+        os.getenv("ARTIFACT_SWEEP_INTERVAL_SECONDS", "300")
+    )
+    # エクスポート・写真帳の成果物キャッシュ（保存先未設定の場合は一時ディレクトリ配下）
+    ARTIFACT_CACHE_DIR: str = os.getenv("ARTIFACT_CACHE_DIR", "")
+    ARTIFACT_CACHE_BYTES: int = int(
+        os.getenv("ARTIFACT_CACHE_BYTES", str(20 * 1024 * 1024 * 1024))
+    )
+    ARTIFACT_CACHE_TTL_SECONDS: int = int(
+        os.getenv("ARTIFACT_CACHE_TTL_SECONDS", str(24 * 3600))
+    )
+
     # AI Services
     REKOGNITION_MAX_LABELS: int = int(os.getenv("REKOGNITION_MAX_LABELS", "10"))
+    REKOGNITION_BATCH_CONCURRENCY: int = int(os.getenv("REKOGNITION_BATCH_CONCURRENCY", "8"))
+    REKOGNITION_BATCH_COMMIT_SIZE: int = int(os.getenv("REKOGNITION_BATCH_COMMIT_SIZE", "50"))
+    REKOGNITION_MAX_RETRIES: int = int(os.getenv("REKOGNITION_MAX_RETRIES", "5"))
+    # 確定済み重複写真で代表写真の解析結果を再利用する最小類似度（%）
+    DUPLICATE_REUSE_MIN_SIMILARITY: float = float(
+        os.getenv("DUPLICATE_REUSE_MIN_SIMILARITY", "95.0")
+    )
+    TITLE_REGENERATION_BATCH_SIZE: int = int(
+        os.getenv("TITLE_REGENERATION_BATCH_SIZE", "1000")
+    )
     OCR_CONFIDENCE_THRESHOLD: float = float(os.getenv("OCR_CONFIDENCE_THRESHOLD", "0.8"))
 
     # Quality thresholds
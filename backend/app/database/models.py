@@ -153,6 +153,51 @@ Index("ix_photos_org_created", Photo.organization_id, Photo.created_at)
 Index("ix_photos_org_shooting_date", Photo.organization_id, Photo.shooting_date)
 
 
+class PhotoLabel(Base):  # type: ignore[valid-type,misc]
+    """写真ラベルテーブル（Rekognitionラベルの正規化、ラベル検索・ファセット用）"""
+
+    __tablename__ = "photo_labels"
+
+    id = Column(Integer, primary_key=True, index=True)
+
+    photo_id = Column(
+        Integer,
+        ForeignKey("photos.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True,
+    )
+
+    # マルチテナント対応
+    organization_id = Column(
+        Integer,
+        ForeignKey("organizations.id", ondelete="CASCADE"),
+        nullable=False,
+    )
+
+    label = Column(String(255), nullable=False)  # Rekognitionラベル名
+    # 建設カテゴリ（equipment等、該当なしはother）
+    category = Column(String(50), nullable=False)
+    confidence = Column(Float, nullable=False)  # 信頼度（0-100）
+
+    def __repr__(self) -> str:
+        return f"<PhotoLabel(photo_id={self.photo_id}, label='{self.label}', category='{self.category}')>"
+
+
+# ラベル・カテゴリ検索用の複合インデックス（photo_idを含めてインデックスのみで絞り込む）
+Index(
+    "ix_photo_labels_org_label_photo",
+    PhotoLabel.organization_id,
+    PhotoLabel.label,
+    PhotoLabel.photo_id,
+)
+Index(
+    "ix_photo_labels_org_category_photo",
+    PhotoLabel.organization_id,
+    PhotoLabel.category,
+    PhotoLabel.photo_id,
+)
+
+
 class User(Base):
     """ユーザーテーブル"""
 
@@ -221,6 +266,22 @@ class PhotoDuplicate(Base):
         return f"<PhotoDuplicate(id={self.id}, photo1_id={self.photo1_id}, photo2_id={self.photo2_id}, similarity={self.similarity_score})>"
 
 
+# 確定済み重複グループ（代表写真→メンバー、メンバー→代表写真）の参照用
+Index(
+    "ix_photo_duplicates_photo1_status", PhotoDuplicate.photo1_id, PhotoDuplicate.status
+)
+Index(
+    "ix_photo_duplicates_photo2_status", PhotoDuplicate.photo2_id, PhotoDuplicate.status
+)
+# 同じ組の重複関係は1行だけ（確定の再送・リトライで行を増やさない）
+Index(
+    "uq_photo_duplicates_pair",
+    PhotoDuplicate.photo1_id,
+    PhotoDuplicate.photo2_id,
+    unique=True,
+)
+
+
 class Project(Base):
     """プロジェクトテーブル"""
 
@@ -243,6 +304,9 @@ class Project(Base):
     start_date = Column(DateTime, nullable=True)
     end_date = Column(DateTime, nullable=True)
 
+    # 確定済み重複写真で代表写真の解析結果（ラベル・OCR）を再利用するか
+    reuse_duplicate_analysis = Column(Boolean, default=True, nullable=False)
+
     # 写真との関連
     photos = relationship("Photo", back_populates="project")
 
@@ -253,3 +317,51 @@ class Project(Base):
 
     def __repr__(self) -> str:
         return f"<Project(id={self.id}, name='{self.name}')>"
+
+
+class PhotoSelection(Base):  # type: ignore[valid-type,misc]
+    """写真選択セットテーブル（エクスポート・PHOTO.XML・写真帳の対象写真）"""
+
+    __tablename__ = "photo_selections"
+
+    id = Column(Integer, primary_key=True, index=True)
+
+    # マルチテナント対応
+    organization_id = Column(
+        Integer,
+        ForeignKey("organizations.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True,
+    )
+
+    name = Column(String(255), nullable=True)
+    source = Column(String(20), nullable=False)  # ids, filter
+    filter = Column(JSON, nullable=True)  # 検索条件から作成した場合の条件
+    photo_count = Column(Integer, nullable=False, default=0)
+    created_by = Column(Integer, ForeignKey("users.id"), nullable=True)
+
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    expires_at = Column(DateTime, nullable=False, index=True)
+
+    def __repr__(self) -> str:
+        return f"<PhotoSelection(id={self.id}, source='{self.source}', photo_count={self.photo_count})>"
+
+
+class PhotoSelectionMember(Base):  # type: ignore[valid-type,misc]
+    """写真選択セットのメンバー（選択セットID・写真IDの複合主キーのみ）"""
+
+    __tablename__ = "photo_selection_members"
+
+    selection_id = Column(
+        Integer,
+        ForeignKey("photo_selections.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    photo_id = Column(
+        Integer,
+        ForeignKey("photos.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+
+    def __repr__(self) -> str:
+        return f"<PhotoSelectionMember(selection_id={self.selection_id}, photo_id={self.photo_id})>"
@@ -29,6 +29,9 @@ from app.routers import (
     organizations,
     projects,
     dashboard,
+    jobs,
+    metrics,
+    photo_selections,
 )
 from app.middleware import TenantIdentificationMiddleware
 from fastapi.staticfiles import StaticFiles
@@ -65,6 +68,9 @@ app.include_router(auth.router)  # /api/v1/auth
 app.include_router(organizations.router)  # /api/v1/organizations
 app.include_router(projects.router)  # /api/v1/projects
 app.include_router(dashboard.router)  # /api/v1/dashboard
+app.include_router(jobs.router)  # /api/v1/jobs/{job_id}/events
+app.include_router(metrics.router)  # /api/v1/metrics
+app.include_router(photo_selections.router)  # /api/v1/photo-selections
 app.include_router(photo_album.router)  # /api/v1/photo-album/generate-pdf
 app.include_router(export.router)  # /api/v1/export/package
 app.include_router(photo_xml.router)  # /api/v1/photo-xml/generate
@@ -0,0 +1,221 @@
+"""
+成果物（エクスポートZIP・写真帳PDF）のダウンロード
+
+成果物ストアのキーを署名付きトークンにしてダウンロードURLに含め、
+どのAPIノードでもストアから読み出して配信します。
+
+途中で切れたダウンロードの再開や分割並列ダウンロードのため、次に対応します。
+    Range / If-Range      単一範囲の部分取得（206）。If-Range が一致しない場合は全体を返す
+    ETag / Last-Modified  If-None-Match が一致する場合は 304
+    HEAD                  本文なしでサイズ・ETagを返す（分割ダウンロードの事前取得用）
+
+ローカルストアの成果物は、ASGIサーバーが zero-copy send 拡張
+（http.response.zerocopysend）に対応していれば sendfile で送信します。
+ARTIFACT_ACCEL_REDIRECT_PREFIX を設定した場合は X-Accel-Redirect でリバースプロキシ
+（nginx）に配信を任せます。
+"""
+
+import posixpath
+from datetime import timedelta
+from email.utils import formatdate, parsedate_to_datetime
+from typing import Dict, Mapping, Optional, Tuple
+from urllib.parse import quote
+
+from fastapi import HTTPException
+from fastapi.concurrency import iterate_in_threadpool, run_in_threadpool
+from fastapi.responses import Response
+from starlette.types import Receive, Scope, Send
+
+from app.auth.jwt_handler import JWTHandler
+from app.config import settings
+from app.services.artifact_store import (
+    ArtifactStat,
+    ArtifactStore,
+    get_artifact_store,
+    parse_byte_range,
+)
+
+ZEROCOPY_EXTENSION = "http.response.zerocopysend"
+
+
+def artifact_download_url(
+    base_url: str, key: str, media_type: str, filename: Optional[str] = None
+) -> str:
+    """
+    成果物のダウンロードURL
+
+    Args:
+        base_url: ダウンロードエンドポイントのURL（例: "/api/v1/export/download"）
+        key: 成果物ストアのキー
+        media_type: Content-Type
+        filename: 保存時のファイル名（省略時はキーのファイル名）
+
+    Returns:
+        トークン付きのダウンロードURL
+    """
+    token = JWTHandler.create_download_token(
+        {
+            "key": key,
+            "filename": filename or posixpath.basename(key),
+            "media_type": media_type,
+        },
+        timedelta(seconds=settings.ARTIFACT_DOWNLOAD_TOKEN_EXPIRE_SECONDS),
+    )
+    return f"{base_url}/{token}"
+
+
+def _etag_matches(header: str, etag: str) -> bool:
+    """If-None-Match の値にETagが含まれるか（弱い比較）"""
+    candidates = [value.strip() for value in header.split(",")]
+    return "*" in candidates or any(
+        candidate.removeprefix("W/") == etag for candidate in candidates
+    )
+
+
+def _if_range_matches(header: str, stat: ArtifactStat) -> bool:
+    """If-Range の値が現在の成果物と一致するか（ETagは強い比較、日時は完全一致）"""
+    header = header.strip()
+    if header.startswith('"') or header.startswith("W/"):
+        return header == stat.etag
+    try:
+        return int(parsedate_to_datetime(header).timestamp()) == int(stat.modified)
+    except (TypeError, ValueError):
+        return False
+
+
+class ArtifactResponse(Response):
+    """成果物の全体または指定範囲を送信するレスポンス"""
+
+    def __init__(
+        self,
+        store: ArtifactStore,
+        key: str,
+        byte_range: Optional[Tuple[int, int]],
+        status_code: int,
+        headers: Dict[str, str],
+        media_type: str,
+    ) -> None:
+        """
+        Args:
+            store: 成果物ストア
+            key: 成果物ストアのキー
+            byte_range: 送信する範囲（開始位置, 終了位置）。Noneの場合は本文なし
+            status_code: ステータスコード
+            headers: レスポンスヘッダー
+            media_type: Content-Type
+        """
+        self.store = store
+        self.key = key
+        self.byte_range = byte_range
+        self.status_code = status_code
+        self.media_type = media_type
+        self.background = None
+        self.init_headers(headers)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await send(
+            {
+                "type": "http.response.start",
+                "status": self.status_code,
+                "headers": self.raw_headers,
+            }
+        )
+        if self.byte_range is None or scope.get("method") == "HEAD":
+            await send({"type": "http.response.body", "body": b""})
+            return
+
+        start, end = self.byte_range
+        local_path = self.store.local_path(self.key)
+        if local_path and ZEROCOPY_EXTENSION in scope.get("extensions", {}):
+            # サーバーが sendfile でファイルから直接送信する
+            with open(local_path, "rb") as f:
+                await send(
+                    {
+                        "type": ZEROCOPY_EXTENSION,
+                        "file": f,
+                        "offset": start,
+                        "count": end - start + 1,
+                    }
+                )
+            return
+
+        async for chunk in iterate_in_threadpool(
+            self.store.iter_range(self.key, start, end)
+        ):
+            await send({"type": "http.response.body", "body": chunk, "more_body": True})
+        await send({"type": "http.response.body", "body": b""})
+
+
+async def artifact_download_response(
+    token: str, request_headers: Mapping[str, str]
+) -> Response:
+    """
+    ダウンロードトークンの成果物を配信
+
+    Args:
+        token: ダウンロードトークン
+        request_headers: リクエストヘッダー（Range, If-Range, If-None-Match を参照）
+
+    Returns:
+        全体（200）、指定範囲（206）、または未変更（304）のレスポンス
+
+    Raises:
+        HTTPException: トークンが無効・期限切れ（403）、成果物がない（404）、
+            範囲がサイズを超えている（416）場合
+    """
+    payload = JWTHandler.decode_token(token)
+    if payload is None or payload.get("type") != "download":
+        raise HTTPException(
+            status_code=403, detail="ダウンロードURLが無効か期限切れです"
+        )
+
+    store = get_artifact_store()
+    key = payload["key"]
+    stat = await run_in_threadpool(store.stat, key)
+    if stat is None:
+        raise HTTPException(status_code=404, detail="ファイルが見つかりません")
+
+    headers = {
+        "Accept-Ranges": "bytes",
+        "ETag": stat.etag,
+        "Last-Modified": formatdate(stat.modified, usegmt=True),
+        "Content-Disposition": f"attachment; filename*=UTF-8''{quote(payload['filename'])}",
+    }
+    if_none_match = request_headers.get("if-none-match")
+    if if_none_match and _etag_matches(if_none_match, stat.etag):
+        return Response(status_code=304, headers=headers)
+
+    range_header = request_headers.get("range")
+    if_range = request_headers.get("if-range")
+    if range_header and if_range and not _if_range_matches(if_range, stat):
+        # 手元の部分データと内容が変わっているため全体を返す
+        range_header = None
+    try:
+        byte_range = parse_byte_range(range_header, stat.size)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=416,
+            detail=str(e),
+            headers={"Content-Range": f"bytes */{stat.size}"},
+        )
+
+    local_path = store.local_path(key)
+    if settings.ARTIFACT_ACCEL_REDIRECT_PREFIX and local_path:
+        # Range・If-Range・sendfile はリバースプロキシが処理する
+        headers["X-Accel-Redirect"] = settings.ARTIFACT_ACCEL_REDIRECT_PREFIX + quote(
+            key
+        )
+        return Response(media_type=payload["media_type"], headers=headers)
+
+    start, end = byte_range or (0, stat.size - 1)
+    headers["Content-Length"] = str(end - start + 1)
+    if byte_range:
+        headers["Content-Range"] = f"bytes {start}-{end}/{stat.size}"
+    return ArtifactResponse(
+        store,
+        key,
+        (start, end) if stat.size else None,
+        status_code=206 if byte_range else 200,
+        headers=headers,
+        media_type=payload["media_type"],
+    )
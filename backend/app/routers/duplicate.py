@@ -2,12 +2,15 @@
 重複写真検出 API エンドポイント
 """
 
+import uuid
+from datetime import datetime
+
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
-from typing import Optional
+from typing import Any, Dict, Optional, cast
 
 from app.database.database import get_db
-from app.database.models import Photo
+from app.database.models import Photo, PhotoDuplicate
 from app.schemas.duplicate import (
     DuplicateDetectionResponse,
     DuplicateGroupResponse,
@@ -17,6 +20,7 @@ from app.schemas.duplicate import (
     DuplicateActionResponse,
 )
 from app.services.duplicate_detection_service import DuplicateDetectionService
+from app.services.analysis_reuse_service import AnalysisReuseService
 from app.config import settings
 
 router = APIRouter(prefix="/api/v1/photos", tags=["Duplicate Detection"])
@@ -214,6 +218,58 @@ async def handle_duplicate_action(
         photo_to_delete.photo_metadata["kept_photo_id"] = request.photo_id_to_keep
         photo_to_delete.is_duplicate = True
 
+        # 重複グループを記録（保持する写真が代表写真）
+        similarity = request.similarity
+        keep_hash = cast(Dict[str, Any], photo_to_keep.photo_metadata or {}).get(
+            "phash"
+        )
+        delete_hash = cast(Dict[str, Any], photo_to_delete.photo_metadata or {}).get(
+            "phash"
+        )
+        if similarity is None and keep_hash and delete_hash:
+            similarity = DuplicateDetectionService().calculate_similarity(
+                keep_hash, delete_hash
+            )
+
+        group_id = cast(Optional[str], photo_to_keep.duplicate_group_id) or str(
+            uuid.uuid4()
+        )
+        photo_to_keep.duplicate_group_id = group_id  # type: ignore[assignment]
+        photo_to_delete.duplicate_group_id = group_id  # type: ignore[assignment]
+
+        # 同じ組の重複関係が記録済みであれば更新する（確定の再送・リトライで行を増やさない）
+        pair = [photo_to_keep.id, photo_to_delete.id]
+        duplicate = (
+            db.query(PhotoDuplicate)
+            .filter(
+                PhotoDuplicate.photo1_id.in_(pair),
+                PhotoDuplicate.photo2_id.in_(pair),
+            )
+            .first()
+        )
+        if duplicate is None:
+            duplicate = PhotoDuplicate(
+                organization_id=photo_to_keep.organization_id,
+                duplicate_type="similar",
+            )
+            db.add(duplicate)
+        duplicate.photo1_id = photo_to_keep.id
+        duplicate.photo2_id = photo_to_delete.id
+        duplicate.similarity_score = (similarity or 0.0) / 100  # type: ignore[assignment]
+        duplicate.status = "confirmed"  # type: ignore[assignment]
+        duplicate.confirmed_at = datetime.utcnow()  # type: ignore[assignment]
+        db.flush()
+
+        # 代表写真の解析結果があればメンバーへ引き継ぐ
+        reuse_service = AnalysisReuseService(db)
+        members = [
+            member
+            for member in reuse_service.find_members(photo_to_keep)
+            if member.id == photo_to_delete.id
+        ]
+        reuse_service.propagate_labels(photo_to_keep, members)
+        reuse_service.propagate_ocr(photo_to_keep, members)
+
         db.commit()
 
         return DuplicateActionResponse(
@@ -238,6 +294,12 @@ async def handle_duplicate_action(
             photo.photo_metadata["duplicate_status"] = "rejected"
             photo.is_duplicate = False
 
+        # 確定済みの重複関係も却下（以降は解析結果を再利用しない）
+        db.query(PhotoDuplicate).filter(
+            PhotoDuplicate.photo1_id.in_([photo1.id, photo2.id]),
+            PhotoDuplicate.photo2_id.in_([photo1.id, photo2.id]),
+        ).update({"status": "rejected"}, synchronize_session=False)
+
         db.commit()
 
         return DuplicateActionResponse(
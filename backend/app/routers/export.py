@@ -2,63 +2,62 @@
 エクスポート APIルーター
 """
 
-import tempfile
-import os
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException
-from fastapi.responses import FileResponse
+from typing import Dict, Iterator, List, Optional, cast
+from urllib.parse import quote
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import Response, StreamingResponse
 from sqlalchemy.orm import Session
 
+from app.config import settings
 from app.database.database import get_db
-from app.database.models import Photo, User
+from app.database.models import User
 from app.schemas.export import (
     ExportRequest,
     ExportResponse,
     ExportValidationResponse,
+    ExportVolumeInfo,
     FileRenameInfo,
 )
+from app.services.artifact_cache import artifact_digest, get_artifact_cache
+from app.services.artifact_lifecycle import (
+    ADMISSION_RETRY_AFTER_SECONDS,
+    ArtifactQuotaExceeded,
+    get_artifact_lifecycle,
+)
+from app.services.aws_clients import create_aws_client
 from app.services.export_service import ExportService
+from app.services.photo_validation_service import (
+    PhotoValidationService,
+    validation_messages,
+)
+from app.services.photo_xml_fragment_cache import get_photo_xml_fragment_cache
 from app.services.photo_xml_generator import PhotoXMLGenerator
+from app.services.job_event_bus import JobProgressReporter
+from app.services.job_scheduler import JobPriority, get_job_scheduler
+from app.services.stream_job_pool import StreamPoolBusy, get_stream_job_pool
+from app.services.zip_writer import ZipChunkQueue, ZipStreamTimeout
 from app.auth.dependencies import get_current_active_user
+from app.routers.artifact_download import (
+    artifact_download_response,
+    artifact_download_url,
+)
+from app.routers.photo_selections import get_selection_or_404, load_target_photos
 
 router = APIRouter(prefix="/api/v1/export", tags=["export"])
 
 
-@router.post("/package", response_model=ExportResponse)
-async def export_package(
-    request: ExportRequest,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user),
-):
+def _load_export_photos(
+    request: ExportRequest, db: Session, current_user: User
+) -> List[Dict]:
     """
-    電子納品パッケージをエクスポート（マルチテナント対応）
+    エクスポート対象の写真データを取得（テナントフィルタ適用）
 
-    Args:
-        request: エクスポートリクエスト
-        db: データベースセッション
-        current_user: 現在の認証済みユーザー
-
-    Returns:
-        エクスポート結果（自組織のみ）
+    Raises:
+        HTTPException: 写真が見つからない、または一部が見つからない場合
     """
-    # 写真データ取得（テナントフィルタ適用）
-    photos = (
-        db.query(Photo)
-        .filter(
-            Photo.id.in_(request.photo_ids),
-            Photo.organization_id == current_user.organization_id,
-        )
-        .all()
-    )
-
-    if not photos:
-        raise HTTPException(status_code=404, detail="指定された写真が見つかりません")
-
-    if len(photos) != len(request.photo_ids):
-        raise HTTPException(
-            status_code=400,
-            detail=f"一部の写真が見つかりません（指定: {len(request.photo_ids)}件, 取得: {len(photos)}件）",
-        )
+    # 写真データ取得（テナントフィルタ適用、選択セットはカーソルで順に読み出す）
+    photos = load_target_photos(request, db, cast(int, current_user.organization_id))
 
     # 写真データをディクショナリに変換
     photo_dicts = []
@@ -76,27 +75,178 @@ async def export_package(
             "work_kind": photo.work_kind or "",
             "work_detail": photo.work_detail or "",
             "photo_metadata": photo.photo_metadata or {},
+            "updated_at": photo.updated_at,
+            "s3_key": photo.s3_key,
+            "file_size": photo.file_size,
         }
         photo_dicts.append(photo_dict)
 
-    # PHOTO.XML生成
-    xml_generator = PhotoXMLGenerator()
-    xml_content = xml_generator.generate_xml(photo_dicts, pretty_print=True)
+    return photo_dicts
 
-    # エクスポートサービス
-    export_service = ExportService()
 
-    # 一時ディレクトリ作成
-    temp_dir = tempfile.mkdtemp()
+def _volume_capacity(export_service: ExportService, request: ExportRequest):
+    """
+    媒体分割時の1巻あたりの最大サイズ（分割しない場合はNone）
 
+    Raises:
+        HTTPException: 未対応の媒体が指定された場合
+    """
     try:
-        # エクスポートパッケージ作成
-        result = export_service.export_package(
+        return export_service.volume_capacity(request.media, request.volume_size)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+def _download_url(zip_path: str) -> str:
+    """ZIPファイル（成果物ストアのキー）のダウンロードURL"""
+    return artifact_download_url("/api/v1/export/download", zip_path, "application/zip")
+
+
+def _export_digest(
+    request: ExportRequest, photo_dicts: List[Dict], volume_size: Optional[int]
+) -> str:
+    """成果物キャッシュのキー（写真ID・updated_at・出力オプション・生成器バージョン）"""
+    return artifact_digest(
+        "export",
+        photo_dicts,
+        {
+            "project_name": request.project_name,
+            "include_photos": request.include_photos,
+            "volume_size": volume_size,
+        },
+        f"{ExportService.ARTIFACT_VERSION}-{PhotoXMLGenerator.FRAGMENT_VERSION}",
+    )
+
+
+def _export_response(
+    export_service: ExportService,
+    photo_dicts: List[Dict],
+    result: Dict,
+    cached: bool = False,
+) -> ExportResponse:
+    """作成済みパッケージの生成結果からレスポンスを作成"""
+    # ファイルリネーム情報生成
+    file_renames = export_service.rename_multiple_photos(photo_dicts)
+    file_rename_infos = [FileRenameInfo(**rename) for rename in file_renames]
+
+    # 媒体分割時は先頭巻をzip_pathとし、全巻をvolumesに列挙
+    volumes = [
+        ExportVolumeInfo(download_url=_download_url(volume["zip_path"]), **volume)
+        for volume in result.get("volumes", [])
+    ]
+    zip_path = volumes[0].zip_path if volumes else result["zip_path"]
+    file_size = (
+        sum(volume.file_size for volume in volumes)
+        if volumes
+        else result.get("file_size")
+    )
+
+    return ExportResponse(
+        success=True,
+        zip_path=zip_path,
+        download_url=_download_url(zip_path),
+        total_photos=result["total_photos"],
+        file_size=file_size,
+        file_renames=file_rename_infos,
+        errors=[],
+        status="success_with_warnings" if result.get("dtd_errors") else "success",
+        # 作成済みパッケージを返す場合はPHOTO.XMLを組み立てていない
+        xml_fragment_cache=None if cached else result.get("xml_fragment_cache"),
+        dtd_errors=result.get("dtd_errors", []),
+        volumes=volumes,
+        cached=cached,
+    )
+
+
+def _photo_s3_client(request: ExportRequest):
+    """写真ファイル取得用のS3クライアント（写真ファイルを含めない場合はNone）"""
+    if not request.include_photos:
+        return None
+    return create_aws_client("s3", region_name=settings.AWS_REGION)
+
+
+@router.post("/package", response_model=ExportResponse)
+async def export_package(
+    request: ExportRequest,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user),
+):
+    """
+    電子納品パッケージをエクスポート（マルチテナント対応）
+
+    Args:
+        request: エクスポートリクエスト
+        db: データベースセッション
+        current_user: 現在の認証済みユーザー
+
+    Returns:
+        エクスポート結果（自組織のみ）
+    """
+    photo_dicts = _load_export_photos(request, db, current_user)
+
+    # エクスポートサービス
+    export_service = ExportService()
+    volume_size = _volume_capacity(export_service, request)
+
+    # 同じ写真（updated_atまで一致）・同じオプションのパッケージが作成済みであれば
+    # ジョブを登録せずにそのまま返す
+    artifact_cache = get_artifact_cache()
+    digest = _export_digest(request, photo_dicts, volume_size)
+    cached_result = artifact_cache.get("export", digest)
+    if cached_result is not None:
+        return _export_response(export_service, photo_dicts, cached_result, cached=True)
+
+    # 写真ファイルはS3からZIPエントリへ直接書き込む（ローカルディスクに一時保存しない）
+    s3_client = _photo_s3_client(request)
+    options = {
+        "fragment_cache": get_photo_xml_fragment_cache(),
+        "s3_client": s3_client,
+        "bucket": settings.S3_BUCKET,
+        "prefetch_concurrency": settings.EXPORT_S3_PREFETCH_CONCURRENCY,
+    }
+
+    def build(export_dir: str, reporter: JobProgressReporter) -> Dict:
+        """成果物キャッシュのディレクトリにパッケージを作成"""
+        # PHOTO.XMLはZIPエントリへ逐次書き込む。媒体分割時は巻ごとのZIPを並行して作成
+        if volume_size:
+            return export_service.export_volumes(
+                photo_dicts,
+                volume_size,
+                export_dir=export_dir,
+                project_name=request.project_name,
+                max_workers=settings.EXPORT_VOLUME_CONCURRENCY,
+                reporter=reporter,
+                **options,
+            )
+        return export_service.export_package(
             photos=photo_dicts,
-            xml_content=xml_content,
-            export_dir=temp_dir,
+            export_dir=export_dir,
             project_name=request.project_name,
+            reporter=reporter,
+            **options,
+        )
+
+    def job(reporter: JobProgressReporter) -> Dict:
+        # 同じ内容の同時リクエストは1回だけ作成し、待機していた側は作成済みのものを使う
+        result, cached = artifact_cache.build(
+            "export", digest, lambda export_dir: build(export_dir, reporter)
         )
+        return {**result, "cached": cached}
+
+    # このノードの作成領域に見積もりサイズを予約（空きがなければ受け付けない）
+    estimated_size = export_service.estimate_package_size(
+        photo_dicts, include_photo_files=request.include_photos
+    )
+
+    try:
+        # エクスポートパッケージ作成（組織ごとの同時実行数上限の範囲で実行）
+        async with get_artifact_lifecycle().admit_async(estimated_size):
+            result = await get_job_scheduler().run(
+                cast(int, current_user.organization_id),
+                "export",
+                job,
+                priority=JobPriority.STANDARD,
+            )
 
         if not result["success"]:
             return ExportResponse(
@@ -110,21 +260,16 @@ async def export_package(
                 status="error",
             )
 
-        # ファイルリネーム情報生成
-        file_renames = export_service.rename_multiple_photos(photo_dicts)
-        file_rename_infos = [FileRenameInfo(**rename) for rename in file_renames]
-
-        return ExportResponse(
-            success=True,
-            zip_path=result["zip_path"],
-            download_url=f"/api/v1/export/download?path={result['zip_path']}",
-            total_photos=result["total_photos"],
-            file_size=result.get("file_size"),
-            file_renames=file_rename_infos,
-            errors=[],
-            status="success",
+        return _export_response(
+            export_service, photo_dicts, result, cached=result["cached"]
         )
 
+    except ArtifactQuotaExceeded as e:
+        raise HTTPException(
+            status_code=503,
+            detail=str(e),
+            headers={"Retry-After": str(ADMISSION_RETRY_AFTER_SECONDS)},
+        )
     except Exception as e:
         return ExportResponse(
             success=False,
@@ -138,34 +283,164 @@ async def export_package(
         )
 
 
+@router.post("/stream")
+async def stream_export_package(
+    request: ExportRequest,
+    volume: Optional[int] = Query(None, ge=1, description="媒体分割時に配信する巻番号"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user),
+) -> StreamingResponse:
+    """
+    電子納品パッケージをZIPとして直接配信（マルチテナント対応）
+
+    一時フォルダやZIPファイルを作らず、エントリを書き込みながらレスポンスへ送信します。
+    PHOTO.XMLのDTD検査結果等は X-Job-Id ヘッダーのジョブID（/api/v1/jobs/{job_id}）で確認できます。
+    配信開始後にエラーが発生した場合は、接続を切断します（不完全なZIPになります）。
+    媒体分割（media/volume_size）指定時は volume の巻だけを配信するため、
+    巻ごとに並行してダウンロードできます（巻数は X-Volume-Count ヘッダー）。
+    組織ごとの同時配信数の上限に達している場合や、最初のチャンクが待機時間内に
+    書き込まれない場合は503（Retry-After付き）を返します。
+
+    Args:
+        request: エクスポートリクエスト
+        volume: 媒体分割時に配信する巻番号
+        db: データベースセッション
+        current_user: 現在の認証済みユーザー
+
+    Returns:
+        application/zip のストリーミングレスポンス（自組織のみ）
+    """
+    photo_dicts = _load_export_photos(request, db, current_user)
+    export_service = ExportService()
+    s3_client = _photo_s3_client(request)
+
+    # 媒体分割時は指定巻の写真だけを通し番号のまま配信
+    filename = export_service.archive_name(request.project_name)
+    first_serial = 1
+    volume_count = 1
+    volume_size = _volume_capacity(export_service, request)
+    if volume_size:
+        try:
+            plan = export_service.plan_volumes(
+                photo_dicts, volume_size, include_photo_files=s3_client is not None
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        volume_count = len(plan)
+        if volume is None and volume_count > 1:
+            raise HTTPException(
+                status_code=400,
+                detail=f"巻番号（volume）を指定してください（全{volume_count}巻）",
+            )
+        if (volume or 1) > volume_count:
+            raise HTTPException(
+                status_code=404,
+                detail=f"指定された巻が見つかりません（全{volume_count}巻）",
+            )
+        selected = plan[(volume or 1) - 1]
+        photo_dicts = selected["photos"]
+        first_serial = selected["first_serial"]
+        filename = export_service.volume_archive_name(
+            request.project_name, selected["volume"], volume_count
+        )
+
+    # ZIPの書き込みは受信側の速度に合わせて待機するため、ジョブスケジューラーの
+    # ワーカーを占有しないよう配信専用のプールで実行（上限に達している場合は503）
+    chunks = ZipChunkQueue()
+    try:
+        job_id = get_stream_job_pool().submit(
+            cast(int, current_user.organization_id),
+            "export",
+            lambda reporter: export_service.stream_package(
+                chunks,
+                photo_dicts,
+                fragment_cache=get_photo_xml_fragment_cache(),
+                s3_client=s3_client,
+                bucket=settings.S3_BUCKET,
+                prefetch_concurrency=settings.EXPORT_S3_PREFETCH_CONCURRENCY,
+                reporter=reporter,
+                first_serial=first_serial,
+            ),
+        )
+    except StreamPoolBusy as e:
+        raise HTTPException(
+            status_code=503,
+            detail=str(e),
+            headers={"Retry-After": str(ADMISSION_RETRY_AFTER_SECONDS)},
+        )
+
+    # 最初のチャンクまでに失敗した場合はエラーレスポンスを返す
+    body = chunks.iter_chunks(
+        first_chunk_timeout=settings.EXPORT_STREAM_FIRST_CHUNK_TIMEOUT
+    )
+    try:
+        first_chunk = await run_in_threadpool(next, body, b"")
+    except ZipStreamTimeout as e:
+        raise HTTPException(
+            status_code=503,
+            detail=str(e),
+            headers={"Retry-After": str(ADMISSION_RETRY_AFTER_SECONDS)},
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+    def content() -> Iterator[bytes]:
+        yield first_chunk
+        yield from body
+
+    return StreamingResponse(
+        content(),
+        media_type="application/zip",
+        headers={
+            "Content-Disposition": f"attachment; filename*=UTF-8''{quote(filename)}",
+            "X-Job-Id": job_id,
+            "X-Volume-Count": str(volume_count),
+        },
+    )
+
+
 @router.post("/validate", response_model=ExportValidationResponse)
 async def validate_export(
     request: ExportRequest,
+    offset: int = Query(0, ge=0, description="違反写真一覧の開始位置"),
+    limit: int = Query(100, ge=1, le=1000, description="違反写真一覧の最大件数"),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user),
-):
+) -> ExportValidationResponse:
     """
     エクスポート前にデータをバリデーション（マルチテナント対応）
 
+    検査はSQLで集計し、件数は全写真分、違反写真は offset/limit の範囲分を返します。
+
     Args:
         request: エクスポートリクエスト
+        offset: 違反写真一覧の開始位置
+        limit: 違反写真一覧の最大件数
         db: データベースセッション
         current_user: 現在の認証済みユーザー
 
     Returns:
         バリデーション結果（自組織のみ）
     """
-    # 写真データ取得（テナントフィルタ適用）
-    photos = (
-        db.query(Photo)
-        .filter(
-            Photo.id.in_(request.photo_ids),
-            Photo.organization_id == current_user.organization_id,
+    result = None
+    requested = len(request.photo_ids or [])
+    if request.selection_id is not None:
+        selection = get_selection_or_404(
+            db, request.selection_id, cast(int, current_user.organization_id)
+        )
+        requested = cast(int, selection.photo_count)
+    if requested:
+        # 写真検査（テナントフィルタ適用）
+        result = PhotoValidationService(db).validate(
+            request.photo_ids,
+            organization_id=cast(int, current_user.organization_id),
+            warnings=("missing_title", "missing_ocr"),
+            offset=offset,
+            limit=limit,
+            selection_id=request.selection_id,
         )
-        .all()
-    )
 
-    if not photos:
+    if not result or not result["total"]:
         return ExportValidationResponse(
             is_valid=False,
             total_photos=0,
@@ -173,87 +448,52 @@ async def validate_export(
             warnings=[],
         )
 
-    if len(photos) != len(request.photo_ids):
+    total = result["total"]
+    if request.photo_ids is not None and total != requested:
         return ExportValidationResponse(
             is_valid=False,
-            total_photos=len(photos),
+            total_photos=total,
             errors=[
-                f"一部の写真が見つかりません（指定: {len(request.photo_ids)}件, 取得: {len(photos)}件）"
+                f"一部の写真が見つかりません（指定: {requested}件, 取得: {total}件）"
             ],
             warnings=[],
         )
 
-    export_service = ExportService()
-    xml_generator = PhotoXMLGenerator()
-    errors = []
-    warnings = []
-
-    # 写真データをディクショナリに変換
-    photo_dicts = []
-    for photo in photos:
-        photo_dict = {
-            "id": photo.id,
-            "file_name": photo.file_name,
-            "title": photo.title or "",
-            "shooting_date": (
-                photo.shooting_date.isoformat() if photo.shooting_date else ""
-            ),
-            "major_category": photo.major_category or "",
-            "photo_type": photo.photo_type or "",
-            "work_type": photo.work_type or "",
-            "work_kind": photo.work_kind or "",
-            "work_detail": photo.work_detail or "",
-            "photo_metadata": photo.photo_metadata or {},
-        }
-        photo_dicts.append(photo_dict)
-
-        # XML用データバリデーション
-        xml_errors = xml_generator.validate_photo_data(photo_dict)
-        if xml_errors:
-            errors.extend([f"写真ID {photo.id}: {error}" for error in xml_errors])
-
-        # 警告チェック
-        if not photo.title:
-            warnings.append(f"写真ID {photo.id}: タイトルが未設定です")
-
-        if not photo.photo_metadata or not photo.photo_metadata.get("ocr_result"):
-            warnings.append(f"写真ID {photo.id}: OCRデータが未処理です")
-
-    # ファイル名重複チェック
-    duplicates = export_service.check_filename_duplication(photo_dicts)
-    if duplicates:
-        errors.extend([f"ファイル名が重複しています: {dup}" for dup in duplicates])
+    errors, warnings = validation_messages(result)
 
     # 推定ファイルサイズ（概算: 1枚あたり2MB）
-    estimated_file_size = len(photos) * 2 * 1024 * 1024
+    estimated_file_size = total * 2 * 1024 * 1024
 
-    is_valid = len(errors) == 0
+    is_valid = (
+        result["invalid_photos"] == 0
+        and result["error_counts"]["duplicate_file_name"] == 0
+    )
 
     return ExportValidationResponse(
         is_valid=is_valid,
-        total_photos=len(photos),
+        total_photos=total,
         errors=errors,
         warnings=warnings,
         estimated_file_size=estimated_file_size,
+        error_counts=result["error_counts"],
+        warning_counts=result["warning_counts"],
+        offenders=result["offenders"],
+        offender_total=result["offender_total"],
     )
 
 
-@router.get("/download")
-async def download_export_file(path: str):
+@router.api_route("/download/{token}", methods=["GET", "HEAD"])
+async def download_export_file(token: str, request: Request) -> Response:
     """
     エクスポートファイルをダウンロード
 
+    Range・If-Range による部分取得（再開・分割並列ダウンロード）に対応します。
+
     Args:
-        path: ファイルパス
+        token: ダウンロードトークン（エクスポート結果の download_url に含まれる）
+        request: リクエスト（Range・If-Range・If-None-Match ヘッダー）
 
     Returns:
-        ファイルレスポンス
+        ファイルレスポンス（Range指定時は206、If-None-Match一致時は304）
     """
-    if not os.path.exists(path):
-        raise HTTPException(status_code=404, detail="ファイルが見つかりません")
-
-    return FileResponse(
-        path=path,
-        media_type="application/zip",
-        filename=os.path.basename(path),
-    )
+    return await artifact_download_response(token, request.headers)
@@ -0,0 +1,114 @@
+"""
+ジョブ進捗 APIルーター
+"""
+
+from typing import AsyncIterator
+
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import StreamingResponse
+
+from app.database.models import User
+from app.schemas.job import JobStatusResponse
+from app.services.job_event_bus import JobInfo, get_job_event_bus
+from app.auth.dependencies import get_current_active_user
+from app.config import settings
+
+router = APIRouter(prefix="/api/v1/jobs", tags=["jobs"])
+
+
+def _get_job_for_user(job_id: str, current_user: User) -> JobInfo:
+    """
+    ジョブ情報を取得（テナントフィルタ適用）
+
+    Raises:
+        HTTPException: ジョブが見つからない、または他組織のジョブの場合
+    """
+    job = get_job_event_bus().get_job(job_id)
+    if job is None or job.organization_id != current_user.organization_id:
+        raise HTTPException(
+            status_code=404, detail=f"ジョブが見つかりません（ID: {job_id}）"
+        )
+    return job
+
+
+@router.get("/{job_id}", response_model=JobStatusResponse)
+async def get_job_status(
+    job_id: str,
+    current_user: User = Depends(get_current_active_user),
+) -> JobStatusResponse:
+    """
+    ジョブの現在の状態を取得（マルチテナント対応）
+
+    Args:
+        job_id: ジョブID
+        current_user: 現在の認証済みユーザー
+
+    Returns:
+        ジョブ状態（自組織のみ）
+    """
+    job = _get_job_for_user(job_id, current_user)
+    event = job.last_event
+
+    if event is None:
+        return JobStatusResponse(job_id=job_id, job_type=job.job_type, status="queued")
+
+    return JobStatusResponse(
+        job_id=job_id,
+        job_type=job.job_type,
+        status=event.event if event.is_terminal else "running",
+        stage=event.stage,
+        processed=event.processed,
+        total=event.total,
+        progress=event.progress,
+        eta_seconds=event.eta_seconds,
+        message=event.message,
+        result=event.result,
+    )
+
+
+@router.get("/{job_id}/events")
+async def stream_job_events(
+    job_id: str,
+    current_user: User = Depends(get_current_active_user),
+) -> StreamingResponse:
+    """
+    ジョブの進捗イベントをServer-Sent Eventsで配信（マルチテナント対応）
+
+    接続時に最新の状態を1件送信し、以降はワーカーが発行した
+    progress/stage/completed/failedイベントを順次送信します。
+    終端イベント（completed/failed）の送信後に接続を閉じます。
+
+    Args:
+        job_id: ジョブID
+        current_user: 現在の認証済みユーザー
+
+    Returns:
+        text/event-stream レスポンス
+    """
+    _get_job_for_user(job_id, current_user)
+    bus = get_job_event_bus()
+
+    async def event_stream() -> AsyncIterator[str]:
+        subscription = await bus.subscribe(job_id)
+        try:
+            while True:
+                event = await subscription.get(
+                    timeout=settings.JOB_EVENT_HEARTBEAT_SECONDS
+                )
+                if event is None:
+                    # プロキシによる切断を防ぐためのハートビート
+                    yield ": keep-alive\n\n"
+                    continue
+
+                yield event.to_sse()
+
+                if event.is_terminal:
+                    break
+        finally:
+            await subscription.close()
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
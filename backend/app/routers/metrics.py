@@ -0,0 +1,44 @@
+"""
+メトリクス APIルーター
+"""
+
+from typing import Dict, List
+
+from fastapi import APIRouter, Depends
+
+from app.database.models import User
+from app.services.metrics import metrics
+from app.auth.dependencies import get_current_active_user
+
+router = APIRouter(prefix="/api/v1/metrics", tags=["metrics"])
+
+
+@router.get("")
+async def get_metrics_snapshot(
+    current_user: User = Depends(get_current_active_user),
+) -> Dict[str, List[Dict]]:
+    """
+    メトリクスのスナップショットを取得（マルチテナント対応）
+
+    organization_idラベルを持つメトリクスは自組織の分のみ返します
+    （スーパーユーザーは全組織分）。
+
+    Args:
+        current_user: 現在の認証済みユーザー
+
+    Returns:
+        counters / gauges / summaries ごとのメトリクスリスト
+    """
+    snapshot = metrics.snapshot()
+    if current_user.is_superuser:
+        return snapshot
+
+    own_org = str(current_user.organization_id)
+    return {
+        kind: [
+            entry
+            for entry in entries
+            if entry["labels"].get("organization_id", own_org) == own_org
+        ]
+        for kind, entries in snapshot.items()
+    }
@@ -2,14 +2,16 @@
 OCR処理APIルーター
 """
 
-from typing import Optional
-from fastapi import APIRouter, Depends, HTTPException, status
+from typing import Any, Dict, Optional, cast
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.orm import Session
 from pydantic import BaseModel
 
 from app.database.database import get_db
 from app.database.models import Photo, User
 from app.services.ocr_service import OCRService, BlackboardData
+from app.services.analysis_reuse_service import AnalysisReuseService
+from app.services.job_scheduler import JobPriority, get_job_scheduler
 from app.auth.dependencies import get_current_active_user
 from app.config import settings
 
@@ -22,6 +24,7 @@ class OCRProcessResponse(BaseModel):
     photo_id: int
     status: str
     blackboard_data: Optional[dict] = None
+    inherited_from: Optional[int] = None
 
 
 class OCRResultResponse(BaseModel):
@@ -37,11 +40,38 @@ class OCRResultResponse(BaseModel):
     design_dimension: Optional[int] = None
     actual_dimension: Optional[int] = None
     inspector: Optional[str] = None
+    inherited_from: Optional[int] = None
+
+
+def _store_ocr_result(photo: Photo, text_blocks: list, blackboard_data: BlackboardData):
+    """OCR結果を写真に保存（コミットは呼び出し側で行う）"""
+    photo.major_category = "工事"  # OCR処理済みは工事として設定
+    photo.work_type = blackboard_data.work_type
+    photo.work_kind = blackboard_data.work_kind
+    photo.work_detail = blackboard_data.work_detail
+
+    if blackboard_data.shooting_date:
+        from datetime import datetime
+
+        photo.shooting_date = datetime.fromisoformat(blackboard_data.shooting_date)
+
+    # メタデータに保存
+    metadata = dict(photo.photo_metadata or {})
+    metadata["ocr_result"] = blackboard_data.model_dump()
+    metadata["ocr_text_blocks"] = text_blocks
+    metadata.pop("ocr_inherited_from", None)
+    photo.photo_metadata = metadata  # type: ignore[assignment]
+
+    photo.is_processed = True
 
 
 @router.post("/{photo_id}/process-ocr", response_model=OCRProcessResponse)
 async def process_ocr(
     photo_id: int,
+    force: bool = Query(
+        False,
+        description="重複グループの代表写真の結果を引き継がず、この写真を処理する",
+    ),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user),
 ):
@@ -50,6 +80,7 @@ async def process_ocr(
 
     Args:
         photo_id: 写真ID
+        force: 代表写真の結果を引き継がずに再処理するか
         db: データベースセッション
         current_user: 現在の認証済みユーザー
 
@@ -74,47 +105,57 @@ async def process_ocr(
             detail=f"写真が見つかりません（ID: {photo_id}）",
         )
 
+    # 確定済み重複グループのメンバーは代表写真の結果を再利用
+    reuse_service = AnalysisReuseService(db)
+    representative = None if force else reuse_service.find_representative(photo)
+
+    if representative is not None and "ocr_result" in (
+        representative.photo_metadata or {}
+    ):
+        reuse_service.propagate_ocr(representative, [photo])
+        db.commit()
+        db.refresh(photo)
+        return OCRProcessResponse(
+            photo_id=photo_id,
+            status="inherited",
+            blackboard_data=cast(Dict[str, Any], photo.photo_metadata)["ocr_result"],
+            inherited_from=cast(int, representative.id),
+        )
+
+    # 代表写真が未処理の場合は代表写真を処理してグループ全体へ引き継ぐ
+    target = representative or photo
+
     # OCRサービスを使用してテキスト抽出
     ocr_service = OCRService()
 
     # S3キーからバケット名とキーを分離
     s3_bucket = settings.S3_BUCKET
-    s3_key = photo.s3_key
+    s3_key = target.s3_key
 
     try:
-        # テキスト抽出
-        text_blocks = ocr_service.extract_text_from_image(s3_bucket, s3_key)
+        # テキスト抽出（組織ごとの同時実行数上限の範囲で実行）
+        text_blocks = await get_job_scheduler().run(
+            cast(int, current_user.organization_id),
+            "textract",
+            lambda reporter: ocr_service.extract_text_from_image(s3_bucket, s3_key),
+            priority=JobPriority.INTERACTIVE,
+        )
 
         # 黒板データ解析
         blackboard_data = ocr_service.parse_blackboard_text(text_blocks)
 
         # データベースに保存
-        photo.major_category = "工事"  # OCR処理済みは工事として設定
-        photo.work_type = blackboard_data.work_type
-        photo.work_kind = blackboard_data.work_kind
-        photo.work_detail = blackboard_data.work_detail
-
-        if blackboard_data.shooting_date:
-            from datetime import datetime
-
-            photo.shooting_date = datetime.fromisoformat(blackboard_data.shooting_date)
-
-        # メタデータに保存
-        if not photo.photo_metadata:
-            photo.photo_metadata = {}
-
-        photo.photo_metadata["ocr_result"] = blackboard_data.model_dump()
-        photo.photo_metadata["ocr_text_blocks"] = text_blocks
-
-        photo.is_processed = True
+        _store_ocr_result(target, text_blocks, blackboard_data)
+        reuse_service.propagate_ocr(target)
 
         db.commit()
         db.refresh(photo)
 
         return OCRProcessResponse(
             photo_id=photo_id,
-            status="completed",
+            status="inherited" if representative else "completed",
             blackboard_data=blackboard_data.model_dump(),
+            inherited_from=cast(int, representative.id) if representative else None,
         )
 
     except Exception as e:
@@ -130,7 +171,7 @@ async def get_ocr_result(
     photo_id: int,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user),
-):
+) -> OCRResultResponse:
     """
     写真のOCR結果を取得（マルチテナント対応）
 
@@ -167,9 +208,11 @@ async def get_ocr_result(
     # メタデータからOCR結果を取得
     ocr_result = photo.photo_metadata.get("ocr_result", {})
 
+    inherited_from = photo.photo_metadata.get("ocr_inherited_from")
+
     return OCRResultResponse(
         photo_id=photo_id,
-        status="completed",
+        status="inherited" if inherited_from else "completed",
         work_name=ocr_result.get("work_name"),
         work_type=ocr_result.get("work_type"),
         work_kind=ocr_result.get("work_kind"),
@@ -178,4 +221,5 @@ async def get_ocr_result(
         design_dimension=ocr_result.get("design_dimension"),
         actual_dimension=ocr_result.get("actual_dimension"),
         inspector=ocr_result.get("inspector"),
+        inherited_from=inherited_from,
     )
@@ -2,22 +2,35 @@
 工事写真帳生成 APIルーター
 """
 
-import tempfile
 import os
-from typing import List
+from typing import Dict, List, cast
 import boto3
-from fastapi import APIRouter, Depends, HTTPException
-from fastapi.responses import FileResponse
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import Response
 from sqlalchemy.orm import Session
 
 from app.database.database import get_db
-from app.database.models import Photo
+from app.database.models import User
 from app.schemas.photo_album import (
     PhotoAlbumGenerationRequest,
     PhotoAlbumGenerationResponse,
     LayoutType as LayoutTypeSchema,
 )
+from app.services.artifact_cache import artifact_digest, get_artifact_cache
+from app.services.artifact_lifecycle import (
+    ADMISSION_RETRY_AFTER_SECONDS,
+    ArtifactQuotaExceeded,
+    get_artifact_lifecycle,
+)
 from app.services.photo_album_generator import PhotoAlbumGenerator, LayoutType
+from app.services.job_event_bus import JobProgressReporter
+from app.services.job_scheduler import JobPriority, get_job_scheduler
+from app.auth.dependencies import get_current_active_user
+from app.routers.artifact_download import (
+    artifact_download_response,
+    artifact_download_url,
+)
+from app.routers.photo_selections import load_target_photos
 from app.config import settings
 
 router = APIRouter(prefix="/api/v1/photo-album", tags=["photo-album"])
@@ -27,47 +40,25 @@ router = APIRouter(prefix="/api/v1/photo-album", tags=["photo-album"])
 async def generate_photo_album_pdf(
     request: PhotoAlbumGenerationRequest,
     db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user),
 ):
     """
-    PDF写真帳を生成
+    PDF写真帳を生成（マルチテナント対応）
 
     Args:
         request: 写真帳生成リクエスト
         db: データベースセッション
+        current_user: 現在の認証済みユーザー
 
     Returns:
-        生成結果
+        生成結果（自組織のみ）
     """
-    # 写真データ取得
-    photos = db.query(Photo).filter(Photo.id.in_(request.photo_ids)).all()
-
-    if not photos:
-        raise HTTPException(status_code=404, detail="指定された写真が見つかりません")
-
-    if len(photos) != len(request.photo_ids):
-        raise HTTPException(
-            status_code=400,
-            detail=f"一部の写真が見つかりません（指定: {len(request.photo_ids)}件, 取得: {len(photos)}件）",
-        )
+    # 写真データ取得（テナントフィルタ適用、選択セットはカーソルで順に読み出す）
+    photos = load_target_photos(request, db, cast(int, current_user.organization_id))
 
-    # S3クライアント初期化
-    s3_client = boto3.client("s3")
-
-    # 写真データをディクショナリに変換
+    # 写真データをディクショナリに変換（画像データは写真帳を作成する場合のみ取得）
     photo_dicts = []
     for photo in photos:
-        # S3から画像データを取得
-        image_data = None
-        if photo.s3_key:
-            try:
-                response = s3_client.get_object(
-                    Bucket=settings.S3_BUCKET, Key=photo.s3_key
-                )
-                image_data = response["Body"].read()
-            except Exception as e:
-                # S3からの取得に失敗した場合はログに記録してスキップ
-                print(f"Warning: Failed to download image from S3: {photo.s3_key}, Error: {str(e)}")
-
         photo_dict = {
             "id": photo.id,
             "file_name": photo.file_name,
@@ -80,47 +71,116 @@ async def generate_photo_album_pdf(
             "work_type": photo.work_type or "",
             "work_kind": photo.work_kind or "",
             "work_detail": photo.work_detail or "",
-            "image_data": image_data,
+            "updated_at": photo.updated_at,
+            "s3_key": photo.s3_key,
+            "file_size": photo.file_size,
         }
         photo_dicts.append(photo_dict)
 
-    # 写真帳生成サービス
-    album_generator = PhotoAlbumGenerator()
+    # レイアウトタイプ変換
+    layout_type_map = {
+        LayoutTypeSchema.STANDARD: LayoutType.STANDARD,
+        LayoutTypeSchema.COMPACT: LayoutType.COMPACT,
+        LayoutTypeSchema.DETAILED: LayoutType.DETAILED,
+    }
+    layout_type = layout_type_map[request.layout_type]
+
+    # 表紙データ変換
+    cover_data = None
+    if request.cover_data:
+        cover_data = {
+            "project_name": request.cover_data.project_name,
+            "contractor": request.cover_data.contractor,
+            "period_from": request.cover_data.period_from,
+            "period_to": request.cover_data.period_to,
+            "location": request.cover_data.location,
+        }
 
-    # 一時ディレクトリ作成
-    temp_dir = tempfile.mkdtemp()
-    output_path = os.path.join(temp_dir, "photo_album.pdf")
+    # 同じ写真（updated_atまで一致）・同じオプションの写真帳が作成済みであれば
+    # S3から画像を取得せずにそのまま返す
+    artifact_cache = get_artifact_cache()
+    digest = artifact_digest(
+        "photo_album",
+        photo_dicts,
+        {
+            "layout_type": layout_type.value,
+            "cover_data": cover_data,
+            "add_page_numbers": request.add_page_numbers,
+            "header_text": request.header_text,
+            "footer_text": request.footer_text,
+            "image_dpi": settings.PHOTO_ALBUM_IMAGE_DPI,
+            "jpeg_quality": settings.PHOTO_ALBUM_JPEG_QUALITY,
+            "jpeg_subsampling": settings.PHOTO_ALBUM_JPEG_SUBSAMPLING,
+        },
+        PhotoAlbumGenerator.ARTIFACT_VERSION,
+    )
+    cached_result = artifact_cache.get("photo_album", digest)
+    if cached_result is not None:
+        return _album_response(cached_result, cached=True)
+
+    # 写真帳生成サービス（画像は表示サイズの印刷解像度まで縮小して埋め込む）
+    album_generator = PhotoAlbumGenerator(
+        image_dpi=settings.PHOTO_ALBUM_IMAGE_DPI,
+        jpeg_quality=settings.PHOTO_ALBUM_JPEG_QUALITY,
+        jpeg_subsampling=settings.PHOTO_ALBUM_JPEG_SUBSAMPLING,
+        pages_per_part=settings.PHOTO_ALBUM_PAGES_PER_PART,
+    )
+
+    def build(output_dir: str, reporter: JobProgressReporter) -> Dict:
+        """成果物キャッシュのディレクトリに写真帳PDFを作成"""
+        # S3クライアント初期化
+        s3_client = boto3.client("s3")
+        missing_images = 0
+
+        def images():
+            """ページの描画に合わせてS3から画像を先読みしながら取得"""
+            nonlocal missing_images
+            fetched = album_generator.iter_images(
+                photo_dicts,
+                s3_client,
+                settings.S3_BUCKET,
+                prefetch_concurrency=settings.PHOTO_ALBUM_PREFETCH_CONCURRENCY,
+            )
+            for photo_dict, image_data in zip(photo_dicts, fetched):
+                if photo_dict["s3_key"] and image_data is None:
+                    missing_images += 1
+                yield image_data
 
-    try:
-        # レイアウトタイプ変換
-        layout_type_map = {
-            LayoutTypeSchema.STANDARD: LayoutType.STANDARD,
-            LayoutTypeSchema.COMPACT: LayoutType.COMPACT,
-            LayoutTypeSchema.DETAILED: LayoutType.DETAILED,
-        }
-        layout_type = layout_type_map[request.layout_type]
-
-        # 表紙データ変換
-        cover_data = None
-        if request.cover_data:
-            cover_data = {
-                "project_name": request.cover_data.project_name,
-                "contractor": request.cover_data.contractor,
-                "period_from": request.cover_data.period_from,
-                "period_to": request.cover_data.period_to,
-                "location": request.cover_data.location,
-            }
-
-        # PDF生成
         result = album_generator.generate_pdf(
             photos=photo_dicts,
-            output_path=output_path,
+            output_path=os.path.join(output_dir, "photo_album.pdf"),
             layout_type=layout_type,
             cover_data=cover_data,
             add_page_numbers=request.add_page_numbers,
             header_text=request.header_text,
             footer_text=request.footer_text,
+            images=images(),
+            reporter=reporter,
         )
+        return {**result, "missing_images": missing_images}
+
+    def job(reporter: JobProgressReporter) -> Dict:
+        # 画像を取得できなかった写真帳は保存しない（次回のリクエストで作り直す）
+        result, cached = artifact_cache.build(
+            "photo_album",
+            digest,
+            lambda output_dir: build(output_dir, reporter),
+            cacheable=lambda result: result["missing_images"] == 0,
+        )
+        return {**result, "cached": cached}
+
+    # このノードの作成領域に見積もりサイズを予約（空きがなければ受け付けない）
+    estimated_size = album_generator.estimate_pdf_size(photo_dicts, layout_type)
+
+    try:
+        # PDF生成（組織ごとの同時実行数上限の範囲で実行）
+        async with get_artifact_lifecycle().admit_async(estimated_size):
+            result = await get_job_scheduler().run(
+                cast(int, current_user.organization_id),
+                "photo_album",
+                job,
+                priority=JobPriority.STANDARD,
+            )
 
         if not result["success"]:
             return PhotoAlbumGenerationResponse(
@@ -134,17 +194,14 @@ async def generate_photo_album_pdf(
                 status="error",
             )
 
-        return PhotoAlbumGenerationResponse(
-            success=True,
-            pdf_path=result["pdf_path"],
-            download_url=f"/api/v1/photo-album/download?path={result['pdf_path']}",
-            total_pages=result["total_pages"],
-            total_photos=result["total_photos"],
-            file_size=result.get("file_size"),
-            errors=[],
-            status="success",
-        )
+        return _album_response(result, cached=result["cached"])
 
+    except ArtifactQuotaExceeded as e:
+        raise HTTPException(
+            status_code=503,
+            detail=str(e),
+            headers={"Retry-After": str(ADMISSION_RETRY_AFTER_SECONDS)},
+        )
     except Exception as e:
         return PhotoAlbumGenerationResponse(
             success=False,
@@ -158,22 +215,35 @@ async def generate_photo_album_pdf(
         )
 
 
-@router.get("/download")
-async def download_photo_album(path: str):
+def _album_response(result: Dict, cached: bool = False) -> PhotoAlbumGenerationResponse:
+    """作成済み写真帳の生成結果からレスポンスを作成"""
+    return PhotoAlbumGenerationResponse(
+        success=True,
+        pdf_path=result["pdf_path"],
+        download_url=artifact_download_url(
+            "/api/v1/photo-album/download", result["pdf_path"], "application/pdf"
+        ),
+        total_pages=result["total_pages"],
+        total_photos=result["total_photos"],
+        file_size=result.get("file_size"),
+        errors=[],
+        status="success",
+        cached=cached,
+    )
+
+
+@router.api_route("/download/{token}", methods=["GET", "HEAD"])
+async def download_photo_album(token: str, request: Request) -> Response:
     """
     写真帳PDFをダウンロード
 
+    Range・If-Range による部分取得（再開・分割並列ダウンロード）に対応します。
+
     Args:
-        path: ファイルパス
+        token: ダウンロードトークン（生成結果の download_url に含まれる）
+        request: リクエスト（Range・If-Range・If-None-Match ヘッダー）
 
     Returns:
-        ファイルレスポンス
+        ファイルレスポンス（Range指定時は206、If-None-Match一致時は304）
     """
-    if not os.path.exists(path):
-        raise HTTPException(status_code=404, detail="ファイルが見つかりません")
-
-    return FileResponse(
-        path=path,
-        media_type="application/pdf",
-        filename="photo_album.pdf",
-    )
+    return await artifact_download_response(token, request.headers)
@@ -0,0 +1,181 @@
+"""
+写真選択セット APIルーター
+"""
+
+from typing import Iterable, Optional, cast
+
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
+
+from app.auth.dependencies import get_current_active_user
+from app.database.database import get_db
+from app.database.models import Photo, PhotoSelection, User
+from app.schemas.photo_selection import (
+    PhotoSearchFilter,
+    PhotoSelectionCreate,
+    PhotoSelectionResponse,
+    PhotoTargetRequest,
+)
+from app.services.photo_selection_service import PhotoSelectionService
+
+router = APIRouter(prefix="/api/v1/photo-selections", tags=["photo-selections"])
+
+
+def get_selection_or_404(
+    db: Session, selection_id: int, organization_id: Optional[int]
+) -> PhotoSelection:
+    """
+    自組織の写真選択セットを取得
+
+    Raises:
+        HTTPException: 未認証（401）、選択セットが存在しない・期限切れ（404）の場合
+    """
+    if organization_id is None:
+        raise HTTPException(
+            status_code=401, detail="写真選択セットの利用には認証が必要です"
+        )
+    selection = PhotoSelectionService(db).get(selection_id, organization_id)
+    if selection is None:
+        raise HTTPException(status_code=404, detail="写真選択セットが見つかりません")
+    return selection
+
+
+def load_target_photos(
+    request: PhotoTargetRequest, db: Session, organization_id: Optional[int]
+) -> Iterable[Photo]:
+    """
+    リクエストの対象写真（photo_ids または selection_id）を写真ID順に取得
+
+    selection_id 指定時は選択セットのメンバーをサーバーサイドカーソルで順に読み出します。
+
+    Args:
+        request: 対象写真を指定するリクエスト
+        db: データベースセッション
+        organization_id: 組織ID（Noneの場合はテナントフィルタを適用しない）
+
+    Returns:
+        写真のイテラブル
+
+    Raises:
+        HTTPException: 写真が見つからない、または一部が見つからない場合
+    """
+    if request.selection_id is not None:
+        selection = get_selection_or_404(db, request.selection_id, organization_id)
+        if not selection.photo_count:
+            raise HTTPException(
+                status_code=404, detail="指定された写真が見つかりません"
+            )
+        return PhotoSelectionService(db).iter_photos(selection)
+
+    photo_ids = request.photo_ids or []
+    query = db.query(Photo).filter(Photo.id.in_(photo_ids))
+    if organization_id is not None:
+        query = query.filter(Photo.organization_id == organization_id)
+    photos = query.order_by(Photo.id).all()
+
+    if not photos:
+        raise HTTPException(status_code=404, detail="指定された写真が見つかりません")
+
+    if len(photos) != len(photo_ids):
+        raise HTTPException(
+            status_code=400,
+            detail=f"一部の写真が見つかりません（指定: {len(photo_ids)}件, 取得: {len(photos)}件）",
+        )
+    return photos
+
+
+@router.post("", response_model=PhotoSelectionResponse, status_code=201)
+async def create_photo_selection(
+    request: PhotoSelectionCreate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user),
+) -> PhotoSelection:
+    """
+    写真選択セットを作成（マルチテナント対応）
+
+    写真IDリストまたは検索条件（/api/v1/photos/search と同じ条件）から作成します。
+    作成した選択セットのIDは、エクスポート・PHOTO.XML・写真帳の各APIの
+    selection_id に指定できます。
+
+    Args:
+        request: 写真選択セット作成リクエスト
+        db: データベースセッション
+        current_user: 現在の認証済みユーザー
+
+    Returns:
+        作成された写真選択セット
+
+    Raises:
+        HTTPException: 写真IDリストの一部が自組織に存在しない場合（400）
+    """
+    service = PhotoSelectionService(db)
+    organization_id = cast(int, current_user.organization_id)
+    created_by = cast(int, current_user.id)
+    if request.photo_ids is not None:
+        selection = service.create_from_ids(
+            organization_id,
+            request.photo_ids,
+            name=request.name,
+            created_by=created_by,
+        )
+        requested = len(set(request.photo_ids))
+        if selection.photo_count != requested:
+            db.rollback()
+            raise HTTPException(
+                status_code=400,
+                detail=f"一部の写真が見つかりません（指定: {requested}件, 取得: {selection.photo_count}件）",
+            )
+    else:
+        selection = service.create_from_filter(
+            organization_id,
+            cast(PhotoSearchFilter, request.filter).model_dump(exclude_none=True),
+            name=request.name,
+            created_by=created_by,
+        )
+
+    db.commit()
+    db.refresh(selection)
+    return selection
+
+
+@router.get("/{selection_id}", response_model=PhotoSelectionResponse)
+async def get_photo_selection(
+    selection_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user),
+) -> PhotoSelection:
+    """
+    写真選択セットを取得（自組織のみ）
+
+    Args:
+        selection_id: 写真選択セットID
+        db: データベースセッション
+        current_user: 現在の認証済みユーザー
+
+    Returns:
+        写真選択セット
+    """
+    return get_selection_or_404(
+        db, selection_id, cast(int, current_user.organization_id)
+    )
+
+
+@router.delete("/{selection_id}", status_code=204)
+async def delete_photo_selection(
+    selection_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user),
+) -> None:
+    """
+    写真選択セットを削除（自組織のみ）
+
+    Args:
+        selection_id: 写真選択セットID
+        db: データベースセッション
+        current_user: 現在の認証済みユーザー
+    """
+    selection = get_selection_or_404(
+        db, selection_id, cast(int, current_user.organization_id)
+    )
+    PhotoSelectionService(db).delete(selection)
+    db.commit()
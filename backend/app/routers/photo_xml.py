@@ -2,48 +2,71 @@
 PHOTO.XML生成 APIルーター
 """
 
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException
+from io import BytesIO
+from typing import Optional, cast
+from fastapi import APIRouter, Depends, Query
 from sqlalchemy.orm import Session
 
+from app.auth.dependencies import get_optional_current_user
 from app.database.database import get_db
-from app.database.models import Photo
+from app.database.models import User
+from app.routers.photo_selections import get_selection_or_404, load_target_photos
 from app.schemas.photo_xml import (
+    DTDErrorResponse,
+    FragmentCacheStatsResponse,
     PhotoXMLGenerationRequest,
     PhotoXMLGenerationResponse,
     PhotoXMLValidationResponse,
 )
+from app.services.photo_validation_service import (
+    PhotoValidationService,
+    validation_messages,
+)
+from app.services.photo_xml_dtd_validator import (
+    DTDValidatingStream,
+    PhotoXMLDTDValidator,
+)
+from app.services.photo_xml_fragment_cache import (
+    FragmentCacheStats,
+    get_photo_xml_fragment_cache,
+)
 from app.services.photo_xml_generator import PhotoXMLGenerator
 
 router = APIRouter(prefix="/api/v1/photo-xml", tags=["photo-xml"])
 
 
+def _selection_organization_id(
+    request: PhotoXMLGenerationRequest, current_user: Optional[User]
+) -> Optional[int]:
+    """写真選択セット指定時のテナントフィルタ（写真IDリスト指定時は従来どおり適用しない）"""
+    if request.selection_id is None or current_user is None:
+        return None
+    return cast(int, current_user.organization_id)
+
+
 @router.post("/generate", response_model=PhotoXMLGenerationResponse)
 async def generate_photo_xml(
     request: PhotoXMLGenerationRequest,
     db: Session = Depends(get_db),
+    current_user: Optional[User] = Depends(get_optional_current_user),
 ):
     """
     PHOTO.XMLを生成
 
+    写真選択セット（selection_id）を指定する場合は認証が必要です。
+
     Args:
         request: XML生成リクエスト
         db: データベースセッション
+        current_user: 認証済みユーザー（未認証の場合はNone）
 
     Returns:
         生成結果
     """
-    # 写真データ取得
-    photos = db.query(Photo).filter(Photo.id.in_(request.photo_ids)).all()
-
-    if not photos:
-        raise HTTPException(status_code=404, detail="指定された写真が見つかりません")
-
-    if len(photos) != len(request.photo_ids):
-        raise HTTPException(
-            status_code=400,
-            detail=f"一部の写真が見つかりません（指定: {len(request.photo_ids)}件, 取得: {len(photos)}件）",
-        )
+    # 写真データ取得（写真選択セットは自組織のもののみ）
+    photos = load_target_photos(
+        request, db, _selection_organization_id(request, current_user)
+    )
 
     # 写真データをディクショナリに変換
     photo_dicts = []
@@ -65,6 +88,7 @@ async def generate_photo_xml(
             "work_kind": photo.work_kind or "",
             "work_detail": photo.work_detail or "",
             "photo_metadata": photo.photo_metadata or {},
+            "updated_at": photo.updated_at,
         }
 
         # プロジェクト情報を追加（最初の写真のみ）
@@ -82,14 +106,26 @@ async def generate_photo_xml(
 
         photo_dicts.append(photo_dict)
 
-    # XML生成
-    xml_content = xml_generator.generate_xml(photo_dicts, pretty_print=True)
-
-    # ファイルサイズ計算（Shift_JISエンコード後）
-    file_size = len(xml_content.encode("shift_jis"))
+    # XML生成（キャッシュ済みの写真情報フラグメントを再利用し、DTD適合を同時に検査）
+    cache_stats = FragmentCacheStats()
+    dtd_validator = PhotoXMLDTDValidator()
+    buffer = BytesIO()
+    file_size = xml_generator.write_xml(
+        photo_dicts,
+        DTDValidatingStream(buffer, dtd_validator),
+        pretty_print=True,
+        fragment_cache=get_photo_xml_fragment_cache(),
+        cache_stats=cache_stats,
+    )
+    xml_content = buffer.getvalue().decode("shift_jis")
+    dtd_errors = dtd_validator.close()
 
     # ステータス決定
-    status = "success" if not validation_errors else "success_with_warnings"
+    status = (
+        "success"
+        if not validation_errors and not dtd_errors
+        else "success_with_warnings"
+    )
 
     return PhotoXMLGenerationResponse(
         total_photos=len(photo_dicts),
@@ -97,81 +133,77 @@ async def generate_photo_xml(
         file_size=file_size,
         validation_errors=validation_errors,
         status=status,
+        fragment_cache=FragmentCacheStatsResponse(**cache_stats.as_dict()),
+        dtd_errors=[DTDErrorResponse(**error.as_dict()) for error in dtd_errors],
     )
 
 
 @router.post("/validate", response_model=PhotoXMLValidationResponse)
 async def validate_photo_xml(
     request: PhotoXMLGenerationRequest,
+    offset: int = Query(0, ge=0, description="違反写真一覧の開始位置"),
+    limit: int = Query(100, ge=1, le=1000, description="違反写真一覧の最大件数"),
     db: Session = Depends(get_db),
+    current_user: Optional[User] = Depends(get_optional_current_user),
 ):
     """
     PHOTO.XML生成前にデータをバリデーション
 
+    検査はSQLで集計し、件数は全写真分、違反写真は offset/limit の範囲分を返します。
+    写真選択セット（selection_id）を指定する場合は認証が必要です。
+
     Args:
         request: XML生成リクエスト
+        offset: 違反写真一覧の開始位置
+        limit: 違反写真一覧の最大件数
         db: データベースセッション
+        current_user: 認証済みユーザー（未認証の場合はNone）
 
     Returns:
         バリデーション結果
     """
-    # 写真データ取得
-    photos = db.query(Photo).filter(Photo.id.in_(request.photo_ids)).all()
+    result = None
+    organization_id = _selection_organization_id(request, current_user)
+    requested = len(request.photo_ids or [])
+    if request.selection_id is not None:
+        selection = get_selection_or_404(db, request.selection_id, organization_id)
+        requested = cast(int, selection.photo_count)
+    if requested:
+        result = PhotoValidationService(db).validate(
+            request.photo_ids,
+            organization_id=organization_id,
+            warnings=("missing_ocr", "missing_classification"),
+            check_duplicates=False,
+            offset=offset,
+            limit=limit,
+            selection_id=request.selection_id,
+        )
 
-    if not photos:
+    if not result or not result["total"]:
         return PhotoXMLValidationResponse(
             is_valid=False,
             errors=["指定された写真が見つかりません"],
             warnings=[],
         )
 
-    if len(photos) != len(request.photo_ids):
+    total = result["total"]
+    if request.photo_ids is not None and total != requested:
         return PhotoXMLValidationResponse(
             is_valid=False,
             errors=[
-                f"一部の写真が見つかりません（指定: {len(request.photo_ids)}件, 取得: {len(photos)}件）"
+                f"一部の写真が見つかりません（指定: {requested}件, 取得: {total}件）"
             ],
             warnings=[],
         )
 
-    xml_generator = PhotoXMLGenerator()
-    errors = []
-    warnings = []
-
-    for photo in photos:
-        photo_dict = {
-            "id": photo.id,
-            "file_name": photo.file_name,
-            "title": photo.title or "",
-            "shooting_date": (
-                photo.shooting_date.isoformat() if photo.shooting_date else ""
-            ),
-            "major_category": photo.major_category or "",
-            "photo_type": photo.photo_type or "",
-            "work_type": photo.work_type or "",
-            "work_kind": photo.work_kind or "",
-            "work_detail": photo.work_detail or "",
-            "photo_metadata": photo.photo_metadata or {},
-        }
-
-        # データバリデーション
-        photo_errors = xml_generator.validate_photo_data(photo_dict)
-        if photo_errors:
-            errors.extend([f"写真ID {photo.id}: {error}" for error in photo_errors])
-
-        # 警告チェック
-        # OCRデータがない場合
-        if not photo.photo_metadata or not photo.photo_metadata.get("ocr_result"):
-            warnings.append(f"写真ID {photo.id}: OCRデータが未処理です")
-
-        # 分類データがない場合
-        if not photo.photo_metadata or not photo.photo_metadata.get("classification"):
-            warnings.append(f"写真ID {photo.id}: 分類データが未処理です")
-
-    is_valid = len(errors) == 0
+    errors, warnings = validation_messages(result)
 
     return PhotoXMLValidationResponse(
-        is_valid=is_valid,
+        is_valid=result["invalid_photos"] == 0,
         errors=errors,
         warnings=warnings,
+        error_counts=result["error_counts"],
+        warning_counts=result["warning_counts"],
+        offenders=result["offenders"],
+        offender_total=result["offender_total"],
     )
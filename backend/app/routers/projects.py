@@ -47,6 +47,7 @@ async def create_project(
         client_name=project_data.client_name,
         start_date=project_data.start_date,
         end_date=project_data.end_date,
+        reuse_duplicate_analysis=project_data.reuse_duplicate_analysis,
     )
 
     db.add(new_project)
@@ -66,6 +67,7 @@ async def create_project(
         client_name=new_project.client_name,
         start_date=new_project.start_date,
         end_date=new_project.end_date,
+        reuse_duplicate_analysis=bool(new_project.reuse_duplicate_analysis),
         photo_count=photo_count or 0,
         created_at=new_project.created_at,
         updated_at=new_project.updated_at,
@@ -117,6 +119,7 @@ async def list_projects(
                 client_name=project.client_name,
                 start_date=project.start_date,
                 end_date=project.end_date,
+                reuse_duplicate_analysis=bool(project.reuse_duplicate_analysis),
                 photo_count=photo_count or 0,
                 created_at=project.created_at,
                 updated_at=project.updated_at,
@@ -168,6 +171,7 @@ async def get_project(
         client_name=project.client_name,
         start_date=project.start_date,
         end_date=project.end_date,
+        reuse_duplicate_analysis=bool(project.reuse_duplicate_analysis),
         photo_count=photo_count or 0,
         created_at=project.created_at,
         updated_at=project.updated_at,
@@ -218,6 +222,8 @@ async def update_project(
         project.start_date = project_data.start_date
     if project_data.end_date is not None:
         project.end_date = project_data.end_date
+    if project_data.reuse_duplicate_analysis is not None:
+        project.reuse_duplicate_analysis = project_data.reuse_duplicate_analysis  # type: ignore[assignment]
 
     db.commit()
     db.refresh(project)
@@ -235,6 +241,7 @@ async def update_project(
         client_name=project.client_name,
         start_date=project.start_date,
         end_date=project.end_date,
+        reuse_duplicate_analysis=bool(project.reuse_duplicate_analysis),
         photo_count=photo_count or 0,
         created_at=project.created_at,
         updated_at=project.updated_at,
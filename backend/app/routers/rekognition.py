@@ -2,26 +2,93 @@
 Amazon Rekognition 画像分類 API エンドポイント
 """
 
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+import time
+from typing import Any, Dict, List, Tuple, cast
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session, sessionmaker
 
 from app.database.database import get_db
 from app.database.models import Photo, User
 from app.schemas.rekognition import (
+    BatchClassificationRequest,
+    BatchClassificationResponse,
     ClassificationResponse,
     ClassificationResultResponse,
     ImageLabelResponse,
 )
 from app.services.rekognition_service import RekognitionService
+from app.services.photo_label_service import PhotoLabelService
+from app.services.analysis_reuse_service import AnalysisReuseService
+from app.services.job_event_bus import JobProgressReporter
+from app.services.job_scheduler import JobPriority, get_job_scheduler
 from app.auth.dependencies import get_current_active_user
 from app.config import settings
 
 router = APIRouter(prefix="/api/v1/photos", tags=["Rekognition"])
 
 
+def _store_classification(
+    db: Session,
+    photo: Photo,
+    labels: List[Dict],
+    rekognition_service: RekognitionService,
+) -> Tuple[Dict[str, List[str]], Dict]:
+    """
+    分類結果を写真メタデータと photo_labels に保存（コミットは呼び出し側で行う）
+
+    Returns:
+        (カテゴリ別ラベル, サマリー)
+    """
+    categorized, summary = rekognition_service.categorize_and_summarize(labels)
+
+    metadata = dict(photo.photo_metadata or {})
+    metadata["rekognition_labels"] = [
+        {
+            "name": label["Name"],
+            "confidence": label["Confidence"],
+            "parents": label["Parents"],
+        }
+        for label in labels
+    ]
+    metadata["rekognition_categorized"] = categorized
+    metadata["rekognition_summary"] = summary
+    metadata.pop("rekognition_inherited_from", None)
+    photo.photo_metadata = metadata  # type: ignore[assignment]
+
+    PhotoLabelService().replace_photo_labels(db, photo, labels, categorized)
+
+    return categorized, summary
+
+
+def _classification_response(photo: Photo) -> ClassificationResponse:
+    """保存済みの分類結果からレスポンスを作成"""
+    metadata = cast(Dict[str, Any], photo.photo_metadata or {})
+    inherited_from = metadata.get("rekognition_inherited_from")
+    return ClassificationResponse(
+        photo_id=cast(int, photo.id),
+        status="inherited" if inherited_from else "completed",
+        labels=[
+            ImageLabelResponse(
+                name=label["name"],
+                confidence=label["confidence"],
+                parents=label.get("parents", []),
+            )
+            for label in metadata.get("rekognition_labels", [])
+        ],
+        categorized_labels=metadata.get("rekognition_categorized") or {},
+        summary=metadata.get("rekognition_summary") or {},
+        inherited_from=inherited_from,
+    )
+
+
 @router.post("/{photo_id}/classify", response_model=ClassificationResponse)
 async def classify_image(
     photo_id: int,
+    force: bool = Query(
+        False,
+        description="重複グループの代表写真の結果を引き継がず、この写真を解析する",
+    ),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user),
 ):
@@ -30,6 +97,7 @@ async def classify_image(
 
     Args:
         photo_id: 写真ID
+        force: 代表写真の結果を引き継がずに再解析するか
         db: データベースセッション
         current_user: 現在の認証済みユーザー
 
@@ -52,58 +120,48 @@ async def classify_image(
             status_code=404, detail=f"写真が見つかりません（ID: {photo_id}）"
         )
 
+    # 確定済み重複グループのメンバーは代表写真の結果を再利用
+    reuse_service = AnalysisReuseService(db)
+    representative = None if force else reuse_service.find_representative(photo)
+
+    if representative is not None and "rekognition_labels" in (
+        representative.photo_metadata or {}
+    ):
+        reuse_service.propagate_labels(representative, [photo])
+        db.commit()
+        db.refresh(photo)
+        return _classification_response(photo)
+
+    # 代表写真が未解析の場合は代表写真を解析してグループ全体へ引き継ぐ
+    target = representative or photo
+
     # Rekognitionサービス初期化
     rekognition_service = RekognitionService(confidence_threshold=70.0)
 
     # S3情報取得
     s3_bucket = settings.S3_BUCKET
-    s3_key = photo.s3_key
+    s3_key = target.s3_key
 
     try:
-        # ラベル検出
-        labels = rekognition_service.detect_labels_from_image(
-            s3_bucket=s3_bucket, s3_key=s3_key
+        # ラベル検出（組織ごとの同時実行数上限の範囲で実行）
+        labels = await get_job_scheduler().run(
+            cast(int, current_user.organization_id),
+            "rekognition",
+            lambda reporter: rekognition_service.detect_labels_from_image(
+                s3_bucket=s3_bucket, s3_key=s3_key
+            ),
+            priority=JobPriority.INTERACTIVE,
         )
 
-        # カテゴリ分類
-        categorized = rekognition_service.categorize_construction_labels(labels)
-
-        # サマリー作成
-        summary = rekognition_service.create_image_label_summary(labels)
-
-        # データベースに保存
-        if photo.photo_metadata is None:
-            photo.photo_metadata = {}
-
-        photo.photo_metadata["rekognition_labels"] = [
-            {
-                "name": label["Name"],
-                "confidence": label["Confidence"],
-                "parents": label["Parents"],
-            }
-            for label in labels
-        ]
-        photo.photo_metadata["rekognition_categorized"] = categorized
-        photo.photo_metadata["rekognition_summary"] = summary
+        # カテゴリ分類・サマリー作成・データベースに保存
+        _store_classification(db, target, labels, rekognition_service)
+        reuse_service.propagate_labels(target)
 
         db.commit()
         db.refresh(photo)
 
         # レスポンス作成
-        return ClassificationResponse(
-            photo_id=photo_id,
-            status="completed",
-            labels=[
-                ImageLabelResponse(
-                    name=label["Name"],
-                    confidence=label["Confidence"],
-                    parents=label["Parents"],
-                )
-                for label in labels
-            ],
-            categorized_labels=categorized,
-            summary=summary,
-        )
+        return _classification_response(photo)
 
     except Exception as e:
         raise HTTPException(
@@ -111,12 +169,193 @@ async def classify_image(
         )
 
 
+def _run_batch_classification(
+    session_factory: sessionmaker,
+    rekognition_service: RekognitionService,
+    targets: List[Tuple[int, str]],
+    representative_ids: List[int],
+    max_concurrency: int,
+    reporter: JobProgressReporter,
+) -> Dict:
+    """
+    一括画像分類ジョブ本体（ワーカースレッドで実行）
+
+    結果は REKOGNITION_BATCH_COMMIT_SIZE 件ごとにコミットし、
+    失敗した写真はバッチを中断せずに結果へ記録します。
+    解析した写真が重複グループの代表写真であればメンバーへ結果を引き継ぎ、
+    representative_ids のうち解析済みの代表写真も同様に引き継ぎます。
+    """
+    reporter.set_total(len(targets))
+    reporter.stage("classifying")
+
+    started = time.monotonic()
+    succeeded = 0
+    retries = 0
+    inherited = 0
+    failures = []
+    pending = 0
+    analysed = set()
+
+    db = session_factory()
+    reuse_service = AnalysisReuseService(db)
+    try:
+        for result in rekognition_service.detect_labels_batch(
+            targets,
+            s3_bucket=settings.S3_BUCKET,
+            max_concurrency=max_concurrency,
+            max_retries=settings.REKOGNITION_MAX_RETRIES,
+        ):
+            retries += result.attempts - 1
+            if result.success:
+                photo = db.get(Photo, result.photo_id)
+                if photo is not None:
+                    _store_classification(db, photo, result.labels, rekognition_service)
+                    inherited += reuse_service.propagate_labels(photo)
+                    analysed.add(photo.id)
+                    succeeded += 1
+                    pending += 1
+            else:
+                failures.append({"photo_id": result.photo_id, "error": result.error})
+
+            if pending >= settings.REKOGNITION_BATCH_COMMIT_SIZE:
+                db.commit()
+                pending = 0
+            reporter.advance(1)
+
+        for representative_id in representative_ids:
+            representative = db.get(Photo, representative_id)
+            if representative is not None and representative_id not in analysed:
+                inherited += reuse_service.propagate_labels(representative)
+
+        db.commit()
+    finally:
+        db.close()
+
+    elapsed = time.monotonic() - started
+    return {
+        "total": len(targets),
+        "succeeded": succeeded,
+        "failed": len(failures),
+        "failures": failures,
+        "inherited": inherited,
+        "retries": retries,
+        "elapsed_seconds": round(elapsed, 3),
+        "photos_per_second": round(len(targets) / elapsed, 2) if elapsed > 0 else 0.0,
+    }
+
+
+@router.post(
+    "/classify/batch", response_model=BatchClassificationResponse, status_code=202
+)
+async def classify_images_batch(
+    request: BatchClassificationRequest,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user),
+):
+    """
+    複数写真の画像分類を一括実行（マルチテナント対応）
+
+    BULKジョブとしてスケジューラーに投入し、ジョブIDを返します。
+    進捗と写真ごとの成否は /api/v1/jobs/{job_id} で取得できます。
+
+    Args:
+        request: 一括画像分類リクエスト
+        db: データベースセッション
+        current_user: 現在の認証済みユーザー
+
+    Returns:
+        BatchClassificationResponse: ジョブ受付結果
+
+    Raises:
+        HTTPException: 対象が指定されていない場合
+    """
+    if request.photo_ids is None and request.project_id is None:
+        raise HTTPException(
+            status_code=400, detail="photo_ids または project_id を指定してください"
+        )
+
+    # 対象写真取得（テナントフィルタ適用）
+    query = db.query(Photo.id, Photo.s3_key, Photo.photo_metadata).filter(
+        Photo.organization_id == current_user.organization_id,
+        Photo.s3_key.isnot(None),
+    )
+    if request.photo_ids is not None:
+        query = query.filter(Photo.id.in_(request.photo_ids))
+    if request.project_id is not None:
+        query = query.filter(Photo.project_id == request.project_id)
+
+    rows = [
+        (photo_id, s3_key)
+        for photo_id, s3_key, metadata in query.order_by(Photo.id).all()
+        if not (
+            request.skip_classified and metadata and "rekognition_labels" in metadata
+        )
+    ]
+
+    # 確定済み重複グループのメンバーは解析せず、代表写真の結果を引き継ぐ
+    representatives = (
+        {}
+        if request.force
+        else AnalysisReuseService(db).representative_ids(
+            cast(int, current_user.organization_id), [photo_id for photo_id, _ in rows]
+        )
+    )
+    targets = [
+        (photo_id, s3_key)
+        for photo_id, s3_key in rows
+        if photo_id not in representatives
+    ]
+    representative_ids = sorted(set(representatives.values()))
+
+    # 未解析の代表写真は解析対象に加える
+    target_ids = {photo_id for photo_id, _ in targets}
+    if representative_ids:
+        for photo_id, s3_key, metadata in db.query(
+            Photo.id, Photo.s3_key, Photo.photo_metadata
+        ).filter(
+            Photo.id.in_(representative_ids),
+            Photo.organization_id == current_user.organization_id,
+        ):
+            if photo_id not in target_ids and not (
+                metadata and "rekognition_labels" in metadata
+            ):
+                targets.append((photo_id, s3_key))
+
+    rekognition_service = RekognitionService(confidence_threshold=70.0)
+    session_factory = sessionmaker(
+        autocommit=False, autoflush=False, bind=db.get_bind()
+    )
+    max_concurrency = request.max_concurrency or settings.REKOGNITION_BATCH_CONCURRENCY
+
+    job = get_job_scheduler().submit(
+        cast(int, current_user.organization_id),
+        "rekognition_batch",
+        lambda reporter: _run_batch_classification(
+            session_factory,
+            rekognition_service,
+            targets,
+            representative_ids,
+            max_concurrency,
+            reporter,
+        ),
+        priority=JobPriority.BULK,
+        cost=max(len(targets), 1),
+    )
+
+    return BatchClassificationResponse(
+        job_id=job.job_id,
+        status="queued",
+        total=len(targets),
+        inherited=len(representatives),
+    )
+
+
 @router.get("/{photo_id}/classification", response_model=ClassificationResultResponse)
 async def get_classification_result(
     photo_id: int,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user),
-):
+) -> ClassificationResultResponse:
     """
     画像分類結果を取得（マルチテナント対応）
 
@@ -156,9 +395,11 @@ async def get_classification_result(
     categorized = photo.photo_metadata.get("rekognition_categorized")
     summary = photo.photo_metadata.get("rekognition_summary")
 
+    inherited_from = photo.photo_metadata.get("rekognition_inherited_from")
+
     return ClassificationResultResponse(
         photo_id=photo_id,
-        status="completed",
+        status="inherited" if inherited_from else "completed",
         labels=[
             ImageLabelResponse(
                 name=label["name"],
@@ -169,4 +410,5 @@ async def get_classification_result(
         ],
         categorized_labels=categorized,
         summary=summary,
+        inherited_from=inherited_from,
     )
@@ -2,16 +2,29 @@
 タイトル自動生成 API エンドポイント
 """
 
+from typing import Any, Dict, Optional, cast
+
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, sessionmaker
 
+from app.config import settings
 from app.database.database import get_db
-from app.database.models import Photo
+from app.database.models import Photo, Project, User
 from app.schemas.title import (
     TitleGenerationResponse,
+    TitleRegenerationRequest,
+    TitleRegenerationResponse,
     TitleUpdateRequest,
 )
 from app.services.title_generation_service import TitleGenerationService
+from app.services.title_regeneration_service import (
+    TitleRegenerationService,
+    build_title_inputs,
+    generated_title_metadata,
+)
+from app.services.job_event_bus import JobProgressReporter
+from app.services.job_scheduler import JobPriority, get_job_scheduler
+from app.auth.dependencies import get_current_active_user
 
 router = APIRouter(prefix="/api/v1/photos", tags=["Title Generation"])
 
@@ -41,21 +54,10 @@ async def generate_title(photo_id: int, db: Session = Depends(get_db)):
         )
 
     try:
-        # OCRデータ取得
-        ocr_data = {}
-        if photo.photo_metadata and "ocr_result" in photo.photo_metadata:
-            ocr_result = photo.photo_metadata["ocr_result"]
-            ocr_data = {
-                "work_type": ocr_result.get("work_type"),
-                "work_kind": ocr_result.get("work_kind"),
-                "station": ocr_result.get("station"),
-                "shooting_date": ocr_result.get("shooting_date"),
-            }
-
-        # 分類データ取得
-        classification_data = {}
-        if photo.photo_metadata and "rekognition_labels" in photo.photo_metadata:
-            classification_data = photo.photo_metadata["rekognition_labels"]
+        # OCRデータ・分類データ取得
+        ocr_data, classification_data = build_title_inputs(
+            cast(Optional[Dict[str, Any]], photo.photo_metadata)
+        )
 
         # タイトル生成
         service = TitleGenerationService()
@@ -66,17 +68,9 @@ async def generate_title(photo_id: int, db: Session = Depends(get_db)):
         # データベースに保存
         photo.title = result["title"]
 
-        if photo.photo_metadata is None:
-            photo.photo_metadata = {}
-
-        photo.photo_metadata["generated_title"] = {
-            "title": result["title"],
-            "work_type": result["work_type"],
-            "station": result["station"],
-            "subject": result["subject"],
-            "date": result["date"],
-            "confidence": result["confidence"],
-        }
+        metadata = dict(photo.photo_metadata or {})
+        metadata["generated_title"] = generated_title_metadata(result)
+        photo.photo_metadata = metadata  # type: ignore[assignment]
 
         db.commit()
         db.refresh(photo)
@@ -98,10 +92,95 @@ async def generate_title(photo_id: int, db: Session = Depends(get_db)):
         )
 
 
+@router.post(
+    "/titles/regenerate", response_model=TitleRegenerationResponse, status_code=202
+)
+async def regenerate_titles(
+    request: TitleRegenerationRequest,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user),
+):
+    """
+    工事（省略時は組織）内の写真のタイトルを一括再生成（マルチテナント対応）
+
+    BULKジョブとしてスケジューラーに投入し、ジョブIDを返します。
+    手動設定タイトルの写真と、入力（OCR項目・分類ラベル・生成サービスの
+    バージョン）が前回生成時から変わっていない写真は再生成しません。
+
+    Args:
+        request: タイトル一括再生成リクエスト
+        db: データベースセッション
+        current_user: 現在の認証済みユーザー
+
+    Returns:
+        TitleRegenerationResponse: ジョブ受付結果
+
+    Raises:
+        HTTPException: 工事が見つからない場合
+    """
+    query = db.query(Photo.id).filter(
+        Photo.organization_id == current_user.organization_id
+    )
+    if request.project_id is not None:
+        project = (
+            db.query(Project)
+            .filter(
+                Project.id == request.project_id,
+                Project.organization_id == current_user.organization_id,
+            )
+            .first()
+        )
+        if project is None:
+            raise HTTPException(status_code=404, detail="プロジェクトが見つかりません")
+        query = query.filter(Photo.project_id == project.id)
+
+    total = query.count()
+    session_factory = sessionmaker(
+        autocommit=False, autoflush=False, bind=db.get_bind()
+    )
+    organization_id = cast(int, current_user.organization_id)
+    batch_size = request.batch_size or settings.TITLE_REGENERATION_BATCH_SIZE
+
+    job = get_job_scheduler().submit(
+        organization_id,
+        "title_regeneration",
+        lambda reporter: _run_title_regeneration(
+            session_factory,
+            organization_id,
+            request.project_id,
+            request.force,
+            batch_size,
+            reporter,
+        ),
+        priority=JobPriority.BULK,
+        cost=max(total // batch_size, 1),
+    )
+
+    return TitleRegenerationResponse(job_id=job.job_id, status="queued", total=total)
+
+
+def _run_title_regeneration(
+    session_factory: sessionmaker,
+    organization_id: int,
+    project_id: Optional[int],
+    force: bool,
+    batch_size: int,
+    reporter: JobProgressReporter,
+) -> Dict:
+    """タイトル一括再生成ジョブ本体（ワーカースレッドで実行）"""
+    db = session_factory()
+    try:
+        return TitleRegenerationService(db, batch_size=batch_size).regenerate(
+            organization_id, project_id=project_id, force=force, reporter=reporter
+        )
+    finally:
+        db.close()
+
+
 @router.put("/{photo_id}/title", response_model=TitleGenerationResponse)
 async def update_title(
     photo_id: int, request: TitleUpdateRequest, db: Session = Depends(get_db)
-):
+) -> TitleGenerationResponse:
     """
     写真のタイトルを手動更新
 
@@ -127,11 +206,10 @@ async def update_title(
         # タイトル更新
         photo.title = request.title
 
-        if photo.photo_metadata is None:
-            photo.photo_metadata = {}
-
-        # 手動更新フラグを設定
-        photo.photo_metadata["manual_title"] = True
+        # 手動更新フラグを設定（JSON列は変更追跡されないため辞書ごと置き換える）
+        metadata = dict(photo.photo_metadata or {})
+        metadata["manual_title"] = True
+        photo.photo_metadata = metadata  # type: ignore[assignment]
 
         db.commit()
         db.refresh(photo)
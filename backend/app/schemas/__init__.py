@@ -9,11 +9,13 @@ from app.schemas.photo import (
     PhotoListResponse,
     PhotoCategory,
 )
-from app.schemas.search import SearchQuery, SearchResponse
+from app.schemas.search import SearchQuery, SearchResponse, FacetCount, SearchFacets
 from app.schemas.rekognition import (
     ImageLabelResponse,
     ClassificationResponse,
     ClassificationResultResponse,
+    BatchClassificationRequest,
+    BatchClassificationResponse,
 )
 from app.schemas.duplicate import (
     PhotoHashInfo,
@@ -30,12 +32,17 @@ from app.schemas.quality import (
 from app.schemas.title import (
     TitleGenerationRequest,
     TitleGenerationResponse,
+    TitleRegenerationRequest,
+    TitleRegenerationResponse,
     TitleUpdateRequest,
 )
 from app.schemas.photo_xml import (
+    DTDErrorResponse,
+    FragmentCacheStatsResponse,
     PhotoXMLGenerationRequest,
     PhotoXMLGenerationResponse,
     PhotoXMLValidationResponse,
+    ValidationOffender,
 )
 from app.schemas.export import (
     ExportRequest,
@@ -49,6 +56,13 @@ from app.schemas.photo_album import (
     CoverData,
     LayoutType,
 )
+from app.schemas.job import JobStatusResponse
+from app.schemas.photo_selection import (
+    PhotoSearchFilter,
+    PhotoSelectionCreate,
+    PhotoSelectionResponse,
+    PhotoTargetRequest,
+)
 
 __all__ = [
     "PhotoCreate",
@@ -58,9 +72,13 @@ __all__ = [
     "PhotoCategory",
     "SearchQuery",
     "SearchResponse",
+    "FacetCount",
+    "SearchFacets",
     "ImageLabelResponse",
     "ClassificationResponse",
     "ClassificationResultResponse",
+    "BatchClassificationRequest",
+    "BatchClassificationResponse",
     "PhotoHashInfo",
     "DuplicatePhotoInfo",
     "DuplicateGroupResponse",
@@ -71,10 +89,15 @@ __all__ = [
     "QualityCheckResponse",
     "TitleGenerationRequest",
     "TitleGenerationResponse",
+    "TitleRegenerationRequest",
+    "TitleRegenerationResponse",
     "TitleUpdateRequest",
+    "DTDErrorResponse",
+    "FragmentCacheStatsResponse",
     "PhotoXMLGenerationRequest",
     "PhotoXMLGenerationResponse",
     "PhotoXMLValidationResponse",
+    "ValidationOffender",
     "ExportRequest",
     "ExportResponse",
     "ExportValidationResponse",
@@ -83,4 +106,9 @@ __all__ = [
     "PhotoAlbumGenerationResponse",
     "CoverData",
     "LayoutType",
+    "JobStatusResponse",
+    "PhotoSearchFilter",
+    "PhotoSelectionCreate",
+    "PhotoSelectionResponse",
+    "PhotoTargetRequest",
 ]
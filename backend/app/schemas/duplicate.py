@@ -56,6 +56,9 @@ class DuplicateActionRequest(BaseModel):
     photo_id_to_keep: int = Field(..., description="保持する写真ID")
     photo_id_to_delete: int = Field(..., description="削除する写真ID")
     action: str = Field(..., description="アクション (confirm/reject)")
+    similarity: Optional[float] = Field(
+        None, ge=0, le=100, description="類似度（%）、省略時はpHashから算出"
+    )
 
 
 class DuplicateActionResponse(BaseModel):
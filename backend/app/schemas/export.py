@@ -2,17 +2,32 @@
 エクスポート レスポンススキーマ
 """
 
-from typing import List, Optional
+from typing import Dict, List, Optional
 from pydantic import BaseModel, Field
 
+from app.schemas.photo_selection import PhotoTargetRequest
+from app.schemas.photo_xml import (
+    DTDErrorResponse,
+    FragmentCacheStatsResponse,
+    ValidationOffender,
+)
 
-class ExportRequest(BaseModel):
-    """エクスポートリクエスト"""
 
-    photo_ids: List[int] = Field(..., description="写真IDリスト")
+class ExportRequest(PhotoTargetRequest):
+    """エクスポートリクエスト（photo_ids または selection_id で対象写真を指定）"""
+
     project_name: Optional[str] = Field(None, description="プロジェクト名")
     contractor: Optional[str] = Field(None, description="施工業者名")
     include_drawings: bool = Field(False, description="参考図を含めるか")
+    include_photos: bool = Field(
+        True, description="写真ファイル（PIC/Pnnnnnnn.JPG）をS3から取得して含めるか"
+    )
+    media: Optional[str] = Field(
+        None, description="分割先の媒体（cd-r/dvd-r/dvd-r-dl/bd-r/bd-r-dl）"
+    )
+    volume_size: Optional[int] = Field(
+        None, gt=0, description="1巻あたりの最大サイズ（バイト。media より優先）"
+    )
 
 
 class FileRenameInfo(BaseModel):
@@ -24,11 +39,25 @@ class FileRenameInfo(BaseModel):
     serial_number: int = Field(..., description="シリアル番号")
 
 
+class ExportVolumeInfo(BaseModel):
+    """媒体分割時の巻情報"""
+
+    volume: int = Field(..., description="巻番号")
+    zip_path: str = Field(..., description="ZIPファイル（成果物ストアのキー）")
+    download_url: str = Field(..., description="ダウンロードURL")
+    file_size: int = Field(..., description="ファイルサイズ（バイト）")
+    total_photos: int = Field(..., description="写真枚数")
+    serial_start: int = Field(..., description="先頭写真のシリアル番号")
+    serial_end: int = Field(..., description="末尾写真のシリアル番号")
+
+
 class ExportResponse(BaseModel):
     """エクスポートレスポンス"""
 
     success: bool = Field(..., description="成功フラグ")
-    zip_path: Optional[str] = Field(None, description="ZIPファイルパス")
+    zip_path: Optional[str] = Field(
+        None, description="ZIPファイル（成果物ストアのキー）"
+    )
     download_url: Optional[str] = Field(None, description="ダウンロードURL")
     total_photos: int = Field(..., description="写真総数")
     file_size: Optional[int] = Field(None, description="ファイルサイズ（バイト）")
@@ -37,6 +66,19 @@ class ExportResponse(BaseModel):
     )
     errors: List[str] = Field(default_factory=list, description="エラーリスト")
     status: str = Field(..., description="処理ステータス")
+    xml_fragment_cache: Optional[FragmentCacheStatsResponse] = Field(
+        default=None, description="PHOTO.XML写真情報フラグメントキャッシュの利用状況"
+    )
+    dtd_errors: List[DTDErrorResponse] = Field(
+        default_factory=list, description="PHOTO.XMLのPHOTO05.DTD 適合エラー"
+    )
+    volumes: List[ExportVolumeInfo] = Field(
+        default_factory=list,
+        description="媒体分割時の巻ごとのZIP（分割しない場合は空）",
+    )
+    cached: bool = Field(
+        default=False, description="同じ内容の作成済みパッケージを返した場合True"
+    )
 
 
 class ExportValidationResponse(BaseModel):
@@ -44,8 +86,23 @@ class ExportValidationResponse(BaseModel):
 
     is_valid: bool = Field(..., description="バリデーション結果")
     total_photos: int = Field(..., description="写真総数")
-    errors: List[str] = Field(default_factory=list, description="エラーリスト")
-    warnings: List[str] = Field(default_factory=list, description="警告リスト")
+    errors: List[str] = Field(
+        default_factory=list, description="エラーリスト（offendersの範囲分）"
+    )
+    warnings: List[str] = Field(
+        default_factory=list, description="警告リスト（offendersの範囲分）"
+    )
     estimated_file_size: Optional[int] = Field(
         None, description="推定ファイルサイズ（バイト）"
     )
+    error_counts: Dict[str, int] = Field(
+        default_factory=dict, description="検査項目ごとのエラー件数（全写真）"
+    )
+    warning_counts: Dict[str, int] = Field(
+        default_factory=dict, description="検査項目ごとの警告件数（全写真）"
+    )
+    offenders: List[ValidationOffender] = Field(
+        default_factory=list,
+        description="エラー・警告のあった写真（offset/limitの範囲）",
+    )
+    offender_total: int = Field(default=0, description="エラー・警告のあった写真の総数")
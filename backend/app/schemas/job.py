@@ -0,0 +1,21 @@
+"""
+ジョブ レスポンススキーマ
+"""
+
+from typing import Dict, Optional
+from pydantic import BaseModel, Field
+
+
+class JobStatusResponse(BaseModel):
+    """ジョブ状態レスポンス"""
+
+    job_id: str = Field(..., description="ジョブID")
+    job_type: str = Field(..., description="ジョブ種別")
+    status: str = Field(..., description="状態（queued/running/completed/failed）")
+    stage: Optional[str] = Field(default=None, description="現在のステージ")
+    processed: int = Field(default=0, description="処理済み件数")
+    total: Optional[int] = Field(default=None, description="処理対象件数")
+    progress: float = Field(default=0.0, description="進捗率（0.0-1.0）")
+    eta_seconds: Optional[float] = Field(default=None, description="推定残り秒数")
+    message: Optional[str] = Field(default=None, description="メッセージ")
+    result: Optional[Dict] = Field(default=None, description="ジョブ結果")
@@ -6,6 +6,8 @@ from typing import List, Optional
 from pydantic import BaseModel, Field
 from enum import Enum
 
+from app.schemas.photo_selection import PhotoTargetRequest
+
 
 class LayoutType(str, Enum):
     """レイアウトタイプ"""
@@ -25,10 +27,9 @@ class CoverData(BaseModel):
     location: Optional[str] = Field(None, description="施工場所")
 
 
-class PhotoAlbumGenerationRequest(BaseModel):
-    """写真帳生成リクエスト"""
+class PhotoAlbumGenerationRequest(PhotoTargetRequest):
+    """写真帳生成リクエスト（photo_ids または selection_id で対象写真を指定）"""
 
-    photo_ids: List[int] = Field(..., description="写真IDリスト")
     layout_type: LayoutType = Field(LayoutType.STANDARD, description="レイアウトタイプ")
     cover_data: Optional[CoverData] = Field(None, description="表紙データ")
     add_page_numbers: bool = Field(True, description="ページ番号を追加するか")
@@ -40,10 +41,15 @@ class PhotoAlbumGenerationResponse(BaseModel):
     """写真帳生成レスポンス"""
 
     success: bool = Field(..., description="成功フラグ")
-    pdf_path: Optional[str] = Field(None, description="PDFファイルパス")
+    pdf_path: Optional[str] = Field(
+        None, description="PDFファイル（成果物ストアのキー）"
+    )
     download_url: Optional[str] = Field(None, description="ダウンロードURL")
     total_pages: int = Field(..., description="総ページ数")
     total_photos: int = Field(..., description="写真総数")
     file_size: Optional[int] = Field(None, description="ファイルサイズ（バイト）")
     errors: List[str] = Field(default_factory=list, description="エラーリスト")
     status: str = Field(..., description="処理ステータス")
+    cached: bool = Field(
+        default=False, description="同じ内容の作成済み写真帳を返した場合True"
+    )
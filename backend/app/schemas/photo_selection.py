@@ -0,0 +1,73 @@
+"""
+写真選択セット スキーマ
+"""
+
+from datetime import datetime
+from typing import List, Optional
+from pydantic import BaseModel, Field, model_validator
+
+
+class PhotoSearchFilter(BaseModel):
+    """写真選択セットを作成する検索条件（/api/v1/photos/search と同じ条件）"""
+
+    keyword: Optional[str] = Field(None, description="キーワード検索")
+    work_type: Optional[str] = Field(None, description="工種フィルタ")
+    work_kind: Optional[str] = Field(None, description="種別フィルタ")
+    major_category: Optional[str] = Field(None, description="写真大分類フィルタ")
+    photo_type: Optional[str] = Field(None, description="写真区分フィルタ")
+    date_from: Optional[str] = Field(None, description="撮影日開始（YYYY-MM-DD）")
+    date_to: Optional[str] = Field(None, description="撮影日終了（YYYY-MM-DD）")
+    label: Optional[str] = Field(
+        None, description="ラベルフィルタ（Rekognitionラベル名）"
+    )
+    label_category: Optional[str] = Field(None, description="ラベルカテゴリフィルタ")
+
+
+class PhotoTargetRequest(BaseModel):
+    """対象写真を写真IDリストまたは写真選択セットで指定するリクエスト"""
+
+    photo_ids: Optional[List[int]] = Field(
+        None, description="写真IDリスト（selection_id と同時には指定できません）"
+    )
+    selection_id: Optional[int] = Field(
+        None, description="写真選択セットID（大量の写真を指定する場合）"
+    )
+
+    @model_validator(mode="after")
+    def validate_target(self) -> "PhotoTargetRequest":
+        """写真IDリストと写真選択セットのどちらか一方を指定"""
+        if (self.photo_ids is None) == (self.selection_id is None):
+            raise ValueError(
+                "photo_ids と selection_id のどちらか一方を指定してください"
+            )
+        return self
+
+
+class PhotoSelectionCreate(BaseModel):
+    """写真選択セット作成リクエスト"""
+
+    name: Optional[str] = Field(None, max_length=255, description="名前")
+    photo_ids: Optional[List[int]] = Field(None, description="写真IDリスト")
+    filter: Optional[PhotoSearchFilter] = Field(None, description="検索条件")
+
+    @model_validator(mode="after")
+    def validate_source(self) -> "PhotoSelectionCreate":
+        """写真IDリストと検索条件のどちらか一方を指定"""
+        if (self.photo_ids is None) == (self.filter is None):
+            raise ValueError("photo_ids と filter のどちらか一方を指定してください")
+        return self
+
+
+class PhotoSelectionResponse(BaseModel):
+    """写真選択セットレスポンス"""
+
+    id: int = Field(..., description="写真選択セットID")
+    name: Optional[str] = Field(None, description="名前")
+    source: str = Field(..., description="作成方法（ids/filter）")
+    filter: Optional[PhotoSearchFilter] = Field(None, description="検索条件")
+    photo_count: int = Field(..., description="写真数")
+    created_at: datetime = Field(..., description="作成日時")
+    expires_at: datetime = Field(..., description="有効期限")
+
+    class Config:
+        from_attributes = True
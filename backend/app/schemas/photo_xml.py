@@ -2,18 +2,37 @@
 PHOTO.XML生成 レスポンススキーマ
 """
 
-from typing import List, Optional
+from typing import Dict, List, Optional
 from pydantic import BaseModel, Field
 
+from app.schemas.photo_selection import PhotoTargetRequest
 
-class PhotoXMLGenerationRequest(BaseModel):
-    """PHOTO.XML生成リクエスト"""
 
-    photo_ids: List[int] = Field(..., description="写真IDリスト")
+class PhotoXMLGenerationRequest(PhotoTargetRequest):
+    """PHOTO.XML生成リクエスト（photo_ids または selection_id で対象写真を指定）"""
+
     project_name: Optional[str] = Field(None, description="工事名称")
     contractor: Optional[str] = Field(None, description="施工業者名")
 
 
+class FragmentCacheStatsResponse(BaseModel):
+    """写真情報フラグメントキャッシュの利用状況"""
+
+    hits: int = Field(..., description="キャッシュヒット数")
+    misses: int = Field(..., description="キャッシュミス数（新たに生成した写真情報）")
+    hit_rate: float = Field(..., description="ヒット率（0.0-1.0）")
+
+
+class DTDErrorResponse(BaseModel):
+    """PHOTO05.DTD 適合エラー"""
+
+    serial_number: Optional[str] = Field(
+        None, description="写真情報のシリアル番号（写真情報外のエラーはnull）"
+    )
+    element: str = Field(..., description="要素名")
+    message: str = Field(..., description="エラー内容")
+
+
 class PhotoXMLGenerationResponse(BaseModel):
     """PHOTO.XML生成レスポンス"""
 
@@ -24,11 +43,41 @@ class PhotoXMLGenerationResponse(BaseModel):
         default_factory=list, description="バリデーションエラー"
     )
     status: str = Field(..., description="処理ステータス")
+    fragment_cache: Optional[FragmentCacheStatsResponse] = Field(
+        None, description="写真情報フラグメントキャッシュの利用状況"
+    )
+    dtd_errors: List[DTDErrorResponse] = Field(
+        default_factory=list, description="PHOTO05.DTD 適合エラー"
+    )
+
+
+class ValidationOffender(BaseModel):
+    """バリデーションでエラー・警告のあった写真"""
+
+    photo_id: int = Field(..., description="写真ID")
+    file_name: Optional[str] = Field(None, description="ファイル名")
+    errors: List[str] = Field(default_factory=list, description="エラーリスト")
+    warnings: List[str] = Field(default_factory=list, description="警告リスト")
 
 
 class PhotoXMLValidationResponse(BaseModel):
     """PHOTO.XMLバリデーションレスポンス"""
 
     is_valid: bool = Field(..., description="バリデーション結果")
-    errors: List[str] = Field(default_factory=list, description="エラーリスト")
-    warnings: List[str] = Field(default_factory=list, description="警告リスト")
+    errors: List[str] = Field(
+        default_factory=list, description="エラーリスト（offendersの範囲分）"
+    )
+    warnings: List[str] = Field(
+        default_factory=list, description="警告リスト（offendersの範囲分）"
+    )
+    error_counts: Dict[str, int] = Field(
+        default_factory=dict, description="検査項目ごとのエラー件数（全写真）"
+    )
+    warning_counts: Dict[str, int] = Field(
+        default_factory=dict, description="検査項目ごとの警告件数（全写真）"
+    )
+    offenders: List[ValidationOffender] = Field(
+        default_factory=list,
+        description="エラー・警告のあった写真（offset/limitの範囲）",
+    )
+    offender_total: int = Field(default=0, description="エラー・警告のあった写真の総数")
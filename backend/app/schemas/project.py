@@ -15,6 +15,9 @@ class ProjectBase(BaseModel):
     client_name: Optional[str] = Field(None, max_length=255, description="クライアント名")
     start_date: Optional[datetime] = Field(None, description="開始日")
     end_date: Optional[datetime] = Field(None, description="終了日")
+    reuse_duplicate_analysis: bool = Field(
+        True, description="確定済み重複写真で代表写真の解析結果を再利用するか"
+    )
 
 
 class ProjectCreate(ProjectBase):
@@ -31,6 +34,9 @@ class ProjectUpdate(BaseModel):
     client_name: Optional[str] = Field(None, max_length=255, description="クライアント名")
     start_date: Optional[datetime] = Field(None, description="開始日")
     end_date: Optional[datetime] = Field(None, description="終了日")
+    reuse_duplicate_analysis: Optional[bool] = Field(
+        None, description="確定済み重複写真で代表写真の解析結果を再利用するか"
+    )
 
 
 class ProjectResponse(ProjectBase):
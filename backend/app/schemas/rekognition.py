@@ -18,7 +18,9 @@ class ClassificationResponse(BaseModel):
     """画像分類レスポンス"""
 
     photo_id: int = Field(..., description="写真ID")
-    status: str = Field(..., description="処理ステータス（completed/not_processed）")
+    status: str = Field(
+        ..., description="処理ステータス（completed/inherited/not_processed）"
+    )
     labels: List[ImageLabelResponse] = Field(
         default_factory=list, description="検出ラベル"
     )
@@ -26,6 +28,10 @@ class ClassificationResponse(BaseModel):
         default_factory=dict, description="カテゴリ別ラベル"
     )
     summary: Dict = Field(default_factory=dict, description="サマリー情報")
+    inherited_from: Optional[int] = Field(
+        default=None,
+        description="結果を引き継いだ代表写真ID（重複グループのメンバーの場合）",
+    )
 
 
 class ClassificationResultResponse(BaseModel):
@@ -40,3 +46,33 @@ class ClassificationResultResponse(BaseModel):
         None, description="カテゴリ別ラベル"
     )
     summary: Optional[Dict] = Field(None, description="サマリー情報")
+    inherited_from: Optional[int] = Field(
+        default=None,
+        description="結果を引き継いだ代表写真ID（重複グループのメンバーの場合）",
+    )
+
+
+class BatchClassificationRequest(BaseModel):
+    """一括画像分類リクエスト"""
+
+    photo_ids: Optional[List[int]] = Field(None, description="対象写真IDリスト")
+    project_id: Optional[int] = Field(None, description="対象工事ID（工事内の全写真）")
+    skip_classified: bool = Field(True, description="分類済みの写真をスキップするか")
+    force: bool = Field(
+        False,
+        description="重複グループのメンバーも代表写真の結果を引き継がずに解析する",
+    )
+    max_concurrency: Optional[int] = Field(
+        None, description="Rekognitionの同時呼び出し数上限", ge=1, le=32
+    )
+
+
+class BatchClassificationResponse(BaseModel):
+    """一括画像分類の受付レスポンス"""
+
+    job_id: str = Field(
+        ..., description="ジョブID（/api/v1/jobs/{job_id}で進捗を取得）"
+    )
+    status: str = Field(..., description="ジョブ状態")
+    total: int = Field(..., description="解析対象件数")
+    inherited: int = Field(0, description="代表写真の結果を引き継ぐ写真数")
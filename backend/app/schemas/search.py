@@ -18,10 +18,30 @@ class SearchQuery(BaseModel):
     photo_type: Optional[str] = Field(None, description="写真区分フィルタ")
     date_from: Optional[str] = Field(None, description="撮影日開始（YYYY-MM-DD）")
     date_to: Optional[str] = Field(None, description="撮影日終了（YYYY-MM-DD）")
+    label: Optional[str] = Field(
+        None, description="ラベルフィルタ（Rekognitionラベル名）"
+    )
+    label_category: Optional[str] = Field(None, description="ラベルカテゴリフィルタ")
     page: int = Field(1, ge=1, description="ページ番号")
     page_size: int = Field(20, ge=1, le=100, description="ページサイズ")
 
 
+class FacetCount(BaseModel):
+    """ファセット件数"""
+
+    value: str = Field(..., description="値")
+    count: int = Field(..., description="該当写真数")
+
+
+class SearchFacets(BaseModel):
+    """検索結果のファセット集計"""
+
+    labels: List[FacetCount] = Field(default_factory=list, description="ラベル別件数")
+    categories: List[FacetCount] = Field(
+        default_factory=list, description="ラベルカテゴリ別件数"
+    )
+
+
 class SearchResponse(BaseModel):
     """検索結果レスポンススキーマ"""
 
@@ -31,3 +51,4 @@ class SearchResponse(BaseModel):
     page_size: int
     total_pages: int
     query: Optional[SearchQuery] = None
+    facets: Optional[SearchFacets] = None
@@ -31,3 +31,25 @@ class TitleUpdateRequest(BaseModel):
     """タイトル手動更新リクエスト"""
 
     title: str = Field(..., description="新しいタイトル", max_length=127)
+
+
+class TitleRegenerationRequest(BaseModel):
+    """タイトル一括再生成リクエスト"""
+
+    project_id: Optional[int] = Field(
+        None, description="対象工事ID（省略時は組織内の全写真）"
+    )
+    force: bool = Field(False, description="入力が前回生成時と同じ写真も再生成するか")
+    batch_size: Optional[int] = Field(
+        None, description="1回の読み出し・書き込みの件数", ge=1, le=5000
+    )
+
+
+class TitleRegenerationResponse(BaseModel):
+    """タイトル一括再生成の受付レスポンス"""
+
+    job_id: str = Field(
+        ..., description="ジョブID（/api/v1/jobs/{job_id}で進捗を取得）"
+    )
+    status: str = Field(..., description="ジョブ状態")
+    total: int = Field(..., description="対象写真数（手動設定タイトルを含む）")
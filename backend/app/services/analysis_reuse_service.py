@@ -0,0 +1,242 @@
+"""
+重複写真グループの解析結果再利用サービス
+
+確定済みかつ類似度の高い重複写真グループでは、代表写真（保持した写真）のみ
+Rekognition・Textractで解析し、その結果をメンバー写真へ引き継ぎます。
+引き継いだ写真はメタデータに引き継ぎ元（*_inherited_from）を記録し、
+削減できたAPI呼び出し数をメトリクス ai_calls_saved_total に加算します。
+"""
+
+from typing import Any, Dict, Iterable, List, Optional, cast
+
+from sqlalchemy.orm import Query, Session
+
+from app.config import settings
+from app.database.models import Photo, PhotoDuplicate, Project
+from app.services.metrics import MetricsRegistry
+from app.services.metrics import metrics as default_metrics
+from app.services.photo_label_service import PhotoLabelService
+
+# 引き継ぎ対象のメタデータキー
+LABEL_METADATA_KEYS = (
+    "rekognition_labels",
+    "rekognition_categorized",
+    "rekognition_summary",
+)
+OCR_METADATA_KEYS = ("ocr_result", "ocr_text_blocks")
+
+# OCR結果として写真に反映される列
+OCR_PHOTO_FIELDS = (
+    "major_category",
+    "work_type",
+    "work_kind",
+    "work_detail",
+    "shooting_date",
+    "is_processed",
+)
+
+
+class AnalysisReuseService:
+    """重複写真グループの解析結果再利用サービス"""
+
+    def __init__(
+        self,
+        db: Session,
+        min_similarity: Optional[float] = None,
+        metrics: Optional[MetricsRegistry] = None,
+    ):
+        """
+        初期化
+
+        Args:
+            db: データベースセッション
+            min_similarity: 再利用する重複の最小類似度（0-100%、省略時は設定値）
+            metrics: メトリクスレジストリ（省略時はグローバル）
+        """
+        self.db = db
+        if min_similarity is None:
+            min_similarity = settings.DUPLICATE_REUSE_MIN_SIMILARITY
+        self.min_similarity = min_similarity
+        self.metrics = metrics or default_metrics
+        self.label_service = PhotoLabelService()
+
+    def is_enabled(self, photo: Photo) -> bool:
+        """写真の工事で解析結果の再利用が有効か"""
+        project = self.db.get(Project, photo.project_id)
+        return project is not None and bool(project.reuse_duplicate_analysis)
+
+    def _confirmed_duplicates(self) -> "Query[PhotoDuplicate]":
+        return self.db.query(PhotoDuplicate).filter(
+            PhotoDuplicate.status == "confirmed",
+            PhotoDuplicate.similarity_score >= self.min_similarity / 100,
+        )
+
+    def representative_ids(
+        self, organization_id: int, photo_ids: Iterable[int]
+    ) -> Dict[int, int]:
+        """
+        写真ごとの代表写真IDをまとめて取得
+
+        Args:
+            organization_id: 組織ID
+            photo_ids: 写真IDのリスト
+
+        Returns:
+            メンバー写真ID→代表写真ID（再利用対象外の写真は含まない）
+        """
+        photo_ids = list(photo_ids)
+        if not photo_ids:
+            return {}
+
+        rows = (
+            self._confirmed_duplicates()
+            .join(Photo, Photo.id == PhotoDuplicate.photo2_id)
+            .join(Project, Project.id == Photo.project_id)
+            .filter(
+                PhotoDuplicate.organization_id == organization_id,
+                PhotoDuplicate.photo2_id.in_(photo_ids),
+                Project.reuse_duplicate_analysis.is_(True),
+            )
+            .order_by(PhotoDuplicate.similarity_score)
+            .with_entities(PhotoDuplicate.photo2_id, PhotoDuplicate.photo1_id)
+            .all()
+        )
+        # 類似度の昇順に上書きし、最も類似度の高い代表写真を採用
+        return {member_id: representative_id for member_id, representative_id in rows}
+
+    def find_representative(self, photo: Photo) -> Optional[Photo]:
+        """
+        写真が属する重複グループの代表写真を取得
+
+        Args:
+            photo: 写真
+
+        Returns:
+            代表写真（再利用対象外の場合はNone）
+        """
+        photo_id = cast(int, photo.id)
+        representative_id = self.representative_ids(
+            cast(int, photo.organization_id), [photo_id]
+        ).get(photo_id)
+        if representative_id is None:
+            return None
+        return self.db.get(Photo, representative_id)
+
+    def find_members(self, representative: Photo) -> List[Photo]:
+        """
+        代表写真から結果を引き継ぐメンバー写真を取得
+
+        Args:
+            representative: 代表写真
+
+        Returns:
+            メンバー写真のリスト（工事で再利用が無効の場合は空）
+        """
+        if not self.is_enabled(representative):
+            return []
+
+        member_ids = [
+            duplicate.photo2_id
+            for duplicate in self._confirmed_duplicates().filter(
+                PhotoDuplicate.photo1_id == representative.id,
+                PhotoDuplicate.organization_id == representative.organization_id,
+            )
+        ]
+        if not member_ids:
+            return []
+        return (
+            self.db.query(Photo)
+            .filter(
+                Photo.id.in_(member_ids),
+                Photo.organization_id == representative.organization_id,
+            )
+            .all()
+        )
+
+    def propagate_labels(
+        self, representative: Photo, members: Optional[List[Photo]] = None
+    ) -> int:
+        """
+        代表写真のラベル解析結果をメンバーへ引き継ぐ（コミットは呼び出し側で行う）
+
+        Args:
+            representative: 代表写真（解析済み）
+            members: 引き継ぎ先（省略時は確定済みメンバー全員）
+
+        Returns:
+            引き継いだ写真数（= 削減したRekognition呼び出し数）
+        """
+        source = cast(Dict[str, Any], representative.photo_metadata or {})
+        if "rekognition_labels" not in source:
+            return 0
+        if members is None:
+            members = self.find_members(representative)
+
+        labels = [
+            {
+                "Name": label["name"],
+                "Confidence": label["confidence"],
+                "Parents": label.get("parents", []),
+            }
+            for label in source["rekognition_labels"]
+        ]
+        categorized = source.get("rekognition_categorized") or {}
+
+        for member in members:
+            metadata = dict(member.photo_metadata or {})
+            for key in LABEL_METADATA_KEYS:
+                if key in source:
+                    metadata[key] = source[key]
+            metadata["rekognition_inherited_from"] = representative.id
+            member.photo_metadata = metadata  # type: ignore[assignment]
+            self.label_service.replace_photo_labels(
+                self.db, member, labels, categorized
+            )
+
+        self._record_saved(
+            "rekognition", cast(int, representative.organization_id), len(members)
+        )
+        return len(members)
+
+    def propagate_ocr(
+        self, representative: Photo, members: Optional[List[Photo]] = None
+    ) -> int:
+        """
+        代表写真のOCR結果をメンバーへ引き継ぐ（コミットは呼び出し側で行う）
+
+        Args:
+            representative: 代表写真（OCR処理済み）
+            members: 引き継ぎ先（省略時は確定済みメンバー全員）
+
+        Returns:
+            引き継いだ写真数（= 削減したTextract呼び出し数）
+        """
+        source = cast(Dict[str, Any], representative.photo_metadata or {})
+        if "ocr_result" not in source:
+            return 0
+        if members is None:
+            members = self.find_members(representative)
+
+        for member in members:
+            metadata = dict(member.photo_metadata or {})
+            for key in OCR_METADATA_KEYS:
+                if key in source:
+                    metadata[key] = source[key]
+            metadata["ocr_inherited_from"] = representative.id
+            member.photo_metadata = metadata  # type: ignore[assignment]
+            for field in OCR_PHOTO_FIELDS:
+                setattr(member, field, getattr(representative, field))
+
+        self._record_saved(
+            "textract", cast(int, representative.organization_id), len(members)
+        )
+        return len(members)
+
+    def _record_saved(self, service: str, organization_id: int, count: int) -> None:
+        if count:
+            self.metrics.inc(
+                "ai_calls_saved_total",
+                count,
+                organization_id=organization_id,
+                service=service,
+            )
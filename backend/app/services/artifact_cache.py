@@ -0,0 +1,387 @@
+"""
+エクスポート・写真帳の成果物キャッシュ
+
+電子納品パッケージ（ZIP）や写真帳PDFを、入力内容のダイジェストをキーとして保存します。
+キーは成果物の種類・写真IDと各写真のupdated_at（ID順）・出力オプション・生成器バージョンの
+SHA-256で、写真が1枚でも更新されると別キーになります。
+同じ内容のリクエストには既存の成果物をそのまま返します。
+
+成果物は成果物ストア（app.services.artifact_store）の <種類>/<ダイジェスト>/ 配下に保存し、
+生成結果を同じ場所の meta.json に保存します（meta.json があるものだけを完成した成果物として扱う）。
+生成結果に含まれるファイルパスはストアのキーに置き換えるため、別のAPIノードが作成した
+成果物もそのまま返せます。
+保持期間（TTL）を過ぎたものは削除し、合計サイズが上限を超えた場合は
+このノードで最終アクセスの古いものから削除します（LRU）。
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+from datetime import datetime
+from functools import lru_cache
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple, cast
+
+from app.config import settings
+from app.services.artifact_store import ArtifactStore, get_artifact_store
+from app.services.metrics import metrics
+
+META_FILE = "meta.json"
+
+
+def _timestamp(value: Any) -> str:
+    """updated_at をダイジェスト用の文字列に変換"""
+    if value is None:
+        return ""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+
+def artifact_digest(
+    kind: str, photos: Iterable[Dict], options: Dict, generator_version: str
+) -> str:
+    """
+    成果物のダイジェストを計算
+
+    Args:
+        kind: 成果物の種類（"export", "photo_album" など）
+        photos: 写真データ（id, updated_at を使用。順序は問わない）
+        options: 出力結果に影響するオプション（JSONに変換できる値）
+        generator_version: 生成器のバージョン（出力形式を変えたら更新する）
+
+    Returns:
+        SHA-256の16進文字列
+    """
+    digest = hashlib.sha256()
+    header = json.dumps(
+        {"kind": kind, "version": generator_version, "options": options},
+        sort_keys=True,
+        ensure_ascii=False,
+        default=str,
+    )
+    digest.update(header.encode("utf-8"))
+    for photo_id, updated_at in sorted(
+        (photo["id"], _timestamp(photo.get("updated_at"))) for photo in photos
+    ):
+        digest.update(f"\n{photo_id}:{updated_at}".encode("utf-8"))
+    return digest.hexdigest()
+
+
+class ArtifactCache:
+    """成果物キャッシュ（TTL・合計バイト数上限のLRU）"""
+
+    def __init__(self, store: ArtifactStore, max_bytes: int, ttl_seconds: int) -> None:
+        """
+        Args:
+            store: 成果物ストア（LocalArtifactStore / S3ArtifactStore）
+            max_bytes: 保存する合計バイト数の上限
+            ttl_seconds: 成果物の保持秒数（作成時刻から）
+        """
+        self.store = store
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._key_locks: Dict[str, threading.Lock] = {}
+        # キーのプレフィックス → {"size_bytes", "created_at", "accessed_at", "files"}
+        self._index: Dict[str, Dict] = {}
+        self._load_index()
+
+    @staticmethod
+    def prefix(kind: str, digest: str) -> str:
+        """成果物のキーのプレフィックス"""
+        return f"{kind}/{digest}/"
+
+    def _load_index(self) -> None:
+        """保存済みの成果物（meta.json）からインデックスを復元"""
+        for key, _, _ in self.store.list_objects():
+            if not key.endswith("/" + META_FILE):
+                continue
+            meta = self._read_meta(key)
+            if meta is not None:
+                self._index[key[: -len(META_FILE)]] = self._index_entry(meta)
+
+    def _read_meta(self, key: str) -> Optional[Dict]:
+        try:
+            raw = self.store.get_bytes(key)
+            return json.loads(raw) if raw is not None else None
+        except ValueError:
+            return None
+
+    @staticmethod
+    def _index_entry(meta: Dict) -> Dict:
+        return {
+            "size_bytes": meta["size_bytes"],
+            "created_at": meta["created_at"],
+            "accessed_at": meta["created_at"],
+            "files": meta["files"],
+        }
+
+    def _key_lock(self, prefix: str) -> threading.Lock:
+        with self._lock:
+            return self._key_locks.setdefault(prefix, threading.Lock())
+
+    def _expired(self, entry: Dict, now: float) -> bool:
+        return bool(now - entry["created_at"] > self.ttl_seconds)
+
+    def get(self, kind: str, digest: str) -> Optional[Dict]:
+        """
+        保存済みの成果物の生成結果を取得
+
+        Args:
+            kind: 成果物の種類
+            digest: ダイジェスト
+
+        Returns:
+            生成結果（ファイルパスはストアのキー。存在しない・保持期間切れ・
+            ファイル欠落の場合はNone）
+        """
+        result = self._lookup(self.prefix(kind, digest))
+        if result is None:
+            metrics.inc("artifact_cache_misses_total", kind=kind)
+        else:
+            metrics.inc("artifact_cache_hits_total", kind=kind)
+        return result
+
+    def _lookup(self, prefix: str) -> Optional[Dict]:
+        meta = self._read_meta(prefix + META_FILE)
+        now = time.time()
+        if meta is None:
+            with self._lock:
+                self._index.pop(prefix, None)
+            return None
+
+        entry = self._index_entry(meta)
+        missing = [key for key in meta["files"] if self.store.size(key) is None]
+        with self._lock:
+            if missing or self._expired(entry, now):
+                self._remove_locked(prefix)
+                return None
+            # 別のノードが作成した成果物もこのノードのLRUに加える
+            entry = self._index.setdefault(prefix, entry)
+            entry["accessed_at"] = now
+        return cast(Dict, meta["result"])
+
+    def build(
+        self,
+        kind: str,
+        digest: str,
+        builder: Callable[[str], Dict],
+        cacheable: Optional[Callable[[Dict], bool]] = None,
+    ) -> Tuple[Dict, bool]:
+        """
+        成果物を取得（未作成の場合は作成して保存）
+
+        同じダイジェストの作成はこのノードで同時に1つだけ実行し、
+        待機していた側は作成された成果物を使います。
+
+        Args:
+            kind: 成果物の種類
+            digest: ダイジェスト
+            builder: 作成先ディレクトリを受け取り、成果物を作成して生成結果を返す関数
+                （生成結果の "success" が偽の場合は保存しない）
+            cacheable: 生成結果を再利用してよいか判定する関数（省略時は成功したものを再利用）
+
+        Returns:
+            (生成結果（ファイルパスはストアのキー）, 既存の成果物を返した場合True)
+        """
+        prefix = self.prefix(kind, digest)
+        with self._key_lock(prefix):
+            cached = self._lookup(prefix)
+            if cached is not None:
+                return cached, True
+
+            staging_dir = self.store.staging_dir(prefix)
+            try:
+                result = builder(staging_dir)
+                if not result.get("success"):
+                    shutil.rmtree(staging_dir, ignore_errors=True)
+                    return result, False
+                files = self._upload(prefix, staging_dir)
+            except BaseException:
+                shutil.rmtree(staging_dir, ignore_errors=True)
+                raise
+            self.store.discard_staging(staging_dir)
+            result = _replace_paths(result, staging_dir, prefix)
+
+            if cacheable is not None and not cacheable(result):
+                # 再利用しない成果物もダウンロード用に保存し、保持期間の経過後に削除する
+                return result, False
+            self._store(prefix, files, result)
+            return result, False
+
+    def _upload(self, prefix: str, staging_dir: str) -> Dict[str, int]:
+        """作成したファイルをストアに保存（キー → サイズ）"""
+        files = {}
+        for dirpath, _, filenames in os.walk(staging_dir):
+            for filename in filenames:
+                path = os.path.join(dirpath, filename)
+                key = prefix + os.path.relpath(path, staging_dir).replace(os.sep, "/")
+                self.store.put_file(key, path)
+                files[key] = os.path.getsize(path)
+        return files
+
+    def _store(self, prefix: str, files: Dict[str, int], result: Dict) -> None:
+        """
+        生成結果を meta.json に保存してインデックスに登録
+
+        1つで合計サイズ上限を超える成果物は、登録直後のLRU削除で消えないよう
+        再利用しない成果物として扱います（保持期間の経過後に sweep で削除）。
+        """
+        now = time.time()
+        size_bytes = sum(files.values())
+        if size_bytes > self.max_bytes:
+            return
+        meta = {
+            "created_at": now,
+            "size_bytes": size_bytes,
+            "files": sorted(files),
+            "result": result,
+        }
+        self.store.put_bytes(
+            prefix + META_FILE,
+            json.dumps(meta, ensure_ascii=False, default=str).encode("utf-8"),
+        )
+        with self._lock:
+            self._index[prefix] = self._index_entry(meta)
+            self._evict_locked(now, keep=prefix)
+
+    def _remove_locked(self, prefix: str) -> None:
+        self._index.pop(prefix, None)
+        self.store.delete_prefix(prefix)
+
+    def _evict_locked(self, now: float, keep: Optional[str] = None) -> List[str]:
+        """
+        保持期間切れ、および合計サイズ上限を超えた分を最終アクセスの古い順に削除
+
+        Args:
+            now: 現在時刻
+            keep: 削除しない成果物のプレフィックス（登録した直後のもの）
+
+        Returns:
+            削除した成果物のプレフィックス
+        """
+        removed = [
+            prefix for prefix, entry in self._index.items() if self._expired(entry, now)
+        ]
+        for prefix in removed:
+            self._remove_locked(prefix)
+        total = sum(entry["size_bytes"] for entry in self._index.values())
+        for prefix, entry in sorted(
+            self._index.items(), key=lambda item: item[1]["accessed_at"]
+        ):
+            if total <= self.max_bytes:
+                break
+            if prefix == keep:
+                continue
+            total -= entry["size_bytes"]
+            self._remove_locked(prefix)
+            removed.append(prefix)
+        metrics.set_gauge("artifact_cache_bytes", total)
+        return removed
+
+    def evict_bytes(self, bytes_to_free: int) -> int:
+        """
+        最終アクセスの古い成果物から、指定バイト数以上になるまで削除
+
+        Args:
+            bytes_to_free: 空けたいバイト数
+
+        Returns:
+            削除した成果物の合計バイト数
+        """
+        freed = 0
+        with self._lock:
+            for prefix, entry in sorted(
+                self._index.items(), key=lambda item: item[1]["accessed_at"]
+            ):
+                if freed >= bytes_to_free:
+                    break
+                lock = self._key_locks.get(prefix)
+                if lock is not None and lock.locked():
+                    continue
+                freed += entry["size_bytes"]
+                self._remove_locked(prefix)
+            metrics.set_gauge(
+                "artifact_cache_bytes",
+                sum(entry["size_bytes"] for entry in self._index.values()),
+            )
+        return freed
+
+    def _stored_prefixes(self) -> Dict[str, float]:
+        """ストア上の成果物（プレフィックス → 最終更新時刻）"""
+        prefixes: Dict[str, float] = {}
+        for key, _, modified in self.store.list_objects():
+            parts = key.split("/")
+            if len(parts) < 3:
+                continue
+            prefix = f"{parts[0]}/{parts[1]}/"
+            prefixes[prefix] = max(prefixes.get(prefix, 0.0), modified)
+        return prefixes
+
+    def sweep(self) -> int:
+        """
+        保持期間切れ・上限超過の成果物を削除
+
+        再利用しない成果物や、別のノードが作成した成果物も保持期間の経過後に削除します。
+
+        Returns:
+            削除した成果物の数
+        """
+        now = time.time()
+        stored = self._stored_prefixes()
+        with self._lock:
+            evicted = self._evict_locked(now)
+            removed = len(evicted)
+            for prefix, modified in stored.items():
+                if prefix in self._index or prefix in evicted:
+                    continue
+                lock = self._key_locks.get(prefix)
+                if lock is not None and lock.locked():
+                    # 作成中
+                    continue
+                if now - modified > self.ttl_seconds:
+                    self.store.delete_prefix(prefix)
+                    removed += 1
+            return removed
+
+    @property
+    def size_bytes(self) -> int:
+        """保存中の成果物の合計バイト数"""
+        with self._lock:
+            return sum(entry["size_bytes"] for entry in self._index.values())
+
+    def clear(self) -> None:
+        """全成果物を削除"""
+        stored = self._stored_prefixes()
+        with self._lock:
+            for prefix in set(self._index) | set(stored):
+                self._remove_locked(prefix)
+
+
+def _replace_paths(value: Any, staging_dir: str, prefix: str) -> Any:
+    """生成結果に含まれる作成先ディレクトリ配下のパスをストアのキーに置き換える"""
+    if isinstance(value, dict):
+        return {k: _replace_paths(v, staging_dir, prefix) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_replace_paths(v, staging_dir, prefix) for v in value]
+    if isinstance(value, str) and value.startswith(staging_dir + os.sep):
+        return prefix + os.path.relpath(value, staging_dir).replace(os.sep, "/")
+    return value
+
+
+@lru_cache()
+def get_artifact_cache() -> ArtifactCache:
+    """
+    成果物キャッシュのシングルトンインスタンスを取得
+
+    Returns:
+        ArtifactCache（保存先は get_artifact_store()）
+    """
+    return ArtifactCache(
+        get_artifact_store(),
+        settings.ARTIFACT_CACHE_BYTES,
+        settings.ARTIFACT_CACHE_TTL_SECONDS,
+    )
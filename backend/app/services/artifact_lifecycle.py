@@ -0,0 +1,228 @@
+"""
+成果物の作成領域の管理（ノードごとのディスク容量上限）
+
+エクスポート・写真帳の作成に使うこのノードのディスク（成果物ストアがローカルの場合は
+保存済みの成果物を含む、およびS3ストアへのアップロード前の作業ディレクトリ）を管理します。
+
+    容量上限      ARTIFACT_NODE_QUOTA_BYTES
+    受け入れ制御  作成前に見積もりサイズを予約し、上限を超える場合は保存済みの成果物を
+                  最終アクセスの古い順に削除して空きを作る。それでも足りなければ受け付けない
+    定期削除      ARTIFACT_SWEEP_INTERVAL_SECONDS ごとに保持期間切れの成果物と
+                  取り残された作業ディレクトリを削除
+    メトリクス    artifact_disk_usage_bytes / artifact_disk_reserved_bytes /
+                  artifact_admission_rejected_total
+"""
+
+import asyncio
+import os
+import shutil
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+from functools import lru_cache
+from typing import AsyncIterator, Iterator, Optional
+
+from app.config import settings
+from app.services.artifact_cache import ArtifactCache, get_artifact_cache
+from app.services.artifact_store import default_scratch_dir
+from app.services.metrics import metrics
+
+# 受け付けなかった場合に再試行を促すまでの秒数
+ADMISSION_RETRY_AFTER_SECONDS = 60
+
+
+class ArtifactQuotaExceeded(Exception):
+    """ディスク容量上限を超えるため成果物を作成できない"""
+
+    def __init__(self, required_bytes: int, available_bytes: int):
+        self.required_bytes = required_bytes
+        self.available_bytes = available_bytes
+        super().__init__(
+            f"作成領域の空き容量が不足しています（必要: {required_bytes}バイト, "
+            f"空き: {max(available_bytes, 0)}バイト）。しばらくしてから再実行してください"
+        )
+
+
+def _directory_bytes(path: str) -> int:
+    """ディレクトリ配下のファイルの合計バイト数"""
+    total = 0
+    for dirpath, _, filenames in os.walk(path):
+        for filename in filenames:
+            try:
+                total += os.path.getsize(os.path.join(dirpath, filename))
+            except OSError:
+                pass
+    return total
+
+
+class ArtifactLifecycleManager:
+    """成果物の作成領域の管理"""
+
+    def __init__(
+        self,
+        cache: ArtifactCache,
+        scratch_dir: str,
+        quota_bytes: int,
+        sweep_interval_seconds: float = 0,
+    ):
+        """
+        Args:
+            cache: 成果物キャッシュ
+            scratch_dir: 作業ディレクトリ（S3ストアへのアップロード前の作成先）
+            quota_bytes: このノードで使用するディスクの上限（バイト）
+            sweep_interval_seconds: 定期削除の間隔（0の場合は定期削除しない）
+        """
+        self.cache = cache
+        self.scratch_dir = scratch_dir
+        self.quota_bytes = quota_bytes
+        self.sweep_interval_seconds = sweep_interval_seconds
+        self._lock = threading.Lock()
+        self._reserved = 0
+        self._sweeper: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        os.makedirs(scratch_dir, exist_ok=True)
+
+    def usage_bytes(self) -> int:
+        """このノードのディスク使用量（作業ディレクトリ + ローカルストアの成果物）"""
+        return _directory_bytes(self.scratch_dir) + self.cache.store.local_usage_bytes()
+
+    @property
+    def reserved_bytes(self) -> int:
+        """作成中の成果物の予約バイト数"""
+        return self._reserved
+
+    def _update_gauges(self, usage: int) -> None:
+        metrics.set_gauge("artifact_disk_usage_bytes", usage)
+        metrics.set_gauge("artifact_disk_reserved_bytes", self._reserved)
+
+    def reserve(self, estimated_bytes: int) -> None:
+        """
+        成果物の作成を受け付け、見積もりサイズを予約（完了後に release を呼ぶ）
+
+        作成中のファイルは使用量と予約の両方に数えるため、見積もりは安全側になります。
+        使用量の計測（ディレクトリの走査）はロックの外で1回だけ行い、
+        成果物を削除した場合は削除したバイト数を差し引きます。
+
+        Args:
+            estimated_bytes: 作成する成果物の見積もりサイズ（バイト）
+
+        Raises:
+            ArtifactQuotaExceeded: 保存済みの成果物を削除しても上限を超える場合
+        """
+        self._ensure_sweeper()
+        usage = self.usage_bytes()
+        with self._lock:
+            excess = usage + self._reserved + estimated_bytes - self.quota_bytes
+            if excess > 0 and self.cache.store.local_usage_bytes():
+                # 保存済みの成果物を最終アクセスの古い順に削除して空きを作る
+                usage -= self.cache.evict_bytes(excess)
+                excess = usage + self._reserved + estimated_bytes - self.quota_bytes
+            if excess > 0:
+                self._update_gauges(usage)
+                metrics.inc("artifact_admission_rejected_total")
+                raise ArtifactQuotaExceeded(
+                    estimated_bytes, self.quota_bytes - usage - self._reserved
+                )
+            self._reserved += estimated_bytes
+            self._update_gauges(usage)
+
+    def release(self, estimated_bytes: int) -> None:
+        """
+        予約を解放（使用量のゲージは次の受け付け・定期削除で更新）
+
+        Args:
+            estimated_bytes: reserve で予約したバイト数
+        """
+        with self._lock:
+            self._reserved -= estimated_bytes
+            metrics.set_gauge("artifact_disk_reserved_bytes", self._reserved)
+
+    @contextmanager
+    def admit(self, estimated_bytes: int) -> Iterator[None]:
+        """
+        成果物の作成を受け付け、完了まで見積もりサイズを予約
+
+        Args:
+            estimated_bytes: 作成する成果物の見積もりサイズ（バイト）
+
+        Raises:
+            ArtifactQuotaExceeded: 保存済みの成果物を削除しても上限を超える場合
+        """
+        self.reserve(estimated_bytes)
+        try:
+            yield
+        finally:
+            self.release(estimated_bytes)
+
+    @asynccontextmanager
+    async def admit_async(self, estimated_bytes: int) -> AsyncIterator[None]:
+        """
+        admit の非同期版（使用量の計測・成果物の削除はスレッドで行い、イベントループを止めない）
+
+        Args:
+            estimated_bytes: 作成する成果物の見積もりサイズ（バイト）
+
+        Raises:
+            ArtifactQuotaExceeded: 保存済みの成果物を削除しても上限を超える場合
+        """
+        await asyncio.to_thread(self.reserve, estimated_bytes)
+        try:
+            yield
+        finally:
+            self.release(estimated_bytes)
+
+    def sweep(self) -> int:
+        """
+        保持期間切れの成果物と、取り残された作業ディレクトリを削除
+
+        Returns:
+            削除した成果物・作業ディレクトリの数
+        """
+        removed = self.cache.sweep()
+        now = time.time()
+        for name in os.listdir(self.scratch_dir):
+            path = os.path.join(self.scratch_dir, name)
+            try:
+                modified = os.path.getmtime(path)
+            except OSError:
+                continue
+            # 作成中の作業ディレクトリは保持期間より前に片付けられる
+            if now - modified > self.cache.ttl_seconds:
+                shutil.rmtree(path, ignore_errors=True)
+                removed += 1
+        with self._lock:
+            self._update_gauges(self.usage_bytes())
+        return removed
+
+    def _ensure_sweeper(self) -> None:
+        """定期削除スレッドを遅延起動"""
+        if self.sweep_interval_seconds <= 0 or self._sweeper is not None:
+            return
+        with self._lock:
+            if self._sweeper is None:
+                self._sweeper = threading.Thread(
+                    target=self._sweep_loop, name="artifact-sweeper", daemon=True
+                )
+                self._sweeper.start()
+
+    def _sweep_loop(self) -> None:
+        while not self._stop.wait(self.sweep_interval_seconds):
+            try:
+                self.sweep()
+            except Exception as e:
+                print(f"Warning: 成果物の定期削除に失敗しました: {e}")
+
+    def shutdown(self) -> None:
+        """定期削除スレッドを停止"""
+        self._stop.set()
+
+
+@lru_cache()
+def get_artifact_lifecycle() -> ArtifactLifecycleManager:
+    """成果物の作成領域の管理のシングルトンインスタンスを取得"""
+    return ArtifactLifecycleManager(
+        get_artifact_cache(),
+        default_scratch_dir(),
+        settings.ARTIFACT_NODE_QUOTA_BYTES,
+        settings.ARTIFACT_SWEEP_INTERVAL_SECONDS,
+    )
@@ -0,0 +1,386 @@
+"""
+エクスポート・写真帳の成果物ストア
+
+作成したZIP・PDFを、どのAPIノードからでもダウンロードできる保存先に置きます。
+ARTIFACT_STORE で保存先を切り替えます。
+    local : ローカルディレクトリ（デフォルト。複数ノードの場合は共有ボリュームを指定）
+    s3    : S3バケット（ARTIFACT_STORE_BUCKET、未設定の場合は S3_BUCKET の artifacts/ 配下）
+
+キーは "<種類>/<ダイジェスト>/<ファイル名>" 形式で、クライアントには署名付きの
+ダウンロードトークン（JWTHandler.create_download_token）として渡します。
+"""
+
+import os
+import shutil
+import tempfile
+from dataclasses import dataclass
+from datetime import datetime
+from functools import lru_cache
+from typing import Any, Iterator, Optional, Tuple, Union, cast
+
+from botocore.exceptions import ClientError
+
+from app.config import settings
+from app.services.aws_clients import create_aws_client
+
+DOWNLOAD_CHUNK_SIZE = 256 * 1024
+
+
+@dataclass(frozen=True)
+class ArtifactStat:
+    """保存済み成果物の情報"""
+
+    size: int
+    # 強いETag（引用符付き）。内容が変わると変わる
+    etag: str
+    # 更新時刻（UNIX時間）
+    modified: float
+
+
+def parse_byte_range(header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """
+    Rangeヘッダー（単一範囲）を解析
+
+    Args:
+        header: Rangeヘッダーの値（"bytes=0-99", "bytes=100-", "bytes=-100"）
+        size: 成果物のサイズ（バイト）
+
+    Returns:
+        (開始位置, 終了位置)（終了位置を含む）。ヘッダーなし・解釈できない形式の場合はNone
+        （範囲指定を無視して全体を返す）
+
+    Raises:
+        ValueError: 範囲が成果物のサイズを超えている場合（416 Range Not Satisfiable）
+    """
+    if not header or not header.startswith("bytes=") or "," in header:
+        return None
+    start_text, _, end_text = header[len("bytes=") :].strip().partition("-")
+    try:
+        if start_text:
+            start = int(start_text)
+            end = int(end_text) if end_text else size - 1
+        else:
+            # 末尾からのバイト数
+            start = max(size - int(end_text), 0)
+            end = size - 1
+    except ValueError:
+        return None
+    if start_text and end_text and start > end:
+        return None
+    if start >= size or end < start:
+        raise ValueError(
+            f"範囲が成果物のサイズ（{size}バイト）を超えています: {header}"
+        )
+    return start, min(end, size - 1)
+
+
+class LocalArtifactStore:
+    """ローカルディレクトリの成果物ストア"""
+
+    def __init__(self, root_dir: str):
+        """
+        Args:
+            root_dir: 保存先ディレクトリ
+        """
+        self.root_dir = root_dir
+        os.makedirs(root_dir, exist_ok=True)
+
+    def local_path(self, key: str) -> str:
+        """キーに対応するファイルパス"""
+        return os.path.join(self.root_dir, *key.split("/"))
+
+    def staging_dir(self, prefix: str) -> str:
+        """
+        成果物を作成するディレクトリ（保存先にそのまま作成する）
+
+        Args:
+            prefix: キーのプレフィックス（"<種類>/<ダイジェスト>/"）
+
+        Returns:
+            空のディレクトリ
+        """
+        path = self.local_path(prefix.rstrip("/"))
+        shutil.rmtree(path, ignore_errors=True)
+        os.makedirs(path)
+        return path
+
+    def put_file(self, key: str, path: str) -> None:
+        """ファイルを保存（保存先に作成済みの場合は何もしない）"""
+        destination = self.local_path(key)
+        if os.path.abspath(path) == os.path.abspath(destination):
+            return
+        os.makedirs(os.path.dirname(destination), exist_ok=True)
+        shutil.copyfile(path, destination)
+
+    def put_bytes(self, key: str, data: bytes) -> None:
+        """バイト列を保存（書き込み途中の内容を読まないよう一時ファイルから置き換える）"""
+        destination = self.local_path(key)
+        os.makedirs(os.path.dirname(destination), exist_ok=True)
+        with open(destination + ".tmp", "wb") as f:
+            f.write(data)
+        os.replace(destination + ".tmp", destination)
+
+    def get_bytes(self, key: str) -> Optional[bytes]:
+        """保存済みの内容（存在しない場合はNone）"""
+        try:
+            with open(self.local_path(key), "rb") as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def size(self, key: str) -> Optional[int]:
+        """保存済みのサイズ（存在しない場合はNone）"""
+        try:
+            return os.path.getsize(self.local_path(key))
+        except OSError:
+            return None
+
+    def stat(self, key: str) -> Optional[ArtifactStat]:
+        """保存済みの成果物の情報（存在しない場合はNone）"""
+        try:
+            stat = os.stat(self.local_path(key))
+        except OSError:
+            return None
+        # 更新時刻とサイズから作る（同じキーで作り直した場合も別の値になる）
+        return ArtifactStat(
+            size=stat.st_size,
+            etag=f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"',
+            modified=stat.st_mtime,
+        )
+
+    def iter_range(
+        self, key: str, start: int, end: int, chunk_size: int = DOWNLOAD_CHUNK_SIZE
+    ) -> Iterator[bytes]:
+        """
+        指定範囲の内容を順に読み出す
+
+        Args:
+            key: キー
+            start: 開始位置
+            end: 終了位置（含む）
+            chunk_size: 1回に読み出すバイト数
+
+        Yields:
+            バイト列
+        """
+        with open(self.local_path(key), "rb") as f:
+            f.seek(start)
+            remaining = end - start + 1
+            while remaining > 0:
+                chunk = f.read(min(chunk_size, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                yield chunk
+
+    def list_objects(self, prefix: str = "") -> Iterator[Tuple[str, int, float]]:
+        """
+        保存済みの成果物を列挙
+
+        Args:
+            prefix: キーのプレフィックス
+
+        Yields:
+            (キー, サイズ, 更新時刻のUNIX時間)
+        """
+        for dirpath, _, filenames in os.walk(self.root_dir):
+            for filename in filenames:
+                path = os.path.join(dirpath, filename)
+                key = os.path.relpath(path, self.root_dir).replace(os.sep, "/")
+                if not key.startswith(prefix):
+                    continue
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                yield key, stat.st_size, stat.st_mtime
+
+    def local_usage_bytes(self) -> int:
+        """このノードのディスクに保存している成果物の合計バイト数"""
+        return sum(size for _, size, _ in self.list_objects())
+
+    def delete_prefix(self, prefix: str) -> None:
+        """プレフィックス配下の成果物を削除"""
+        path = self.local_path(prefix.rstrip("/"))
+        if os.path.isdir(path):
+            shutil.rmtree(path, ignore_errors=True)
+        elif os.path.exists(path):
+            os.remove(path)
+
+    def discard_staging(self, path: str) -> None:
+        """作成に使ったディレクトリを片付ける（保存先に作成しているため残す）"""
+
+
+class S3ArtifactStore:
+    """S3の成果物ストア（複数ノードで共有）"""
+
+    def __init__(
+        self,
+        s3_client: Any,
+        bucket: str,
+        prefix: str = "artifacts/",
+        scratch_dir: Optional[str] = None,
+    ) -> None:
+        """
+        Args:
+            s3_client: S3クライアント
+            bucket: バケット名
+            prefix: オブジェクトキーのプレフィックス
+            scratch_dir: アップロード前の作業ディレクトリの作成先（省略時は一時ディレクトリ）
+        """
+        self.s3_client = s3_client
+        self.bucket = bucket
+        self.prefix = prefix
+        self.scratch_dir = scratch_dir
+
+    def _key(self, key: str) -> str:
+        return f"{self.prefix}{key}"
+
+    @staticmethod
+    def _not_found(error: ClientError) -> bool:
+        return error.response.get("Error", {}).get("Code") in (
+            "NoSuchKey",
+            "404",
+            "NotFound",
+        )
+
+    def local_path(self, key: str) -> Optional[str]:
+        """ローカルファイルはない"""
+        return None
+
+    def staging_dir(self, prefix: str) -> str:
+        """成果物を作成する作業ディレクトリ（アップロード後に削除する）"""
+        if self.scratch_dir:
+            os.makedirs(self.scratch_dir, exist_ok=True)
+        return tempfile.mkdtemp(prefix="artifact-", dir=self.scratch_dir)
+
+    def put_file(self, key: str, path: str) -> None:
+        """ファイルをアップロード（大きなファイルはマルチパート）"""
+        self.s3_client.upload_file(path, self.bucket, self._key(key))
+
+    def put_bytes(self, key: str, data: bytes) -> None:
+        """バイト列をアップロード"""
+        self.s3_client.put_object(Bucket=self.bucket, Key=self._key(key), Body=data)
+
+    def get_bytes(self, key: str) -> Optional[bytes]:
+        """保存済みの内容（存在しない場合はNone）"""
+        try:
+            response = self.s3_client.get_object(Bucket=self.bucket, Key=self._key(key))
+        except ClientError as e:
+            if self._not_found(e):
+                return None
+            raise
+        return cast(bytes, response["Body"].read())
+
+    def size(self, key: str) -> Optional[int]:
+        """保存済みのサイズ（存在しない場合はNone）"""
+        try:
+            response = self.s3_client.head_object(
+                Bucket=self.bucket, Key=self._key(key)
+            )
+        except ClientError as e:
+            if self._not_found(e):
+                return None
+            raise
+        return cast(int, response["ContentLength"])
+
+    def stat(self, key: str) -> Optional[ArtifactStat]:
+        """保存済みの成果物の情報（存在しない場合はNone）"""
+        try:
+            response = self.s3_client.head_object(
+                Bucket=self.bucket, Key=self._key(key)
+            )
+        except ClientError as e:
+            if self._not_found(e):
+                return None
+            raise
+        modified = response.get("LastModified")
+        return ArtifactStat(
+            size=response["ContentLength"],
+            etag=response["ETag"],
+            modified=modified.timestamp() if isinstance(modified, datetime) else 0.0,
+        )
+
+    def iter_range(
+        self, key: str, start: int, end: int, chunk_size: int = DOWNLOAD_CHUNK_SIZE
+    ) -> Iterator[bytes]:
+        """指定範囲の内容を順に読み出す（S3のRange取得）"""
+        if end < start:
+            return
+        response = self.s3_client.get_object(
+            Bucket=self.bucket, Key=self._key(key), Range=f"bytes={start}-{end}"
+        )
+        body = response["Body"]
+        try:
+            yield from body.iter_chunks(chunk_size)
+        finally:
+            body.close()
+
+    def list_objects(self, prefix: str = "") -> Iterator[Tuple[str, int, float]]:
+        """保存済みの成果物を列挙（(キー, サイズ, 更新時刻のUNIX時間)）"""
+        kwargs = {"Bucket": self.bucket, "Prefix": self._key(prefix)}
+        while True:
+            response = self.s3_client.list_objects_v2(**kwargs)
+            for item in response.get("Contents", []):
+                modified = item.get("LastModified")
+                yield (
+                    item["Key"][len(self.prefix) :],
+                    item["Size"],
+                    modified.timestamp() if isinstance(modified, datetime) else 0.0,
+                )
+            if not response.get("IsTruncated"):
+                break
+            kwargs["ContinuationToken"] = response["NextContinuationToken"]
+
+    def local_usage_bytes(self) -> int:
+        """このノードのディスクには成果物を保存しない"""
+        return 0
+
+    def delete_prefix(self, prefix: str) -> None:
+        """プレフィックス配下の成果物を削除"""
+        for key, _, _ in list(self.list_objects(prefix)):
+            self.s3_client.delete_object(Bucket=self.bucket, Key=self._key(key))
+
+    def discard_staging(self, path: str) -> None:
+        """アップロード済みの一時ディレクトリを削除"""
+        shutil.rmtree(path, ignore_errors=True)
+
+
+def default_local_root() -> str:
+    """ローカルストアの保存先（ARTIFACT_CACHE_DIR 未設定時は一時ディレクトリ配下）"""
+    return settings.ARTIFACT_CACHE_DIR or os.path.join(
+        tempfile.gettempdir(), "construction-photo-artifacts"
+    )
+
+
+def default_scratch_dir() -> str:
+    """作業ディレクトリの作成先（ARTIFACT_SCRATCH_DIR 未設定時は一時ディレクトリ配下）"""
+    return settings.ARTIFACT_SCRATCH_DIR or os.path.join(
+        tempfile.gettempdir(), "construction-photo-scratch"
+    )
+
+
+# 成果物ストアの実装（キャッシュ・ダウンロードはどちらも同じメソッドで扱う）
+ArtifactStore = Union[LocalArtifactStore, S3ArtifactStore]
+
+
+@lru_cache()
+def get_artifact_store() -> ArtifactStore:
+    """
+    成果物ストアのシングルトンインスタンスを取得
+
+    Returns:
+        S3ArtifactStore（ARTIFACT_STORE=s3）またはLocalArtifactStore
+
+    Raises:
+        ValueError: 未対応の保存先が設定されている場合
+    """
+    if settings.ARTIFACT_STORE == "s3":
+        return S3ArtifactStore(
+            create_aws_client("s3", region_name=settings.AWS_REGION),
+            settings.ARTIFACT_STORE_BUCKET or settings.S3_BUCKET,
+            scratch_dir=default_scratch_dir(),
+        )
+    if settings.ARTIFACT_STORE != "local":
+        raise ValueError(f"未対応の成果物ストアです: {settings.ARTIFACT_STORE}")
+    return LocalArtifactStore(default_local_root())
@@ -0,0 +1,98 @@
+"""
+AWSクライアントファクトリー
+
+AWS_CLIENT_BACKEND でクライアントの生成元を切り替えます。
+    aws  : boto3クライアント（デフォルト）
+    fake : app.services.fake_aws のローカル代替実装（Textract・Rekognitionのみ）
+
+fakeバックエンドのクライアントはプロセス内で共有し、同時実行上限や
+呼び出し統計がサービスインスタンスをまたいで有効になるようにします。
+"""
+
+from functools import lru_cache
+from typing import Any, Callable, Dict
+
+import boto3
+
+from app.config import settings
+from app.services.fake_aws import (
+    FakeAWSBackend,
+    FakeRekognitionClient,
+    FakeTextractClient,
+    LatencyModel,
+)
+
+FAKE_CLIENTS = {
+    "rekognition": FakeRekognitionClient,
+    "textract": FakeTextractClient,
+}
+
+
+def _boto3_backend(service_name: str, **kwargs: Any) -> Any:
+    return boto3.client(service_name, **kwargs)
+
+
+def _fake_backend(service_name: str, **kwargs: Any) -> Any:
+    if service_name not in FAKE_CLIENTS:
+        # 代替実装のないサービス（S3等）は通常のクライアントを使用
+        return boto3.client(service_name, **kwargs)
+    return get_fake_client(service_name)
+
+
+_BACKENDS: Dict[str, Callable] = {
+    "aws": _boto3_backend,
+    "fake": _fake_backend,
+}
+
+
+def register_aws_client_backend(name: str, factory: Callable) -> None:
+    """
+    クライアント生成バックエンドを登録
+
+    Args:
+        name: バックエンド名（AWS_CLIENT_BACKEND に指定する値）
+        factory: (service_name, **kwargs) を受け取りクライアントを返す関数
+    """
+    _BACKENDS[name] = factory
+
+
+def create_aws_client(service_name: str, **kwargs: Any) -> Any:
+    """
+    AWSクライアントを生成
+
+    Args:
+        service_name: サービス名（textract/rekognition/s3等）
+        **kwargs: boto3.client に渡す引数
+
+    Returns:
+        クライアント
+
+    Raises:
+        ValueError: 未登録のバックエンドが設定されている場合
+    """
+    backend = _BACKENDS.get(settings.AWS_CLIENT_BACKEND)
+    if backend is None:
+        raise ValueError(
+            f"未登録のAWSクライアントバックエンドです: {settings.AWS_CLIENT_BACKEND}"
+        )
+    return backend(service_name, **kwargs)
+
+
+@lru_cache()
+def get_fake_client(service_name: str) -> FakeAWSBackend:
+    """
+    設定値から代替クライアントを生成（サービスごとのシングルトン）
+
+    Args:
+        service_name: サービス名（textract/rekognition）
+
+    Returns:
+        代替クライアント
+    """
+    return FAKE_CLIENTS[service_name](
+        latency=LatencyModel.parse(settings.FAKE_AWS_LATENCY),
+        throttle_rate=settings.FAKE_AWS_THROTTLE_RATE,
+        max_concurrency=settings.FAKE_AWS_MAX_CONCURRENCY,
+        error_rate=settings.FAKE_AWS_ERROR_RATE,
+        seed=settings.FAKE_AWS_SEED,
+    )
@@ -6,15 +6,59 @@
 
 import os
 import shutil
-import zipfile
-from typing import List, Dict, Optional, Tuple
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, List, Dict, Optional, Tuple, cast
 from pathlib import Path
 from datetime import datetime
 
+from botocore.exceptions import BotoCoreError, ClientError
+
+from app.services.photo_xml_dtd_validator import (
+    DTDValidatingStream,
+    PhotoXMLDTDValidator,
+)
+from app.services.job_event_bus import JobProgressReporter
+from app.services.photo_xml_fragment_cache import (
+    FragmentCacheStats,
+    PhotoXMLFragmentCache,
+)
+from app.services.photo_xml_generator import PhotoXMLGenerator
+from app.services.s3_prefetcher import S3ObjectPrefetcher
+from app.services.zip_writer import (
+    ZIP_DEFLATED,
+    ZipChunkQueue,
+    ZipStreamWriter,
+    WritableStream,
+    compression_for,
+    get_deflate_executor,
+)
+
+# 分割先の媒体と1巻あたりの容量（バイト。フォーマット後の実容量より少なめ）
+MEDIA_CAPACITIES = {
+    "cd-r": 700 * 1000 * 1000,
+    "dvd-r": 4_700 * 1000 * 1000,
+    "dvd-r-dl": 8_500 * 1000 * 1000,
+    "bd-r": 25_000 * 1000 * 1000,
+    "bd-r-dl": 50_000 * 1000 * 1000,
+}
+
+# 巻のサイズ見積もり: 写真1枚あたりのZIPヘッダー類（ローカル・セントラル・ZIP64拡張）
+ZIP_ENTRY_OVERHEAD = 256
+
+# 巻のサイズ見積もり: 写真1枚あたりのPHOTO.XML（deflate後の上限の目安）
+PHOTO_XML_BYTES_PER_PHOTO = 2048
+
+# 巻のサイズ見積もり: テンプレート以外の固定分（XMLヘッダー・終端レコード等）
+VOLUME_BASE_OVERHEAD = 64 * 1024
+
 
 class ExportService:
     """エクスポートサービスクラス"""
 
+    # パッケージの出力形式のバージョン（変更時はキャッシュ済みの成果物が無効になる）
+    ARTIFACT_VERSION = "1"
+
     def __init__(self):
         """初期化"""
         self.photo_folder = "PIC"
@@ -54,18 +98,21 @@ class ExportService:
             "serial_number": serial_number,
         }
 
-    def rename_multiple_photos(self, photos: List[Dict]) -> List[Dict]:
+    def rename_multiple_photos(
+        self, photos: List[Dict], first_serial: int = 1
+    ) -> List[Dict]:
         """
         複数写真のファイル名をリネーム
 
         Args:
             photos: 写真データリスト
+            first_serial: 先頭写真のシリアル番号
 
         Returns:
             リネーム情報リスト
         """
         renamed_list = []
-        for idx, photo in enumerate(photos, start=1):
+        for idx, photo in enumerate(photos, start=first_serial):
             renamed = self.rename_photo_file(photo, idx)
             renamed_list.append(renamed)
         return renamed_list
@@ -224,6 +271,109 @@ class ExportService:
 
         return xml_path
 
+    def write_photo_xml_to_zip(
+        self,
+        zip_writer: ZipStreamWriter,
+        photos: List[Dict],
+        pretty_print: bool = True,
+        fragment_cache: Optional[PhotoXMLFragmentCache] = None,
+        cache_stats: Optional[FragmentCacheStats] = None,
+        dtd_validator: Optional[PhotoXMLDTDValidator] = None,
+        first_serial: int = 1,
+    ) -> int:
+        """
+        PHOTO.XMLをZIPエントリへ直接書き込み（XML全体をメモリや一時ファイルに保持しない）
+
+        Args:
+            zip_writer: 書き込み先のZIPアーカイブ
+            photos: 写真データリスト
+            pretty_print: 整形出力するかどうか
+            fragment_cache: 写真情報フラグメントキャッシュ（省略時は使用しない）
+            cache_stats: キャッシュ利用状況の集計先
+            dtd_validator: 書き込みと並行してDTD適合を検査するチェッカー（省略可）
+            first_serial: 先頭写真のシリアル番号
+
+        Returns:
+            PHOTO.XMLのサイズ（Shift_JISエンコード後のバイト数）
+        """
+        generator = PhotoXMLGenerator()
+        with zip_writer.open("PHOTO.XML", ZIP_DEFLATED) as entry:
+            stream: WritableStream = entry
+            if dtd_validator is not None:
+                stream = DTDValidatingStream(entry, dtd_validator)
+            return generator.write_xml(
+                photos,
+                stream,
+                pretty_print=pretty_print,
+                fragment_cache=fragment_cache,
+                cache_stats=cache_stats,
+                first_serial=first_serial,
+            )
+
+    def write_photo_files_to_zip(
+        self,
+        zip_writer: ZipStreamWriter,
+        photos: List[Dict],
+        s3_client: Any,
+        bucket: str,
+        max_concurrency: int = 8,
+        reporter: Optional[JobProgressReporter] = None,
+        first_serial: int = 1,
+    ) -> Dict:
+        """
+        写真ファイルをS3から取得し、ZIPエントリ（PIC/Pnnnnnnn.JPG）へ直接書き込み
+
+        後続の写真は S3ObjectPrefetcher で並行して先読みし、ローカルディスクには
+        一時保存しません。CRCは書き込みと同時に計算され、JPEG/TIFFは無圧縮で格納します。
+
+        Args:
+            zip_writer: 書き込み先のZIPアーカイブ
+            photos: 写真データリスト（s3_key が必要）
+            s3_client: S3クライアント
+            bucket: バケット名
+            max_concurrency: 同時に取得する写真ファイル数
+            reporter: 進捗レポーター（省略可）
+            first_serial: 先頭写真のシリアル番号
+
+        Returns:
+            書き込み結果（files: ファイル数, bytes: 合計バイト数）
+
+        Raises:
+            ValueError: S3キーのない写真が含まれる場合
+            RuntimeError: 写真ファイルを取得できない場合
+        """
+        for photo in photos:
+            if not photo.get("s3_key"):
+                raise ValueError(f"写真のS3キーがありません（ID: {photo.get('id')}）")
+
+        renames = self.rename_multiple_photos(photos, first_serial)
+        prefetcher = S3ObjectPrefetcher(s3_client, bucket, max_concurrency)
+        objects = prefetcher.iter_objects(photo["s3_key"] for photo in photos)
+        if reporter is not None:
+            reporter.set_total(len(photos))
+            reporter.stage("photos")
+
+        total_bytes = 0
+        try:
+            for photo, rename in zip(photos, renames):
+                try:
+                    _, data = next(objects)
+                except (BotoCoreError, ClientError) as e:
+                    raise RuntimeError(
+                        f"写真ファイルを取得できません（ID: {photo.get('id')}, "
+                        f"S3キー: {photo['s3_key']}）"
+                    ) from e
+
+                data = cast(bytes, data)
+                zip_writer.write(f"{self.photo_folder}/{rename['new_file_name']}", data)
+                total_bytes += len(data)
+                if reporter is not None:
+                    reporter.advance(1)
+        finally:
+            objects.close()
+
+        return {"files": len(photos), "bytes": total_bytes}
+
     def create_zip_archive(
         self, source_folder: str, output_dir: str, archive_name: Optional[str] = None
     ) -> str:
@@ -238,23 +388,35 @@ class ExportService:
         Returns:
             作成されたZIPファイルパス
         """
-        if archive_name is None:
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            archive_name = f"photo_export_{timestamp}.zip"
-
-        zip_path = os.path.join(output_dir, archive_name)
+        zip_path = os.path.join(output_dir, archive_name or self.archive_name())
 
-        with zipfile.ZipFile(zip_path, "w", zipfile.ZIP_DEFLATED) as zipf:
-            # フォルダ内の全ファイルをZIPに追加
-            for root, dirs, files in os.walk(source_folder):
-                for file in files:
-                    file_path = os.path.join(root, file)
-                    # ZIP内でのパスを相対パスに
-                    arcname = os.path.relpath(file_path, source_folder)
-                    zipf.write(file_path, arcname)
+        with open(zip_path, "wb") as f:
+            with ZipStreamWriter(f, executor=get_deflate_executor()) as zip_writer:
+                self.add_folder_to_zip(zip_writer, source_folder)
 
         return zip_path
 
+    def add_folder_to_zip(self, zip_writer: ZipStreamWriter, source_folder: str) -> int:
+        """
+        フォルダ内の全ファイルをZIPに追加（圧縮方式は拡張子ごとに決定）
+
+        Args:
+            zip_writer: 書き込み先のZIPアーカイブ
+            source_folder: ソースフォルダパス
+
+        Returns:
+            追加したファイル数
+        """
+        count = 0
+        for root, dirs, files in os.walk(source_folder):
+            for file in files:
+                file_path = os.path.join(root, file)
+                # ZIP内でのパスを相対パスに（区切り文字は常に "/"）
+                arcname = Path(os.path.relpath(file_path, source_folder)).as_posix()
+                zip_writer.write_file(file_path, arcname, compression_for(arcname))
+                count += 1
+        return count
+
     def get_file_size(self, file_path: str) -> int:
         """
         ファイルサイズを取得
@@ -267,21 +429,167 @@ class ExportService:
         """
         return os.path.getsize(file_path)
 
+    def archive_name(self, project_name: Optional[str] = None) -> str:
+        """
+        エクスポートZIPのファイル名を決定
+
+        Args:
+            project_name: プロジェクト名（省略時は日時から生成）
+
+        Returns:
+            ファイル名
+        """
+        if project_name:
+            return f"{project_name}_export.zip"
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        return f"photo_export_{timestamp}.zip"
+
+    def write_templates_to_zip(self, zip_writer: ZipStreamWriter):
+        """
+        DTD/XSLテンプレートをZIPのルートへ書き込み（テンプレートがない場合はダミー）
+
+        Args:
+            zip_writer: 書き込み先のZIPアーカイブ
+        """
+        for path in (self.get_dtd_template_path(), self.get_xsl_template_path()):
+            arcname = os.path.basename(path)
+            if os.path.exists(path):
+                zip_writer.write_file(path, arcname)
+            else:
+                zip_writer.write(arcname, f"<!-- {arcname} -->".encode("shift_jis"))
+
+    def write_package(
+        self,
+        zip_writer: ZipStreamWriter,
+        photos: List[Dict],
+        xml_content: Optional[str] = None,
+        fragment_cache: Optional[PhotoXMLFragmentCache] = None,
+        s3_client: Any = None,
+        bucket: Optional[str] = None,
+        prefetch_concurrency: int = 8,
+        reporter: Optional[JobProgressReporter] = None,
+        first_serial: int = 1,
+    ) -> Dict:
+        """
+        電子納品パッケージの全エントリをZIPへ書き込み
+
+        出力先はファイルでもHTTPレスポンス（ZipChunkQueue）でもよく、
+        ローカルディスクに作業フォルダを作りません。
+
+        Args:
+            zip_writer: 書き込み先のZIPアーカイブ
+            photos: 写真データリスト
+            xml_content: PHOTO.XML内容（省略時は写真データから逐次生成）
+            fragment_cache: PHOTO.XML写真情報フラグメントキャッシュ（省略時は使用しない）
+            s3_client: 写真ファイル取得用のS3クライアント（省略時は写真ファイルを含めない）
+            bucket: 写真ファイルのバケット名
+            prefetch_concurrency: 写真ファイルの同時取得数
+            reporter: 進捗レポーター（省略可）
+            first_serial: 先頭写真のシリアル番号（媒体分割時の2巻目以降）
+
+        Returns:
+            書き込み結果（total_photos, dtd_errors, xml_fragment_cache, photo_files）
+        """
+        self.write_templates_to_zip(zip_writer)
+
+        # 写真ファイル（S3から逐次取得してZIPエントリへ書き込み）
+        xml_photos = photos
+        photo_files = None
+        if s3_client is not None:
+            photo_files = self.write_photo_files_to_zip(
+                zip_writer,
+                photos,
+                s3_client,
+                cast(str, bucket),
+                max_concurrency=prefetch_concurrency,
+                reporter=reporter,
+                first_serial=first_serial,
+            )
+            xml_photos = [
+                {**photo, "file_name": rename["new_file_name"]}
+                for photo, rename in zip(
+                    photos, self.rename_multiple_photos(photos, first_serial)
+                )
+            ]
+
+        cache_stats = None
+        dtd_errors = []
+        if xml_content is not None:
+            zip_writer.write("PHOTO.XML", xml_content.encode("shift_jis"))
+        else:
+            cache_stats = FragmentCacheStats()
+            dtd_validator = PhotoXMLDTDValidator()
+            self.write_photo_xml_to_zip(
+                zip_writer,
+                xml_photos,
+                fragment_cache=fragment_cache,
+                cache_stats=cache_stats,
+                dtd_validator=dtd_validator,
+                first_serial=first_serial,
+            )
+            dtd_errors = [error.as_dict() for error in dtd_validator.close()]
+
+        result = {"total_photos": len(photos), "dtd_errors": dtd_errors}
+        if fragment_cache is not None and cache_stats is not None:
+            result["xml_fragment_cache"] = cache_stats.as_dict()
+        if photo_files is not None:
+            result["photo_files"] = photo_files
+        return result
+
+    def stream_package(
+        self, chunks: ZipChunkQueue, photos: List[Dict], **options: Any
+    ) -> Dict:
+        """
+        パッケージをZIPとして逐次出力（HTTPレスポンスへの直接配信用）
+
+        ワーカースレッドで実行し、読み出し側は chunks.iter_chunks() で受け取ります。
+        途中で例外が発生した場合は読み出し側でも同じ例外を送出します。
+
+        Args:
+            chunks: 出力先のチャンクキュー
+            photos: 写真データリスト
+            **options: write_package の引数
+
+        Returns:
+            書き込み結果（write_package の戻り値）
+        """
+        try:
+            with ZipStreamWriter(chunks, executor=get_deflate_executor()) as zip_writer:
+                result = self.write_package(zip_writer, photos, **options)
+        except BaseException as e:
+            chunks.finish(e)
+            raise
+        chunks.finish()
+        return result
+
     def export_package(
         self,
         photos: List[Dict],
-        xml_content: str,
-        export_dir: str,
+        xml_content: Optional[str] = None,
+        export_dir: str = ".",
         project_name: Optional[str] = None,
+        fragment_cache: Optional[PhotoXMLFragmentCache] = None,
+        s3_client: Any = None,
+        bucket: Optional[str] = None,
+        prefetch_concurrency: int = 8,
+        reporter: Optional[JobProgressReporter] = None,
     ) -> Dict:
         """
         エクスポートパッケージを作成（統合処理）
 
+        S3クライアントを指定した場合は、写真ファイルをS3から取得して
+        PIC/Pnnnnnnn.JPG としてZIPに格納し、PHOTO.XMLの写真ファイル名もリネーム後の名前にします。
+
         Args:
             photos: 写真データリスト
-            xml_content: PHOTO.XML内容
+            xml_content: PHOTO.XML内容（省略時は写真データからZIPエントリへ逐次生成）
             export_dir: エクスポート先ディレクトリ
             project_name: プロジェクト名
+            fragment_cache: PHOTO.XML写真情報フラグメントキャッシュ（省略時は使用しない）
+            s3_client: 写真ファイル取得用のS3クライアント（省略時は写真ファイルを含めない）
+            bucket: 写真ファイルのバケット名
+            prefetch_concurrency: 写真ファイルの同時取得数
+            reporter: 進捗レポーター（省略可）
 
         Returns:
             エクスポート結果
@@ -298,37 +606,275 @@ class ExportService:
             }
 
         try:
-            # フォルダ構造作成
-            folders = self.create_folder_structure(export_dir)
+            # テンプレート・写真ファイル・PHOTO.XMLをZIPへ直接書き込む（作業フォルダは作らない）
+            zip_path = os.path.join(export_dir, self.archive_name(project_name))
+            with open(zip_path, "wb") as f:
+                with ZipStreamWriter(f, executor=get_deflate_executor()) as zip_writer:
+                    result = self.write_package(
+                        zip_writer,
+                        photos,
+                        xml_content=xml_content,
+                        fragment_cache=fragment_cache,
+                        s3_client=s3_client,
+                        bucket=bucket,
+                        prefetch_concurrency=prefetch_concurrency,
+                        reporter=reporter,
+                    )
+
+            return {
+                "success": True,
+                "errors": [],
+                "zip_path": zip_path,
+                "file_size": self.get_file_size(zip_path),
+                **result,
+            }
+
+        except Exception as e:
+            return {
+                "success": False,
+                "errors": [str(e)],
+                "zip_path": None,
+                "total_photos": 0,
+            }
+
+    def volume_capacity(
+        self, media: Optional[str] = None, volume_size: Optional[int] = None
+    ) -> Optional[int]:
+        """
+        1巻あたりの最大サイズを決定
+
+        Args:
+            media: 媒体名（MEDIA_CAPACITIES のキー）
+            volume_size: 最大サイズ（バイト。指定時は media より優先）
+
+        Returns:
+            最大サイズ（分割しない場合はNone）
+
+        Raises:
+            ValueError: 未対応の媒体が指定された場合
+        """
+        if volume_size:
+            return volume_size
+        if media is None:
+            return None
+        capacity = MEDIA_CAPACITIES.get(media.lower())
+        if capacity is None:
+            raise ValueError(
+                f"未対応の媒体です: {media}（{', '.join(MEDIA_CAPACITIES)}）"
+            )
+        return capacity
+
+    def _volume_base_size(self) -> int:
+        """1巻あたりの写真以外の見積もりサイズ（テンプレート・固定分）"""
+        return VOLUME_BASE_OVERHEAD + sum(
+            os.path.getsize(path)
+            for path in (self.get_dtd_template_path(), self.get_xsl_template_path())
+            if os.path.exists(path)
+        )
+
+    def estimate_package_size(
+        self, photos: List[Dict], include_photo_files: bool = True
+    ) -> int:
+        """
+        パッケージ（分割しない場合のZIP）の見積もりサイズ
+
+        作成領域の予約に使います。サイズ不明の写真ファイルは0バイトとして数えます。
+
+        Args:
+            photos: 写真データリスト
+            include_photo_files: 写真ファイルのサイズを含めるか
+
+        Returns:
+            見積もりサイズ（バイト）
+        """
+        size = self._volume_base_size()
+        for photo in photos:
+            size += ZIP_ENTRY_OVERHEAD + PHOTO_XML_BYTES_PER_PHOTO
+            if include_photo_files:
+                size += photo.get("file_size") or 0
+        return size
+
+    def plan_volumes(
+        self, photos: List[Dict], volume_size: int, include_photo_files: bool = True
+    ) -> List[Dict]:
+        """
+        写真をシリアル番号順に、1巻の見積もりサイズが volume_size 以下になるよう分割
+
+        シリアル番号・写真ファイル名は巻をまたいで通し番号とし、各巻に
+        その巻の写真だけを記載したPHOTO.XMLを格納します。
 
-            # テンプレートコピー
-            self.copy_templates_to_folder(folders["root"])
+        Args:
+            photos: 写真データリスト（写真ファイルを含める場合は file_size が必要）
+            volume_size: 1巻あたりの最大サイズ（バイト）
+            include_photo_files: 写真ファイルのサイズを見積もりに含めるか
 
-            # PHOTO.XML保存
-            self.save_photo_xml(folders["root"], xml_content)
+        Returns:
+            巻の計画リスト（volume, first_serial, photos, estimated_size）
 
-            # ZIPアーカイブ作成
-            archive_name = f"{project_name}_export.zip" if project_name else None
-            zip_path = self.create_zip_archive(
-                folders["root"], export_dir, archive_name
+        Raises:
+            ValueError: 1枚で最大サイズを超える写真、またはサイズ不明の写真がある場合
+        """
+        base = self._volume_base_size()
+
+        volumes: List[Dict] = []
+        current: List[Dict] = []
+        size = base
+        for serial, photo in enumerate(photos, start=1):
+            photo_size = ZIP_ENTRY_OVERHEAD + PHOTO_XML_BYTES_PER_PHOTO
+            if include_photo_files:
+                if photo.get("file_size") is None:
+                    raise ValueError(
+                        f"写真のファイルサイズが不明です（ID: {photo.get('id')}）"
+                    )
+                photo_size += photo["file_size"]
+            if base + photo_size > volume_size:
+                raise ValueError(
+                    f"1巻の最大サイズを超える写真があります（ID: {photo.get('id')}）"
+                )
+            if current and size + photo_size > volume_size:
+                volumes.append(
+                    {
+                        "volume": len(volumes) + 1,
+                        "first_serial": serial - len(current),
+                        "photos": current,
+                        "estimated_size": size,
+                    }
+                )
+                current = []
+                size = base
+            current.append(photo)
+            size += photo_size
+        if current:
+            volumes.append(
+                {
+                    "volume": len(volumes) + 1,
+                    "first_serial": len(photos) - len(current) + 1,
+                    "photos": current,
+                    "estimated_size": size,
+                }
             )
+        return volumes
+
+    def volume_archive_name(
+        self, project_name: Optional[str], volume: int, volume_count: int
+    ) -> str:
+        """
+        巻ごとのZIPファイル名（例: 工事A_export_vol01of03.zip）
 
+        Args:
+            project_name: プロジェクト名
+            volume: 巻番号
+            volume_count: 巻数
+
+        Returns:
+            ファイル名
+        """
+        stem = self.archive_name(project_name)[: -len(".zip")]
+        return f"{stem}_vol{volume:02d}of{volume_count:02d}.zip"
+
+    def export_volumes(
+        self,
+        photos: List[Dict],
+        volume_size: int,
+        export_dir: str = ".",
+        project_name: Optional[str] = None,
+        max_workers: int = 2,
+        reporter: Optional[JobProgressReporter] = None,
+        **options: Any,
+    ) -> Dict:
+        """
+        媒体サイズごとに分割したエクスポートパッケージを作成
+
+        各巻は独立したZIP（PHOTO05.DTD/XSL・PIC/・PHOTO.XML）として並行して作成します。
+
+        Args:
+            photos: 写真データリスト
+            volume_size: 1巻あたりの最大サイズ（バイト）
+            export_dir: エクスポート先ディレクトリ
+            project_name: プロジェクト名
+            max_workers: 同時に作成する巻数
+            reporter: 進捗レポーター（巻の完了ごとに写真枚数分進める）
+            **options: write_package の引数（s3_client, bucket, fragment_cache 等）
+
+        Returns:
+            エクスポート結果（volumes に巻ごとの zip_path・file_size 等）
+        """
+        if not photos:
             return {
-                "success": True,
-                "errors": [],
+                "success": False,
+                "errors": ["写真が指定されていません"],
+                "volumes": [],
+                "total_photos": 0,
+            }
+
+        try:
+            plan = self.plan_volumes(
+                photos,
+                volume_size,
+                include_photo_files=options.get("s3_client") is not None,
+            )
+        except ValueError as e:
+            return {
+                "success": False,
+                "errors": [str(e)],
+                "volumes": [],
+                "total_photos": 0,
+            }
+
+        if reporter is not None:
+            reporter.set_total(len(photos))
+            reporter.stage("volumes")
+        progress_lock = threading.Lock()
+
+        def build(volume: Dict) -> Dict:
+            archive_name = self.volume_archive_name(
+                project_name, volume["volume"], len(plan)
+            )
+            zip_path = os.path.join(export_dir, archive_name)
+            with open(zip_path, "wb") as f:
+                with ZipStreamWriter(f, executor=get_deflate_executor()) as zip_writer:
+                    result = self.write_package(
+                        zip_writer,
+                        volume["photos"],
+                        first_serial=volume["first_serial"],
+                        **options,
+                    )
+            if reporter is not None:
+                with progress_lock:
+                    reporter.advance(len(volume["photos"]))
+            return {
+                "volume": volume["volume"],
                 "zip_path": zip_path,
-                "total_photos": len(photos),
                 "file_size": self.get_file_size(zip_path),
+                "serial_start": volume["first_serial"],
+                "serial_end": volume["first_serial"] + len(volume["photos"]) - 1,
+                **result,
             }
 
+        try:
+            with ThreadPoolExecutor(
+                max_workers=max(1, min(max_workers, len(plan))),
+                thread_name_prefix="export-volume",
+            ) as executor:
+                volumes = list(executor.map(build, plan))
         except Exception as e:
             return {
                 "success": False,
                 "errors": [str(e)],
-                "zip_path": None,
+                "volumes": [],
                 "total_photos": 0,
             }
 
+        return {
+            "success": True,
+            "errors": [],
+            "volumes": volumes,
+            "total_photos": len(photos),
+            "dtd_errors": [
+                error for volume in volumes for error in volume["dtd_errors"]
+            ],
+        }
+
     def cleanup_temp_files(self, temp_dir: str):
         """
         一時ファイルをクリーンアップ
@@ -0,0 +1,511 @@
+"""
+Textract・Rekognition・S3 のローカル代替実装（負荷試験・スループット計測用）
+
+boto3クライアントと同じメソッド名・レスポンス形式（Blocks / Labels）を返し、
+レイテンシ分布・スロットリング率・同時実行上限・エラー率を設定できます。
+レスポンスはS3キーから決まる乱数で生成するため、同じ写真には毎回同じ結果を返します。
+
+レイテンシ分布の指定形式（ミリ秒）:
+    "fixed:100"          常に100ms
+    "uniform:50:150"     50〜150msの一様分布
+    "normal:100:20"      平均100ms・標準偏差20msの正規分布（0未満は0）
+    "lognormal:120:0.5"  中央値120ms・σ=0.5の対数正規分布（API応答に近い裾の長い分布）
+"""
+
+import math
+import random
+import threading
+import time
+import uuid
+import zlib
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterator, List, Optional
+
+from botocore.exceptions import ClientError
+
+
+class LatencyModel:
+    """レイテンシ分布"""
+
+    def __init__(self, kind: str = "fixed", *params: float):
+        """
+        初期化
+
+        Args:
+            kind: 分布の種類（fixed/uniform/normal/lognormal）
+            *params: 分布のパラメータ（ミリ秒）
+        """
+        if kind not in ("fixed", "uniform", "normal", "lognormal"):
+            raise ValueError(f"未対応のレイテンシ分布です: {kind}")
+        self.kind = kind
+        self.params = params or (0.0,)
+
+    @classmethod
+    def parse(cls, spec: str) -> "LatencyModel":
+        """
+        "lognormal:120:0.5" 形式の指定を解析
+
+        Args:
+            spec: レイテンシ分布の指定
+
+        Returns:
+            LatencyModel
+        """
+        if not spec:
+            return cls("fixed", 0.0)
+        kind, *params = spec.split(":")
+        return cls(kind.strip(), *(float(param) for param in params))
+
+    def sample(self, rng: random.Random) -> float:
+        """
+        レイテンシを1件サンプリング
+
+        Returns:
+            レイテンシ（秒）
+        """
+        if self.kind == "fixed":
+            millis = self.params[0]
+        elif self.kind == "uniform":
+            millis = rng.uniform(self.params[0], self.params[1])
+        elif self.kind == "normal":
+            millis = max(rng.gauss(self.params[0], self.params[1]), 0.0)
+        else:
+            median, sigma = self.params[0], self.params[1]
+            millis = rng.lognormvariate(math.log(median), sigma) if median > 0 else 0.0
+        return millis / 1000
+
+
+class FakeAWSBackend:
+    """レイテンシ・スロットリング・エラーを模擬する共通処理"""
+
+    # サービスごとのエラーコード
+    THROTTLING_CODE = "ThrottlingException"
+    INVALID_INPUT_CODE = "InvalidParameterException"
+
+    def __init__(
+        self,
+        latency: Optional[LatencyModel] = None,
+        throttle_rate: float = 0.0,
+        max_concurrency: int = 0,
+        error_rate: float = 0.0,
+        seed: Optional[int] = None,
+    ):
+        """
+        初期化
+
+        Args:
+            latency: レイテンシ分布
+            throttle_rate: スロットリングを返す確率（0.0-1.0）
+            max_concurrency: 同時実行上限（超過分はスロットリング、0は無制限）
+            error_rate: 入力エラー（画像不正等）を返す確率（0.0-1.0）
+            seed: 乱数シード
+        """
+        self.latency = latency or LatencyModel("fixed", 0.0)
+        self.throttle_rate = throttle_rate
+        self.max_concurrency = max_concurrency
+        self.error_rate = error_rate
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self.stats = {"calls": 0, "throttled": 0, "errors": 0}
+
+    def _call(self, operation: str, s3_key: str) -> None:
+        """
+        API呼び出しを模擬（スロットリング・エラー・レイテンシ）
+
+        Raises:
+            ClientError: スロットリングまたは入力エラー
+        """
+        with self._lock:
+            self.stats["calls"] += 1
+            self._in_flight += 1
+            throttled = (
+                self.max_concurrency > 0 and self._in_flight > self.max_concurrency
+            ) or self._rng.random() < self.throttle_rate
+            failed = not throttled and self._rng.random() < self.error_rate
+            delay = self.latency.sample(self._rng)
+            if throttled:
+                self.stats["throttled"] += 1
+            elif failed:
+                self.stats["errors"] += 1
+
+        try:
+            if throttled:
+                raise self._error(operation, self.THROTTLING_CODE, "Rate exceeded")
+            time.sleep(delay)
+            if failed:
+                raise self._error(
+                    operation,
+                    self.INVALID_INPUT_CODE,
+                    f"Request has invalid image: {s3_key}",
+                )
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+
+    @staticmethod
+    def _error(operation: str, code: str, message: str) -> ClientError:
+        return ClientError(
+            {
+                "Error": {"Code": code, "Message": message},
+                "ResponseMetadata": {"HTTPStatusCode": 400},
+            },
+            operation,
+        )
+
+    @staticmethod
+    def _rng_for(s3_key: str) -> random.Random:
+        """S3キーごとに決定的な乱数生成器"""
+        return random.Random(zlib.crc32(s3_key.encode("utf-8")))
+
+    @staticmethod
+    def _response_metadata() -> Dict:
+        return {"RequestId": str(uuid.uuid4()), "HTTPStatusCode": 200}
+
+
+class FakeRekognitionClient(FakeAWSBackend):
+    """Rekognition detect_labels の代替実装"""
+
+    INVALID_INPUT_CODE = "InvalidImageFormatException"
+
+    # (ラベル名, 親ラベル, カテゴリ, インスタンスを持つか)
+    LABEL_CATALOG = [
+        ("Construction", [], "Buildings and Architecture", False),
+        ("Construction Site", ["Construction"], "Buildings and Architecture", False),
+        (
+            "Excavator",
+            ["Machine", "Vehicle", "Transportation"],
+            "Vehicles and Automotive",
+            True,
+        ),
+        (
+            "Bulldozer",
+            ["Machine", "Vehicle", "Transportation"],
+            "Vehicles and Automotive",
+            True,
+        ),
+        ("Crane", ["Machine", "Construction Crane"], "Vehicles and Automotive", True),
+        (
+            "Dump Truck",
+            ["Truck", "Vehicle", "Transportation"],
+            "Vehicles and Automotive",
+            True,
+        ),
+        ("Truck", ["Vehicle", "Transportation"], "Vehicles and Automotive", True),
+        ("Machine", [], "Technology and Computing", False),
+        ("Person", [], "Person Description", True),
+        ("Worker", ["Person"], "Person Description", True),
+        ("Helmet", ["Clothing"], "Apparel and Accessories", True),
+        ("Hard Hat", ["Helmet", "Clothing"], "Apparel and Accessories", True),
+        ("Safety Vest", ["Clothing"], "Apparel and Accessories", False),
+        ("Clothing", [], "Apparel and Accessories", False),
+        ("Concrete", [], "Materials", False),
+        ("Rebar", ["Steel"], "Materials", False),
+        ("Steel", [], "Materials", False),
+        ("Lumber", ["Wood"], "Materials", False),
+        ("Pipe", [], "Materials", False),
+        ("Scaffolding", ["Construction"], "Buildings and Architecture", False),
+        ("Road", ["Asphalt"], "Buildings and Architecture", False),
+        ("Bridge", ["Architecture"], "Buildings and Architecture", False),
+        ("Soil", [], "Nature and Outdoors", False),
+        ("Outdoors", [], "Nature and Outdoors", False),
+        ("Sky", [], "Nature and Outdoors", False),
+        ("Tree", ["Plant"], "Nature and Outdoors", False),
+    ]
+
+    def detect_labels(
+        self,
+        Image: Dict,
+        MaxLabels: int = 1000,
+        MinConfidence: float = 55.0,
+        **kwargs: Any,
+    ) -> Dict:
+        """detect_labels の代替（S3Object指定のみ対応）"""
+        s3_key = Image.get("S3Object", {}).get("Name", "")
+        self._call("DetectLabels", s3_key)
+
+        rng = self._rng_for(s3_key)
+        count = rng.randint(5, 15)
+        labels: List[Dict[str, Any]] = []
+        for name, parents, category, has_instances in rng.sample(
+            self.LABEL_CATALOG, count
+        ):
+            confidence = round(rng.uniform(55.0, 99.9), 4)
+            if confidence < MinConfidence:
+                continue
+            instances: List[Dict[str, Any]] = []
+            if has_instances:
+                for _ in range(rng.randint(1, 3)):
+                    width, height = rng.uniform(0.05, 0.5), rng.uniform(0.05, 0.5)
+                    instances.append(
+                        {
+                            "BoundingBox": {
+                                "Width": width,
+                                "Height": height,
+                                "Left": rng.uniform(0, 1 - width),
+                                "Top": rng.uniform(0, 1 - height),
+                            },
+                            "Confidence": round(rng.uniform(MinConfidence, 99.9), 4),
+                        }
+                    )
+            labels.append(
+                {
+                    "Name": name,
+                    "Confidence": confidence,
+                    "Instances": instances,
+                    "Parents": [{"Name": parent} for parent in parents],
+                    "Aliases": [],
+                    "Categories": [{"Name": category}],
+                }
+            )
+
+        labels.sort(key=lambda label: label["Confidence"], reverse=True)
+        return {
+            "Labels": labels[:MaxLabels],
+            "LabelModelVersion": "3.0",
+            "ResponseMetadata": self._response_metadata(),
+        }
+
+
+class FakeTextractClient(FakeAWSBackend):
+    """Textract detect_document_text の代替実装（工事黒板を模したテキスト）"""
+
+    INVALID_INPUT_CODE = "UnsupportedDocumentException"
+
+    WORK_NAMES = [
+        "国道1号線道路改良工事",
+        "市道拡幅工事",
+        "河川護岸整備工事",
+        "橋梁補修工事",
+    ]
+    WORK_TYPES = [
+        ("土工", "掘削工"),
+        ("基礎工", "配筋工"),
+        ("舗装工", "表層工"),
+        ("コンクリート工", "型枠工"),
+    ]
+    INSPECTORS = ["山田太郎", "佐藤花子", "鈴木一郎", "田中次郎"]
+
+    def _blackboard_lines(self, rng: random.Random) -> List[str]:
+        work_type, work_kind = rng.choice(self.WORK_TYPES)
+        design = rng.randrange(100, 2000, 50)
+        lines = [
+            rng.choice(self.WORK_NAMES),
+            f"工種: {work_type}",
+            f"種別: {work_kind}",
+            f"測点: No.{rng.randint(0, 99)}+{rng.uniform(0, 20):.1f}",
+            f"撮影日: 2024/{rng.randint(1, 12):02d}/{rng.randint(1, 28):02d}",
+            f"設計: {design}mm 実測: {design + rng.randint(-10, 10)}mm",
+            f"立会者: {rng.choice(self.INSPECTORS)}",
+        ]
+        return lines[: rng.randint(4, len(lines))]
+
+    def detect_document_text(self, Document: Dict, **kwargs: Any) -> Dict:
+        """detect_document_text の代替（S3Object指定のみ対応）"""
+        s3_key = Document.get("S3Object", {}).get("Name", "")
+        self._call("DetectDocumentText", s3_key)
+
+        rng = self._rng_for(s3_key)
+        page_id = str(uuid.UUID(int=rng.getrandbits(128)))
+        blocks: List[Dict[str, Any]] = [
+            {
+                "BlockType": "PAGE",
+                "Geometry": self._geometry(0.0, 0.0, 1.0, 1.0),
+                "Id": page_id,
+                "Relationships": [{"Type": "CHILD", "Ids": []}],
+            }
+        ]
+
+        top = rng.uniform(0.05, 0.15)
+        for text in self._blackboard_lines(rng):
+            line_id = str(uuid.UUID(int=rng.getrandbits(128)))
+            blocks[0]["Relationships"][0]["Ids"].append(line_id)
+            height = rng.uniform(0.04, 0.07)
+            width = min(0.04 * len(text), 0.9)
+            left = rng.uniform(0.02, 1 - width)
+            confidence = round(rng.uniform(60.0, 99.9), 4)
+
+            word_blocks: List[Dict[str, Any]] = []
+            for word in text.split():
+                word_blocks.append(
+                    {
+                        "BlockType": "WORD",
+                        "Confidence": round(
+                            min(confidence + rng.uniform(-3, 3), 100.0), 4
+                        ),
+                        "Text": word,
+                        "TextType": "PRINTED",
+                        "Geometry": self._geometry(
+                            left, top, width / max(len(text.split()), 1), height
+                        ),
+                        "Id": str(uuid.UUID(int=rng.getrandbits(128))),
+                    }
+                )
+
+            blocks.append(
+                {
+                    "BlockType": "LINE",
+                    "Confidence": confidence,
+                    "Text": text,
+                    "Geometry": self._geometry(left, top, width, height),
+                    "Id": line_id,
+                    "Relationships": [
+                        {"Type": "CHILD", "Ids": [block["Id"] for block in word_blocks]}
+                    ],
+                }
+            )
+            blocks.extend(word_blocks)
+            top += height + rng.uniform(0.02, 0.05)
+
+        return {
+            "DocumentMetadata": {"Pages": 1},
+            "Blocks": blocks,
+            "DetectDocumentTextModelVersion": "1.0",
+            "ResponseMetadata": self._response_metadata(),
+        }
+
+    @staticmethod
+    def _geometry(left: float, top: float, width: float, height: float) -> Dict:
+        return {
+            "BoundingBox": {"Width": width, "Height": height, "Left": left, "Top": top},
+            "Polygon": [
+                {"X": left, "Y": top},
+                {"X": left + width, "Y": top},
+                {"X": left + width, "Y": top + height},
+                {"X": left, "Y": top + height},
+            ],
+        }
+
+
+class FakeStreamingBody:
+    """botocore.response.StreamingBody の代替（メモリ上のバイト列）"""
+
+    def __init__(self, data: bytes):
+        self._data = data
+        self._position = 0
+
+    def read(self, amt: Optional[int] = None) -> bytes:
+        end = len(self._data) if amt is None else self._position + amt
+        chunk = self._data[self._position : end]
+        self._position += len(chunk)
+        return chunk
+
+    def iter_chunks(self, chunk_size: int = 1024) -> Iterator[bytes]:
+        while True:
+            chunk = self.read(chunk_size)
+            if not chunk:
+                break
+            yield chunk
+
+    def close(self) -> None:
+        pass
+
+
+class FakeS3Client(FakeAWSBackend):
+    """S3 オブジェクト操作の代替実装
+
+    put_object / upload_file で保存したオブジェクトはその内容を、それ以外のキーは
+    キーごとに決定的なJPEG風のバイト列（object_size バイト）を返します
+    （generate_missing=False の場合は NoSuchKey エラー）。
+    """
+
+    INVALID_INPUT_CODE = "NoSuchKey"
+    THROTTLING_CODE = "SlowDown"
+
+    def __init__(
+        self,
+        object_size: int = 2 * 1024 * 1024,
+        generate_missing: bool = True,
+        **kwargs: Any,
+    ) -> None:
+        """
+        初期化
+
+        Args:
+            object_size: 未登録キーに対して返すオブジェクトのサイズ（バイト）
+            generate_missing: 未登録キーに対してバイト列を生成するか
+            **kwargs: FakeAWSBackend の引数
+        """
+        super().__init__(**kwargs)
+        self.object_size = object_size
+        self.generate_missing = generate_missing
+        self._objects: Dict[str, bytes] = {}
+        self._modified: Dict[str, datetime] = {}
+
+    def put_object(self, Bucket: str, Key: str, Body: Any, **kwargs: Any) -> Dict:
+        data = Body.read() if hasattr(Body, "read") else bytes(Body)
+        self._objects[f"{Bucket}/{Key}"] = data
+        self._modified[f"{Bucket}/{Key}"] = datetime.now(timezone.utc)
+        return {
+            "ETag": f'"{zlib.crc32(data):08x}"',
+            "ResponseMetadata": self._response_metadata(),
+        }
+
+    def upload_file(self, Filename: str, Bucket: str, Key: str, **kwargs: Any) -> None:
+        with open(Filename, "rb") as f:
+            self.put_object(Bucket=Bucket, Key=Key, Body=f)
+
+    def _object(self, operation: str, Bucket: str, Key: str) -> bytes:
+        data = self._objects.get(f"{Bucket}/{Key}")
+        if data is None:
+            if not self.generate_missing:
+                raise self._error(
+                    operation,
+                    self.INVALID_INPUT_CODE,
+                    "The specified key does not exist.",
+                )
+            rng = self._rng_for(Key)
+            # SOI/EOIマーカーで挟んだ乱数列（圧縮済み画像と同様に圧縮が効かない）
+            data = (
+                b"\xff\xd8" + rng.randbytes(max(self.object_size - 4, 0)) + b"\xff\xd9"
+            )
+        return data
+
+    def get_object(self, Bucket: str, Key: str, Range: str = "", **kwargs: Any) -> Dict:
+        self._call("GetObject", Key)
+        data = self._object("GetObject", Bucket, Key)
+        response = {"ContentType": "image/jpeg"}
+        if Range:
+            # "bytes=開始-終了" のみ対応
+            first, last = Range.split("=", 1)[1].split("-")
+            start, end = int(first), min(int(last or len(data) - 1), len(data) - 1)
+            response["ContentRange"] = f"bytes {start}-{end}/{len(data)}"
+            data = data[start : end + 1]
+        return {
+            **response,
+            "Body": FakeStreamingBody(data),
+            "ContentLength": len(data),
+            "ResponseMetadata": self._response_metadata(),
+        }
+
+    def head_object(self, Bucket: str, Key: str, **kwargs: Any) -> Dict:
+        data = self._object("HeadObject", Bucket, Key)
+        return {
+            "ContentLength": len(data),
+            "ETag": f'"{zlib.crc32(data):08x}"',
+            "LastModified": self._modified.get(f"{Bucket}/{Key}"),
+            "ResponseMetadata": self._response_metadata(),
+        }
+
+    def delete_object(self, Bucket: str, Key: str, **kwargs: Any) -> Dict:
+        self._objects.pop(f"{Bucket}/{Key}", None)
+        self._modified.pop(f"{Bucket}/{Key}", None)
+        return {"ResponseMetadata": self._response_metadata()}
+
+    def list_objects_v2(self, Bucket: str, Prefix: str = "", **kwargs: Any) -> Dict:
+        # 保存済みオブジェクトのみを1ページで返す
+        contents = [
+            {
+                "Key": name.split("/", 1)[1],
+                "Size": len(data),
+                "LastModified": self._modified[name],
+            }
+            for name, data in sorted(self._objects.items())
+            if name.startswith(f"{Bucket}/{Prefix}")
+        ]
+        return {
+            "Contents": contents,
+            "KeyCount": len(contents),
+            "IsTruncated": False,
+            "ResponseMetadata": self._response_metadata(),
+        }
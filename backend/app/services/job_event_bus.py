@@ -0,0 +1,503 @@
+"""
+ジョブ進捗イベントバス
+
+ワーカーが発行する進捗・ステージ・ETAイベントを購読者（SSE接続）へ配信します。
+REDIS_URLが設定されていればRedis Pub/Subを使用し、未設定または接続できない場合は
+インメモリ実装にフォールバックします（単一ノード構成・テスト用）。
+"""
+
+import asyncio
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple, Union, cast
+
+from pydantic import BaseModel
+
+from app.config import settings
+
+try:
+    import redis
+    import redis.asyncio as redis_asyncio
+except ImportError:  # pragma: no cover - redisは任意依存
+    redis = None  # type: ignore[assignment]
+    redis_asyncio = None  # type: ignore[assignment]
+
+
+# 終端イベント（これ以降イベントは発行されない）
+TERMINAL_EVENTS = {"completed", "failed"}
+
+
+class JobEvent(BaseModel):
+    """ジョブ進捗イベント"""
+
+    job_id: str
+    event: str  # progress / stage / completed / failed
+    seq: int = 0
+    stage: Optional[str] = None
+    processed: int = 0
+    total: Optional[int] = None
+    progress: float = 0.0  # 0.0-1.0
+    eta_seconds: Optional[float] = None
+    message: Optional[str] = None
+    result: Optional[Dict] = None
+    timestamp: float = 0.0
+
+    @property
+    def is_terminal(self) -> bool:
+        """終端イベントかどうか"""
+        return self.event in TERMINAL_EVENTS
+
+    def to_sse(self) -> str:
+        """
+        Server-Sent Events形式にシリアライズ
+
+        Returns:
+            SSEメッセージ文字列
+        """
+        return (
+            f"id: {self.seq}\nevent: {self.event}\ndata: {self.model_dump_json()}\n\n"
+        )
+
+
+class JobInfo(BaseModel):
+    """ジョブ情報（テナント判定と最新状態のスナップショット）"""
+
+    job_id: str
+    organization_id: int
+    job_type: str
+    created_at: float
+    last_event: Optional[JobEvent] = None
+
+
+class JobSubscription(ABC):
+    """ジョブイベント購読（1つのSSE接続に対応）"""
+
+    def __init__(self, initial: Optional[JobEvent] = None):
+        """
+        Args:
+            initial: 購読開始時点の最新イベント（スナップショット）
+        """
+        self._pending: List[JobEvent] = [initial] if initial else []
+        self._last_seq = initial.seq if initial else 0
+
+    async def get(self, timeout: float) -> Optional[JobEvent]:
+        """
+        次のイベントを取得
+
+        Args:
+            timeout: 待機秒数
+
+        Returns:
+            イベント（タイムアウト時はNone）
+        """
+        if self._pending:
+            return self._pending.pop(0)
+
+        deadline = time.monotonic() + timeout
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return None
+            event = await self._receive(remaining)
+            if event is None:
+                return None
+            # スナップショットと重複したイベントは読み飛ばす
+            if event.seq and event.seq <= self._last_seq:
+                continue
+            self._last_seq = event.seq
+            return event
+
+    @abstractmethod
+    async def _receive(self, timeout: float) -> Optional[JobEvent]:
+        """
+        バスから次のイベントを受信
+
+        Args:
+            timeout: 待機秒数
+
+        Returns:
+            イベント（タイムアウト時はNone）
+        """
+
+    async def close(self) -> None:
+        """購読を終了"""
+
+
+class _QueueSubscription(JobSubscription):
+    """インメモリバス用の購読"""
+
+    def __init__(self, bus: "InMemoryJobEventBus", job_id: str, queue: asyncio.Queue):
+        super().__init__(initial=None)
+        self._bus = bus
+        self._job_id = job_id
+        self._queue = queue
+
+    def prime(self, initial: Optional[JobEvent]) -> None:
+        """キュー登録後に取得したスナップショットを先頭に積む"""
+        if initial:
+            self._pending.append(initial)
+            self._last_seq = initial.seq
+
+    async def _receive(self, timeout: float) -> Optional[JobEvent]:
+        try:
+            return await asyncio.wait_for(self._queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    async def close(self) -> None:
+        self._bus._unsubscribe(self._job_id, self._queue)
+
+
+class InMemoryJobEventBus:
+    """インメモリのジョブイベントバス（プロセス内のみで有効）"""
+
+    def __init__(self, ttl_seconds: int = 3600):
+        """
+        Args:
+            ttl_seconds: 終了済みジョブ情報の保持秒数
+        """
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._jobs: Dict[str, JobInfo] = {}
+        self._seq: Dict[str, int] = {}
+        self._subscribers: Dict[
+            str, List[Tuple[asyncio.AbstractEventLoop, asyncio.Queue]]
+        ] = {}
+        # 期限切れ削除は全件走査になるため、一定間隔でのみ実行する
+        self._eviction_interval = min(ttl_seconds, 60)
+        self._last_eviction = 0.0
+
+    def register_job(
+        self, organization_id: int, job_type: str, job_id: Optional[str] = None
+    ) -> str:
+        """
+        ジョブを登録
+
+        Args:
+            organization_id: ジョブを所有する組織ID
+            job_type: ジョブ種別
+            job_id: ジョブID（省略時は自動生成）
+
+        Returns:
+            ジョブID
+        """
+        job_id = job_id or str(uuid.uuid4())
+        with self._lock:
+            self._evict_expired()
+            self._jobs[job_id] = JobInfo(
+                job_id=job_id,
+                organization_id=organization_id,
+                job_type=job_type,
+                created_at=time.time(),
+            )
+            self._seq[job_id] = 0
+        return job_id
+
+    def get_job(self, job_id: str) -> Optional[JobInfo]:
+        """
+        ジョブ情報を取得
+
+        Args:
+            job_id: ジョブID
+
+        Returns:
+            ジョブ情報（存在しない場合はNone）
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return job.model_copy() if job else None
+
+    def publish(self, event: JobEvent) -> JobEvent:
+        """
+        イベントを発行（ワーカースレッドから呼び出し可能）
+
+        Args:
+            event: ジョブイベント
+
+        Returns:
+            シーケンス番号とタイムスタンプを付与したイベント
+        """
+        with self._lock:
+            job = self._jobs.get(event.job_id)
+            if job is None:
+                raise KeyError(f"ジョブが登録されていません: {event.job_id}")
+            self._seq[event.job_id] += 1
+            event = event.model_copy(
+                update={"seq": self._seq[event.job_id], "timestamp": time.time()}
+            )
+            job.last_event = event
+            subscribers = list(self._subscribers.get(event.job_id, []))
+
+        for loop, queue in subscribers:
+            try:
+                loop.call_soon_threadsafe(queue.put_nowait, event)
+            except RuntimeError:
+                # イベントループ終了済みの購読者は破棄
+                self._unsubscribe(event.job_id, queue)
+
+        return event
+
+    async def subscribe(self, job_id: str) -> JobSubscription:
+        """
+        ジョブイベントを購読
+
+        Args:
+            job_id: ジョブID
+
+        Returns:
+            購読オブジェクト（最新スナップショットから配信）
+        """
+        queue: asyncio.Queue = asyncio.Queue()
+        subscription = _QueueSubscription(self, job_id, queue)
+        with self._lock:
+            self._subscribers.setdefault(job_id, []).append(
+                (asyncio.get_running_loop(), queue)
+            )
+            job = self._jobs.get(job_id)
+            subscription.prime(job.last_event if job else None)
+        return subscription
+
+    def _unsubscribe(self, job_id: str, queue: asyncio.Queue) -> None:
+        with self._lock:
+            subscribers = self._subscribers.get(job_id, [])
+            self._subscribers[job_id] = [s for s in subscribers if s[1] is not queue]
+            if not self._subscribers[job_id]:
+                del self._subscribers[job_id]
+
+    def _evict_expired(self) -> None:
+        """TTLを過ぎた終了済みジョブを削除（ロック取得済みで呼び出す）"""
+        now = time.time()
+        if now - self._last_eviction < self._eviction_interval:
+            return
+        self._last_eviction = now
+        threshold = now - self.ttl_seconds
+        expired = [
+            job_id
+            for job_id, job in self._jobs.items()
+            if job.last_event
+            and job.last_event.is_terminal
+            and job.last_event.timestamp < threshold
+        ]
+        for job_id in expired:
+            self._jobs.pop(job_id, None)
+            self._seq.pop(job_id, None)
+
+
+class _RedisSubscription(JobSubscription):
+    """Redisバス用の購読"""
+
+    def __init__(self, client: Any, pubsub: Any, initial: Optional[JobEvent]):
+        super().__init__(initial=initial)
+        self._client = client
+        self._pubsub = pubsub
+
+    async def _receive(self, timeout: float) -> Optional[JobEvent]:
+        message = await self._pubsub.get_message(
+            ignore_subscribe_messages=True, timeout=timeout
+        )
+        if message is None:
+            return None
+        return JobEvent.model_validate_json(message["data"])
+
+    async def close(self) -> None:
+        await self._pubsub.aclose()
+        await self._client.aclose()
+
+
+class RedisJobEventBus:
+    """Redis Pub/Subを使用したジョブイベントバス（複数APIノード対応）"""
+
+    KEY_PREFIX = "jobs"
+
+    def __init__(self, url: str, ttl_seconds: int = 3600):
+        """
+        Args:
+            url: Redis接続URL
+            ttl_seconds: ジョブ情報の保持秒数（イベント発行のたびに延長するため、
+                実行中のジョブは最後のイベントから数えて保持されます）
+        """
+        if redis is None:
+            raise RuntimeError("redisパッケージがインストールされていません")
+        self.url = url
+        self.ttl_seconds = ttl_seconds
+        self._redis = redis.Redis.from_url(url)
+
+    def _key(self, job_id: str, name: str) -> str:
+        return f"{self.KEY_PREFIX}:{job_id}:{name}"
+
+    def ping(self) -> bool:
+        """接続確認"""
+        return bool(self._redis.ping())
+
+    def register_job(
+        self, organization_id: int, job_type: str, job_id: Optional[str] = None
+    ) -> str:
+        """ジョブを登録（InMemoryJobEventBus.register_jobと同じ）"""
+        job_id = job_id or str(uuid.uuid4())
+        info = JobInfo(
+            job_id=job_id,
+            organization_id=organization_id,
+            job_type=job_type,
+            created_at=time.time(),
+        )
+        self._redis.set(
+            self._key(job_id, "info"), info.model_dump_json(), ex=self.ttl_seconds
+        )
+        return job_id
+
+    def get_job(self, job_id: str) -> Optional[JobInfo]:
+        """ジョブ情報を取得（InMemoryJobEventBus.get_jobと同じ）"""
+        info_raw, last_raw = cast(
+            List[Optional[bytes]],
+            self._redis.mget(self._key(job_id, "info"), self._key(job_id, "last")),
+        )
+        if info_raw is None:
+            return None
+        info = JobInfo.model_validate_json(info_raw)
+        if last_raw is not None:
+            info.last_event = JobEvent.model_validate_json(last_raw)
+        return info
+
+    def publish(self, event: JobEvent) -> JobEvent:
+        """イベントを発行（InMemoryJobEventBus.publishと同じ）"""
+        seq = self._redis.incr(self._key(event.job_id, "seq"))
+        event = event.model_copy(update={"seq": seq, "timestamp": time.time()})
+        payload = event.model_dump_json()
+
+        # 長時間実行中のジョブが消えないよう、ジョブ情報の保持期限も延長する
+        pipe = self._redis.pipeline()
+        pipe.expire(self._key(event.job_id, "info"), self.ttl_seconds)
+        pipe.expire(self._key(event.job_id, "seq"), self.ttl_seconds)
+        pipe.set(self._key(event.job_id, "last"), payload, ex=self.ttl_seconds)
+        pipe.publish(self._key(event.job_id, "events"), payload)
+        pipe.execute()
+        return event
+
+    async def subscribe(self, job_id: str) -> JobSubscription:
+        """ジョブイベントを購読（購読開始後にスナップショットを取得）"""
+        client = redis_asyncio.Redis.from_url(self.url)
+        pubsub = client.pubsub()
+        await pubsub.subscribe(self._key(job_id, "events"))
+        last_raw = await client.get(self._key(job_id, "last"))
+        initial = JobEvent.model_validate_json(last_raw) if last_raw else None
+        return _RedisSubscription(client, pubsub, initial)
+
+
+class JobProgressReporter:
+    """ワーカー向けの進捗レポーター（ETA計算と発行頻度の間引きを行う）"""
+
+    def __init__(
+        self,
+        bus: "JobEventBus",
+        job_id: str,
+        total: Optional[int] = None,
+        min_interval: float = 0.5,
+    ):
+        """
+        Args:
+            bus: ジョブイベントバス
+            job_id: ジョブID
+            total: 処理対象の総数
+            min_interval: 進捗イベントの最小発行間隔（秒）
+        """
+        self.bus = bus
+        self.job_id = job_id
+        self.total = total
+        self.min_interval = min_interval
+        self.processed = 0
+        self.current_stage: Optional[str] = None
+        self._started_at = time.monotonic()
+        self._last_published = 0.0
+
+    def set_total(self, total: int) -> None:
+        """処理対象の総数を設定"""
+        self.total = total
+
+    def progress_ratio(self) -> float:
+        """進捗率（0.0-1.0）"""
+        if not self.total:
+            return 0.0
+        return min(self.processed / self.total, 1.0)
+
+    def eta_seconds(self) -> Optional[float]:
+        """
+        残り時間を推定（これまでの平均処理速度から算出）
+
+        Returns:
+            残り秒数（推定できない場合はNone）
+        """
+        if not self.total or self.processed == 0:
+            return None
+        elapsed = time.monotonic() - self._started_at
+        remaining = max(self.total - self.processed, 0)
+        return round(elapsed / self.processed * remaining, 1)
+
+    def _publish(self, event: str, **fields: Any) -> JobEvent:
+        self._last_published = time.monotonic()
+        return self.bus.publish(
+            JobEvent(
+                job_id=self.job_id,
+                event=event,
+                stage=self.current_stage,
+                processed=self.processed,
+                total=self.total,
+                progress=self.progress_ratio(),
+                eta_seconds=self.eta_seconds(),
+                **fields,
+            )
+        )
+
+    def stage(self, name: str, message: Optional[str] = None) -> JobEvent:
+        """ステージ開始を通知"""
+        self.current_stage = name
+        return self._publish("stage", message=message)
+
+    def advance(self, count: int = 1, message: Optional[str] = None) -> None:
+        """
+        処理件数を進める（min_interval未満の連続呼び出しは発行を間引く）
+
+        Args:
+            count: 処理済み件数の増分
+            message: メッセージ
+        """
+        self.processed += count
+        finished = self.total is not None and self.processed >= self.total
+        if finished or time.monotonic() - self._last_published >= self.min_interval:
+            self._publish("progress", message=message)
+
+    def complete(
+        self, result: Optional[Dict] = None, message: Optional[str] = None
+    ) -> JobEvent:
+        """ジョブ完了を通知"""
+        return self._publish("completed", result=result, message=message)
+
+    def fail(self, message: str) -> JobEvent:
+        """ジョブ失敗を通知"""
+        return self._publish("failed", message=message)
+
+
+# ジョブイベントバスの実装（ワーカー・ルーターはどちらも同じメソッドで扱う）
+JobEventBus = Union[InMemoryJobEventBus, RedisJobEventBus]
+
+
+@lru_cache()
+def get_job_event_bus() -> JobEventBus:
+    """
+    ジョブイベントバスのシングルトンインスタンスを取得
+
+    Returns:
+        RedisJobEventBus（REDIS_URL設定時）またはInMemoryJobEventBus
+    """
+    if settings.REDIS_URL and redis is not None:
+        try:
+            bus = RedisJobEventBus(settings.REDIS_URL, settings.JOB_EVENT_TTL_SECONDS)
+            bus.ping()
+            return bus
+        except Exception as e:
+            print(
+                f"Warning: Redisに接続できないためインメモリのジョブイベントバスを使用します: {e}"
+            )
+    return InMemoryJobEventBus(settings.JOB_EVENT_TTL_SECONDS)
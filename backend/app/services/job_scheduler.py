@@ -0,0 +1,393 @@
+"""
+ジョブスケジューラー
+
+Textract・Rekognition・写真帳・エクスポートなどの重い処理を組織（テナント）単位で
+公平に実行します。
+
+- 優先度: INTERACTIVE（単一写真の操作） > STANDARD（写真帳・エクスポート） > BULK（一括処理）
+- 同一優先度内では組織ごとの重み付き公平キューイング（Start-time Fair Queuing）
+- 組織ごとの同時実行数上限（INTERACTIVEとそれ以外で別枠）
+- ワーカーの一部をINTERACTIVE専用に予約し、一括処理中も単一写真の操作を待たせない
+- 組織別のキュー待ち時間をメトリクスに記録
+"""
+
+import asyncio
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from enum import IntEnum
+from functools import lru_cache
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+from app.config import settings
+from app.services.job_event_bus import (
+    JobEventBus,
+    JobProgressReporter,
+    get_job_event_bus,
+)
+from app.services.metrics import MetricsRegistry
+from app.services.metrics import metrics as default_metrics
+
+
+class JobPriority(IntEnum):
+    """ジョブ優先度（値が小さいほど優先）"""
+
+    INTERACTIVE = 0
+    STANDARD = 1
+    BULK = 2
+
+
+@dataclass
+class ScheduledJob:
+    """スケジュール済みジョブ"""
+
+    job_id: str
+    organization_id: int
+    job_type: str
+    priority: JobPriority
+    func: Callable[[JobProgressReporter], object]
+    cost: float = 1.0
+    start_tag: float = 0.0
+    finish_tag: float = 0.0
+    enqueued_at: float = field(default_factory=time.monotonic)
+    future: Future = field(default_factory=Future)
+
+
+def parse_tenant_weights(value: str) -> Dict[int, float]:
+    """
+    組織別の重み設定を解析
+
+    Args:
+        value: "組織ID:重み" のカンマ区切り（例: "1:2,5:0.5"）
+
+    Returns:
+        組織ID→重みの辞書
+    """
+    weights = {}
+    for item in value.split(","):
+        if ":" not in item:
+            continue
+        org_id, weight = item.split(":", 1)
+        weights[int(org_id.strip())] = float(weight.strip())
+    return weights
+
+
+class JobScheduler:
+    """組織単位の重み付き公平キューイングを行うジョブスケジューラー"""
+
+    def __init__(
+        self,
+        max_workers: int = 4,
+        tenant_concurrency: int = 2,
+        tenant_weights: Optional[Dict[int, float]] = None,
+        interactive_reserved: int = 1,
+        bus: Optional[JobEventBus] = None,
+        metrics: Optional[MetricsRegistry] = None,
+    ):
+        """
+        初期化
+
+        Args:
+            max_workers: ワーカースレッド数（全体の同時実行数）
+            tenant_concurrency: 組織ごとの同時実行数上限
+            tenant_weights: 組織ID→重み（未指定の組織は1.0）
+            interactive_reserved: INTERACTIVE専用に予約するワーカー数
+            bus: ジョブイベントバス（省略時はシングルトン）
+            metrics: メトリクスレジストリ（省略時はグローバル）
+        """
+        self.max_workers = max_workers
+        self.tenant_concurrency = tenant_concurrency
+        self.tenant_weights = tenant_weights or {}
+        self.interactive_reserved = min(interactive_reserved, max_workers - 1)
+        self.bus = bus or get_job_event_bus()
+        self.metrics = metrics or default_metrics
+
+        self._cond = threading.Condition()
+        # (組織ID, 優先度) → FIFOキュー
+        self._queues: Dict[Tuple[int, JobPriority], Deque[ScheduledJob]] = {}
+        # 優先度ごとの仮想時刻と、(組織ID, 優先度)ごとの最終finishタグ
+        self._virtual_time: Dict[JobPriority, float] = {p: 0.0 for p in JobPriority}
+        self._last_finish: Dict[Tuple[int, JobPriority], float] = {}
+        # (組織ID, INTERACTIVEかどうか) → 実行中ジョブ数
+        self._running: Dict[Tuple[int, bool], int] = {}
+        self._background_running = 0
+        self._workers: List[threading.Thread] = []
+        self._shutdown = False
+
+    def weight_for(self, organization_id: int) -> float:
+        """組織の重みを取得"""
+        return self.tenant_weights.get(organization_id, 1.0)
+
+    def submit(
+        self,
+        organization_id: int,
+        job_type: str,
+        func: Callable[[JobProgressReporter], object],
+        priority: JobPriority = JobPriority.BULK,
+        cost: float = 1.0,
+    ) -> ScheduledJob:
+        """
+        ジョブを投入
+
+        Args:
+            organization_id: 組織ID
+            job_type: ジョブ種別
+            func: 実行関数（進捗レポーターを受け取り、結果を返す）
+            priority: 優先度
+            cost: 相対コスト（大きいほど組織の持ち時間を多く消費）
+
+        Returns:
+            スケジュール済みジョブ（future で結果を待機可能）
+        """
+        job_id = self.bus.register_job(organization_id, job_type)
+        job = ScheduledJob(
+            job_id=job_id,
+            organization_id=organization_id,
+            job_type=job_type,
+            priority=priority,
+            func=func,
+            cost=cost,
+        )
+
+        with self._cond:
+            if self._shutdown:
+                raise RuntimeError("スケジューラーは停止しています")
+            key = (organization_id, priority)
+            job.start_tag = max(
+                self._virtual_time[priority], self._last_finish.get(key, 0.0)
+            )
+            job.finish_tag = job.start_tag + cost / self.weight_for(organization_id)
+            self._last_finish[key] = job.finish_tag
+            self._queues.setdefault(key, deque()).append(job)
+            self._update_depth_gauge(organization_id)
+            self._ensure_workers()
+            self._cond.notify()
+
+        return job
+
+    async def run(
+        self,
+        organization_id: int,
+        job_type: str,
+        func: Callable[[JobProgressReporter], object],
+        priority: JobPriority = JobPriority.INTERACTIVE,
+        cost: float = 1.0,
+    ) -> Any:
+        """
+        ジョブを投入して完了を待機（APIリクエスト内から使用）
+
+        Args:
+            organization_id: 組織ID
+            job_type: ジョブ種別
+            func: 実行関数
+            priority: 優先度
+            cost: 相対コスト
+
+        Returns:
+            実行関数の戻り値
+        """
+        job = self.submit(organization_id, job_type, func, priority=priority, cost=cost)
+        return await asyncio.wrap_future(job.future)
+
+    def _ensure_workers(self) -> None:
+        """ワーカースレッドを遅延起動（ロック取得済みで呼び出す）"""
+        while len(self._workers) < self.max_workers:
+            worker = threading.Thread(
+                target=self._worker_loop,
+                name=f"job-worker-{len(self._workers)}",
+                daemon=True,
+            )
+            self._workers.append(worker)
+            worker.start()
+
+    def _next_job(self) -> Optional[ScheduledJob]:
+        """
+        次に実行するジョブを選択（ロック取得済みで呼び出す）
+
+        優先度が高いクラスから、同時実行上限に達していない組織の先頭ジョブのうち
+        startタグが最小のものを選択します。
+        """
+        background_full = (
+            self._background_running >= self.max_workers - self.interactive_reserved
+        )
+        best: Optional[ScheduledJob] = None
+        for (organization_id, priority), queue in self._queues.items():
+            if not queue:
+                continue
+            interactive = priority == JobPriority.INTERACTIVE
+            if not interactive and background_full:
+                continue
+            if (
+                self._running.get((organization_id, interactive), 0)
+                >= self.tenant_concurrency
+            ):
+                continue
+            head = queue[0]
+            if best is None or (head.priority, head.start_tag, head.enqueued_at) < (
+                best.priority,
+                best.start_tag,
+                best.enqueued_at,
+            ):
+                best = head
+
+        if best is None:
+            return None
+
+        key = (best.organization_id, best.priority)
+        self._queues[key].popleft()
+        if not self._queues[key]:
+            del self._queues[key]
+        self._virtual_time[best.priority] = max(
+            self._virtual_time[best.priority], best.start_tag
+        )
+        self._mark_running(best, 1)
+        return best
+
+    def _mark_running(self, job: ScheduledJob, delta: int) -> None:
+        """実行中ジョブ数を増減（ロック取得済みで呼び出す）"""
+        interactive = job.priority == JobPriority.INTERACTIVE
+        key = (job.organization_id, interactive)
+        self._running[key] = self._running.get(key, 0) + delta
+        if not interactive:
+            self._background_running += delta
+        self._update_depth_gauge(job.organization_id)
+
+    def _worker_loop(self) -> None:
+        """ワーカースレッドのメインループ"""
+        while True:
+            with self._cond:
+                job = self._next_job()
+                while job is None:
+                    if self._shutdown:
+                        return
+                    self._cond.wait()
+                    job = self._next_job()
+
+            try:
+                self._run(job)
+            finally:
+                with self._cond:
+                    self._mark_running(job, -1)
+                    self._cond.notify_all()
+
+    def _run(self, job: ScheduledJob) -> None:
+        """ジョブを実行し、結果をfutureとイベントバスに反映"""
+        wait_seconds = time.monotonic() - job.enqueued_at
+        self.metrics.observe(
+            "job_queue_wait_seconds",
+            wait_seconds,
+            organization_id=job.organization_id,
+            priority=job.priority.name.lower(),
+        )
+
+        reporter = JobProgressReporter(self.bus, job.job_id)
+        started = time.monotonic()
+        try:
+            result = job.func(reporter)
+        except Exception as e:
+            self.metrics.inc(
+                "jobs_failed_total",
+                organization_id=job.organization_id,
+                job_type=job.job_type,
+            )
+            try:
+                self._report(job, lambda: reporter.fail(str(e)))
+            finally:
+                job.future.set_exception(e)
+            return
+        finally:
+            self.metrics.observe(
+                "job_run_seconds",
+                time.monotonic() - started,
+                organization_id=job.organization_id,
+                job_type=job.job_type,
+            )
+
+        self.metrics.inc(
+            "jobs_completed_total",
+            organization_id=job.organization_id,
+            job_type=job.job_type,
+        )
+        try:
+            self._report(
+                job,
+                lambda: reporter.complete(
+                    result=result if isinstance(result, dict) else None
+                ),
+            )
+        finally:
+            job.future.set_result(result)
+
+    def _report(self, job: ScheduledJob, publish: Callable[[], object]) -> None:
+        """
+        完了・失敗イベントを発行
+
+        イベントバス（Redis等）の障害で発行に失敗しても、futureの解決と
+        実行数の解放は行う必要があるため、例外は記録して握りつぶします。
+        """
+        try:
+            publish()
+        except Exception as e:
+            self.metrics.inc("job_event_publish_errors_total", job_type=job.job_type)
+            print(
+                f"Warning: Failed to publish job event: {job.job_id}, Error: {str(e)}"
+            )
+
+    def _update_depth_gauge(self, organization_id: int) -> None:
+        """キュー長・実行数ゲージを更新（ロック取得済みで呼び出す）"""
+        depth = sum(
+            len(queue)
+            for (org_id, _), queue in self._queues.items()
+            if org_id == organization_id
+        )
+        self.metrics.set_gauge(
+            "job_queue_depth", depth, organization_id=organization_id
+        )
+        running = self._running.get((organization_id, True), 0) + self._running.get(
+            (organization_id, False), 0
+        )
+        self.metrics.set_gauge("jobs_running", running, organization_id=organization_id)
+
+    def stats(self) -> Dict[int, Dict[str, int]]:
+        """
+        組織ごとのキュー長と実行数を取得
+
+        Returns:
+            組織ID→{"queued", "running"}
+        """
+        with self._cond:
+            result: Dict[int, Dict[str, int]] = {}
+            for (organization_id, _), queue in self._queues.items():
+                entry = result.setdefault(organization_id, {"queued": 0, "running": 0})
+                entry["queued"] += len(queue)
+            for (organization_id, _), running in self._running.items():
+                entry = result.setdefault(organization_id, {"queued": 0, "running": 0})
+                entry["running"] += running
+            return result
+
+    def shutdown(self, wait: bool = True) -> None:
+        """
+        スケジューラーを停止（キュー内の未実行ジョブは破棄しない）
+
+        Args:
+            wait: ワーカースレッドの終了を待つか
+        """
+        with self._cond:
+            self._shutdown = True
+            self._cond.notify_all()
+        if wait:
+            for worker in self._workers:
+                worker.join()
+
+
+@lru_cache()
+def get_job_scheduler() -> JobScheduler:
+    """ジョブスケジューラーのシングルトンインスタンスを取得"""
+    return JobScheduler(
+        max_workers=settings.JOB_MAX_WORKERS,
+        tenant_concurrency=settings.JOB_TENANT_CONCURRENCY,
+        tenant_weights=parse_tenant_weights(settings.JOB_TENANT_WEIGHTS),
+        interactive_reserved=settings.JOB_INTERACTIVE_RESERVED,
+    )
@@ -0,0 +1,158 @@
+"""
+アプリケーションメトリクス
+
+カウンター・ゲージ・サマリー（件数/合計/最大/分位点）をプロセス内で集計します。
+ラベルにorganization_idを含むメトリクスはテナント単位で参照できます。
+"""
+
+import threading
+from collections import deque
+from functools import lru_cache
+from typing import Any, Deque, Dict, List, Tuple
+
+# サマリーの分位点計算に使用する直近サンプル数
+SUMMARY_WINDOW = 1024
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+def _label_key(labels: Dict[str, Any]) -> LabelKey:
+    return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+
+class _Summary:
+    """サマリー（件数・合計・最大値と直近サンプル）"""
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.samples: Deque[float] = deque(maxlen=SUMMARY_WINDOW)
+
+    def observe(self, value: float) -> None:
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+        self.samples.append(value)
+
+    def quantile(self, q: float) -> float:
+        if not self.samples:
+            return 0.0
+        ordered = sorted(self.samples)
+        return ordered[min(int(q * len(ordered)), len(ordered) - 1)]
+
+
+class MetricsRegistry:
+    """メトリクスレジストリ（スレッドセーフ）"""
+
+    def __init__(self) -> None:
+        """初期化"""
+        self._lock = threading.Lock()
+        self._counters: Dict[Tuple[str, LabelKey], float] = {}
+        self._gauges: Dict[Tuple[str, LabelKey], float] = {}
+        self._summaries: Dict[Tuple[str, LabelKey], _Summary] = {}
+
+    def inc(self, name: str, value: float = 1.0, **labels: Any) -> None:
+        """
+        カウンターを加算
+
+        Args:
+            name: メトリクス名
+            value: 加算値
+            **labels: ラベル
+        """
+        key = (name, _label_key(labels))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0.0) + value
+
+    def set_gauge(self, name: str, value: float, **labels: Any) -> None:
+        """
+        ゲージを設定
+
+        Args:
+            name: メトリクス名
+            value: 値
+            **labels: ラベル
+        """
+        key = (name, _label_key(labels))
+        with self._lock:
+            self._gauges[key] = value
+
+    def observe(self, name: str, value: float, **labels: Any) -> None:
+        """
+        サマリーに観測値を追加
+
+        Args:
+            name: メトリクス名
+            value: 観測値
+            **labels: ラベル
+        """
+        key = (name, _label_key(labels))
+        with self._lock:
+            summary = self._summaries.get(key)
+            if summary is None:
+                summary = self._summaries[key] = _Summary()
+            summary.observe(value)
+
+    def get_counter(self, name: str, **labels: Any) -> float:
+        """カウンター値を取得"""
+        with self._lock:
+            return self._counters.get((name, _label_key(labels)), 0.0)
+
+    def get_gauge(self, name: str, **labels: Any) -> float:
+        """ゲージ値を取得"""
+        with self._lock:
+            return self._gauges.get((name, _label_key(labels)), 0.0)
+
+    def snapshot(self) -> Dict[str, List[Dict]]:
+        """
+        全メトリクスのスナップショットを取得
+
+        Returns:
+            種別ごとのメトリクスリスト
+        """
+        with self._lock:
+            counters = [
+                {"name": name, "labels": dict(labels), "value": value}
+                for (name, labels), value in self._counters.items()
+            ]
+            gauges = [
+                {"name": name, "labels": dict(labels), "value": value}
+                for (name, labels), value in self._gauges.items()
+            ]
+            summaries = [
+                {
+                    "name": name,
+                    "labels": dict(labels),
+                    "count": summary.count,
+                    "sum": round(summary.total, 6),
+                    "avg": (
+                        round(summary.total / summary.count, 6)
+                        if summary.count
+                        else 0.0
+                    ),
+                    "max": round(summary.max, 6),
+                    "p50": round(summary.quantile(0.5), 6),
+                    "p95": round(summary.quantile(0.95), 6),
+                }
+                for (name, labels), summary in self._summaries.items()
+            ]
+
+        return {"counters": counters, "gauges": gauges, "summaries": summaries}
+
+    def reset(self) -> None:
+        """全メトリクスをクリア（テスト用）"""
+        with self._lock:
+            self._counters.clear()
+            self._gauges.clear()
+            self._summaries.clear()
+
+
+@lru_cache()
+def get_metrics() -> MetricsRegistry:
+    """メトリクスレジストリのシングルトンインスタンスを取得"""
+    return MetricsRegistry()
+
+
+# グローバルメトリクスインスタンス
+metrics = get_metrics()
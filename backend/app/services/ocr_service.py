@@ -3,11 +3,12 @@ OCRサービス - Amazon Textractを使用した黒板テキスト抽出
 """
 
 import re
-import boto3
 from typing import Dict, List, Optional
 from pydantic import BaseModel
 from datetime import datetime
 
+from app.services.aws_clients import create_aws_client
+
 
 class BlackboardData(BaseModel):
     """黒板から抽出されたデータ"""
@@ -36,7 +37,7 @@ class OCRService:
             region: AWSリージョン
         """
         self.confidence_threshold = confidence_threshold
-        self.textract = boto3.client("textract", region_name=region)
+        self.textract = create_aws_client("textract", region_name=region)
 
     def extract_text_from_image(
         self, s3_bucket: str, s3_key: str
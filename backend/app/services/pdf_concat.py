@@ -0,0 +1,346 @@
+"""
+PDF連結
+
+reportlab で分割して保存したPDF（相互参照表形式、オブジェクトストリームなし）を
+1つのPDFに連結します。
+
+ストリーム（画像・ページの描画内容）は解析せず、チャンク単位で出力ファイルへ
+そのままコピーします。メモリ上に保持するのはオブジェクトの位置とページの参照だけのため、
+連結するPDFのサイズには依存しません。
+"""
+
+import hashlib
+import re
+from typing import BinaryIO, Dict, Iterable, List, Optional, Set, Tuple
+
+# ストリームのコピー・オブジェクトの読み取り単位
+COPY_CHUNK_SIZE = 1024 * 1024
+READ_CHUNK_SIZE = 64 * 1024
+
+# 末尾から startxref を探す範囲
+TRAILER_SEARCH_SIZE = 4096
+
+_REFERENCE = re.compile(rb"(\d+) (\d+) R\b")
+_KEYWORD_END = b" \t\r\n\f\x00/<>[]()%"
+
+
+class PDFConcatError(Exception):
+    """連結できない構造のPDF"""
+
+
+def concatenate_pdfs(part_paths: Iterable[str], output_path: str) -> int:
+    """
+    PDFを順に連結
+
+    各PDFのページをその順に並べ、カタログ・ページツリーは作り直します。
+    文書情報（/Info）は先頭のPDFのものを使います。
+
+    Args:
+        part_paths: 連結するPDFのパス（reportlab で作成したもの）
+        output_path: 出力先のパス
+
+    Returns:
+        連結後のページ数
+
+    Raises:
+        PDFConcatError: 相互参照ストリーム等、未対応の構造の場合
+    """
+    with open(output_path, "wb") as output:
+        writer = _PDFWriter(output)
+        # 1: ページツリーのルート、2: カタログ（最後に書き込む）
+        pages_root = writer.reserve()
+        catalog = writer.reserve()
+        info: Optional[int] = None
+        kids: List[int] = []
+        digest = hashlib.md5()
+
+        for index, part_path in enumerate(part_paths):
+            with open(part_path, "rb") as part_file:
+                part = _PDFPart(part_file)
+                if index == 0:
+                    writer.write_header(part.version)
+                digest.update(part.trailer)
+
+                # カタログ・ページツリーの中間ノードは連結後のものに置き換え、
+                # 文書情報は先頭のPDFのものだけを残す
+                dropped = {part.root} | part.page_tree_nodes
+                if index > 0 and part.info is not None:
+                    dropped.add(part.info)
+                numbers = {node: pages_root for node in part.page_tree_nodes}
+                for number in part.object_numbers():
+                    if number not in dropped:
+                        numbers[number] = writer.reserve()
+
+                for number in part.object_numbers():
+                    if number not in dropped:
+                        part.copy_object(number, numbers, writer)
+                kids.extend(numbers[page] for page in part.pages)
+                if index == 0 and part.info is not None:
+                    info = numbers[part.info]
+
+        writer.write_object(
+            pages_root,
+            b"<< /Count %d /Kids [ %s ] /Type /Pages >>"
+            % (len(kids), b" ".join(b"%d 0 R" % kid for kid in kids)),
+        )
+        writer.write_object(
+            catalog,
+            b"<< /PageMode /UseNone /Pages %d 0 R /Type /Catalog >>" % pages_root,
+        )
+        writer.write_trailer(catalog, info, digest.hexdigest().encode("ascii"))
+
+    return len(kids)
+
+
+class _PDFWriter:
+    """オブジェクトの位置を記録しながらPDFを書き込む"""
+
+    def __init__(self, output: BinaryIO):
+        self.output = output
+        self.offsets: Dict[int, int] = {}
+        self._next_number = 1
+
+    def reserve(self) -> int:
+        """オブジェクト番号を割り当て"""
+        number = self._next_number
+        self._next_number += 1
+        return number
+
+    def write_header(self, version: bytes) -> None:
+        # バイナリを含むファイルであることを示すコメント行
+        self.output.write(version + b"\n%\xe2\xe3\xcf\xd3\n")
+
+    def begin_object(self, number: int) -> None:
+        self.offsets[number] = self.output.tell()
+        self.output.write(b"%d 0 obj\n" % number)
+
+    def write_object(self, number: int, body: bytes) -> None:
+        self.begin_object(number)
+        self.output.write(body + b"\nendobj\n")
+
+    def write_trailer(self, root: int, info: Optional[int], file_id: bytes) -> None:
+        size = self._next_number
+        missing = set(range(1, size)) - set(self.offsets)
+        if missing:
+            raise PDFConcatError(f"書き込まれていないオブジェクトがあります: {missing}")
+
+        xref_offset = self.output.tell()
+        self.output.write(b"xref\n0 %d\n0000000000 65535 f \n" % size)
+        for number in range(1, size):
+            self.output.write(b"%010d 00000 n \n" % self.offsets[number])
+        info_entry = b" /Info %d 0 R" % info if info is not None else b""
+        self.output.write(
+            b"trailer\n<< /ID [<%s><%s>]%s /Root %d 0 R /Size %d >>\n"
+            % (file_id, file_id, info_entry, root, size)
+        )
+        self.output.write(b"startxref\n%d\n%%%%EOF\n" % xref_offset)
+
+
+class _PDFPart:
+    """連結するPDF（相互参照表とページツリーだけを読み込む）"""
+
+    def __init__(self, file: BinaryIO):
+        self.file = file
+        self.version = file.readline().rstrip()
+        if not self.version.startswith(b"%PDF-"):
+            raise PDFConcatError("PDFではありません")
+
+        self.offsets, self.trailer = self._read_xref()
+        self.root = self._trailer_reference(b"Root")
+        if self.root is None:
+            raise PDFConcatError("カタログがありません")
+        self.info = self._trailer_reference(b"Info")
+
+        catalog = self.read_body(self.root)
+        match = re.search(rb"/Pages (\d+) \d+ R", catalog)
+        if match is None:
+            raise PDFConcatError("ページツリーがありません")
+        self.pages: List[int] = []
+        self.page_tree_nodes: Set[int] = set()
+        self._collect_pages(int(match.group(1)))
+
+    def object_numbers(self) -> List[int]:
+        return sorted(self.offsets)
+
+    def _read_xref(self) -> Tuple[Dict[int, int], bytes]:
+        """末尾の startxref から相互参照表とトレーラーを読み込む"""
+        self.file.seek(0, 2)
+        size = self.file.tell()
+        self.file.seek(max(size - TRAILER_SEARCH_SIZE, 0))
+        tail = self.file.read()
+        position = tail.rfind(b"startxref")
+        if position < 0:
+            raise PDFConcatError("startxref がありません")
+        xref_offset = int(tail[position + len(b"startxref") :].split()[0])
+
+        # 相互参照表とトレーラーはオブジェクト数に比例する大きさ
+        self.file.seek(xref_offset)
+        data = self.file.read(size - xref_offset)
+        if not data.startswith(b"xref"):
+            raise PDFConcatError("相互参照ストリームには対応していません")
+        trailer_at = data.find(b"trailer")
+        if trailer_at < 0 or b"/Prev" in data[trailer_at:]:
+            raise PDFConcatError("増分更新されたPDFには対応していません")
+
+        offsets: Dict[int, int] = {}
+        tokens = data[len(b"xref") : trailer_at].split()
+        i = 0
+        while i < len(tokens):
+            first, count = int(tokens[i]), int(tokens[i + 1])
+            i += 2
+            for number in range(first, first + count):
+                offset, kind = int(tokens[i]), tokens[i + 2]
+                i += 3
+                if kind == b"n" and number > 0:
+                    offsets[number] = offset
+        return offsets, data[trailer_at:]
+
+    def _trailer_reference(self, key: bytes) -> Optional[int]:
+        match = re.search(rb"/" + key + rb" (\d+) \d+ R", self.trailer)
+        return int(match.group(1)) if match else None
+
+    def _collect_pages(self, node: int) -> None:
+        """ページツリーを順にたどり、ページと中間ノードを記録"""
+        body = self.read_body(node)
+        if not re.search(rb"/Type\s*/Pages\b", body):
+            self.pages.append(node)
+            return
+        self.page_tree_nodes.add(node)
+        kids = re.search(rb"/Kids\s*\[(.*?)\]", body, re.S)
+        if kids is None:
+            raise PDFConcatError("ページツリーに /Kids がありません")
+        for match in _REFERENCE.finditer(kids.group(1)):
+            self._collect_pages(int(match.group(1)))
+
+    def _locate(self, number: int) -> Tuple[bytes, int, bool]:
+        """
+        オブジェクトの本体（ストリームを除く）を読み込む
+
+        Returns:
+            (本体, 本体の後に続く stream/endobj キーワードのファイル位置, ストリームか)
+        """
+        offset = self.offsets.get(number)
+        if offset is None:
+            raise PDFConcatError(f"オブジェクト {number} がありません")
+        self.file.seek(offset)
+        data = b""
+        while True:
+            chunk = self.file.read(READ_CHUNK_SIZE)
+            data += chunk
+            match = re.match(rb"\s*\d+\s+\d+\s+obj", data)
+            if match is not None:
+                end, is_stream = _scan_body(data, match.end())
+                if end >= 0:
+                    return data[match.end() : end].strip(), offset + end, is_stream
+            if not chunk:
+                raise PDFConcatError(f"オブジェクト {number} が途中で終わっています")
+
+    def read_body(self, number: int) -> bytes:
+        return self._locate(number)[0]
+
+    def copy_object(
+        self, number: int, numbers: Dict[int, int], writer: _PDFWriter
+    ) -> None:
+        """オブジェクト番号を付け替えて書き込む（ストリームはそのままコピー）"""
+        body, keyword_at, is_stream = self._locate(number)
+        body = _renumber(body, numbers)
+        if not is_stream:
+            writer.write_object(numbers[number], body)
+            return
+
+        length = re.search(rb"/Length (\d+)(\s+\d+\s+R)?", body)
+        if length is None or length.group(2):
+            raise PDFConcatError(f"オブジェクト {number} のストリーム長がありません")
+        remaining = int(length.group(1))
+
+        # stream キーワードの後の改行（CRLFまたはLF）からストリームが始まる
+        self.file.seek(keyword_at + len(b"stream"))
+        eol = self.file.read(2)
+        self.file.seek(keyword_at + len(b"stream") + (2 if eol == b"\r\n" else 1))
+
+        writer.begin_object(numbers[number])
+        writer.output.write(body + b"\nstream\r\n")
+        while remaining:
+            chunk = self.file.read(min(remaining, COPY_CHUNK_SIZE))
+            if not chunk:
+                raise PDFConcatError(
+                    f"オブジェクト {number} のストリームが途中で終わっています"
+                )
+            writer.output.write(chunk)
+            remaining -= len(chunk)
+        writer.output.write(b"\r\nendstream\nendobj\n")
+
+
+def _scan_body(data: bytes, start: int) -> Tuple[int, bool]:
+    """
+    オブジェクト本体の終わり（文字列の外にある stream/endobj キーワード）を探す
+
+    Returns:
+        (キーワードの位置, stream かどうか)。見つからない場合は位置が -1
+    """
+    depth = 0
+    i = start
+    while i < len(data):
+        char = data[i : i + 1]
+        if depth:
+            # リテラル文字列（括弧の入れ子とエスケープを考慮）
+            if char == b"\\":
+                i += 1
+            elif char == b"(":
+                depth += 1
+            elif char == b")":
+                depth -= 1
+        elif char == b"(":
+            depth = 1
+        elif char == b"%":
+            newline = re.compile(rb"[\r\n]").search(data, i)
+            if newline is None:
+                return -1, False
+            i = newline.start()
+        else:
+            for keyword in (b"stream", b"endobj"):
+                if data.startswith(keyword, i) and data[i - 1 : i] in b" \t\r\n>]":
+                    after = data[i + len(keyword) : i + len(keyword) + 1]
+                    if not after:
+                        return -1, False
+                    if after in _KEYWORD_END:
+                        return i, keyword == b"stream"
+        i += 1
+    return -1, False
+
+
+def _renumber(body: bytes, numbers: Dict[int, int]) -> bytes:
+    """文字列の外にある間接参照のオブジェクト番号を付け替える"""
+
+    def replace(match: "re.Match[bytes]") -> bytes:
+        number = int(match.group(1))
+        if number not in numbers:
+            raise PDFConcatError(f"参照先のオブジェクト {number} がありません")
+        return b"%d 0 R" % numbers[number]
+
+    parts = []
+    depth = 0
+    segment_start = 0
+    i = 0
+    while i < len(body):
+        char = body[i : i + 1]
+        if depth:
+            if char == b"\\":
+                i += 1
+            elif char == b"(":
+                depth += 1
+            elif char == b")":
+                depth -= 1
+                if not depth:
+                    parts.append(body[segment_start : i + 1])
+                    segment_start = i + 1
+        elif char == b"(":
+            parts.append(_REFERENCE.sub(replace, body[segment_start:i]))
+            segment_start = i
+            depth = 1
+        i += 1
+    if depth:
+        parts.append(body[segment_start:])
+    else:
+        parts.append(_REFERENCE.sub(replace, body[segment_start:]))
+    return b"".join(parts)
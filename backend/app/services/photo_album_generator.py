@@ -2,11 +2,23 @@
 工事写真帳生成サービス
 
 PDF形式の工事写真帳を自動生成します
+
+画像データは写真帳全体を事前に読み込まず、ページを描画する直前に先読みイテレータから
+そのページの分だけ取り出します。reportlab のキャンバスは埋め込んだ画像を保存時まで
+すべてメモリ上に保持するため、写真帳は pages_per_part ページごとの部分PDFとして
+ディスクに保存し、最後に連結します（メモリ上の画像は先読み数 + 1部分のページ分に収まります）。
+
+画像は枠内の表示サイズで印刷解像度（image_dpi）に必要な画素数まで縮小してから
+埋め込みます（JPEGは縮小後のサイズに近い縮尺でデコードします）。
+すでに必要な画素数以下のJPEGはデコードせず、元のデータのままDCTDecodeの画像として
+埋め込み、EXIFの向きは変換行列で反映します。
 """
 
+import hashlib
+import math
 import os
 from enum import Enum
-from typing import List, Dict, Optional
+from typing import Any, Iterable, Iterator, List, Dict, Optional, Tuple, cast
 from io import BytesIO
 from datetime import datetime
 
@@ -14,10 +26,47 @@ from reportlab.lib.pagesizes import A4
 from reportlab.lib.units import mm
 from reportlab.pdfgen import canvas
 from reportlab.lib import colors
+from reportlab.lib.utils import ImageReader
 from reportlab.platypus import Table, TableStyle
-from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase import pdfdoc, pdfmetrics, pdfutils
 from reportlab.pdfbase.cidfonts import UnicodeCIDFont
-from PIL import Image
+from PIL import Image, ImageOps
+
+from app.services.job_event_bus import JobProgressReporter
+from app.services.pdf_concat import concatenate_pdfs
+from app.services.s3_prefetcher import S3ObjectPrefetcher
+
+
+# 作成領域の予約用: PDFの固定分（フォント・表紙等）と1ページあたりの増分
+PDF_BASE_OVERHEAD = 256 * 1024
+PDF_PAGE_OVERHEAD = 8 * 1024
+
+# 画像を縮小する印刷解像度（dpi）・JPEG品質・クロマサブサンプリングの既定値
+DEFAULT_IMAGE_DPI = 200
+DEFAULT_JPEG_QUALITY = 85
+DEFAULT_JPEG_SUBSAMPLING = "4:2:0"
+
+# 1つの部分PDFに描画する写真ページ数の既定値
+DEFAULT_PAGES_PER_PART = 10
+
+# EXIF Orientation で縦横が入れ替わる値
+TRANSPOSED_ORIENTATIONS = (5, 6, 7, 8)
+
+# EXIF Orientation ごとの、元の画像の単位正方形を表示向きの単位正方形に移す変換行列
+# （PDFの cm 演算子の (a, b, c, d, e, f)。PILの exif_transpose と同じ向きになる）
+EXIF_ORIENTATION_MATRICES = {
+    1: (1, 0, 0, 1, 0, 0),
+    2: (-1, 0, 0, 1, 1, 0),  # 左右反転
+    3: (-1, 0, 0, -1, 1, 1),  # 180度回転
+    4: (1, 0, 0, -1, 0, 1),  # 上下反転
+    5: (0, -1, -1, 0, 1, 1),  # 転置
+    6: (0, -1, 1, 0, 0, 1),  # 時計回りに90度回転
+    7: (0, 1, 1, 0, 0, 0),  # 反転置
+    8: (0, 1, -1, 0, 1, 0),  # 反時計回りに90度回転
+}
+
+# デコードせずにそのまま埋め込むJPEGのモード（CMYKは色の反転の有無が画像により異なるため除く）
+PASSTHROUGH_JPEG_MODES = ("RGB", "L")
 
 
 class LayoutType(Enum):
@@ -31,8 +80,31 @@ class LayoutType(Enum):
 class PhotoAlbumGenerator:
     """工事写真帳ジェネレータークラス"""
 
-    def __init__(self):
-        """初期化"""
+    # 写真帳PDFの出力形式のバージョン（変更時はキャッシュ済みの成果物が無効になる）
+    ARTIFACT_VERSION = "5"
+
+    def __init__(
+        self,
+        image_dpi: int = DEFAULT_IMAGE_DPI,
+        jpeg_quality: int = DEFAULT_JPEG_QUALITY,
+        jpeg_subsampling: Optional[str] = DEFAULT_JPEG_SUBSAMPLING,
+        pages_per_part: int = DEFAULT_PAGES_PER_PART,
+    ):
+        """
+        初期化
+
+        Args:
+            image_dpi: 埋め込む画像の印刷解像度（0の場合は縮小せず、JPEGはそのまま埋め込む）
+            jpeg_quality: 埋め込む画像のJPEG品質（1-95）
+            jpeg_subsampling: クロマサブサンプリング（"4:4:4"/"4:2:2"/"4:2:0"。
+                Noneの場合はPILの既定値）
+            pages_per_part: 1つの部分PDFに描画する写真ページ数
+                （埋め込んだ画像はこのページ数ごとにメモリから解放されます）
+        """
+        self.image_dpi = image_dpi
+        self.jpeg_quality = jpeg_quality
+        self.jpeg_subsampling = jpeg_subsampling
+        self.pages_per_part = max(pages_per_part, 1)
         self.page_width, self.page_height = A4
         self.margin = 20 * mm
         self.title_font_size = 14
@@ -55,6 +127,8 @@ class PhotoAlbumGenerator:
         add_page_numbers: bool = False,
         header_text: Optional[str] = None,
         footer_text: Optional[str] = None,
+        images: Optional[Iterable[Optional[bytes]]] = None,
+        reporter: Optional[JobProgressReporter] = None,
     ) -> Dict:
         """
         PDF写真帳を生成
@@ -67,6 +141,10 @@ class PhotoAlbumGenerator:
             add_page_numbers: ページ番号を追加するか
             header_text: ヘッダーテキスト
             footer_text: フッターテキスト
+            images: 写真の順の画像データ（iter_images 等のイテレータ）。
+                各ページの描画直前にそのページの分だけ取り出します。
+                省略時は写真データの image_data を使用
+            reporter: 進捗レポーター（ページの描画ごとに写真枚数分進める）
 
         Returns:
             生成結果
@@ -82,37 +160,70 @@ class PhotoAlbumGenerator:
             }
 
         try:
-            # PDFキャンバス作成
-            c = canvas.Canvas(output_path, pagesize=A4)
-
-            page_count = 0
-
-            # 表紙ページ生成
-            if cover_data:
-                self._draw_cover_page(c, cover_data)
-                c.showPage()
-                page_count += 1
-
-            # 写真ページ生成
             photo_pages = self._generate_photo_pages(photos, layout_type)
-            for page_photos in photo_pages:
-                self._draw_photo_page(
-                    c,
-                    page_photos,
-                    layout_type,
-                    header_text=header_text,
-                    footer_text=footer_text,
-                )
-
-                # ページ番号追加
-                if add_page_numbers:
-                    page_count += 1
-                    self._draw_page_number(c, page_count)
-
-                c.showPage()
+            part_count = math.ceil(len(photo_pages) / self.pages_per_part)
+            # 部分PDFが1つで済む場合は出力先に直接保存
+            part_paths = (
+                [f"{output_path}.part{index}" for index in range(part_count)]
+                if part_count > 1
+                else [output_path]
+            )
+            page_count = 0
+            image_iter = iter(images) if images is not None else None
+            if reporter is not None:
+                reporter.set_total(len(photos))
+                reporter.stage("pages")
 
-            # PDF保存
-            c.save()
+            try:
+                for part_index, part_path in enumerate(part_paths):
+                    # PDFキャンバス作成（部分PDFの保存で埋め込んだ画像を解放する）
+                    c = canvas.Canvas(part_path, pagesize=A4)
+
+                    # 表紙ページ生成
+                    if part_index == 0 and cover_data:
+                        self._draw_cover_page(c, cover_data)
+                        c.showPage()
+                        page_count += 1
+
+                    # 写真ページ生成
+                    first_page = part_index * self.pages_per_part
+                    for page_photos in photo_pages[
+                        first_page : first_page + self.pages_per_part
+                    ]:
+                        if image_iter is not None:
+                            # このページの画像だけを取り出す（描画後は参照を残さない）
+                            page_photos = [
+                                {**photo, "image_data": next(image_iter, None)}
+                                for photo in page_photos
+                            ]
+                        self._draw_photo_page(
+                            c,
+                            page_photos,
+                            layout_type,
+                            header_text=header_text,
+                            footer_text=footer_text,
+                        )
+
+                        # ページ番号追加
+                        if add_page_numbers:
+                            page_count += 1
+                            self._draw_page_number(c, page_count)
+
+                        c.showPage()
+                        if reporter is not None:
+                            reporter.advance(len(page_photos))
+
+                    # PDF保存
+                    c.save()
+
+                # 部分PDFを連結（画像のストリームはファイル間でそのままコピー）
+                if part_count > 1:
+                    concatenate_pdfs(part_paths, output_path)
+            finally:
+                if part_count > 1:
+                    for part_path in part_paths:
+                        if os.path.exists(part_path):
+                            os.remove(part_path)
 
             # ファイルサイズ取得
             file_size = os.path.getsize(output_path)
@@ -141,6 +252,47 @@ class PhotoAlbumGenerator:
                 "total_photos": 0,
             }
 
+    def iter_images(
+        self,
+        photos: List[Dict],
+        s3_client: Any,
+        bucket: str,
+        prefetch_concurrency: int = 4,
+    ) -> Iterator[Optional[bytes]]:
+        """
+        写真の順に画像データをS3から取得（後続の写真を先読み）
+
+        Args:
+            photos: 写真データリスト（s3_key を使用）
+            s3_client: S3クライアント
+            bucket: バケット名
+            prefetch_concurrency: 先読みする画像数の上限
+
+        Yields:
+            画像データ（s3_key がない写真、取得に失敗した写真はNone）
+        """
+        prefetcher = S3ObjectPrefetcher(s3_client, bucket, prefetch_concurrency)
+        objects = prefetcher.iter_objects(
+            (photo["s3_key"] for photo in photos if photo.get("s3_key")),
+            return_exceptions=True,
+        )
+        try:
+            for photo in photos:
+                if not photo.get("s3_key"):
+                    yield None
+                    continue
+                key, data = next(objects)
+                if isinstance(data, Exception):
+                    # S3からの取得に失敗した場合はログに記録してスキップ
+                    print(
+                        f"Warning: Failed to download image from S3: {key}, Error: {str(data)}"
+                    )
+                    yield None
+                    continue
+                yield data
+        finally:
+            objects.close()
+
     def generate_cover_page_data(self, cover_data: Dict) -> Dict:
         """
         表紙ページデータを生成
@@ -344,9 +496,9 @@ class PhotoAlbumGenerator:
         image_data = photo.get("image_data")
         if image_data:
             try:
-                # 画像をリサイズして描画
+                # 画像サイズ（EXIFの向きを反映）をヘッダーから取得
                 img = Image.open(BytesIO(image_data))
-                img_width, img_height = img.size
+                img_width, img_height = self._oriented_size(img)
 
                 # アスペクト比を保持してリサイズ
                 aspect = img_width / img_height
@@ -363,12 +515,33 @@ class PhotoAlbumGenerator:
                 img_x = x + (width - new_width) / 2
                 img_y = y + height * 0.3
 
-                # 画像を一時ファイルに保存して描画（ReportLabの制約）
-                temp_img = BytesIO()
-                img.save(temp_img, format="JPEG")
-                temp_img.seek(0)
-
-                c.drawImage(temp_img, img_x, img_y, new_width, new_height)
+                # 縮小不要なJPEGはデコードせずにそのまま描画
+                embedded = self._can_embed_directly(
+                    img, new_width, new_height
+                ) and self._draw_jpeg(
+                    c,
+                    image_data,
+                    img.getexif().get(0x0112),
+                    img_x,
+                    img_y,
+                    new_width,
+                    new_height,
+                )
+                if not embedded:
+                    # 表示サイズの印刷解像度まで縮小したJPEGを描画（向きは反映済み）。
+                    # drawImage は同一性の判定に全画素をデコードし、保存まで保持するため、
+                    # 縮小後のJPEGもそのまま埋め込む
+                    rendered = self._render_image(image_data, new_width, new_height)
+                    if not self._draw_jpeg(
+                        c, rendered, None, img_x, img_y, new_width, new_height
+                    ):
+                        c.drawImage(
+                            ImageReader(BytesIO(rendered)),
+                            img_x,
+                            img_y,
+                            new_width,
+                            new_height,
+                        )
 
             except Exception as e:
                 # 画像読み込みエラーの場合はスキップ
@@ -394,25 +567,172 @@ class PhotoAlbumGenerator:
         c.setFont(self.font_name, 10)
         c.drawCentredString(self.page_width / 2, self.margin / 2, f"- {page_number} -")
 
-    def resize_image(self, image_data: bytes, max_width: int, max_height: int) -> bytes:
+    def resize_image(
+        self,
+        image_data: bytes,
+        max_width: int,
+        max_height: int,
+        quality: int = 85,
+        subsampling: Optional[str] = None,
+    ) -> bytes:
         """
-        画像をリサイズ
+        画像をリサイズ（EXIFの向きを反映）
+
+        JPEGは縮小後のサイズに近い縮尺（1/2・1/4・1/8）でデコードするため、
+        大きな写真でも全画素を展開しません。
 
         Args:
             image_data: 画像データ
             max_width: 最大幅
             max_height: 最大高さ
+            quality: JPEG品質
+            subsampling: クロマサブサンプリング（Noneの場合はPILの既定値）
 
         Returns:
-            リサイズ後の画像データ
+            リサイズ後の画像データ（JPEG）
         """
-        img = Image.open(BytesIO(image_data))
+        img: Image.Image = Image.open(BytesIO(image_data))
+        # 向きが入れ替わる場合に備えて長辺を基準にデコード時の縮尺を決める
+        longest = max(max_width, max_height)
+        img.draft("RGB", (longest, longest))
+        img = cast(Image.Image, ImageOps.exif_transpose(img))
         img.thumbnail((max_width, max_height), Image.Resampling.LANCZOS)
+        if img.mode not in ("RGB", "L", "CMYK"):
+            img = img.convert("RGB")
 
+        options: Dict[str, Any] = {"quality": quality}
+        if subsampling is not None:
+            options["subsampling"] = subsampling
         output = BytesIO()
-        img.save(output, format="JPEG", quality=85)
+        img.save(output, format="JPEG", **options)
         return output.getvalue()
 
+    def frame_pixels(self, width: float, height: float) -> Tuple[int, int]:
+        """
+        表示サイズ（ポイント）の印刷解像度に必要な画素数
+
+        Args:
+            width: 表示幅（ポイント）
+            height: 表示高さ（ポイント）
+
+        Returns:
+            (幅, 高さ) の画素数
+        """
+        return (
+            math.ceil(width / 72 * self.image_dpi),
+            math.ceil(height / 72 * self.image_dpi),
+        )
+
+    def _render_image(self, image_data: bytes, width: float, height: float) -> bytes:
+        """表示サイズの印刷解像度まで縮小したJPEG（image_dpi が0の場合は元の画素数）"""
+        if self.image_dpi:
+            max_width, max_height = self.frame_pixels(width, height)
+        else:
+            max_width, max_height = self._oriented_size(Image.open(BytesIO(image_data)))
+        return self.resize_image(
+            image_data,
+            max_width,
+            max_height,
+            quality=self.jpeg_quality,
+            subsampling=self.jpeg_subsampling,
+        )
+
+    def _can_embed_directly(
+        self, img: Image.Image, width: float, height: float
+    ) -> bool:
+        """
+        縮小・再エンコードせずにJPEGのまま埋め込めるか（ヘッダーの情報だけで判定）
+
+        Args:
+            img: 開いた画像（画素はデコードしていないもの）
+            width: 表示幅（ポイント）
+            height: 表示高さ（ポイント）
+
+        Returns:
+            JPEGで、表示サイズの印刷解像度に必要な画素数以下の場合はTrue
+        """
+        if img.format != "JPEG" or img.mode not in PASSTHROUGH_JPEG_MODES:
+            return False
+        if not self.image_dpi:
+            return True
+        max_width, max_height = self.frame_pixels(width, height)
+        img_width, img_height = self._oriented_size(img)
+        return img_width <= max_width and img_height <= max_height
+
+    def _draw_jpeg(
+        self,
+        c: canvas.Canvas,
+        image_data: bytes,
+        orientation: Optional[int],
+        x: float,
+        y: float,
+        width: float,
+        height: float,
+    ) -> bool:
+        """
+        JPEGをデコードせずにDCTDecodeの画像として描画
+
+        canvas.drawImage は画像の同一性の判定に全画素をデコードするため使わず、
+        画像データのハッシュを名前にして画像オブジェクトを登録します
+        （同じ画像データは1つの画像オブジェクトを共有します）。
+
+        Args:
+            c: キャンバス
+            image_data: JPEGデータ
+            orientation: EXIF Orientation（Noneの場合は回転なし）
+            x: X座標
+            y: Y座標
+            width: 表示幅（向きを反映した後）
+            height: 表示高さ（向きを反映した後）
+
+        Returns:
+            描画した場合はTrue（reportlabが扱えないJPEGの場合はFalse）
+        """
+        name = "jpeg" + hashlib.sha1(image_data).hexdigest()
+        reg_name = c._doc.getXObjectName(name)
+        if reg_name not in c._doc.idToObject:
+            try:
+                # SOFマーカー（ベースライン・プログレッシブのみ）から画素数と色数を取得
+                img_width, img_height, components, _ = pdfutils.readJPEGInfo(
+                    BytesIO(image_data)
+                )
+            except Exception:
+                return False
+            if components not in (1, 3):
+                return False
+            # ASCII85にエンコードせず、JPEGデータをそのままストリームにする
+            image = pdfdoc.PDFImageXObject(name)
+            image.width, image.height = img_width, img_height
+            image.bitsPerComponent = 8
+            image.colorSpace = "DeviceGray" if components == 1 else "DeviceRGB"
+            image._filters = ("DCTDecode",)
+            image.streamContent = image_data
+            image.mask = None
+            c._setXObjects(image)
+            c._doc.Reference(image, reg_name)
+            c._doc.addForm(name, image)
+
+        c._currentPageHasImages = 1
+        c.saveState()
+        c.transform(width, 0, 0, height, x, y)
+        c.transform(
+            *EXIF_ORIENTATION_MATRICES.get(
+                orientation or 1, EXIF_ORIENTATION_MATRICES[1]
+            )
+        )
+        # ページのリソース（XObject）にも登録される
+        c.doForm(name)
+        c.restoreState()
+        return True
+
+    @staticmethod
+    def _oriented_size(img: Image.Image) -> Tuple[int, int]:
+        """EXIF Orientation を反映した画像サイズ"""
+        width, height = img.size
+        if img.getexif().get(0x0112) in TRANSPOSED_ORIENTATIONS:
+            return height, width
+        return width, height
+
     def generate_thumbnail(self, image_data: bytes, size: tuple) -> bytes:
         """
         サムネイルを生成
@@ -431,6 +751,26 @@ class PhotoAlbumGenerator:
         img.save(output, format="JPEG", quality=75)
         return output.getvalue()
 
+    def estimate_pdf_size(self, photos: List[Dict], layout_type: LayoutType) -> int:
+        """
+        写真帳PDFの見積もりサイズ（作成領域の予約用）
+
+        画像は縮小して埋め込むため、元ファイルのサイズの合計を上限の目安とします。
+
+        Args:
+            photos: 写真データリスト（file_size を使用。不明な場合は0バイト）
+            layout_type: レイアウトタイプ
+
+        Returns:
+            見積もりサイズ（バイト）
+        """
+        pages = self.get_page_count(len(photos), layout_type)
+        return (
+            PDF_BASE_OVERHEAD
+            + pages * PDF_PAGE_OVERHEAD
+            + sum(photo.get("file_size") or 0 for photo in photos)
+        )
+
     def get_page_count(self, photo_count: int, layout_type: LayoutType) -> int:
         """
         ページ数を計算
@@ -0,0 +1,142 @@
+"""
+写真ラベルサービス
+
+Rekognitionの検出ラベルを photo_labels テーブルに正規化して保存し、
+ラベル・カテゴリによる絞り込みとファセット集計を提供します。
+"""
+
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import exists, func
+from sqlalchemy.orm import Query, Session
+
+from app.database.models import Photo, PhotoLabel
+
+
+class PhotoLabelService:
+    """写真ラベルの保存・検索サービス"""
+
+    @staticmethod
+    def build_label_rows(
+        photo: Photo, labels: List[Dict], categorized: Dict[str, List[str]]
+    ) -> List[PhotoLabel]:
+        """
+        検出ラベルから photo_labels の行を作成
+
+        Args:
+            photo: 写真
+            labels: Rekognitionラベルリスト（Name/Confidence）
+            categorized: categorize_construction_labels の結果
+
+        Returns:
+            PhotoLabelのリスト
+        """
+        category_by_label = {
+            name: category for category, names in categorized.items() for name in names
+        }
+        return [
+            PhotoLabel(
+                photo_id=photo.id,
+                organization_id=photo.organization_id,
+                label=label["Name"],
+                category=category_by_label.get(label["Name"], "other"),
+                confidence=label["Confidence"],
+            )
+            for label in labels
+        ]
+
+    def replace_photo_labels(
+        self,
+        db: Session,
+        photo: Photo,
+        labels: List[Dict],
+        categorized: Dict[str, List[str]],
+    ) -> None:
+        """
+        写真のラベルを置き換え（コミットは呼び出し側で行う）
+
+        Args:
+            db: データベースセッション
+            photo: 写真
+            labels: Rekognitionラベルリスト
+            categorized: カテゴリ別ラベル
+        """
+        db.query(PhotoLabel).filter(PhotoLabel.photo_id == photo.id).delete(
+            synchronize_session=False
+        )
+        db.add_all(self.build_label_rows(photo, labels, categorized))
+
+    @staticmethod
+    def filter_by_label(
+        query: Query,
+        organization_id: int,
+        label: Optional[str] = None,
+        category: Optional[str] = None,
+    ) -> Query:
+        """
+        ラベル・カテゴリで写真クエリを絞り込み（EXISTSによる準結合）
+
+        Args:
+            query: 写真クエリ
+            organization_id: 組織ID
+            label: ラベル名（完全一致）
+            category: ラベルカテゴリ
+
+        Returns:
+            絞り込み後のクエリ
+        """
+        if label:
+            query = query.filter(
+                exists().where(
+                    PhotoLabel.organization_id == organization_id,
+                    PhotoLabel.label == label,
+                    PhotoLabel.photo_id == Photo.id,
+                )
+            )
+        if category:
+            query = query.filter(
+                exists().where(
+                    PhotoLabel.organization_id == organization_id,
+                    PhotoLabel.category == category,
+                    PhotoLabel.photo_id == Photo.id,
+                )
+            )
+        return query
+
+    @staticmethod
+    def facet_counts(
+        db: Session, organization_id: int, photo_query: Query, limit: int = 20
+    ) -> Dict[str, List[Dict]]:
+        """
+        検索結果に対するラベル・カテゴリ別の写真件数を集計
+
+        Args:
+            db: データベースセッション
+            organization_id: 組織ID
+            photo_query: 絞り込み済みの写真クエリ
+            limit: ラベルファセットの最大件数
+
+        Returns:
+            {"labels": [{"value", "count"}], "categories": [{"value", "count"}]}
+        """
+        photo_ids = photo_query.with_entities(Photo.id).order_by(None).subquery()
+
+        def _counts(column: Any, max_items: Optional[int]) -> List[Dict[str, Any]]:
+            count = func.count(func.distinct(PhotoLabel.photo_id))
+            query = (
+                db.query(column, count)
+                .filter(
+                    PhotoLabel.organization_id == organization_id,
+                    PhotoLabel.photo_id.in_(photo_ids.select()),
+                )
+                .group_by(column)
+                .order_by(count.desc(), column)
+            )
+            if max_items:
+                query = query.limit(max_items)
+            return [{"value": value, "count": total} for value, total in query.all()]
+
+        return {
+            "labels": _counts(PhotoLabel.label, limit),
+            "categories": _counts(PhotoLabel.category, None),
+        }
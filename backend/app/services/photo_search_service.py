@@ -0,0 +1,97 @@
+"""
+写真検索の絞り込み条件
+
+検索API（/api/v1/photos/search）と、検索条件からの写真選択セットの作成で共通に使います。
+"""
+
+from datetime import datetime, timedelta
+from typing import Optional
+
+from sqlalchemy import func, or_
+from sqlalchemy.orm import Query, Session
+from sqlalchemy.sql import ColumnElement
+
+from app.database.models import Photo
+from app.services.photo_label_service import PhotoLabelService
+
+
+def keyword_rank(keyword: str) -> ColumnElement[float]:
+    """キーワードの関連度（PostgreSQLの全文検索用）"""
+    return func.ts_rank(Photo.search_vector, func.plainto_tsquery("simple", keyword))
+
+
+def apply_search_filters(
+    query: Query,
+    db: Session,
+    organization_id: int,
+    keyword: Optional[str] = None,
+    work_type: Optional[str] = None,
+    work_kind: Optional[str] = None,
+    major_category: Optional[str] = None,
+    photo_type: Optional[str] = None,
+    date_from: Optional[str] = None,
+    date_to: Optional[str] = None,
+    label: Optional[str] = None,
+    label_category: Optional[str] = None,
+) -> Query:
+    """
+    写真クエリを検索条件で絞り込み（並び順は変更しない）
+
+    Args:
+        query: 写真クエリ（テナントフィルタ適用済み）
+        db: データベースセッション
+        organization_id: 組織ID
+        keyword: キーワード（ファイル名、タイトル、説明から検索）
+        work_type: 工種
+        work_kind: 種別
+        major_category: 写真大分類
+        photo_type: 写真区分
+        date_from: 撮影日開始（YYYY-MM-DD）
+        date_to: 撮影日終了（YYYY-MM-DD）
+        label: ラベル名
+        label_category: ラベルカテゴリ
+
+    Returns:
+        絞り込み後のクエリ
+    """
+    # キーワード検索（全文検索）
+    if keyword:
+        if db.get_bind().dialect.name == "postgresql":
+            # PostgreSQL: TSVectorを使った全文検索（高速）
+            ts_query = func.plainto_tsquery("simple", keyword)
+            query = query.filter(Photo.search_vector.op("@@")(ts_query))
+        else:
+            # SQLite/その他: LIKE検索にフォールバック
+            search_pattern = f"%{keyword}%"
+            query = query.filter(
+                or_(
+                    Photo.file_name.like(search_pattern),
+                    Photo.title.like(search_pattern),
+                    Photo.description.like(search_pattern),
+                    Photo.work_type.like(search_pattern),
+                    Photo.work_kind.like(search_pattern),
+                )
+            )
+
+    # 工種・種別・写真大分類・写真区分フィルタ
+    if work_type:
+        query = query.filter(Photo.work_type == work_type)
+    if work_kind:
+        query = query.filter(Photo.work_kind == work_kind)
+    if major_category:
+        query = query.filter(Photo.major_category == major_category)
+    if photo_type:
+        query = query.filter(Photo.photo_type == photo_type)
+
+    # 日付範囲フィルタ
+    if date_from:
+        query = query.filter(Photo.shooting_date >= datetime.fromisoformat(date_from))
+    if date_to:
+        # 日付の終わりまで含める（23:59:59）
+        date_to_end = datetime.fromisoformat(date_to) + timedelta(days=1, seconds=-1)
+        query = query.filter(Photo.shooting_date <= date_to_end)
+
+    # ラベル・ラベルカテゴリフィルタ（photo_labels経由）
+    return PhotoLabelService.filter_by_label(
+        query, organization_id, label=label, category=label_category
+    )
@@ -0,0 +1,250 @@
+"""
+写真選択セット
+
+エクスポート・PHOTO.XML・写真帳の対象写真を、写真IDリストや検索条件からサーバー側に
+保存しておき、各APIには選択セットIDだけを渡せるようにします。
+数万枚の写真IDをリクエストのたびに送ったり、巨大な IN (...) 句を組み立てたりせずに、
+バリデーション → PHOTO.XML → エクスポートと同じ対象を繰り返し使えます。
+
+メンバーは (selection_id, photo_id) の複合主キーだけのテーブルに INSERT ... SELECT で保存し、
+対象写真の取得はメンバーとの準結合を写真ID順にサーバーサイドカーソルで読み出します。
+"""
+
+from datetime import datetime, timedelta
+from typing import Dict, Iterator, List, Optional, cast
+
+from sqlalchemy import Integer, Select, bindparam, delete, func, insert, literal, select
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import ColumnElement
+
+from app.config import settings
+from app.database.models import Photo, PhotoSelection, PhotoSelectionMember
+from app.services.photo_search_service import apply_search_filters
+
+# 写真IDリストから作成する場合に1文で登録する件数
+ID_INSERT_BATCH_SIZE = 5000
+
+# 対象写真をサーバーサイドカーソルで読み出す際の1回の取得件数
+STREAM_BATCH_SIZE = 1000
+
+
+def selection_member_filter(selection_id: int) -> ColumnElement[bool]:
+    """写真選択セットのメンバーに絞り込む条件（準結合）"""
+    return Photo.id.in_(
+        select(PhotoSelectionMember.photo_id).where(
+            PhotoSelectionMember.selection_id == selection_id
+        )
+    )
+
+
+class PhotoSelectionService:
+    """写真選択セットの作成・取得（コミットは呼び出し側で行う）"""
+
+    def __init__(self, db: Session):
+        """
+        初期化
+
+        Args:
+            db: データベースセッション
+        """
+        self.db = db
+
+    def create_from_ids(
+        self,
+        organization_id: int,
+        photo_ids: List[int],
+        name: Optional[str] = None,
+        created_by: Optional[int] = None,
+    ) -> PhotoSelection:
+        """
+        写真IDリストから選択セットを作成
+
+        自組織に存在しない写真IDは登録しません（photo_count で確認できます）。
+
+        Args:
+            organization_id: 組織ID
+            photo_ids: 写真IDリスト（重複は1件として扱う）
+            name: 名前
+            created_by: 作成ユーザーID
+
+        Returns:
+            作成した写真選択セット
+        """
+        selection = self._create(organization_id, "ids", None, name, created_by)
+        ids = sorted(set(photo_ids))
+        for start in range(0, len(ids), ID_INSERT_BATCH_SIZE):
+            batch = ids[start : start + ID_INSERT_BATCH_SIZE]
+            # IDは整数のためSQLに直接展開する（バインド変数の上限に達しない）
+            self._insert_members(
+                selection,
+                select(literal(selection.id, Integer), Photo.id).where(
+                    Photo.organization_id == organization_id,
+                    Photo.id.in_(
+                        bindparam(
+                            "photo_ids", batch, expanding=True, literal_execute=True
+                        )
+                    ),
+                ),
+            )
+        return self._finish(selection)
+
+    def create_from_filter(
+        self,
+        organization_id: int,
+        filters: Dict,
+        name: Optional[str] = None,
+        created_by: Optional[int] = None,
+    ) -> PhotoSelection:
+        """
+        検索条件から選択セットを作成（検索結果をデータベース内でそのまま登録）
+
+        Args:
+            organization_id: 組織ID
+            filters: 検索条件（apply_search_filters のキーワード引数）
+            name: 名前
+            created_by: 作成ユーザーID
+
+        Returns:
+            作成した写真選択セット
+        """
+        selection = self._create(organization_id, "filter", filters, name, created_by)
+        query = apply_search_filters(
+            self.db.query(Photo).filter(Photo.organization_id == organization_id),
+            self.db,
+            organization_id,
+            **filters,
+        )
+        self._insert_members(
+            selection,
+            cast(
+                Select,
+                query.with_entities(literal(selection.id, Integer), Photo.id).statement,
+            ),
+        )
+        return self._finish(selection)
+
+    def get(self, selection_id: int, organization_id: int) -> Optional[PhotoSelection]:
+        """
+        自組織の有効期限内の選択セットを取得
+
+        Args:
+            selection_id: 写真選択セットID
+            organization_id: 組織ID
+
+        Returns:
+            写真選択セット（存在しない・他組織・期限切れの場合はNone）
+        """
+        return (
+            self.db.query(PhotoSelection)
+            .filter(
+                PhotoSelection.id == selection_id,
+                PhotoSelection.organization_id == organization_id,
+                PhotoSelection.expires_at > datetime.utcnow(),
+            )
+            .first()
+        )
+
+    def iter_photos(
+        self, selection: PhotoSelection, batch_size: int = STREAM_BATCH_SIZE
+    ) -> Iterator[Photo]:
+        """
+        選択セットの写真を写真ID順に読み出し
+
+        サーバーサイドカーソル（yield_per）で batch_size 件ずつ取得するため、
+        写真数によらずメモリ上の写真オブジェクトは一定数に収まります。
+
+        Args:
+            selection: 写真選択セット
+            batch_size: 1回の取得件数
+
+        Yields:
+            写真
+        """
+        yield from (
+            self.db.query(Photo)
+            .filter(
+                Photo.organization_id == selection.organization_id,
+                selection_member_filter(cast(int, selection.id)),
+            )
+            .order_by(Photo.id)
+            .yield_per(batch_size)
+        )
+
+    def delete(self, selection: PhotoSelection) -> None:
+        """
+        選択セットを削除
+
+        Args:
+            selection: 写真選択セット
+        """
+        self.db.execute(
+            delete(PhotoSelectionMember).where(
+                PhotoSelectionMember.selection_id == selection.id
+            )
+        )
+        self.db.delete(selection)
+        self.db.flush()
+
+    def delete_expired(self) -> int:
+        """
+        有効期限切れの選択セットを削除
+
+        Returns:
+            削除した選択セットの数
+        """
+        return self._delete_where(PhotoSelection.expires_at <= datetime.utcnow())
+
+    def _create(
+        self,
+        organization_id: int,
+        source: str,
+        filters: Optional[Dict],
+        name: Optional[str],
+        created_by: Optional[int],
+    ) -> PhotoSelection:
+        """選択セットを登録（メンバー登録前）"""
+        self.delete_expired()
+        now = datetime.utcnow()
+        selection = PhotoSelection(
+            organization_id=organization_id,
+            name=name,
+            source=source,
+            filter=filters,
+            photo_count=0,
+            created_by=created_by,
+            created_at=now,
+            expires_at=now + timedelta(seconds=settings.PHOTO_SELECTION_TTL_SECONDS),
+        )
+        self.db.add(selection)
+        self.db.flush()
+        return selection
+
+    def _insert_members(self, selection: PhotoSelection, rows: Select) -> None:
+        """(選択セットID, 写真ID) を返すSELECTの結果をメンバーとして登録"""
+        self.db.execute(
+            insert(PhotoSelectionMember).from_select(["selection_id", "photo_id"], rows)
+        )
+
+    def _finish(self, selection: PhotoSelection) -> PhotoSelection:
+        """写真数を記録"""
+        selection.photo_count = self.db.execute(  # type: ignore[assignment]
+            select(func.count())
+            .select_from(PhotoSelectionMember)
+            .where(PhotoSelectionMember.selection_id == selection.id)
+        ).scalar_one()
+        self.db.flush()
+        return selection
+
+    def _delete_where(self, condition: ColumnElement[bool]) -> int:
+        """条件に一致する選択セットをメンバーごと削除"""
+        selection_ids = select(PhotoSelection.id).where(condition)
+        self.db.execute(
+            delete(PhotoSelectionMember).where(
+                PhotoSelectionMember.selection_id.in_(selection_ids)
+            )
+        )
+        return self.db.execute(
+            delete(PhotoSelection)
+            .where(condition)
+            .execution_options(synchronize_session=False)
+        ).rowcount
@@ -0,0 +1,266 @@
+"""
+エクスポート・PHOTO.XML 事前バリデーションサービス
+
+写真を1枚ずつ読み込んで検査する代わりに、検査項目をSQLの条件式として組み立て、
+件数は1回の集計クエリで、違反写真の一覧はページ単位で取得します。
+メタデータ（JSON）はOCR結果・分類結果の有無だけをDB側で判定するため、
+写真のJSON全体をアプリケーションに転送しません。
+"""
+
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import and_, bindparam, case, func, not_, or_, select
+from sqlalchemy.engine import RowMapping
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import ColumnElement
+
+from app.database.models import Photo
+from app.services.photo_selection_service import selection_member_filter
+
+# PHOTO.XMLのタイトル最大文字数
+TITLE_MAX_LENGTH = 127
+
+# 写真ファイル名形式（Pnnnnnnn.JPG）
+FILE_NAME_PATTERN = r"^P[0-9]{7}\.JPG$"
+
+# 必須項目（検査名, 列, 項目名）
+REQUIRED_FIELDS: List[Tuple[str, ColumnElement, str]] = [
+    ("missing_file_name", Photo.file_name, "file_name"),
+    ("missing_title", Photo.title, "title"),
+    ("missing_shooting_date", Photo.shooting_date, "shooting_date"),
+    ("missing_major_category", Photo.major_category, "major_category"),
+]
+
+# 警告メッセージ
+WARNING_MESSAGES = {
+    "missing_title": "タイトルが未設定です",
+    "missing_ocr": "OCRデータが未処理です",
+    "missing_classification": "分類データが未処理です",
+}
+
+
+def _is_blank(column: ColumnElement) -> ColumnElement[bool]:
+    """NULLまたは空文字"""
+    if column.type.python_type is str:
+        return or_(column.is_(None), column == "")
+    return column.is_(None)
+
+
+def _metadata_key_missing(key: str) -> ColumnElement[bool]:
+    """メタデータのキーが存在しない、または空値（null・空文字・空オブジェクト等）"""
+    value = Photo.photo_metadata[key].as_string()
+    return or_(value.is_(None), value.in_(["", "{}", "[]", "null", "false"]))
+
+
+def _error_conditions() -> Dict:
+    """エラー検査名→条件式"""
+    conditions = {name: _is_blank(column) for name, column, _ in REQUIRED_FIELDS}
+    conditions["invalid_file_name"] = and_(
+        not_(_is_blank(Photo.file_name)),
+        not_(Photo.file_name.regexp_match(FILE_NAME_PATTERN)),
+    )
+    conditions["title_too_long"] = func.length(Photo.title) > TITLE_MAX_LENGTH
+    return conditions
+
+
+def _warning_conditions() -> Dict:
+    """警告検査名→条件式"""
+    return {
+        "missing_title": _is_blank(Photo.title),
+        "missing_ocr": _metadata_key_missing("ocr_result"),
+        "missing_classification": _metadata_key_missing("classification"),
+    }
+
+
+def validation_messages(result: Dict) -> Tuple[List[str], List[str]]:
+    """
+    検査結果から従来形式のエラー・警告メッセージを組み立て
+
+    Args:
+        result: PhotoValidationService.validate の戻り値
+
+    Returns:
+        (エラーメッセージ, 警告メッセージ)（違反写真はページ範囲分のみ）
+    """
+    errors: List[str] = []
+    warnings: List[str] = []
+    for offender in result["offenders"]:
+        prefix = f"写真ID {offender['photo_id']}: "
+        errors.extend(prefix + message for message in offender["errors"])
+        warnings.extend(prefix + message for message in offender["warnings"])
+    errors.extend(
+        f"ファイル名が重複しています: {file_name}"
+        for file_name in result["duplicate_file_names"]
+    )
+    return errors, warnings
+
+
+class PhotoValidationService:
+    """写真データの事前バリデーション（SQL集計）"""
+
+    def __init__(self, db: Session):
+        """
+        初期化
+
+        Args:
+            db: データベースセッション
+        """
+        self.db = db
+
+    def validate(
+        self,
+        photo_ids: Optional[List[int]],
+        organization_id: Optional[int] = None,
+        warnings: Iterable[str] = ("missing_title", "missing_ocr"),
+        check_duplicates: bool = True,
+        offset: int = 0,
+        limit: int = 100,
+        selection_id: Optional[int] = None,
+    ) -> Dict:
+        """
+        指定写真をバリデーション
+
+        件数は全写真を対象に集計し、違反写真の一覧（offenders）と重複ファイル名は
+        offset/limit の範囲のみ返します。
+
+        Args:
+            photo_ids: 写真IDリスト（selection_id 指定時はNone）
+            organization_id: 組織ID（指定時は自組織の写真のみ対象）
+            warnings: 検査する警告項目（WARNING_MESSAGES のキー）
+            check_duplicates: ファイル名の重複を検査するか
+            offset: 違反写真一覧の開始位置
+            limit: 違反写真一覧の最大件数
+            selection_id: 写真選択セットID（指定時は選択セットのメンバーが対象）
+
+        Returns:
+            検査結果（total, error_counts, warning_counts, invalid_photos,
+            offenders, offender_total, duplicate_file_names）
+        """
+        error_conditions = _error_conditions()
+        warning_conditions = {
+            name: condition
+            for name, condition in _warning_conditions().items()
+            if name in set(warnings)
+        }
+        scope = self._scope(photo_ids, organization_id, selection_id)
+
+        # 件数の集計（1クエリ）
+        any_error = or_(*error_conditions.values())
+        any_issue = or_(any_error, *warning_conditions.values())
+        row = self.db.execute(
+            select(
+                func.count(Photo.id),
+                self._count(any_error),
+                self._count(any_issue),
+                *[self._count(c) for c in error_conditions.values()],
+                *[self._count(c) for c in warning_conditions.values()],
+            ).where(*scope)
+        ).one()
+        total, invalid_photos, offender_total = row[0], row[1] or 0, row[2] or 0
+        counts = [value or 0 for value in row[3:]]
+        error_counts = dict(zip(error_conditions, counts[: len(error_conditions)]))
+        warning_counts = dict(zip(warning_conditions, counts[len(error_conditions) :]))
+
+        # 違反写真（ページ単位）
+        offenders = []
+        if offender_total:
+            flags = {**error_conditions}
+            flags.update(
+                {f"warning_{name}": c for name, c in warning_conditions.items()}
+            )
+            rows = self.db.execute(
+                select(
+                    Photo.id,
+                    Photo.file_name,
+                    func.length(Photo.title).label("title_length"),
+                    *[case((c, 1), else_=0).label(name) for name, c in flags.items()],
+                )
+                .where(*scope, any_issue)
+                .order_by(Photo.id)
+                .offset(offset)
+                .limit(limit)
+            ).mappings()
+            offenders = [self._offender(row, warning_conditions) for row in rows]
+
+        # ファイル名の重複
+        duplicate_file_names = []
+        if check_duplicates:
+            duplicated = (
+                select(Photo.file_name)
+                .where(*scope)
+                .group_by(Photo.file_name)
+                .having(func.count(Photo.id) > 1)
+            )
+            error_counts["duplicate_file_name"] = self.db.execute(
+                select(func.count()).select_from(duplicated.subquery())
+            ).scalar_one()
+            if error_counts["duplicate_file_name"]:
+                duplicate_file_names = list(
+                    self.db.execute(
+                        duplicated.order_by(Photo.file_name).offset(offset).limit(limit)
+                    ).scalars()
+                )
+
+        return {
+            "total": total,
+            "error_counts": error_counts,
+            "warning_counts": warning_counts,
+            "invalid_photos": invalid_photos,
+            "offenders": offenders,
+            "offender_total": offender_total,
+            "duplicate_file_names": duplicate_file_names,
+        }
+
+    def _scope(
+        self,
+        photo_ids: Optional[List[int]],
+        organization_id: Optional[int],
+        selection_id: Optional[int] = None,
+    ) -> List:
+        """対象写真の条件"""
+        if selection_id is not None:
+            # 選択セットのメンバーとの準結合
+            scope = [selection_member_filter(selection_id)]
+        else:
+            # IDは整数のためSQLに直接展開する（件数が多くてもバインド変数の上限に達しない）
+            scope = [
+                Photo.id.in_(
+                    bindparam(
+                        "photo_ids", photo_ids, expanding=True, literal_execute=True
+                    )
+                )
+            ]
+        if organization_id is not None:
+            scope.append(Photo.organization_id == organization_id)
+        return scope
+
+    @staticmethod
+    def _count(condition: ColumnElement[bool]) -> ColumnElement[int]:
+        """条件を満たす行数"""
+        return func.sum(case((condition, 1), else_=0))
+
+    @staticmethod
+    def _offender(row: RowMapping, warning_conditions: Dict) -> Dict:
+        """違反写真1件のメッセージを組み立て"""
+        errors = [
+            f"必須項目 '{field}' が不足しています"
+            for name, _, field in REQUIRED_FIELDS
+            if row[name]
+        ]
+        if row["invalid_file_name"]:
+            errors.append(f"ファイル名形式が不正です: {row['file_name']}")
+        if row["title_too_long"]:
+            errors.append(
+                f"タイトルが{TITLE_MAX_LENGTH}文字を超えています: {row['title_length']}文字"
+            )
+        warnings = [
+            WARNING_MESSAGES[name]
+            for name in warning_conditions
+            if row[f"warning_{name}"]
+        ]
+        return {
+            "photo_id": row["id"],
+            "file_name": row["file_name"],
+            "errors": errors,
+            "warnings": warnings,
+        }
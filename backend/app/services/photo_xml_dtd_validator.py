@@ -0,0 +1,444 @@
+"""
+PHOTO.XML DTD適合チェック
+
+templates/PHOTO05.DTD の要素宣言を事前にコンパイルし、逐次出力される
+PHOTO.XMLを生成と並行して検査します（子要素の並び順・必須要素・文字数）。
+
+- 写真情報要素は1枚分ごとに、DTDから組み立てた1つの正規表現で照合する（高速経路）
+- 照合に失敗した写真情報と、基礎情報などその他の部分はexpatで要素ごとに検査し、
+  エラー内容を写真のシリアル番号付きで報告する
+
+XML全体を保持しないため、ZIPエントリへの書き込みと同時に検査できます。
+"""
+
+import codecs
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, Optional, Pattern, Sequence, Tuple
+
+import pyexpat
+
+from app.services.zip_writer import WritableStream
+
+# 要素の文字数上限（デジタル写真管理情報基準。全角・半角を区別せず文字数で判定）
+LENGTH_LIMITS = {
+    "シリアル番号": 7,
+    "写真ファイル名": 12,
+    "工種": 127,
+    "種別": 127,
+    "細別": 127,
+    "写真タイトル": 127,
+    "撮影年月日": 10,
+    "写真区分": 127,
+    "工事名": 127,
+    "測点": 127,
+    "設計寸法": 127,
+    "実測寸法": 127,
+    "検査員": 127,
+}
+
+# 1回の検査で記録するエラーの最大件数
+MAX_ERRORS = 1000
+
+_ELEMENT_DECL = re.compile(r"<!ELEMENT\s+(\S+)\s+(.+?)>", re.S)
+_FIXED_ATTR_DECL = re.compile(
+    r"<!ATTLIST\s+(\S+)\s+(\S+)\s+\S+\s+#FIXED\s+\"([^\"]*)\"\s*>"
+)
+_COMMENT = re.compile(r"<!--.*?-->", re.S)
+_MODEL_TOKEN = re.compile(r"#PCDATA|[^\s,|()?*+]+|[,|()?*+]")
+# 高速経路で許可する文字データ1文字（実体参照を含む写真情報はexpatでの詳細検査に回す）
+_TEXT_CHAR = r"[^<&]"
+
+
+def get_dtd_path() -> Path:
+    """PHOTO05.DTD のパスを取得"""
+    return Path(__file__).parent.parent.parent / "templates" / "PHOTO05.DTD"
+
+
+@dataclass(frozen=True)
+class ElementModel:
+    """コンパイル済みの要素宣言"""
+
+    name: str
+    # 内容モデルの宣言文字列（エラーメッセージ用）
+    declaration: str
+    # 内容モデルの字句
+    tokens: Tuple[str, ...]
+    # 子要素の並び（1要素1文字に変換した文字列）に対する正規表現（#PCDATAのみの場合はNone）
+    pattern: Optional["re.Pattern"]
+    # 出現必須の子要素
+    required: Tuple[str, ...]
+    # 文字データを記述できるか
+    text_allowed: bool = False
+
+
+@dataclass
+class DTDError:
+    """DTD適合エラー"""
+
+    # 写真情報のシリアル番号（基礎情報など写真情報外のエラーはNone）
+    serial_number: Optional[str]
+    element: str
+    message: str
+
+    def as_dict(self) -> Dict:
+        """レスポンス用の辞書に変換"""
+        return {
+            "serial_number": self.serial_number,
+            "element": self.element,
+            "message": self.message,
+        }
+
+    def __str__(self) -> str:
+        prefix = f"シリアル番号 {self.serial_number}: " if self.serial_number else ""
+        return f"{prefix}<{self.element}> {self.message}"
+
+
+class PhotoXMLSchema:
+    """DTDをコンパイルした検査モデル"""
+
+    def __init__(self, dtd_text: str):
+        """
+        Args:
+            dtd_text: DTDの内容
+        """
+        dtd_text = _COMMENT.sub("", dtd_text)
+        declarations = _ELEMENT_DECL.findall(dtd_text)
+        # 要素名を私用領域の1文字に対応付け、子要素の並びを文字列として照合する
+        self.symbols = {
+            name: chr(0xE000 + index) for index, (name, _) in enumerate(declarations)
+        }
+        self.elements = {
+            name: self._compile(name, model.strip()) for name, model in declarations
+        }
+        self.fixed_attributes: Dict[str, Dict[str, str]] = {}
+        for element, attribute, value in _FIXED_ATTR_DECL.findall(dtd_text):
+            self.fixed_attributes.setdefault(element, {})[attribute] = value
+        self.root = declarations[0][0] if declarations else None
+
+    def _compile(self, name: str, model: str) -> ElementModel:
+        """内容モデルを正規表現に変換"""
+        tokens = tuple(_MODEL_TOKEN.findall(model))
+        if model == "(#PCDATA)":
+            return ElementModel(name, model, tokens, None, (), True)
+        if model == "EMPTY":
+            return ElementModel(name, model, tokens, re.compile(""), ())
+        if model == "ANY":
+            return ElementModel(name, model, tokens, re.compile(".*", re.S), (), True)
+
+        if "#PCDATA" in tokens:
+            # 混合内容（#PCDATA|a|b）*：宣言された子要素を任意順・任意個数で許可
+            allowed = "".join(
+                re.escape(self.symbols[t]) for t in tokens if t in self.symbols
+            )
+            pattern = f"[{allowed}]*" if allowed else ""
+            return ElementModel(name, model, tokens, re.compile(pattern), (), True)
+
+        regex = []
+        for token in tokens:
+            if token == "(":
+                regex.append("(?:")
+            elif token in ")|?*+":
+                regex.append(token)
+            elif token == ",":
+                continue
+            else:
+                regex.append(re.escape(self.symbols[token]))
+        return ElementModel(
+            name, model, tokens, re.compile("".join(regex)), self._required(tokens)
+        )
+
+    def fragment_pattern(self, name: str) -> Optional["re.Pattern"]:
+        """
+        要素1つ分（開始タグから終了タグまで）の出力全体に一致する正規表現を組み立て
+
+        子孫要素の並び・文字数もすべて正規表現に含めます。属性は許可しません。
+
+        Args:
+            name: 要素名
+
+        Returns:
+            正規表現（再帰的な定義・ANY・混合内容を含む場合はNone）
+        """
+        regex = self._fragment_regex(name, ())
+        return re.compile(regex) if regex is not None else None
+
+    def _fragment_regex(self, name: str, ancestors: Tuple[str, ...]) -> Optional[str]:
+        model = self.elements.get(name)
+        if model is None or name in ancestors:
+            return None
+        tag = re.escape(name)
+        empty = f"<{tag}\\s*/>"
+        if model.pattern is None:
+            limit = LENGTH_LIMITS.get(name)
+            quantifier = f"{{0,{limit}}}" if limit is not None else "*"
+            return f"(?:<{tag}>{_TEXT_CHAR}{quantifier}</{tag}>|{empty})"
+        if model.text_allowed:
+            return None
+
+        regex = []
+        for token in model.tokens:
+            if token == "(":
+                regex.append("(?:")
+            elif token in ")|?*+":
+                regex.append(token)
+            elif token != ",":
+                child = self._fragment_regex(token, ancestors + (name,))
+                if child is None:
+                    return None
+                regex.append(f"(?:{child}\\s*)")
+        content = f"<{tag}>\\s*{''.join(regex)}</{tag}>"
+        if model.pattern.fullmatch(""):
+            content = f"(?:{content}|{empty})"
+        return content
+
+    @staticmethod
+    def _required(tokens: Sequence[str]) -> Tuple[str, ...]:
+        """最上位の並び（選択を含まない場合）で出現必須の子要素"""
+        if tokens[0] != "(" or "|" in tokens:
+            return ()
+        required = []
+        depth = 0
+        for index, token in enumerate(tokens):
+            if token == "(":
+                depth += 1
+            elif token == ")":
+                depth -= 1
+            elif depth == 1 and token not in ",?*+":
+                following = tokens[index + 1] if index + 1 < len(tokens) else ""
+                if following not in ("?", "*"):
+                    required.append(token)
+        return tuple(required)
+
+
+@lru_cache()
+def get_photo05_schema() -> PhotoXMLSchema:
+    """
+    PHOTO05.DTD のコンパイル済みモデルを取得
+
+    Returns:
+        PhotoXMLSchema
+    """
+    return PhotoXMLSchema(get_dtd_path().read_text(encoding="utf-8"))
+
+
+class PhotoXMLDTDValidator:
+    """PHOTO.XMLの逐次DTD適合チェッカー"""
+
+    PHOTO_ELEMENT = "写真情報"
+    SERIAL_ELEMENT = "シリアル番号"
+
+    def __init__(
+        self,
+        schema: Optional[PhotoXMLSchema] = None,
+        encoding: str = "shift_jis",
+        max_errors: int = MAX_ERRORS,
+    ):
+        """
+        Args:
+            schema: 検査モデル（省略時はPHOTO05.DTD）
+            encoding: 入力バイト列の文字コード
+            max_errors: 記録するエラーの最大件数（件数自体は全件数える）
+        """
+        self.schema = schema or get_photo05_schema()
+        self.max_errors = max_errors
+        self.errors: List[DTDError] = []
+        self.error_count = 0
+        self.photo_count = 0
+        self._decoder = codecs.getincrementaldecoder(encoding)()
+        # expatはShift_JISを扱えないため、デコードした文字列を渡す
+        self._parser = pyexpat.ParserCreate("utf-8")
+        self._parser.buffer_text = True
+        self._parser.StartElementHandler = self._start
+        self._parser.EndElementHandler = self._end
+        self._parser.CharacterDataHandler = self._characters
+        self._stack: List[list] = []
+        self._serial: Optional[str] = None
+        self._closed = False
+        # 写真情報の高速経路（1枚分の文字列をまとめて正規表現で照合）
+        self._photo_pattern = self.schema.fragment_pattern(self.PHOTO_ELEMENT)
+        self._photo_start = f"<{self.PHOTO_ELEMENT}>"
+        self._photo_end = f"</{self.PHOTO_ELEMENT}>"
+        self._photo_symbol = self.schema.symbols.get(self.PHOTO_ELEMENT)
+        self._pending = ""
+
+    def feed(self, data: bytes) -> None:
+        """
+        出力されたバイト列を検査
+
+        Args:
+            data: PHOTO.XMLの一部
+        """
+        text = self._decoder.decode(data)
+        if not text:
+            return
+        if self._photo_pattern is None:
+            self._parse(text, False)
+        else:
+            self._pending += text
+            self._consume_photos(self._photo_pattern)
+
+    def close(self) -> List[DTDError]:
+        """
+        検査を終了
+
+        Returns:
+            記録したエラーのリスト
+        """
+        if not self._closed:
+            self._pending += self._decoder.decode(b"", final=True)
+            self._parse(self._pending, True)
+            self._pending = ""
+            self._closed = True
+        return self.errors
+
+    @property
+    def is_valid(self) -> bool:
+        """エラーがないかどうか"""
+        return self.error_count == 0
+
+    def _consume_photos(self, photo_pattern: Pattern[str]) -> None:
+        """完結した写真情報を照合し、それ以外の部分をexpatへ渡す"""
+        pending = self._pending
+        position = 0
+        while not self._closed:
+            start = pending.find(self._photo_start, position)
+            if start < 0:
+                # 開始タグが分割されている可能性がある末尾は次回に持ち越す
+                keep = max(position, len(pending) - len(self._photo_start) + 1)
+                self._parse(pending[position:keep], False)
+                position = keep
+                break
+            end = pending.find(self._photo_end, start)
+            if end < 0:
+                self._parse(pending[position:start], False)
+                position = start
+                break
+            end += len(self._photo_end)
+            between = pending[position:start]
+            if not (self._stack and between.isspace()):
+                # 写真情報間の空白（要素内容の区切り）は検査不要
+                self._parse(between, False)
+            fragment = pending[start:end]
+            if self._stack and photo_pattern.fullmatch(fragment):
+                # 検査済みの写真情報は親要素の子として記録するのみ
+                self.photo_count += 1
+                self._stack[-1][1].append(self._photo_symbol)
+            else:
+                self._parse(fragment, False)
+            position = end
+        self._pending = pending[position:]
+
+    def _parse(self, text: str, final: bool) -> None:
+        if self._closed or (not text and not final):
+            return
+        try:
+            self._parser.Parse(text, final)
+        except pyexpat.ExpatError as e:
+            self._error(
+                self._stack[-1][0] if self._stack else "",
+                f"XMLの構文が不正です: {pyexpat.ErrorString(e.code)}",
+            )
+            self._closed = True
+
+    def _error(self, element: str, message: str) -> None:
+        self.error_count += 1
+        if len(self.errors) < self.max_errors:
+            self.errors.append(
+                DTDError(
+                    serial_number=self._serial,
+                    element=element,
+                    message=message,
+                )
+            )
+
+    def _start(self, name: str, attributes: Dict[str, str]) -> None:
+        symbols = self.schema.symbols
+        if self._stack:
+            parent = self._stack[-1]
+            parent[1].append(symbols.get(name, "\x00"))
+        elif name != self.schema.root:
+            self._error(name, f"ルート要素は <{self.schema.root}> である必要があります")
+
+        if name == self.PHOTO_ELEMENT:
+            self.photo_count += 1
+            self._serial = None
+        if name not in symbols:
+            self._error(name, "DTDで宣言されていない要素です")
+
+        fixed = self.schema.fixed_attributes.get(name)
+        if fixed:
+            for attribute, value in fixed.items():
+                if attributes.get(attribute, value) != value:
+                    self._error(
+                        name, f'属性 {attribute} は "{value}" である必要があります'
+                    )
+        # [要素名, 子要素の記号, 文字数, シリアル番号の文字列]
+        self._stack.append([name, [], 0, None])
+
+    def _characters(self, data: str) -> None:
+        if self._stack:
+            current = self._stack[-1]
+            current[2] += len(data)
+            if current[0] == self.SERIAL_ELEMENT:
+                current[3] = (current[3] or "") + data
+            elif not data.isspace():
+                model = self.schema.elements.get(current[0])
+                if model is not None and not model.text_allowed:
+                    self._error(current[0], "文字データは記述できません")
+
+    def _end(self, name: str) -> None:
+        _, children, length, text = self._stack.pop()
+        model = self.schema.elements.get(name)
+        if model is None:
+            return
+
+        if model.pattern is None:
+            if children:
+                self._error(name, "子要素は記述できません")
+            limit = LENGTH_LIMITS.get(name)
+            if limit is not None and length > limit:
+                self._error(name, f"{limit}文字を超えています（{length}文字）")
+            if name == self.SERIAL_ELEMENT:
+                self._serial = text or ""
+        elif not model.pattern.fullmatch("".join(children)):
+            self._content_error(model, children)
+
+        if name == self.PHOTO_ELEMENT:
+            self._serial = None
+
+    def _content_error(self, model: ElementModel, children: List[str]) -> None:
+        names = {symbol: name for name, symbol in self.schema.symbols.items()}
+        actual = [names.get(symbol, "?") for symbol in children]
+        missing = [name for name in model.required if name not in actual]
+        if missing:
+            for name in missing:
+                self._error(model.name, f"必須要素 <{name}> がありません")
+        else:
+            self._error(
+                model.name,
+                f"子要素の並びが不正です（定義: {model.declaration}, 実際: ({','.join(actual)})）",
+            )
+
+
+class DTDValidatingStream:
+    """書き込み先へ出力しながらDTD適合チェックを行うストリーム"""
+
+    def __init__(
+        self, stream: Optional[WritableStream], validator: PhotoXMLDTDValidator
+    ) -> None:
+        """
+        Args:
+            stream: 書き込み先（Noneの場合は検査のみ）
+            validator: DTD適合チェッカー
+        """
+        self.stream = stream
+        self.validator = validator
+
+    def write(self, data: bytes) -> int:
+        self.validator.feed(data)
+        if self.stream is not None:
+            self.stream.write(data)
+        return len(data)
@@ -0,0 +1,217 @@
+"""
+PHOTO.XML 写真情報フラグメントキャッシュ
+
+写真1枚分の写真情報要素をShift_JISエンコード済みのバイト列でキャッシュします。
+キーは写真ID・updated_at・ファイル名・生成器バージョンで、写真が更新されると
+自動的に別キーになります（ファイル名はエクスポート時にPnnnnnnn.JPGへ置き換わるため含める）。
+シリアル番号は出力順で決まるため、キャッシュには数字の位置を記録しておき、
+組み立て時に差し替えます。
+
+REDIS_URL が設定されている場合はRedis（複数ノードで共有）、
+未設定の場合はプロセス内のLRUキャッシュを使用します。
+"""
+
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union, cast
+
+from app.config import settings
+
+try:
+    import redis
+except ImportError:  # pragma: no cover - redisは任意依存
+    redis = None  # type: ignore[assignment]
+
+
+@dataclass(frozen=True)
+class PhotoXMLFragment:
+    """エンコード済みの写真情報フラグメント"""
+
+    data: bytes
+    # シリアル番号（7桁）の開始位置
+    serial_offsets: Tuple[int, ...]
+
+    def with_serial(self, serial: bytes) -> bytes:
+        """
+        シリアル番号を差し替えたバイト列を取得
+
+        Args:
+            serial: 7桁のシリアル番号（ASCII）
+
+        Returns:
+            写真情報要素のバイト列
+        """
+        if len(self.serial_offsets) == 1:
+            offset = self.serial_offsets[0]
+            return self.data[:offset] + serial + self.data[offset + len(serial) :]
+        buffer = bytearray(self.data)
+        for offset in self.serial_offsets:
+            buffer[offset : offset + len(serial)] = serial
+        return bytes(buffer)
+
+    def encode(self) -> bytes:
+        """保存用にシリアライズ（"位置,位置|" + データ）"""
+        header = ",".join(str(offset) for offset in self.serial_offsets)
+        return header.encode("ascii") + b"|" + self.data
+
+    @classmethod
+    def decode(cls, raw: bytes) -> "PhotoXMLFragment":
+        """保存形式から復元"""
+        header, data = raw.split(b"|", 1)
+        offsets = tuple(int(offset) for offset in header.split(b",") if offset)
+        return cls(data=data, serial_offsets=offsets)
+
+
+@dataclass
+class FragmentCacheStats:
+    """1回のXML組み立てにおけるキャッシュ利用状況"""
+
+    hits: int = 0
+    misses: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        """ヒット率（0.0-1.0）"""
+        total = self.hits + self.misses
+        return round(self.hits / total, 4) if total else 0.0
+
+    def as_dict(self) -> Dict:
+        """レスポンス用の辞書に変換"""
+        return {"hits": self.hits, "misses": self.misses, "hit_rate": self.hit_rate}
+
+
+class InMemoryPhotoXMLFragmentCache:
+    """プロセス内のフラグメントキャッシュ（合計バイト数上限のLRU）"""
+
+    def __init__(self, max_bytes: int = 128 * 1024 * 1024):
+        """
+        Args:
+            max_bytes: キャッシュする合計バイト数の上限
+        """
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, PhotoXMLFragment]" = OrderedDict()
+        self._bytes = 0
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, PhotoXMLFragment]:
+        """
+        複数キーをまとめて取得
+
+        Args:
+            keys: キャッシュキー
+
+        Returns:
+            キー→フラグメント（存在するもののみ）
+        """
+        found = {}
+        with self._lock:
+            for key in keys:
+                fragment = self._entries.get(key)
+                if fragment is not None:
+                    self._entries.move_to_end(key)
+                    found[key] = fragment
+        return found
+
+    def put_many(self, fragments: Dict[str, PhotoXMLFragment]) -> None:
+        """
+        複数フラグメントをまとめて保存
+
+        Args:
+            fragments: キー→フラグメント
+        """
+        with self._lock:
+            for key, fragment in fragments.items():
+                previous = self._entries.pop(key, None)
+                if previous is not None:
+                    self._bytes -= len(previous.data)
+                if len(fragment.data) > self.max_bytes:
+                    continue
+                self._entries[key] = fragment
+                self._bytes += len(fragment.data)
+            while self._bytes > self.max_bytes and self._entries:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= len(evicted.data)
+
+    @property
+    def size_bytes(self) -> int:
+        """現在のキャッシュ合計バイト数"""
+        return self._bytes
+
+    def clear(self) -> None:
+        """全エントリを削除"""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+
+class RedisPhotoXMLFragmentCache:
+    """Redisを使用したフラグメントキャッシュ（複数ノードで共有）"""
+
+    KEY_PREFIX = "photo_xml_fragment"
+
+    def __init__(self, url: str, ttl_seconds: int):
+        """
+        Args:
+            url: Redis接続URL
+            ttl_seconds: エントリの保持秒数
+        """
+        if redis is None:
+            raise RuntimeError("redisパッケージがインストールされていません")
+        self.ttl_seconds = ttl_seconds
+        self._redis = redis.Redis.from_url(url)
+
+    def _key(self, key: str) -> str:
+        return f"{self.KEY_PREFIX}:{key}"
+
+    def ping(self) -> bool:
+        """接続確認"""
+        return bool(self._redis.ping())
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, PhotoXMLFragment]:
+        """複数キーをまとめて取得（1往復）"""
+        keys = list(keys)
+        if not keys:
+            return {}
+        values = cast(List[Any], self._redis.mget([self._key(key) for key in keys]))
+        return {
+            key: PhotoXMLFragment.decode(raw)
+            for key, raw in zip(keys, values)
+            if raw is not None
+        }
+
+    def put_many(self, fragments: Dict[str, PhotoXMLFragment]) -> None:
+        """複数フラグメントをまとめて保存（1往復）"""
+        if not fragments:
+            return
+        pipe = self._redis.pipeline(transaction=False)
+        for key, fragment in fragments.items():
+            pipe.set(self._key(key), fragment.encode(), ex=self.ttl_seconds)
+        pipe.execute()
+
+
+# フラグメントキャッシュの実装（PhotoXMLGeneratorはどちらも同じメソッドで扱う）
+PhotoXMLFragmentCache = Union[InMemoryPhotoXMLFragmentCache, RedisPhotoXMLFragmentCache]
+
+
+@lru_cache()
+def get_photo_xml_fragment_cache() -> PhotoXMLFragmentCache:
+    """
+    フラグメントキャッシュのシングルトンインスタンスを取得
+
+    Returns:
+        RedisPhotoXMLFragmentCache（REDIS_URL設定時）またはInMemoryPhotoXMLFragmentCache
+    """
+    if settings.REDIS_URL and redis is not None:
+        try:
+            cache = RedisPhotoXMLFragmentCache(
+                settings.REDIS_URL, settings.PHOTO_XML_FRAGMENT_CACHE_TTL_SECONDS
+            )
+            cache.ping()
+            return cache
+        except Exception as e:
+            print(
+                f"Warning: Redisに接続できないためインメモリのフラグメントキャッシュを使用します: {e}"
+            )
+    return InMemoryPhotoXMLFragmentCache(settings.PHOTO_XML_FRAGMENT_CACHE_BYTES)
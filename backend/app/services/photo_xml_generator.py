@@ -2,18 +2,48 @@
 PHOTO.XML生成サービス
 
 デジタル写真管理情報基準（PHOTO05.DTD）準拠のXML生成
+
+写真情報は1枚ずつ要素を組み立てて逐次出力するため、写真数が多くても
+文書全体をメモリ上に保持しません。フラグメントキャッシュを指定すると、
+エンコード済みの写真情報を再利用し、シリアル番号のみ差し替えます。
 """
 
-from typing import List, Dict, Optional
+from itertools import islice
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
 import xml.etree.ElementTree as ET
 from xml.dom import minidom
 import re
 from datetime import datetime
 
+from app.services.metrics import metrics
+from app.services.photo_xml_fragment_cache import (
+    FragmentCacheStats,
+    PhotoXMLFragment,
+    PhotoXMLFragmentCache,
+)
+from app.services.zip_writer import WritableStream
+
+XML_DECLARATION = '<?xml version="1.0" encoding="Shift_JIS"?>\n'
+DOCTYPE = '<!DOCTYPE photodata SYSTEM "PHOTO05.DTD">\n'
+XML_ENCODING = "shift_jis"
+PRETTY_INDENT = "  "
+
+# ストリームへの書き込み単位（バイト）
+WRITE_BUFFER_SIZE = 64 * 1024
+
+# フラグメントキャッシュをまとめて参照する写真数
+FRAGMENT_BATCH_SIZE = 500
+
+SERIAL_DIGITS = 7
+SERIAL_OPEN_TAG = "<シリアル番号>".encode(XML_ENCODING)
+
 
 class PhotoXMLGenerator:
     """PHOTO.XML生成クラス"""
 
+    # 写真情報の出力形式のバージョン（変更時はキャッシュ済みフラグメントが無効になる）
+    FRAGMENT_VERSION = "2"
+
     def __init__(self):
         """初期化"""
         self.dtd_version = "05"
@@ -31,10 +61,208 @@ class PhotoXMLGenerator:
         Returns:
             生成されたXML文字列
         """
-        # XML宣言とDOCTYPE
-        xml_declaration = '<?xml version="1.0" encoding="Shift_JIS"?>\n'
-        doctype = '<!DOCTYPE photodata SYSTEM "PHOTO05.DTD">\n'
+        return "".join(self.iter_xml(photos, pretty_print=pretty_print))
+
+    def write_xml(
+        self,
+        photos: Iterable[Dict],
+        stream: WritableStream,
+        pretty_print: bool = False,
+        fragment_cache: Optional[PhotoXMLFragmentCache] = None,
+        cache_stats: Optional[FragmentCacheStats] = None,
+        first_serial: int = 1,
+    ) -> int:
+        """
+        PHOTO.XMLをShift_JISでストリームに書き込み
+
+        ファイルやZIPエントリ（ZipFile.open(name, "w")）に直接書き込めます。
+        写真データはイテレータでもよく、1枚ずつ消費されます。
+
+        Args:
+            photos: 写真データ（リストまたはイテレータ）
+            stream: 書き込み先のバイナリストリーム
+            pretty_print: 整形出力するかどうか
+            fragment_cache: 写真情報フラグメントキャッシュ（省略時は使用しない）
+            cache_stats: キャッシュ利用状況の集計先
+            first_serial: 先頭写真のシリアル番号（媒体分割時は2巻目以降で通し番号を継続）
+
+        Returns:
+            書き込んだバイト数
+        """
+        written = 0
+        buffer = []
+        buffered = 0
+        for data in self.iter_xml_bytes(
+            photos,
+            pretty_print=pretty_print,
+            fragment_cache=fragment_cache,
+            cache_stats=cache_stats,
+            first_serial=first_serial,
+        ):
+            buffer.append(data)
+            buffered += len(data)
+            if buffered >= WRITE_BUFFER_SIZE:
+                stream.write(b"".join(buffer))
+                written += buffered
+                buffer = []
+                buffered = 0
+        if buffer:
+            stream.write(b"".join(buffer))
+            written += buffered
+        return written
+
+    def iter_xml_bytes(
+        self,
+        photos: Iterable[Dict],
+        pretty_print: bool = False,
+        fragment_cache: Optional[PhotoXMLFragmentCache] = None,
+        cache_stats: Optional[FragmentCacheStats] = None,
+        first_serial: int = 1,
+    ) -> Iterator[bytes]:
+        """
+        PHOTO.XMLをShift_JISエンコード済みの断片ごとに生成
+
+        フラグメントキャッシュを指定した場合、写真ID・updated_at・ファイル名・生成器バージョンが
+        一致する写真情報はキャッシュのバイト列にシリアル番号を差し替えて出力します。
+        キャッシュは FRAGMENT_BATCH_SIZE 件ずつまとめて参照・保存します。
+
+        Args:
+            photos: 写真データ（リストまたはイテレータ。キャッシュ利用時は id と updated_at が必要）
+            pretty_print: 整形出力するかどうか
+            fragment_cache: 写真情報フラグメントキャッシュ（省略時は使用しない）
+            cache_stats: キャッシュ利用状況の集計先
+            first_serial: 先頭写真のシリアル番号
+
+        Yields:
+            XMLのバイト列の断片
+        """
+        yield self._xml_header(pretty_print).encode(XML_ENCODING)
+
+        if fragment_cache is None:
+            for idx, photo in enumerate(photos, start=first_serial):
+                yield self.serialize_photo_info(photo, idx, pretty_print).encode(
+                    XML_ENCODING
+                )
+        else:
+            stats = cache_stats if cache_stats is not None else FragmentCacheStats()
+            version = self.fragment_version(pretty_print)
+            iterator = iter(photos)
+            serial = first_serial
+            while True:
+                batch = list(islice(iterator, FRAGMENT_BATCH_SIZE))
+                if not batch:
+                    break
+                keys = [self.fragment_cache_key(photo, version) for photo in batch]
+                cached = fragment_cache.get_many(key for key in keys if key)
+                rendered = {}
+                for photo, key in zip(batch, keys):
+                    fragment = cached.get(key) if key else None
+                    if fragment is not None:
+                        stats.hits += 1
+                        yield fragment.with_serial(
+                            self.format_serial_number(serial).encode("ascii")
+                        )
+                    else:
+                        stats.misses += 1
+                        fragment = self.render_photo_fragment(
+                            photo, serial, pretty_print
+                        )
+                        if key and fragment.serial_offsets:
+                            rendered[key] = fragment
+                        yield fragment.data
+                    serial += 1
+                fragment_cache.put_many(rendered)
+
+            metrics.inc("photo_xml_fragment_cache_hits_total", stats.hits)
+            metrics.inc("photo_xml_fragment_cache_misses_total", stats.misses)
+
+        yield self._xml_footer(pretty_print).encode(XML_ENCODING)
+
+    def fragment_version(self, pretty_print: bool = False) -> str:
+        """
+        フラグメントキャッシュのバージョン文字列を取得
+
+        Args:
+            pretty_print: 整形出力するかどうか
+
+        Returns:
+            出力形式・DTDバージョン・適用要領基準を含むバージョン文字列
+        """
+        layout = "pretty" if pretty_print else "compact"
+        return f"{self.FRAGMENT_VERSION}-{self.dtd_version}-{self.standard}-{layout}"
+
+    def fragment_cache_key(self, photo: Dict, version: str) -> Optional[str]:
+        """
+        写真情報フラグメントのキャッシュキーを生成
+
+        ファイル名は写真の更新とは無関係に置き換えられる（エクスポート時のリネーム）ため、
+        キーに含めます。
+
+        Args:
+            photo: 写真データ
+            version: fragment_version の戻り値
+
+        Returns:
+            キャッシュキー（id または updated_at がない場合はNone）
+        """
+        photo_id = photo.get("id")
+        updated_at = photo.get("updated_at")
+        if photo_id is None or not updated_at:
+            return None
+        if isinstance(updated_at, datetime):
+            updated_at = updated_at.isoformat()
+        return f"{version}:{photo_id}:{updated_at}:{photo.get('file_name', '')}"
+
+    def render_photo_fragment(
+        self, photo: Dict, serial: int, pretty_print: bool = False
+    ) -> PhotoXMLFragment:
+        """
+        写真情報をエンコード済みフラグメントとして生成
+
+        Args:
+            photo: 写真データ
+            serial: シリアル番号
+            pretty_print: 整形出力するかどうか
+
+        Returns:
+            フラグメント（シリアル番号が7桁を超える場合は差し替え位置なし）
+        """
+        data = self.serialize_photo_info(photo, serial, pretty_print).encode(
+            XML_ENCODING
+        )
+        offsets: Tuple[int, ...] = ()
+        position = data.find(SERIAL_OPEN_TAG)
+        if position >= 0 and len(self.format_serial_number(serial)) == SERIAL_DIGITS:
+            offsets = (position + len(SERIAL_OPEN_TAG),)
+        return PhotoXMLFragment(data=data, serial_offsets=offsets)
+
+    def iter_xml(
+        self, photos: Iterable[Dict], pretty_print: bool = False
+    ) -> Iterator[str]:
+        """
+        PHOTO.XMLを断片ごとに生成
+
+        写真情報は1枚ごとに1つの断片として返します。
+        出力は従来のElementTree全体の直列化（整形時はminidomによる整形）と
+        同一です。
+
+        Args:
+            photos: 写真データ（リストまたはイテレータ）
+            pretty_print: 整形出力するかどうか
+
+        Yields:
+            XML文字列の断片
+        """
+        yield self._xml_header(pretty_print)
+
+        # 写真情報（各写真ごと）
+        for idx, photo in enumerate(photos, start=1):
+            yield self.serialize_photo_info(photo, idx, pretty_print)
 
+        yield self._xml_footer(pretty_print)
+
+    def _xml_header(self, pretty_print: bool) -> str:
+        """XML宣言・DOCTYPE・ルート開始タグ・基礎情報"""
         # ルート要素
         root = ET.Element("photodata", attrib={"DTD_version": self.dtd_version})
 
@@ -45,17 +273,98 @@ class PhotoXMLGenerator:
         standard_elem = ET.SubElement(basic_info, "適用要領基準")
         standard_elem.text = self.standard
 
-        # 写真情報（各写真ごと）
-        for idx, photo in enumerate(photos, start=1):
-            self._add_photo_info(root, photo, idx)
+        return (
+            XML_DECLARATION
+            + DOCTYPE
+            + self._start_tag(root)
+            + ("\n" if pretty_print else "")
+            + self.serialize_element(basic_info, pretty_print, depth=1)
+        )
+
+    def _xml_footer(self, pretty_print: bool) -> str:
+        """ルート終了タグ"""
+        return "</photodata>" + ("\n" if pretty_print else "")
+
+    def serialize_photo_info(
+        self, photo: Dict, serial: int, pretty_print: bool = False
+    ) -> str:
+        """
+        写真情報1件分のXML断片を生成
+
+        Args:
+            photo: 写真データ
+            serial: シリアル番号
+            pretty_print: 整形出力するかどうか
+
+        Returns:
+            写真情報要素のXML文字列
+        """
+        holder = ET.Element("photodata")
+        self._add_photo_info(holder, photo, serial)
+        return self.serialize_element(holder[0], pretty_print, depth=1)
 
-        # XML文字列生成
+    def serialize_element(
+        self, elem: ET.Element, pretty_print: bool = False, depth: int = 0
+    ) -> str:
+        """
+        要素を直列化
+
+        整形しない場合は ET.tostring と、整形する場合は minidom の
+        toprettyxml(indent="  ") と同じ形式で出力します（混在内容は非対応）。
+
+        Args:
+            elem: XML要素
+            pretty_print: 整形出力するかどうか
+            depth: インデントの深さ（整形時のみ使用）
+
+        Returns:
+            XML文字列
+        """
+        parts: List[str] = []
         if pretty_print:
-            xml_str = self._prettify_xml(root)
+            self._write_pretty(elem, parts.append, PRETTY_INDENT * depth)
         else:
-            xml_str = ET.tostring(root, encoding="unicode")
-
-        return xml_declaration + doctype + xml_str
+            self._write_compact(elem, parts.append)
+        return "".join(parts)
+
+    def _start_tag(self, elem: ET.Element) -> str:
+        if not elem.attrib:
+            return f"<{elem.tag}>"
+        attrs = "".join(
+            f' {name}="{_escape_pretty(value)}"' for name, value in elem.attrib.items()
+        )
+        return f"<{elem.tag}{attrs}>"
+
+    def _write_compact(self, elem: ET.Element, write: Callable[[str], object]) -> None:
+        """ET.tostring と同じ形式で要素を出力"""
+        if len(elem) or elem.text:
+            write(self._start_tag(elem))
+            if elem.text:
+                write(_escape_compact(elem.text))
+            for child in elem:
+                self._write_compact(child, write)
+            write(f"</{elem.tag}>")
+        else:
+            write(self._start_tag(elem)[:-1] + " />")
+
+    def _write_pretty(
+        self, elem: ET.Element, write: Callable[[str], object], indent: str
+    ) -> None:
+        """minidom の toprettyxml と同じ形式で要素を出力"""
+        if len(elem):
+            write(indent + self._start_tag(elem) + "\n")
+            for child in elem:
+                self._write_pretty(child, write, indent + PRETTY_INDENT)
+            write(f"{indent}</{elem.tag}>\n")
+        elif elem.text:
+            write(
+                indent
+                + self._start_tag(elem)
+                + _escape_pretty(_normalize_newlines(elem.text))
+                + f"</{elem.tag}>\n"
+            )
+        else:
+            write(indent + self._start_tag(elem)[:-1] + "/>\n")
 
     def _add_photo_info(self, root: ET.Element, photo: Dict, serial: int):
         """
@@ -142,7 +451,7 @@ class PhotoXMLGenerator:
 
     def _prettify_xml(self, elem: ET.Element) -> str:
         """
-        XMLを整形
+        XMLをDOM経由で整形（従来方式。逐次出力との互換性確認用）
 
         Args:
             elem: XML要素
@@ -220,6 +529,10 @@ class PhotoXMLGenerator:
         if re.match(r"^\d{4}-\d{2}-\d{2}$", date_str):
             return date_str
 
+        # ISO 8601の日時形式（CCYY-MM-DDThh:mm:ss）の場合は日付部分のみ
+        if re.match(r"^\d{4}-\d{2}-\d{2}[T ]", date_str):
+            return date_str[:10]
+
         # CCYYMMDD形式の場合
         if re.match(r"^\d{8}$", date_str):
             return f"{date_str[:4]}-{date_str[4:6]}-{date_str[6:]}"
@@ -308,3 +621,36 @@ class PhotoXMLGenerator:
         text = text.replace("'", "&apos;")
 
         return text
+
+
+def _escape_compact(text: str) -> str:
+    """ElementTreeと同じテキストのエスケープ"""
+    if "&" in text:
+        text = text.replace("&", "&amp;")
+    if "<" in text:
+        text = text.replace("<", "&lt;")
+    if ">" in text:
+        text = text.replace(">", "&gt;")
+    return text
+
+
+_PRETTY_ESCAPE_CHARS = re.compile(r'[&<">]')
+
+
+def _escape_pretty(text: str) -> str:
+    """minidomと同じテキスト・属性値のエスケープ"""
+    if not _PRETTY_ESCAPE_CHARS.search(text):
+        return text
+    return (
+        text.replace("&", "&amp;")
+        .replace("<", "&lt;")
+        .replace('"', "&quot;")
+        .replace(">", "&gt;")
+    )
+
+
+def _normalize_newlines(text: str) -> str:
+    """XMLパーサーによる改行の正規化（DOM経由の整形出力と一致させる）"""
+    if "\r" in text:
+        text = text.replace("\r\n", "\n").replace("\r", "\n")
+    return text
@@ -2,10 +2,25 @@
 Amazon Rekognition 画像分類サービス
 """
 
-from typing import List, Dict, Optional
-import boto3
+import random
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import List, Dict, Iterable, Iterator, Optional, Tuple
+
+from botocore.exceptions import ClientError
 from pydantic import BaseModel
 
+from app.services.aws_clients import create_aws_client
+
+# リトライ対象とするスロットリング系エラーコード
+THROTTLING_ERROR_CODES = {
+    "ThrottlingException",
+    "ProvisionedThroughputExceededException",
+    "LimitExceededException",
+}
+
 
 class ImageLabel(BaseModel):
     """画像ラベル"""
@@ -15,6 +30,163 @@ class ImageLabel(BaseModel):
     parents: List[str] = []
 
 
+class BatchLabelResult(BaseModel):
+    """一括ラベル検出の1件分の結果"""
+
+    photo_id: int
+    s3_key: str
+    success: bool
+    labels: List[Dict] = []
+    error: Optional[str] = None
+    attempts: int = 0
+    elapsed_seconds: float = 0.0
+
+
+def is_throttling_error(error: Exception) -> bool:
+    """スロットリングによるエラーかどうか判定"""
+    if not isinstance(error, ClientError):
+        return False
+    return error.response.get("Error", {}).get("Code") in THROTTLING_ERROR_CODES
+
+
+class AdaptiveConcurrencyLimiter:
+    """
+    スロットリングに応じて同時実行数を増減するリミッター
+
+    スロットリング発生時は上限を半減し（最小 min_concurrency）、
+    上限と同数の呼び出しが連続して成功するごとに1ずつ戻します（AIMD）。
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int,
+        min_concurrency: int = 1,
+        base_delay: float = 0.2,
+        max_delay: float = 10.0,
+    ):
+        """
+        初期化
+
+        Args:
+            max_concurrency: 同時実行数の上限
+            min_concurrency: スロットリング時に絞る下限
+            base_delay: バックオフの初期待機秒数
+            max_delay: バックオフの最大待機秒数
+        """
+        self.max_concurrency = max(max_concurrency, 1)
+        self.min_concurrency = max(min(min_concurrency, self.max_concurrency), 1)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.limit = self.max_concurrency
+        self.throttle_count = 0
+        self._in_flight = 0
+        self._successes = 0
+        self._cond = threading.Condition()
+
+    def acquire(self) -> None:
+        """実行枠を取得（空きがなければ待機）"""
+        with self._cond:
+            while self._in_flight >= self.limit:
+                self._cond.wait()
+            self._in_flight += 1
+
+    def release(self) -> None:
+        """実行枠を返却"""
+        with self._cond:
+            self._in_flight -= 1
+            self._cond.notify_all()
+
+    def on_success(self) -> None:
+        """成功を記録し、必要に応じて上限を戻す"""
+        with self._cond:
+            self._successes += 1
+            if self.limit < self.max_concurrency and self._successes >= self.limit:
+                self.limit += 1
+                self._successes = 0
+                self._cond.notify_all()
+
+    def on_throttle(self, attempt: int) -> float:
+        """
+        スロットリングを記録して上限を絞る
+
+        Args:
+            attempt: 何回目のリトライか（0始まり）
+
+        Returns:
+            次の呼び出しまでの待機秒数（指数バックオフ＋ジッター）
+        """
+        with self._cond:
+            self.throttle_count += 1
+            self.limit = max(self.min_concurrency, self.limit // 2)
+            self._successes = 0
+        delay = min(self.max_delay, self.base_delay * (2**attempt))
+        return random.uniform(delay / 2, delay)
+
+
+class ConstructionLabelMatcher:
+    """
+    建設関連キーワードのマッチャー
+
+    カテゴリごとのキーワードを1つの正規表現にまとめてコンパイルし、
+    ラベル名→カテゴリの判定結果をキャッシュします。Rekognitionのラベル語彙は
+    有限のため、大量の写真を処理してもほとんどのラベルはキャッシュで解決されます。
+    カテゴリの優先順位はキーワード辞書の定義順です。
+    """
+
+    def __init__(self, keywords: Dict[str, List[str]], cache_size: int = 10000):
+        """
+        初期化
+
+        Args:
+            keywords: カテゴリ→キーワードリスト
+            cache_size: ラベル名キャッシュの最大件数
+        """
+        self.cache_size = cache_size
+        self._patterns = [
+            (
+                category,
+                re.compile(
+                    "|".join(
+                        re.escape(keyword.lower())
+                        for keyword in sorted(words, key=len, reverse=True)
+                    )
+                ),
+            )
+            for category, words in keywords.items()
+            if words
+        ]
+        # キーワードそのものと一致するラベルは走査なしで解決
+        self._cache: Dict[str, Optional[str]] = {}
+        for keyword in (keyword for words in keywords.values() for keyword in words):
+            self._cache.setdefault(keyword.lower(), self._scan(keyword.lower()))
+
+    def _scan(self, name: str) -> Optional[str]:
+        for category, pattern in self._patterns:
+            if pattern.search(name):
+                return category
+        return None
+
+    def match(self, label_name: str) -> Optional[str]:
+        """
+        ラベル名のカテゴリを判定
+
+        Args:
+            label_name: ラベル名
+
+        Returns:
+            カテゴリ名（建設関連でない場合はNone）
+        """
+        name = label_name.lower()
+        try:
+            return self._cache[name]
+        except KeyError:
+            pass
+        category = self._scan(name)
+        if len(self._cache) < self.cache_size:
+            self._cache[name] = category
+        return category
+
+
 class RekognitionService:
     """Amazon Rekognition画像分類サービス"""
 
@@ -62,6 +234,9 @@ class RekognitionService:
         ],
     }
 
+    # クラス読み込み時に一度だけ構築
+    LABEL_MATCHER = ConstructionLabelMatcher(CONSTRUCTION_KEYWORDS)
+
     def __init__(self, confidence_threshold: float = 70.0):
         """
         初期化
@@ -70,7 +245,7 @@ class RekognitionService:
             confidence_threshold: 信頼度閾値（この値以上のラベルのみ抽出）
         """
         self.confidence_threshold = confidence_threshold
-        self.rekognition = boto3.client("rekognition")
+        self.rekognition = create_aws_client("rekognition")
 
     def detect_labels_from_image(
         self, s3_bucket: str, s3_key: str, max_labels: int = 50
@@ -105,6 +280,115 @@ class RekognitionService:
 
         return labels
 
+    def detect_labels_batch(
+        self,
+        photos: Iterable[Tuple[int, str]],
+        s3_bucket: str,
+        max_labels: int = 50,
+        max_concurrency: int = 8,
+        max_retries: int = 5,
+        limiter: Optional[AdaptiveConcurrencyLimiter] = None,
+    ) -> Iterator[BatchLabelResult]:
+        """
+        複数画像のラベルを並行して検出
+
+        スロットリング時は同時実行数を絞ってリトライし、その他のエラーは
+        該当写真のみ失敗として返します（バッチ全体は中断しません）。
+
+        Args:
+            photos: (写真ID, S3オブジェクトキー) のリスト
+            s3_bucket: S3バケット名
+            max_labels: 最大ラベル数
+            max_concurrency: 同時実行数の上限
+            max_retries: スロットリング時の最大リトライ回数
+            limiter: 同時実行数リミッター（省略時は max_concurrency で生成）
+
+        Yields:
+            写真ごとの検出結果（完了順）
+        """
+        limiter = limiter or AdaptiveConcurrencyLimiter(max_concurrency)
+
+        with ThreadPoolExecutor(
+            max_workers=limiter.max_concurrency,
+            thread_name_prefix="rekognition-batch",
+        ) as executor:
+            futures = [
+                executor.submit(
+                    self._detect_labels_with_retry,
+                    photo_id,
+                    s3_key,
+                    s3_bucket,
+                    max_labels,
+                    max_retries,
+                    limiter,
+                )
+                for photo_id, s3_key in photos
+            ]
+            for future in as_completed(futures):
+                yield future.result()
+
+    def _detect_labels_with_retry(
+        self,
+        photo_id: int,
+        s3_key: str,
+        s3_bucket: str,
+        max_labels: int,
+        max_retries: int,
+        limiter: AdaptiveConcurrencyLimiter,
+    ) -> BatchLabelResult:
+        """1枚分のラベル検出（スロットリング時は待機してリトライ）"""
+        started = time.monotonic()
+        attempt = 0
+        while True:
+            limiter.acquire()
+            try:
+                labels = self.detect_labels_from_image(
+                    s3_bucket=s3_bucket, s3_key=s3_key, max_labels=max_labels
+                )
+            except Exception as e:
+                error = e
+            else:
+                limiter.on_success()
+                return BatchLabelResult(
+                    photo_id=photo_id,
+                    s3_key=s3_key,
+                    success=True,
+                    labels=labels,
+                    attempts=attempt + 1,
+                    elapsed_seconds=time.monotonic() - started,
+                )
+            finally:
+                limiter.release()
+
+            if is_throttling_error(error) and attempt < max_retries:
+                time.sleep(limiter.on_throttle(attempt))
+                attempt += 1
+                continue
+
+            return BatchLabelResult(
+                photo_id=photo_id,
+                s3_key=s3_key,
+                success=False,
+                error=str(error),
+                attempts=attempt + 1,
+                elapsed_seconds=time.monotonic() - started,
+            )
+
+    def classify_label(self, label_name: str) -> Tuple[str, bool]:
+        """
+        ラベルのカテゴリと建設関連かどうかを判定
+
+        Args:
+            label_name: ラベル名
+
+        Returns:
+            (カテゴリ名（該当なしは"other"）, 建設関連かどうか)
+        """
+        category = self.LABEL_MATCHER.match(label_name)
+        if category is None:
+            return "other", False
+        return category, True
+
     def categorize_construction_labels(
         self, labels: List[Dict]
     ) -> Dict[str, List[str]]:
@@ -117,28 +401,7 @@ class RekognitionService:
         Returns:
             カテゴリ別ラベル辞書
         """
-        categorized = {
-            "equipment": [],
-            "people": [],
-            "safety": [],
-            "materials": [],
-            "scene": [],
-            "other": [],
-        }
-
-        for label in labels:
-            label_name = label["Name"].lower()
-            categorized_flag = False
-
-            for category, keywords in self.CONSTRUCTION_KEYWORDS.items():
-                if any(keyword in label_name for keyword in keywords):
-                    categorized[category].append(label["Name"])
-                    categorized_flag = True
-                    break
-
-            if not categorized_flag:
-                categorized["other"].append(label["Name"])
-
+        categorized, _ = self.categorize_and_summarize(labels)
         return categorized
 
     def filter_construction_related(self, labels: List[Dict]) -> List[Dict]:
@@ -151,19 +414,7 @@ class RekognitionService:
         Returns:
             建設関連ラベルのみのリスト
         """
-        all_keywords = [
-            keyword
-            for keywords in self.CONSTRUCTION_KEYWORDS.values()
-            for keyword in keywords
-        ]
-
-        filtered = []
-        for label in labels:
-            label_name = label["Name"].lower()
-            if any(keyword in label_name for keyword in all_keywords):
-                filtered.append(label)
-
-        return filtered
+        return [label for label in labels if self.classify_label(label["Name"])[1]]
 
     def create_image_label_summary(self, labels: List[Dict]) -> Dict:
         """
@@ -175,8 +426,43 @@ class RekognitionService:
         Returns:
             サマリー情報
         """
+        _, summary = self.categorize_and_summarize(labels)
+        return summary
+
+    def categorize_and_summarize(
+        self, labels: List[Dict]
+    ) -> Tuple[Dict[str, List[str]], Dict]:
+        """
+        カテゴリ分類とサマリー作成を1回の走査で行う
+
+        Args:
+            labels: ラベルリスト
+
+        Returns:
+            (カテゴリ別ラベル辞書, サマリー情報)
+        """
+        categorized = {
+            "equipment": [],
+            "people": [],
+            "safety": [],
+            "materials": [],
+            "scene": [],
+            "other": [],
+        }
+        has_construction_content = False
+        total_confidence = 0.0
+        max_confidence = 0.0
+
+        for label in labels:
+            category, related = self.classify_label(label["Name"])
+            categorized[category].append(label["Name"])
+            has_construction_content = has_construction_content or related
+            confidence = label.get("Confidence", 0.0)
+            total_confidence += confidence
+            max_confidence = max(max_confidence, confidence)
+
         if not labels:
-            return {
+            return categorized, {
                 "total_labels": 0,
                 "max_confidence": 0.0,
                 "avg_confidence": 0.0,
@@ -184,16 +470,14 @@ class RekognitionService:
                 "has_construction_content": False,
             }
 
-        confidences = [label["Confidence"] for label in labels]
-        sorted_labels = sorted(labels, key=lambda x: x["Confidence"], reverse=True)
-
-        # 建設関連コンテンツの有無
-        construction_related = self.filter_construction_related(labels)
+        sorted_labels = sorted(
+            labels, key=lambda x: x.get("Confidence", 0.0), reverse=True
+        )
 
-        return {
+        return categorized, {
             "total_labels": len(labels),
-            "max_confidence": max(confidences),
-            "avg_confidence": sum(confidences) / len(confidences),
+            "max_confidence": max_confidence,
+            "avg_confidence": total_confidence / len(labels),
             "top_labels": [label["Name"] for label in sorted_labels[:5]],
-            "has_construction_content": len(construction_related) > 0,
+            "has_construction_content": has_construction_content,
         }
@@ -0,0 +1,88 @@
+"""
+S3オブジェクトの先読み
+
+エクスポート・写真帳作成時に写真ファイルを順番どおりに取り出しつつ、後続の写真を
+最大 max_concurrency 件まで並行してダウンロードしておきます。
+保持するのは先読み中の数件分のみで、ローカルディスクには書き出しません
+（メモリ使用量の目安: (max_concurrency + 1) × 写真1枚のサイズ）。
+"""
+
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from typing import Any, Generator, Iterable, Tuple, Union, cast
+
+
+class S3ObjectPrefetcher:
+    """順序を保ったまま、同時実行数を制限してS3オブジェクトを先読み"""
+
+    def __init__(self, s3_client: Any, bucket: str, max_concurrency: int = 8) -> None:
+        """
+        初期化
+
+        Args:
+            s3_client: S3クライアント（boto3クライアントはスレッド間で共有可能）
+            bucket: バケット名
+            max_concurrency: 同時に取得するオブジェクト数の上限
+        """
+        self.s3_client = s3_client
+        self.bucket = bucket
+        self.max_concurrency = max(1, max_concurrency)
+
+    def fetch(self, key: str) -> bytes:
+        """
+        オブジェクトを1件取得
+
+        Args:
+            key: S3キー
+
+        Returns:
+            オブジェクトの内容
+        """
+        body = self.s3_client.get_object(Bucket=self.bucket, Key=key)["Body"]
+        try:
+            return cast(bytes, body.read())
+        finally:
+            body.close()
+
+    def iter_objects(
+        self, keys: Iterable[str], return_exceptions: bool = False
+    ) -> Generator[Tuple[str, Union[bytes, Exception]], None, None]:
+        """
+        キーの順にオブジェクトを取得
+
+        取り出した1件を呼び出し側が処理している間も、後続の取得を進めます。
+        取得に失敗した場合は、そのキーの順番で例外を送出し、未着手の取得は取り消します。
+
+        Args:
+            keys: S3キー（リストまたはイテレータ）
+            return_exceptions: Trueの場合、取得に失敗したキーは例外を送出せずに
+                内容の代わりに例外オブジェクトを返し、後続の取得を続ける
+
+        Yields:
+            (S3キー, オブジェクトの内容または例外)
+        """
+        keys = iter(keys)
+        with ThreadPoolExecutor(
+            max_workers=self.max_concurrency, thread_name_prefix="s3-prefetch"
+        ) as executor:
+            window = deque(
+                (key, executor.submit(self.fetch, key))
+                for key in islice(keys, self.max_concurrency)
+            )
+            try:
+                while window:
+                    key, future = window.popleft()
+                    data: Union[bytes, Exception]
+                    try:
+                        data = future.result()
+                    except Exception as e:
+                        if not return_exceptions:
+                            raise
+                        data = e
+                    for next_key in islice(keys, 1):
+                        window.append((next_key, executor.submit(self.fetch, next_key)))
+                    yield key, data
+            finally:
+                for _, future in window:
+                    future.cancel()
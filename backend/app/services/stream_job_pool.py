@@ -0,0 +1,170 @@
+"""
+ストリーミング配信ジョブプール
+
+ZIPのストリーミング配信（/api/v1/export/stream）の書き込み処理は、受信側の速度に
+合わせて待機するため、転送が終わるまでスレッドを占有します。ジョブスケジューラーの
+ワーカーで実行すると、遅いダウンロードが写真帳・エクスポート等の処理枠を使い切るため、
+配信ごとに専用スレッドで実行し、同時配信数を組織単位と全体で制限します。
+
+上限に達している場合は待たせずに StreamPoolBusy を送出します（APIは503を返す）。
+進捗・完了イベントはジョブスケジューラーと同じくジョブイベントバスに発行します。
+"""
+
+import threading
+from functools import lru_cache
+from typing import Callable, Dict, Optional
+
+from app.config import settings
+from app.services.job_event_bus import (
+    JobEventBus,
+    JobProgressReporter,
+    get_job_event_bus,
+)
+from app.services.metrics import MetricsRegistry
+from app.services.metrics import metrics as default_metrics
+
+
+class StreamPoolBusy(Exception):
+    """同時配信数の上限に達している"""
+
+
+class StreamJobPool:
+    """同時実行数を制限した配信専用のジョブ実行プール"""
+
+    def __init__(
+        self,
+        max_streams: int = 8,
+        tenant_streams: int = 2,
+        bus: Optional[JobEventBus] = None,
+        metrics: Optional[MetricsRegistry] = None,
+    ):
+        """
+        初期化
+
+        Args:
+            max_streams: 全体の同時配信数上限
+            tenant_streams: 組織ごとの同時配信数上限
+            bus: ジョブイベントバス（省略時はシングルトン）
+            metrics: メトリクスレジストリ（省略時はグローバル）
+        """
+        self.max_streams = max_streams
+        self.tenant_streams = tenant_streams
+        self.bus = bus or get_job_event_bus()
+        self.metrics = metrics or default_metrics
+
+        self._lock = threading.Lock()
+        # 組織ID → 実行中の配信数
+        self._running: Dict[int, int] = {}
+
+    def submit(
+        self,
+        organization_id: int,
+        job_type: str,
+        func: Callable[[JobProgressReporter], object],
+    ) -> str:
+        """
+        配信ジョブを専用スレッドで開始
+
+        Args:
+            organization_id: 組織ID
+            job_type: ジョブ種別
+            func: 実行関数（進捗レポーターを受け取り、結果を返す）
+
+        Returns:
+            ジョブID
+
+        Raises:
+            StreamPoolBusy: 組織または全体の同時配信数が上限に達している場合
+        """
+        with self._lock:
+            if (
+                sum(self._running.values()) >= self.max_streams
+                or self._running.get(organization_id, 0) >= self.tenant_streams
+            ):
+                self.metrics.inc(
+                    "stream_jobs_rejected_total", organization_id=organization_id
+                )
+                raise StreamPoolBusy("同時に配信できる数の上限に達しています")
+            self._running[organization_id] = self._running.get(organization_id, 0) + 1
+
+        try:
+            job_id = self.bus.register_job(organization_id, job_type)
+            thread = threading.Thread(
+                target=self._run,
+                args=(organization_id, job_type, job_id, func),
+                name=f"stream-{job_id[:8]}",
+                daemon=True,
+            )
+            thread.start()
+        except BaseException:
+            self._release(organization_id)
+            raise
+        return job_id
+
+    def running(self, organization_id: Optional[int] = None) -> int:
+        """実行中の配信数（組織ID省略時は全体）"""
+        with self._lock:
+            if organization_id is None:
+                return sum(self._running.values())
+            return self._running.get(organization_id, 0)
+
+    def _release(self, organization_id: int) -> None:
+        with self._lock:
+            self._running[organization_id] -= 1
+            if not self._running[organization_id]:
+                del self._running[organization_id]
+
+    def _run(
+        self,
+        organization_id: int,
+        job_type: str,
+        job_id: str,
+        func: Callable[[JobProgressReporter], object],
+    ) -> None:
+        """ジョブを実行し、結果をイベントバスに反映"""
+        reporter = JobProgressReporter(self.bus, job_id)
+        try:
+            try:
+                result = func(reporter)
+            except Exception as e:
+                self.metrics.inc(
+                    "jobs_failed_total",
+                    organization_id=organization_id,
+                    job_type=job_type,
+                )
+                self._report(job_type, job_id, lambda: reporter.fail(str(e)))
+                return
+
+            self.metrics.inc(
+                "jobs_completed_total",
+                organization_id=organization_id,
+                job_type=job_type,
+            )
+            self._report(
+                job_type,
+                job_id,
+                lambda: reporter.complete(
+                    result=result if isinstance(result, dict) else None
+                ),
+            )
+        finally:
+            self._release(organization_id)
+
+    def _report(
+        self, job_type: str, job_id: str, publish: Callable[[], object]
+    ) -> None:
+        """完了・失敗イベントを発行（発行の失敗で配信数を解放し損ねないよう握りつぶす）"""
+        try:
+            publish()
+        except Exception as e:
+            self.metrics.inc("job_event_publish_errors_total", job_type=job_type)
+            print(f"Warning: Failed to publish job event: {job_id}, Error: {str(e)}")
+
+
+@lru_cache()
+def get_stream_job_pool() -> StreamJobPool:
+    """ストリーミング配信ジョブプールのシングルトンインスタンスを取得"""
+    return StreamJobPool(
+        max_streams=settings.EXPORT_STREAM_MAX_CONCURRENCY,
+        tenant_streams=settings.EXPORT_STREAM_TENANT_CONCURRENCY,
+    )
@@ -6,14 +6,47 @@ OCRデータと画像分類結果から写真タイトルを自動生成する
 例: "基礎工_No.15+20.5_配筋状況_20240315"
 """
 
+import hashlib
+import json
 import re
 from datetime import datetime
+from functools import lru_cache
 from typing import Dict, Optional
 
+# 対応する日付形式
+DATE_FORMATS = [
+    "%Y-%m-%d",
+    "%Y/%m/%d",
+    "%Y.%m.%d",
+    "%Y%m%d",
+]
+
+
+@lru_cache(maxsize=4096)
+def _parse_date_yyyymmdd(date_str: str) -> Optional[str]:
+    """
+    日付文字列をYYYYMMDD形式に変換（一括再生成では同じ日付が繰り返し現れるためキャッシュ）
+
+    Args:
+        date_str: 日付文字列
+
+    Returns:
+        YYYYMMDD形式の日付（パースできない場合はNone）
+    """
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.strptime(date_str, fmt).strftime("%Y%m%d")
+        except ValueError:
+            continue
+    return None
+
 
 class TitleGenerationService:
     """タイトル自動生成サービスクラス"""
 
+    # 生成規則のバージョン（マッピング以外の生成ロジックを変更したら上げる）
+    VERSION = "1"
+
     def __init__(self):
         """初期化"""
         # 分類ラベルから撮影対象へのマッピング
@@ -43,6 +76,47 @@ class TitleGenerationService:
             "舗装工": "舗装施工",
         }
 
+        self.version = self._compute_version()
+
+    def _compute_version(self) -> str:
+        """
+        サービスバージョンを計算
+
+        マッピングの内容もバージョンに含め、修正時に自動で再生成対象にします。
+
+        Returns:
+            str: バージョン文字列（例: "1-3f2a9c01"）
+        """
+        mapping_digest = hashlib.sha1(
+            json.dumps(
+                [self.label_to_subject, self.work_type_to_subject],
+                sort_keys=True,
+                ensure_ascii=False,
+            ).encode("utf-8")
+        ).hexdigest()[:8]
+        return f"{self.VERSION}-{mapping_digest}"
+
+    def input_fingerprint(self, ocr_data: Dict, classification_data: Dict) -> str:
+        """
+        タイトル生成の入力フィンガープリントを計算
+
+        OCR項目・分類ラベル・サービスバージョンが同じであれば同じ値になります。
+
+        Args:
+            ocr_data: OCRデータ
+            classification_data: 分類データ
+
+        Returns:
+            str: フィンガープリント（SHA-1の16進文字列）
+        """
+        payload = json.dumps(
+            [self.version, ocr_data, classification_data],
+            sort_keys=True,
+            ensure_ascii=False,
+            default=str,
+        )
+        return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
     def generate_title(self, ocr_data: Dict, classification_data: Dict) -> str:
         """
         写真タイトルを自動生成
@@ -136,19 +210,9 @@ class TitleGenerationService:
             return datetime.now().strftime("%Y%m%d")
 
         # 様々な日付形式に対応
-        date_formats = [
-            "%Y-%m-%d",
-            "%Y/%m/%d",
-            "%Y.%m.%d",
-            "%Y%m%d",
-        ]
-
-        for fmt in date_formats:
-            try:
-                dt = datetime.strptime(date_str, fmt)
-                return dt.strftime("%Y%m%d")
-            except ValueError:
-                continue
+        formatted = _parse_date_yyyymmdd(date_str)
+        if formatted:
+            return formatted
 
         # パースできない場合は今日の日付
         return datetime.now().strftime("%Y%m%d")
@@ -286,4 +350,5 @@ class TitleGenerationService:
             "subject": subject if subject else None,
             "date": date if date else None,
             "confidence": round(confidence, 2),
+            "fingerprint": self.input_fingerprint(ocr_data, classification_data),
         }
@@ -0,0 +1,262 @@
+"""
+タイトル一括再生成サービス
+
+工種マッピングの修正後などに、工事（または組織）内の写真のタイトルを再生成します。
+
+- 写真は (id, updated_at, metadata) をIDのキーセットページングで順に読み出す
+- 入力フィンガープリント（OCR項目・分類ラベル・生成サービスのバージョン）が
+  前回生成時と同じ写真はタイトルを生成しない
+- 書き込みは UPDATE ... FROM (VALUES ...) によるバッチ更新
+- 手動設定タイトル（metadata.manual_title）の写真は常にスキップ
+- 読み出し後に更新された写真（updated_at不一致）は上書きしない
+"""
+
+import json
+import time
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import DateTime
+from sqlalchemy.orm import Session
+
+from app.database.models import Photo
+from app.services.job_event_bus import JobProgressReporter
+from app.services.title_generation_service import TitleGenerationService
+
+
+def build_title_inputs(metadata: Optional[Dict]) -> Tuple[Dict, Dict]:
+    """
+    写真メタデータからタイトル生成の入力を組み立て
+
+    Args:
+        metadata: 写真メタデータ
+
+    Returns:
+        (OCRデータ, 分類データ)
+    """
+    metadata = metadata or {}
+    ocr_data = {}
+    ocr_result = metadata.get("ocr_result")
+    if ocr_result:
+        ocr_data = {
+            "work_type": ocr_result.get("work_type"),
+            "work_kind": ocr_result.get("work_kind"),
+            "station": ocr_result.get("station"),
+            "shooting_date": ocr_result.get("shooting_date"),
+        }
+
+    classification_data = {}
+    categorized = metadata.get("rekognition_categorized")
+    if categorized:
+        classification_data = {"categorized_labels": categorized}
+
+    return ocr_data, classification_data
+
+
+def generated_title_metadata(result: Dict) -> Dict:
+    """
+    タイトル生成結果からメタデータに保存する内容を抽出
+
+    Args:
+        result: generate_title_with_metadata の戻り値
+
+    Returns:
+        metadata.generated_title に保存する辞書
+    """
+    return {
+        "title": result["title"],
+        "work_type": result["work_type"],
+        "station": result["station"],
+        "subject": result["subject"],
+        "date": result["date"],
+        "confidence": result["confidence"],
+        "fingerprint": result.get("fingerprint"),
+    }
+
+
+class TitleRegenerationService:
+    """タイトル一括再生成サービス"""
+
+    def __init__(
+        self,
+        db: Session,
+        batch_size: int = 1000,
+        title_service: Optional[TitleGenerationService] = None,
+    ):
+        """
+        初期化
+
+        Args:
+            db: データベースセッション
+            batch_size: 1回の読み出し・書き込みの件数
+            title_service: タイトル生成サービス（省略時は新規作成）
+        """
+        self.db = db
+        self.batch_size = batch_size
+        self.title_service = title_service or TitleGenerationService()
+        dialect = db.get_bind().dialect
+        self.dialect = dialect.name
+        self._paramstyle = dialect.paramstyle
+        # 日時は方言の変換処理を通す（SQLiteは保存形式の文字列で比較するため）
+        self._datetime_processor = DateTime().dialect_impl(dialect).bind_processor(
+            dialect
+        ) or (lambda value: value)
+
+    def regenerate(
+        self,
+        organization_id: int,
+        project_id: Optional[int] = None,
+        force: bool = False,
+        reporter: Optional[JobProgressReporter] = None,
+    ) -> Dict:
+        """
+        タイトルを再生成
+
+        入力フィンガープリントが変わった写真のみ再生成します。
+        バッチごとにコミットするため、途中で失敗しても処理済みバッチは保存されます。
+
+        Args:
+            organization_id: 組織ID
+            project_id: 工事ID（省略時は組織内の全写真）
+            force: フィンガープリントが同じ写真も再生成するか
+            reporter: 進捗レポーター（省略可）
+
+        Returns:
+            処理結果（件数・所要時間）
+        """
+        started = time.monotonic()
+        total = 0
+        updated = 0
+        unchanged = 0
+        skipped_manual = 0
+        conflicts = 0
+
+        query = self.db.query(Photo.id, Photo.updated_at, Photo.photo_metadata).filter(
+            Photo.organization_id == organization_id
+        )
+        if project_id is not None:
+            query = query.filter(Photo.project_id == project_id)
+
+        if reporter is not None:
+            reporter.set_total(query.count())
+            reporter.stage("regenerating")
+
+        last_id = 0
+        while True:
+            rows = (
+                query.filter(Photo.id > last_id)
+                .order_by(Photo.id)
+                .limit(self.batch_size)
+                .all()
+            )
+            if not rows:
+                break
+            last_id = rows[-1].id
+            total += len(rows)
+
+            changes = []
+            for photo_id, updated_at, metadata in rows:
+                if metadata and metadata.get("manual_title"):
+                    skipped_manual += 1
+                    continue
+
+                ocr_data, classification_data = build_title_inputs(metadata)
+                previous = (metadata or {}).get("generated_title") or {}
+                if not force and previous.get(
+                    "fingerprint"
+                ) == self.title_service.input_fingerprint(
+                    ocr_data, classification_data
+                ):
+                    unchanged += 1
+                    continue
+
+                result = self.title_service.generate_title_with_metadata(
+                    ocr_data=ocr_data, classification_data=classification_data
+                )
+                metadata = dict(metadata or {})
+                metadata["generated_title"] = generated_title_metadata(result)
+                changes.append((photo_id, updated_at, result["title"], metadata))
+
+            if changes:
+                written = self._write_batch(organization_id, changes)
+                updated += written
+                conflicts += len(changes) - written
+            self.db.commit()
+
+            if reporter is not None:
+                reporter.advance(len(rows))
+
+        elapsed = time.monotonic() - started
+        return {
+            "total": total,
+            "updated": updated,
+            "unchanged": unchanged,
+            "skipped_manual": skipped_manual,
+            "conflicts": conflicts,
+            "elapsed_seconds": round(elapsed, 3),
+            "photos_per_second": round(total / elapsed, 2) if elapsed > 0 else 0.0,
+        }
+
+    def _write_batch(
+        self,
+        organization_id: int,
+        changes: List[Tuple[int, datetime, str, Dict]],
+    ) -> int:
+        """
+        タイトルとメタデータを1文でバッチ更新
+
+        Args:
+            organization_id: 組織ID
+            changes: (写真ID, 読み出し時のupdated_at, タイトル, メタデータ) のリスト
+
+        Returns:
+            更新件数（読み出し後に更新された写真は含まない）
+        """
+        # 件数ごとに異なる文をSQLAlchemyでコンパイルするとコストが大きいため、
+        # DBドライバーの位置パラメータ形式で直接実行する
+        mark = "?" if self._paramstyle == "qmark" else "%s"
+        row = f"({mark}, {mark}, {mark}, {mark})"
+        values = ", ".join([row] * len(changes))
+        params = [self._datetime_processor(datetime.utcnow())]
+        for photo_id, updated_at, title, metadata in changes:
+            params.extend(
+                [
+                    photo_id,
+                    self._datetime_processor(updated_at),
+                    title,
+                    json.dumps(metadata),
+                ]
+            )
+        params.append(organization_id)
+
+        if self.dialect == "postgresql":
+            statement = f"""
+                UPDATE photos AS p
+                SET title = v.title,
+                    metadata = CAST(v.metadata AS JSON),
+                    updated_at = {mark}
+                FROM (VALUES {values}) AS v(id, updated_at, title, metadata)
+                WHERE p.id = v.id
+                  AND p.updated_at = v.updated_at
+                  AND p.organization_id = {mark}
+            """
+        else:
+            # SQLiteは派生テーブルの列名指定に対応しないため、VALUESの既定列名
+            # （column1〜）に別名を付ける
+            statement = f"""
+                UPDATE photos
+                SET title = v.title,
+                    metadata = v.metadata,
+                    updated_at = {mark}
+                FROM (
+                    SELECT column1 AS id, column2 AS updated_at,
+                           column3 AS title, column4 AS metadata
+                    FROM (VALUES {values})
+                ) AS v
+                WHERE photos.id = v.id
+                  AND photos.updated_at = v.updated_at
+                  AND photos.organization_id = {mark}
+            """
+
+        result = self.db.connection().exec_driver_sql(statement, tuple(params))
+        return result.rowcount
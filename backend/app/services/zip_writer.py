@@ -0,0 +1,712 @@
+"""
+ZIPアーカイブの逐次書き込み
+
+標準の zipfile と互換性のあるZIP（必要に応じてZIP64）を、書き込み専用の
+ストリームへ先頭から順に出力します。エントリごとに圧縮方式を選べます
+（圧縮済みのJPEG/TIFFは無圧縮、XML/DTD/XSL等はdeflate）。
+
+サイズの大きいdeflateエントリは、ブロック単位でワーカープールに圧縮させ、
+結果を順番どおりに連結します（直前ブロックの末尾32KBを辞書として使うため、
+圧縮率は単一スレッドの場合とほぼ同じです）。
+各エントリのCRC・サイズはデータディスクリプタとセントラルディレクトリに
+書き込むため、出力先にシークは不要です。ZipChunkQueue を出力先にすると、
+書き込み中のZIPをそのままHTTPレスポンスとして配信できます。
+"""
+
+import os
+import queue
+import struct
+import threading
+import zlib
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime
+from functools import lru_cache
+from types import TracebackType
+from typing import (
+    Deque,
+    Iterator,
+    List,
+    Optional,
+    Protocol,
+    Set,
+    Tuple,
+    Type,
+    Union,
+    cast,
+)
+
+from app.config import settings
+
+ZIP_STORED = 0
+ZIP_DEFLATED = 8
+
+# 書き込むデータ（bytes・bytearray・memoryview）
+Buffer = Union[bytes, bytearray, memoryview]
+
+
+class WritableStream(Protocol):
+    """ZipStreamWriter の出力先（write のみ使用）"""
+
+    def write(self, data: Buffer) -> int: ...
+
+
+# 圧縮済みのため無圧縮で格納する拡張子
+STORED_EXTENSIONS = (".jpg", ".jpeg", ".tif", ".tiff")
+
+# 並列deflateのブロックサイズ（これより小さいエントリはワーカープールを使わない）
+DEFLATE_BLOCK_SIZE = 1024 * 1024
+
+# deflateの辞書として引き継ぐ直前ブロックの末尾（deflateの参照範囲）
+DEFLATE_WINDOW_SIZE = 32 * 1024
+
+# ストリーミング配信のチャンクサイズと、未送信チャンクの上限
+STREAM_CHUNK_SIZE = 256 * 1024
+STREAM_MAX_CHUNKS = 32
+
+# ZIP64が必要になる境界
+ZIP64_LIMIT = 0xFFFFFFFF
+ZIP64_COUNT_LIMIT = 0xFFFF
+
+_LOCAL_HEADER = struct.Struct("<4sHHHHHIIIHH")
+_DATA_DESCRIPTOR = struct.Struct("<4sIII")
+_DATA_DESCRIPTOR64 = struct.Struct("<4sIQQ")
+_CENTRAL_HEADER = struct.Struct("<4sHHHHHHIIIHHHHHII")
+_END_RECORD = struct.Struct("<4sHHHHIIH")
+_END_RECORD64 = struct.Struct("<4sQHHIIQQQQ")
+_END_LOCATOR64 = struct.Struct("<4sIQI")
+
+# データディスクリプタ使用（サイズ・CRCを後置）
+_FLAG_DATA_DESCRIPTOR = 0x08
+# ファイル名がUTF-8
+_FLAG_UTF8 = 0x800
+
+
+def compression_for(arcname: str) -> int:
+    """
+    エントリ名から圧縮方式を決定
+
+    Args:
+        arcname: ZIP内のパス
+
+    Returns:
+        ZIP_STORED（JPEG/TIFF）または ZIP_DEFLATED
+    """
+    if arcname.lower().endswith(STORED_EXTENSIONS):
+        return ZIP_STORED
+    return ZIP_DEFLATED
+
+
+def deflate_block(data: bytes, zdict: bytes = b"", level: int = 6) -> bytes:
+    """
+    1ブロックをdeflate（最終ブロック印なし、バイト境界で終了）
+
+    Args:
+        data: 圧縮するデータ
+        zdict: 直前ブロックの末尾（辞書）
+        level: 圧縮レベル
+
+    Returns:
+        raw deflateデータ（他のブロックとそのまま連結できる）
+    """
+    if zdict:
+        compressor = zlib.compressobj(
+            level,
+            zlib.DEFLATED,
+            -15,
+            zlib.DEF_MEM_LEVEL,
+            zlib.Z_DEFAULT_STRATEGY,
+            zdict,
+        )
+    else:
+        compressor = zlib.compressobj(level, zlib.DEFLATED, -15)
+    return compressor.compress(data) + compressor.flush(zlib.Z_SYNC_FLUSH)
+
+
+@lru_cache()
+def get_deflate_executor() -> ThreadPoolExecutor:
+    """
+    並列deflate用ワーカープールを取得（シングルトン）
+
+    zlibは圧縮中にGILを解放するため、スレッドで複数コアを利用できます。
+
+    Returns:
+        ThreadPoolExecutor
+    """
+    workers = settings.EXPORT_DEFLATE_WORKERS or os.cpu_count() or 1
+    return ThreadPoolExecutor(max_workers=workers, thread_name_prefix="zip-deflate")
+
+
+def _dos_datetime(date_time: datetime) -> Tuple[int, int]:
+    """ZIPヘッダー用の日付・時刻（MS-DOS形式）"""
+    year = min(max(date_time.year, 1980), 2107)
+    dos_date = (year - 1980) << 9 | date_time.month << 5 | date_time.day
+    dos_time = date_time.hour << 11 | date_time.minute << 5 | date_time.second // 2
+    return dos_date, dos_time
+
+
+class _EntryRecord:
+    """セントラルディレクトリに書き込むエントリ情報"""
+
+    __slots__ = (
+        "name",
+        "flags",
+        "compress_type",
+        "dos_date",
+        "dos_time",
+        "header_offset",
+        "crc",
+        "compress_size",
+        "file_size",
+    )
+
+    def __init__(
+        self,
+        name: bytes,
+        flags: int,
+        compress_type: int,
+        date_time: datetime,
+        offset: int,
+    ) -> None:
+        self.name = name
+        self.flags = flags
+        self.compress_type = compress_type
+        self.dos_date, self.dos_time = _dos_datetime(date_time)
+        self.header_offset = offset
+        self.crc = 0
+        self.compress_size = 0
+        self.file_size = 0
+
+    @property
+    def zip64(self) -> bool:
+        return (
+            self.file_size >= ZIP64_LIMIT
+            or self.compress_size >= ZIP64_LIMIT
+            or self.header_offset >= ZIP64_LIMIT
+        )
+
+
+class ZipEntryWriter:
+    """1エントリの書き込み（ZipStreamWriter.open が返すファイルライクオブジェクト）"""
+
+    def __init__(self, archive: "ZipStreamWriter", record: _EntryRecord) -> None:
+        self._archive = archive
+        self._record = record
+        self._crc = 0
+        self._size = 0
+        self._compressed = 0
+        self._buffer = bytearray()
+        self._pending: Deque["Future[bytes]"] = deque()
+        self._zdict = b""
+        self._compressor: Optional["zlib._Compress"] = None
+        self.closed = False
+
+    def __enter__(self) -> "ZipEntryWriter":
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc: Optional[BaseException],
+        tb: Optional[TracebackType],
+    ) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self._cancel()
+
+    def write(self, data: Buffer) -> int:
+        """
+        データを書き込み
+
+        Args:
+            data: bytes・bytearray・memoryview
+
+        Returns:
+            書き込んだバイト数
+        """
+        length = len(data)
+        if not length:
+            return 0
+        self._crc = zlib.crc32(data, self._crc)
+        self._size += length
+        if self._record.compress_type == ZIP_STORED:
+            self._emit(data)
+            return length
+
+        executor = self._archive.executor
+        if executor is None:
+            # 単一スレッドで逐次圧縮
+            if self._compressor is None:
+                self._compressor = zlib.compressobj(
+                    self._archive.compresslevel, zlib.DEFLATED, -15
+                )
+            self._emit(self._compressor.compress(data))
+            return length
+
+        # ブロック単位でワーカープールに圧縮させる
+        self._buffer += data
+        block_size = self._archive.block_size
+        while len(self._buffer) >= block_size:
+            block = bytes(self._buffer[:block_size])
+            del self._buffer[:block_size]
+            self._submit(executor, block)
+        return length
+
+    def flush(self) -> None:
+        """互換性のためのダミー（データはブロック単位で出力されます）"""
+
+    def close(self) -> None:
+        """エントリを閉じ、データディスクリプタを書き込む"""
+        if self.closed:
+            return
+        self.closed = True
+        if self._record.compress_type == ZIP_DEFLATED:
+            if self._pending:
+                if self._buffer:
+                    self._submit(
+                        cast(ThreadPoolExecutor, self._archive.executor),
+                        bytes(self._buffer),
+                    )
+                self._drain(0)
+                # 空の最終ブロック（固定ハフマン）でdeflateストリームを終端
+                self._emit(b"\x03\x00")
+            elif self._compressor is not None:
+                self._emit(self._compressor.flush())
+            else:
+                # 1ブロックに収まるエントリはワーカープールを使わずに圧縮
+                compressor = zlib.compressobj(
+                    self._archive.compresslevel, zlib.DEFLATED, -15
+                )
+                self._emit(
+                    compressor.compress(bytes(self._buffer)) + compressor.flush()
+                )
+            self._buffer = bytearray()
+
+        record = self._record
+        record.crc = self._crc
+        record.file_size = self._size
+        record.compress_size = self._compressed
+        self._archive._finish_entry(record)
+
+    def _submit(self, executor: ThreadPoolExecutor, block: bytes) -> None:
+        """ブロックの圧縮を依頼（先行ブロックが多い場合は完了分から出力）"""
+        self._pending.append(
+            executor.submit(
+                deflate_block, block, self._zdict, self._archive.compresslevel
+            )
+        )
+        self._zdict = block[-DEFLATE_WINDOW_SIZE:]
+        self._drain(self._archive.max_pending_blocks)
+
+    def _drain(self, keep: int) -> None:
+        """圧縮済みブロックを順番に出力し、未完了を keep 件以下にする"""
+        while len(self._pending) > keep:
+            self._emit(self._pending.popleft().result())
+
+    def _cancel(self) -> None:
+        """例外発生時に未着手の圧縮を取り消す"""
+        for future in self._pending:
+            future.cancel()
+        self._pending.clear()
+        self.closed = True
+        self._archive._current = None
+
+    def _emit(self, data: Buffer) -> None:
+        self._compressed += len(data)
+        self._archive._write(data)
+
+
+class ZipStreamWriter:
+    """ZIPアーカイブを書き込み専用ストリームへ逐次出力"""
+
+    def __init__(
+        self,
+        fileobj: WritableStream,
+        compresslevel: int = 6,
+        executor: Optional[ThreadPoolExecutor] = None,
+        block_size: int = DEFLATE_BLOCK_SIZE,
+        max_pending_blocks: Optional[int] = None,
+        force_zip64: bool = False,
+    ) -> None:
+        """
+        初期化
+
+        Args:
+            fileobj: 出力先（write のみ使用。ソケット等のシークできないストリームも可）
+            compresslevel: deflateの圧縮レベル
+            executor: 並列deflate用ワーカープール（省略時は単一スレッドで圧縮）
+            block_size: 並列deflateのブロックサイズ
+            max_pending_blocks: 圧縮待ちブロックの上限（省略時はワーカー数×2）
+            force_zip64: 常にZIP64終端レコードを書き込む
+        """
+        self.fileobj = fileobj
+        self.compresslevel = compresslevel
+        self.executor = executor
+        self.block_size = block_size
+        if max_pending_blocks is None:
+            max_pending_blocks = 2 * getattr(executor, "_max_workers", 1)
+        self.max_pending_blocks = max(1, max_pending_blocks)
+        self.force_zip64 = force_zip64
+        self.offset = 0
+        self._records: List[_EntryRecord] = []
+        self._current: Optional[ZipEntryWriter] = None
+        self._names: Set[str] = set()
+        self.closed = False
+
+    def __enter__(self) -> "ZipStreamWriter":
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc: Optional[BaseException],
+        tb: Optional[TracebackType],
+    ) -> None:
+        if exc_type is None:
+            self.close()
+        elif self._current is not None:
+            self._current._cancel()
+
+    @property
+    def entry_count(self) -> int:
+        """書き込み済みエントリ数"""
+        return len(self._records)
+
+    def open(
+        self,
+        arcname: str,
+        compress_type: Optional[int] = None,
+        date_time: Optional[datetime] = None,
+    ) -> ZipEntryWriter:
+        """
+        エントリを開く（同時に開けるエントリは1つ）
+
+        Args:
+            arcname: ZIP内のパス
+            compress_type: ZIP_STORED/ZIP_DEFLATED（省略時は compression_for で決定）
+            date_time: 更新日時（省略時は現在時刻）
+
+        Returns:
+            ZipEntryWriter
+
+        Raises:
+            ValueError: 閉じたアーカイブ・重複したエントリ名・他のエントリを書き込み中の場合
+        """
+        if self.closed:
+            raise ValueError("ZIPアーカイブは既に閉じられています")
+        if self._current is not None:
+            raise ValueError(
+                "書き込み中のエントリを閉じてから次のエントリを開いてください"
+            )
+        if arcname in self._names:
+            raise ValueError(f"ZIP内のパスが重複しています: {arcname}")
+        if compress_type is None:
+            compress_type = compression_for(arcname)
+
+        try:
+            name = arcname.encode("ascii")
+            flags = _FLAG_DATA_DESCRIPTOR
+        except UnicodeEncodeError:
+            name = arcname.encode("utf-8")
+            flags = _FLAG_DATA_DESCRIPTOR | _FLAG_UTF8
+        record = _EntryRecord(
+            name, flags, compress_type, date_time or datetime.now(), self.offset
+        )
+        # CRC・サイズは後置のデータディスクリプタに書き込む
+        self._write(
+            _LOCAL_HEADER.pack(
+                b"PK\x03\x04",
+                45,
+                flags,
+                compress_type,
+                record.dos_time,
+                record.dos_date,
+                0,
+                0,
+                0,
+                len(name),
+                0,
+            )
+        )
+        self._write(name)
+        self._names.add(arcname)
+        self._current = ZipEntryWriter(self, record)
+        return self._current
+
+    def write(
+        self,
+        arcname: str,
+        data: bytes,
+        compress_type: Optional[int] = None,
+        date_time: Optional[datetime] = None,
+    ) -> None:
+        """
+        メモリ上のデータを1エントリとして書き込み
+
+        Args:
+            arcname: ZIP内のパス
+            data: 内容
+            compress_type: 圧縮方式（省略時は compression_for で決定）
+            date_time: 更新日時
+        """
+        with self.open(arcname, compress_type, date_time) as entry:
+            entry.write(data)
+
+    def write_file(
+        self,
+        path: str,
+        arcname: str,
+        compress_type: Optional[int] = None,
+        chunk_size: int = DEFLATE_BLOCK_SIZE,
+    ) -> None:
+        """
+        ファイルを1エントリとして書き込み（chunk_size ずつ読み込む）
+
+        Args:
+            path: ファイルパス
+            arcname: ZIP内のパス
+            compress_type: 圧縮方式（省略時は compression_for で決定）
+            chunk_size: 読み込み単位（バイト）
+        """
+        date_time = datetime.fromtimestamp(os.stat(path).st_mtime)
+        with (
+            open(path, "rb") as f,
+            self.open(arcname, compress_type, date_time) as entry,
+        ):
+            while True:
+                chunk = f.read(chunk_size)
+                if not chunk:
+                    break
+                entry.write(chunk)
+
+    def close(self) -> None:
+        """セントラルディレクトリと終端レコードを書き込む"""
+        if self.closed:
+            return
+        if self._current is not None:
+            self._current.close()
+        self.closed = True
+
+        directory_offset = self.offset
+        for record in self._records:
+            self._write_central_header(record)
+        directory_size = self.offset - directory_offset
+        count = len(self._records)
+
+        if (
+            self.force_zip64
+            or count >= ZIP64_COUNT_LIMIT
+            or directory_offset >= ZIP64_LIMIT
+            or directory_size >= ZIP64_LIMIT
+        ):
+            end64_offset = self.offset
+            self._write(
+                _END_RECORD64.pack(
+                    b"PK\x06\x06",
+                    _END_RECORD64.size - 12,
+                    45,
+                    45,
+                    0,
+                    0,
+                    count,
+                    count,
+                    directory_size,
+                    directory_offset,
+                )
+            )
+            self._write(_END_LOCATOR64.pack(b"PK\x06\x07", 0, end64_offset, 1))
+        self._write(
+            _END_RECORD.pack(
+                b"PK\x05\x06",
+                0,
+                0,
+                min(count, ZIP64_COUNT_LIMIT),
+                min(count, ZIP64_COUNT_LIMIT),
+                min(directory_size, ZIP64_LIMIT),
+                min(directory_offset, ZIP64_LIMIT),
+                0,
+            )
+        )
+
+    def _finish_entry(self, record: _EntryRecord) -> None:
+        """エントリ終了時にデータディスクリプタを書き込む"""
+        if record.zip64:
+            descriptor = _DATA_DESCRIPTOR64.pack(
+                b"PK\x07\x08", record.crc, record.compress_size, record.file_size
+            )
+        else:
+            descriptor = _DATA_DESCRIPTOR.pack(
+                b"PK\x07\x08", record.crc, record.compress_size, record.file_size
+            )
+        self._write(descriptor)
+        self._records.append(record)
+        self._current = None
+
+    def _write_central_header(self, record: _EntryRecord) -> None:
+        """セントラルディレクトリのヘッダーを1件書き込む"""
+        # ZIP64拡張フィールドには上限を超えた項目のみ（非圧縮・圧縮サイズ・オフセットの順）
+        extra_values = []
+        file_size, compress_size, offset = (
+            record.file_size,
+            record.compress_size,
+            record.header_offset,
+        )
+        if file_size >= ZIP64_LIMIT:
+            extra_values.append(file_size)
+            file_size = ZIP64_LIMIT
+        if compress_size >= ZIP64_LIMIT:
+            extra_values.append(compress_size)
+            compress_size = ZIP64_LIMIT
+        if offset >= ZIP64_LIMIT:
+            extra_values.append(offset)
+            offset = ZIP64_LIMIT
+        extra = b""
+        if extra_values:
+            extra = struct.pack(
+                f"<HH{len(extra_values)}Q", 0x0001, 8 * len(extra_values), *extra_values
+            )
+
+        self._write(
+            _CENTRAL_HEADER.pack(
+                b"PK\x01\x02",
+                3 << 8 | 45,  # 作成: UNIX, ZIP 4.5
+                45,
+                record.flags,
+                record.compress_type,
+                record.dos_time,
+                record.dos_date,
+                record.crc,
+                compress_size,
+                file_size,
+                len(record.name),
+                len(extra),
+                0,
+                0,
+                0,
+                0o100644 << 16,  # 通常ファイル rw-r--r--
+                offset,
+            )
+        )
+        self._write(record.name)
+        self._write(extra)
+
+    def _write(self, data: Buffer) -> None:
+        if data:
+            self.fileobj.write(data)
+            self.offset += len(data)
+
+
+class ZipStreamCancelled(Exception):
+    """ストリーミング配信の受信側が切断された"""
+
+
+class ZipStreamTimeout(Exception):
+    """ストリーミング配信の最初のチャンクが待機時間内に書き込まれなかった"""
+
+
+_END_OF_STREAM = object()
+
+
+class ZipChunkQueue:
+    """
+    ZIPの出力をチャンク単位で受け渡す有界キュー
+
+    書き込み側（ZipStreamWriter を動かすワーカースレッド）は write/finish、
+    読み出し側（HTTPレスポンス）は iter_chunks を使用します。
+    未送信のチャンクが max_chunks 件に達すると書き込み側が待機するため、
+    受信が遅くてもメモリ使用量は chunk_size × max_chunks 程度に収まります。
+    """
+
+    def __init__(
+        self, chunk_size: int = STREAM_CHUNK_SIZE, max_chunks: int = STREAM_MAX_CHUNKS
+    ):
+        """
+        初期化
+
+        Args:
+            chunk_size: 読み出し側へ渡すチャンクの目安サイズ（バイト）
+            max_chunks: 未送信チャンクの上限
+        """
+        self.chunk_size = chunk_size
+        self._queue: "queue.Queue[object]" = queue.Queue(maxsize=max_chunks)
+        self._buffer = bytearray()
+        self._cancelled = threading.Event()
+
+    def write(self, data: Buffer) -> int:
+        """
+        データを書き込み（チャンクサイズに達したら読み出し側へ渡す）
+
+        Raises:
+            ZipStreamCancelled: 読み出し側が切断された場合
+        """
+        self._buffer += data
+        if len(self._buffer) >= self.chunk_size:
+            self._put(bytes(self._buffer))
+            self._buffer = bytearray()
+        return len(data)
+
+    def finish(self, error: Optional[BaseException] = None) -> None:
+        """
+        書き込みを終了
+
+        Args:
+            error: 書き込み側で発生した例外（読み出し側で再送出されます）
+        """
+        try:
+            if error is None and self._buffer:
+                self._put(bytes(self._buffer))
+            self._buffer = bytearray()
+            self._put(error if error is not None else _END_OF_STREAM)
+        except ZipStreamCancelled:
+            pass
+
+    def cancel(self) -> None:
+        """読み出しを中止し、待機中の書き込み側を解放"""
+        self._cancelled.set()
+        try:
+            while True:
+                self._queue.get_nowait()
+        except queue.Empty:
+            pass
+
+    def iter_chunks(
+        self, first_chunk_timeout: Optional[float] = None
+    ) -> Iterator[bytes]:
+        """
+        チャンクを順に取り出す（StreamingResponse にそのまま渡せます）
+
+        Args:
+            first_chunk_timeout: 最初のチャンクを待つ秒数（省略時は無制限）
+
+        Yields:
+            ZIPのバイト列
+
+        Raises:
+            ZipStreamTimeout: 最初のチャンクが待機時間内に書き込まれなかった場合
+            Exception: 書き込み側で発生した例外
+        """
+        try:
+            try:
+                item = self._queue.get(timeout=first_chunk_timeout)
+            except queue.Empty:
+                raise ZipStreamTimeout("ZIPの書き込みが開始されませんでした")
+            while True:
+                if item is _END_OF_STREAM:
+                    return
+                if isinstance(item, BaseException):
+                    raise item
+                yield cast(bytes, item)
+                item = self._queue.get()
+        finally:
+            # 受信側の切断時は書き込み側を停止させる
+            self.cancel()
+
+    def _put(self, item: object) -> None:
+        while not self._cancelled.is_set():
+            try:
+                self._queue.put(item, timeout=0.5)
+                return
+            except queue.Full:
+                continue
+        raise ZipStreamCancelled("ZIPの受信側が切断されました")
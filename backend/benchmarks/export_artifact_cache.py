@@ -0,0 +1,84 @@
+"""
+エクスポート成果物キャッシュのベンチマーク
+
+S3代替クライアント（レイテンシ分布付き）の写真ファイルで電子納品パッケージを作成し、
+初回（作成して成果物キャッシュに保存）と、同じ内容の2回目（作成済みのZIPを返す）、
+写真を1枚更新した後（ダイジェストが変わり作り直す）の所要時間を比較します。
+
+使い方:
+    cd backend
+    python -m benchmarks.export_artifact_cache --size-gb 1 --photo-mb 2
+"""
+
+import argparse
+import tempfile
+import time
+from datetime import datetime
+
+from app.services.artifact_cache import ArtifactCache, artifact_digest
+from app.services.artifact_store import LocalArtifactStore
+from app.services.export_service import ExportService
+from app.services.fake_aws import FakeS3Client, LatencyModel
+
+from benchmarks.photo_xml_writer import make_photos
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--size-gb", type=float, default=1.0)
+    parser.add_argument("--photo-mb", type=float, default=2.0)
+    parser.add_argument("--latency", default="lognormal:60:0.5")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    photo_bytes = int(args.photo_mb * 1024 * 1024)
+    count = int(args.size_gb * 1024**3 // photo_bytes)
+    client = FakeS3Client(
+        object_size=photo_bytes,
+        latency=LatencyModel.parse(args.latency),
+        seed=args.seed,
+    )
+    photos = [
+        {
+            **photo,
+            "s3_key": f"photos/{photo['id']}.jpg",
+            "updated_at": datetime(2024, 4, 1),
+        }
+        for photo in make_photos(count, args.seed)
+    ]
+    print(f"photos={count} x {args.photo_mb}MB, latency={args.latency}")
+
+    def export(cache: ArtifactCache):
+        digest = artifact_digest(
+            "export", photos, {"project_name": "bench"}, ExportService.ARTIFACT_VERSION
+        )
+        started = time.perf_counter()
+        result, cached = cache.build(
+            "export",
+            digest,
+            lambda export_dir: ExportService().export_package(
+                photos,
+                export_dir=export_dir,
+                project_name="bench",
+                s3_client=client,
+                bucket="bench",
+                prefetch_concurrency=args.concurrency,
+            ),
+        )
+        assert result["success"], result["errors"]
+        return time.perf_counter() - started, cached
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = ArtifactCache(
+            LocalArtifactStore(tmp), max_bytes=10 * 1024**3, ttl_seconds=3600
+        )
+        for name in ("first", "repeat", "updated"):
+            if name == "updated":
+                photos[0] = {**photos[0], "updated_at": datetime(2024, 4, 2)}
+            elapsed, cached = export(cache)
+            print(f"{name:<8} {elapsed:8.3f}s cached={cached}")
+
+
+if __name__ == "__main__":
+    main()
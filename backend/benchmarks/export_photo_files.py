@@ -0,0 +1,78 @@
+"""
+エクスポートZIPへの写真ファイル書き込みのベンチマーク
+
+S3代替クライアント（レイテンシ分布付き）から写真ファイルを取得し、
+PIC/Pnnnnnnn.JPG としてZIPへ書き込む処理を、先読みの同時取得数ごとに比較します。
+所要時間とPythonヒープのピーク使用量（tracemalloc）を表示します。
+
+使い方:
+    cd backend
+    python -m benchmarks.export_photo_files --photos 500 --size-kb 2048 \\
+        --latency lognormal:60:0.5 --concurrency 1 8 16
+"""
+
+import argparse
+import time
+import tracemalloc
+
+from app.services.export_service import ExportService
+from app.services.fake_aws import FakeS3Client, LatencyModel
+from app.services.zip_writer import ZipStreamWriter
+
+
+class CountingSink:
+    """書き込まれたバイト数だけを数える出力先"""
+
+    def __init__(self):
+        self.size = 0
+
+    def write(self, data) -> int:
+        self.size += len(data)
+        return len(data)
+
+
+def run(photos, client, concurrency: int):
+    """写真ファイルをZIPへ書き込み、(所要時間, ピークメモリ, 結果) を返す"""
+    service = ExportService()
+    tracemalloc.start()
+    started = time.perf_counter()
+    with ZipStreamWriter(CountingSink()) as zip_writer:
+        result = service.write_photo_files_to_zip(
+            zip_writer, photos, client, "bench", max_concurrency=concurrency
+        )
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--photos", type=int, default=500)
+    parser.add_argument("--size-kb", type=int, default=2048)
+    parser.add_argument("--latency", default="lognormal:60:0.5")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 16])
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    client = FakeS3Client(
+        object_size=args.size_kb * 1024,
+        latency=LatencyModel.parse(args.latency),
+        seed=args.seed,
+    )
+    photos = [
+        {"id": i, "file_name": f"IMG_{i:05d}.JPG", "s3_key": f"photos/{i}.jpg"}
+        for i in range(1, args.photos + 1)
+    ]
+
+    for concurrency in args.concurrency:
+        elapsed, peak, result = run(photos, client, concurrency)
+        print(
+            f"concurrency={concurrency:<3} photos={result['files']}: {elapsed:.2f}s "
+            f"{result['bytes'] / elapsed / 1024 / 1024:.0f}MB/s "
+            f"peak={peak / 1024 / 1024:.0f}MB"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+エクスポートZIPのストリーミング配信ベンチマーク
+
+S3代替クライアント（レイテンシ分布付き）の写真ファイルで電子納品パッケージを作成し、
+従来のファイル出力（ZIP完成後にダウンロード開始）と、レスポンスへの直接配信
+（ExportService.stream_package）で、最初の1バイトまでの時間と全体の時間を比較します。
+
+使い方:
+    cd backend
+    python -m benchmarks.export_streaming --size-gb 2 --photo-mb 2 \\
+        --latency lognormal:60:0.5 --concurrency 8
+"""
+
+import argparse
+import tempfile
+import threading
+import time
+
+from app.services.export_service import ExportService
+from app.services.fake_aws import FakeS3Client, LatencyModel
+from app.services.zip_writer import ZipChunkQueue
+
+from benchmarks.photo_xml_writer import make_photos
+
+
+def export_to_file(photos, client, concurrency: int):
+    """従来方式（ZIPファイルの完成後に配信開始）。(最初の1バイト, 全体, サイズ) を返す"""
+    with tempfile.TemporaryDirectory() as tmp:
+        started = time.perf_counter()
+        result = ExportService().export_package(
+            photos,
+            export_dir=tmp,
+            s3_client=client,
+            bucket="bench",
+            prefetch_concurrency=concurrency,
+        )
+        assert result["success"], result["errors"]
+        elapsed = time.perf_counter() - started
+    return elapsed, elapsed, result["file_size"]
+
+
+def export_to_stream(photos, client, concurrency: int):
+    """直接配信。(最初の1バイト, 全体, サイズ) を返す"""
+    chunks = ZipChunkQueue()
+    started = time.perf_counter()
+    worker = threading.Thread(
+        target=ExportService().stream_package,
+        args=(chunks, photos),
+        kwargs={
+            "s3_client": client,
+            "bucket": "bench",
+            "prefetch_concurrency": concurrency,
+        },
+    )
+    worker.start()
+    first_byte = None
+    size = 0
+    for chunk in chunks.iter_chunks():
+        if first_byte is None:
+            first_byte = time.perf_counter() - started
+        size += len(chunk)
+    worker.join()
+    return first_byte, time.perf_counter() - started, size
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--size-gb", type=float, default=2.0)
+    parser.add_argument("--photo-mb", type=float, default=2.0)
+    parser.add_argument("--latency", default="lognormal:60:0.5")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    photo_bytes = int(args.photo_mb * 1024 * 1024)
+    count = int(args.size_gb * 1024**3 // photo_bytes)
+    client = FakeS3Client(
+        object_size=photo_bytes,
+        latency=LatencyModel.parse(args.latency),
+        seed=args.seed,
+    )
+    photos = [
+        {**photo, "s3_key": f"photos/{photo['id']}.jpg"}
+        for photo in make_photos(count, args.seed)
+    ]
+    print(f"photos={count} x {args.photo_mb}MB, latency={args.latency}")
+
+    for name, export in (("file", export_to_file), ("stream", export_to_stream)):
+        first_byte, elapsed, size = export(photos, client, args.concurrency)
+        print(
+            f"{name:<6} first_byte={first_byte:6.2f}s total={elapsed:6.2f}s "
+            f"size={size / 1024**3:.2f}GB"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+媒体分割エクスポートのベンチマーク
+
+S3代替クライアント（レイテンシ分布付き）の写真ファイルで電子納品パッケージを作成し、
+指定媒体の容量で巻に分割して、巻の同時作成数ごとの所要時間を比較します。
+各巻の実サイズが媒体容量以下であることも検証します。
+
+使い方:
+    cd backend
+    python -m benchmarks.export_volumes --size-gb 4 --media cd-r --workers 1 4
+"""
+
+import argparse
+import tempfile
+import time
+
+from app.services.export_service import ExportService
+from app.services.fake_aws import FakeS3Client, LatencyModel
+
+from benchmarks.photo_xml_writer import make_photos
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--size-gb", type=float, default=4.0)
+    parser.add_argument("--photo-mb", type=float, default=2.0)
+    parser.add_argument("--media", default="cd-r")
+    parser.add_argument("--latency", default="lognormal:60:0.5")
+    parser.add_argument("--concurrency", type=int, default=8, help="巻ごとの先読み数")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 4])
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    service = ExportService()
+    capacity = service.volume_capacity(args.media)
+    photo_bytes = int(args.photo_mb * 1024 * 1024)
+    count = int(args.size_gb * 1024**3 // photo_bytes)
+    client = FakeS3Client(
+        object_size=photo_bytes,
+        latency=LatencyModel.parse(args.latency),
+        seed=args.seed,
+    )
+    photos = [
+        {**photo, "s3_key": f"photos/{photo['id']}.jpg", "file_size": photo_bytes}
+        for photo in make_photos(count, args.seed)
+    ]
+    plan = service.plan_volumes(photos, capacity)
+    print(
+        f"photos={count} x {args.photo_mb}MB, media={args.media} "
+        f"({capacity / 1000**2:.0f}MB), volumes={len(plan)}"
+    )
+
+    for workers in args.workers:
+        with tempfile.TemporaryDirectory() as tmp:
+            started = time.perf_counter()
+            result = service.export_volumes(
+                photos,
+                capacity,
+                export_dir=tmp,
+                max_workers=workers,
+                s3_client=client,
+                bucket="bench",
+                prefetch_concurrency=args.concurrency,
+            )
+            elapsed = time.perf_counter() - started
+        assert result["success"], result["errors"]
+        sizes = [volume["file_size"] for volume in result["volumes"]]
+        assert max(sizes) <= capacity
+        print(
+            f"workers={workers:<2} {elapsed:6.2f}s "
+            f"largest={max(sizes) / 1000**2:.1f}MB "
+            f"fill={sum(sizes) / (capacity * len(sizes)):.1%}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+"""
+エクスポートZIPの圧縮方式ベンチマーク
+
+写真ファイル（圧縮の効かないJPEG相当のデータ）・PHOTO.XML・DTD/XSLからなる
+電子納品パッケージを、次の方式で書き込んで比較します。
+
+    legacy   : zipfile で全エントリをdeflate（従来方式）
+    serial   : ZipStreamWriter（JPEG/TIFFは無圧縮、XML等は単一スレッドでdeflate）
+    parallel : ZipStreamWriter（同上、XML等の大きなエントリをワーカープールでdeflate）
+
+出力先は既定ではバイト数を数えるだけのストリームです（--output 指定時はファイルに
+書き込み、zipfile で全エントリのCRCを検査します）。
+
+使い方:
+    cd backend
+    python -m benchmarks.export_zip_compression --size-gb 5 --photo-mb 2 \\
+        --xml-photos 200000 --modes legacy serial parallel
+"""
+
+import argparse
+import os
+import random
+import time
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+
+from app.services.export_service import ExportService
+from app.services.photo_xml_generator import PhotoXMLGenerator
+from app.services.zip_writer import ZipStreamWriter
+
+from benchmarks.photo_xml_writer import make_photos
+
+
+class CountingSink:
+    """書き込まれたバイト数だけを数える出力先"""
+
+    def __init__(self):
+        self.size = 0
+
+    def write(self, data) -> int:
+        self.size += len(data)
+        return len(data)
+
+
+def photo_blobs(photo_bytes: int, variants: int, seed: int):
+    """JPEG相当の写真データ（deflateの参照範囲を超える長さの乱数列）"""
+    rng = random.Random(seed)
+    return [
+        b"\xff\xd8" + rng.randbytes(photo_bytes - 4) + b"\xff\xd9"
+        for _ in range(variants)
+    ]
+
+
+def template_files():
+    """PHOTO05.DTD・PHOTO05.XSL（ZIP内のパス, 内容）"""
+    service = ExportService()
+    templates = []
+    for path in (service.get_dtd_template_path(), service.get_xsl_template_path()):
+        with open(path, "rb") as f:
+            templates.append((os.path.basename(path), f.read()))
+    return templates
+
+
+def write_legacy(output, photo_count, blobs, xml_photos, templates):
+    """従来方式（全エントリを zipfile でdeflate）"""
+    with zipfile.ZipFile(output, "w", zipfile.ZIP_DEFLATED) as zf:
+        for name, data in templates:
+            zf.writestr(name, data)
+        for i in range(photo_count):
+            with zf.open(f"PIC/P{i + 1:07d}.JPG", "w") as entry:
+                entry.write(blobs[i % len(blobs)])
+        with zf.open("PHOTO.XML", "w", force_zip64=True) as entry:
+            PhotoXMLGenerator().write_xml(xml_photos, entry, pretty_print=True)
+
+
+def write_policy(output, photo_count, blobs, xml_photos, templates, executor):
+    """エントリごとの圧縮方式（executor 指定時は並列deflate）"""
+    with ZipStreamWriter(output, executor=executor) as zip_writer:
+        for name, data in templates:
+            zip_writer.write(name, data)
+        for i in range(photo_count):
+            zip_writer.write(f"PIC/P{i + 1:07d}.JPG", blobs[i % len(blobs)])
+        with zip_writer.open("PHOTO.XML") as entry:
+            PhotoXMLGenerator().write_xml(xml_photos, entry, pretty_print=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--size-gb", type=float, default=5.0)
+    parser.add_argument("--photo-mb", type=float, default=2.0)
+    parser.add_argument("--xml-photos", type=int, default=0, help="0の場合は写真枚数")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--modes", nargs="+", default=["legacy", "serial", "parallel"])
+    parser.add_argument("--output", default="", help="ZIPの出力先ディレクトリ")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    photo_bytes = int(args.photo_mb * 1024 * 1024)
+    photo_count = int(args.size_gb * 1024**3 // photo_bytes)
+    blobs = photo_blobs(photo_bytes, 16, args.seed)
+    xml_photos = list(make_photos(args.xml_photos or photo_count, args.seed))
+    templates = template_files()
+    executor = ThreadPoolExecutor(max_workers=args.workers)
+    print(
+        f"photos={photo_count} x {args.photo_mb}MB, "
+        f"PHOTO.XML={len(xml_photos)} photos, workers={args.workers}"
+    )
+
+    for mode in args.modes:
+        path = os.path.join(args.output, f"{mode}.zip") if args.output else None
+        output = open(path, "wb") if path else CountingSink()
+        started = time.perf_counter()
+        try:
+            if mode == "legacy":
+                write_legacy(output, photo_count, blobs, xml_photos, templates)
+            else:
+                write_policy(
+                    output,
+                    photo_count,
+                    blobs,
+                    xml_photos,
+                    templates,
+                    executor if mode == "parallel" else None,
+                )
+        finally:
+            if path:
+                output.close()
+        elapsed = time.perf_counter() - started
+        size = os.path.getsize(path) if path else output.size
+        print(
+            f"{mode:<8} {elapsed:7.2f}s {size / 1024**3:6.2f}GB "
+            f"{size / elapsed / 1024**2:6.0f}MB/s"
+        )
+        if path:
+            with zipfile.ZipFile(path) as zf:
+                assert zf.testzip() is None
+                zip64 = zf.infolist()[-1].header_offset > 0xFFFFFFFF
+            print(f"         verified entries={photo_count + 3} zip64={zip64}")
+            os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+"""
+ローカル代替AWS（Textract・Rekognition）を使ったパイプラインのベンチマーク
+
+ネットワーク・AWS料金なしで、大量写真の一括画像分類・一括OCR・ジョブキューの
+スループットを計測します（AWS_CLIENT_BACKEND=fake と同じ代替実装を使用）。
+
+使い方:
+    cd backend
+    python -m benchmarks.fake_aws_pipeline --photos 10000 --latency lognormal:40:0.5 \\
+        --throttle-rate 0.01 --service-limit 32 --concurrency 32
+"""
+
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+
+from app.services.fake_aws import (
+    FakeRekognitionClient,
+    FakeTextractClient,
+    LatencyModel,
+)
+from app.services.job_event_bus import InMemoryJobEventBus
+from app.services.job_scheduler import JobPriority, JobScheduler
+from app.services.metrics import MetricsRegistry
+from app.services.ocr_service import OCRService
+from app.services.rekognition_service import RekognitionService
+
+
+def _fake_options(args):
+    return {
+        "latency": LatencyModel.parse(args.latency),
+        "throttle_rate": args.throttle_rate,
+        "max_concurrency": args.service_limit,
+        "error_rate": args.error_rate,
+        "seed": 0,
+    }
+
+
+def bench_classification(args, photos):
+    client = FakeRekognitionClient(**_fake_options(args))
+    with patch(
+        "app.services.rekognition_service.create_aws_client", return_value=client
+    ):
+        service = RekognitionService(confidence_threshold=70.0)
+
+    started = time.perf_counter()
+    succeeded = failed = retries = 0
+    for result in service.detect_labels_batch(
+        photos, s3_bucket="bench", max_concurrency=args.concurrency
+    ):
+        service.categorize_and_summarize(result.labels)
+        succeeded += result.success
+        failed += not result.success
+        retries += result.attempts - 1
+    elapsed = time.perf_counter() - started
+
+    print(
+        f"classification: {elapsed:.2f}s ({len(photos) / elapsed:.0f} photos/s) "
+        f"succeeded={succeeded} failed={failed} retries={retries} "
+        f"throttled={client.stats['throttled']}"
+    )
+
+
+def bench_ocr(args, photos):
+    client = FakeTextractClient(**_fake_options(args))
+    with patch("app.services.ocr_service.create_aws_client", return_value=client):
+        service = OCRService()
+
+    def process(item):
+        _, s3_key = item
+        try:
+            blocks = service.extract_text_from_image("bench", s3_key)
+        except Exception:
+            return False
+        service.parse_blackboard_text(blocks)
+        return True
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+        succeeded = sum(executor.map(process, photos))
+    elapsed = time.perf_counter() - started
+
+    print(
+        f"ocr:            {elapsed:.2f}s ({len(photos) / elapsed:.0f} photos/s) "
+        f"succeeded={succeeded} failed={len(photos) - succeeded} "
+        f"(no retry; throttled={client.stats['throttled']})"
+    )
+
+
+def bench_job_queue(args, photos):
+    # キューの計測ではスロットリング・エラーを無効化
+    client = FakeRekognitionClient(latency=LatencyModel.parse(args.latency), seed=0)
+    registry = MetricsRegistry()
+    scheduler = JobScheduler(
+        max_workers=args.concurrency,
+        tenant_concurrency=max(args.concurrency // 2, 1),
+        bus=InMemoryJobEventBus(),
+        metrics=registry,
+    )
+
+    def classify(s3_key):
+        return lambda reporter: client.detect_labels(
+            Image={"S3Object": {"Bucket": "bench", "Name": s3_key}}
+        )
+
+    started = time.perf_counter()
+    jobs = []
+    for index, (_, s3_key) in enumerate(photos):
+        # 組織1が大半を投入し、組織2・3は少量（公平性の確認）
+        organization_id = 1 if index % 10 < 8 else 2 + index % 2
+        jobs.append(scheduler.submit(organization_id, "bench", classify(s3_key)))
+    for job in jobs:
+        job.future.result()
+    elapsed = time.perf_counter() - started
+    scheduler.shutdown()
+
+    print(f"job queue:      {elapsed:.2f}s ({len(jobs) / elapsed:.0f} jobs/s)")
+    for summary in sorted(
+        registry.snapshot()["summaries"],
+        key=lambda s: s["labels"].get("organization_id", ""),
+    ):
+        if summary["name"] == "job_queue_wait_seconds":
+            print(
+                f"  org={summary['labels']['organization_id']} jobs={summary['count']} "
+                f"wait p50={summary['p50']:.2f}s p95={summary['p95']:.2f}s"
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--photos", type=int, default=10000)
+    parser.add_argument("--latency", default="lognormal:40:0.5", help="ミリ秒")
+    parser.add_argument("--throttle-rate", type=float, default=0.01)
+    parser.add_argument(
+        "--service-limit", type=int, default=32, help="API側の同時実行上限"
+    )
+    parser.add_argument("--error-rate", type=float, default=0.001)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument(
+        "--only", choices=["classification", "ocr", "queue"], help="特定の計測のみ実行"
+    )
+    args = parser.parse_args()
+
+    photos = [(i, f"photos/P{i:07d}.JPG") for i in range(1, args.photos + 1)]
+    print(
+        f"photos={args.photos} latency={args.latency} throttle={args.throttle_rate} "
+        f"service_limit={args.service_limit} concurrency={args.concurrency}"
+    )
+    if args.only in (None, "classification"):
+        bench_classification(args, photos)
+    if args.only in (None, "ocr"):
+        bench_ocr(args, photos)
+    if args.only in (None, "queue"):
+        bench_job_queue(args, photos)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+"""
+建設関連ラベル判定のマイクロベンチマーク
+
+従来の入れ子ループ（カテゴリ×キーワードの部分一致走査を分類・フィルタ・サマリーで
+それぞれ実行）と、コンパイル済みマッチャーによる1パス処理を比較します。
+
+使い方:
+    cd backend
+    python -m benchmarks.label_matcher --photos 10000
+"""
+
+import argparse
+import random
+import timeit
+from unittest.mock import patch
+
+from app.services.rekognition_service import RekognitionService
+
+# Rekognitionが返す代表的なラベル
+LABEL_VOCABULARY = [
+    "Construction",
+    "Construction Site",
+    "Excavator",
+    "Bulldozer",
+    "Crane",
+    "Dump Truck",
+    "Truck",
+    "Vehicle",
+    "Machine",
+    "Person",
+    "Human",
+    "Worker",
+    "Helmet",
+    "Hard Hat",
+    "Clothing",
+    "Apparel",
+    "Safety Vest",
+    "Concrete",
+    "Rebar",
+    "Steel",
+    "Wood",
+    "Lumber",
+    "Brick",
+    "Pipe",
+    "Scaffolding",
+    "Building",
+    "Road",
+    "Bridge",
+    "Soil",
+    "Dirt",
+    "Ground",
+    "Sky",
+    "Tree",
+    "Plant",
+    "Outdoors",
+    "Nature",
+    "Architecture",
+    "Urban",
+    "Asphalt",
+    "Tarmac",
+]
+
+
+def naive_categorize_and_summarize(keywords, labels):
+    """従来実装と同等の処理（分類→フィルタ→サマリーで3回走査）"""
+    categorized = {category: [] for category in [*keywords, "other"]}
+    for label in labels:
+        name = label["Name"].lower()
+        for category, words in keywords.items():
+            if any(word in name for word in words):
+                categorized[category].append(label["Name"])
+                break
+        else:
+            categorized["other"].append(label["Name"])
+
+    all_keywords = [word for words in keywords.values() for word in words]
+    related = [
+        label
+        for label in labels
+        if any(word in label["Name"].lower() for word in all_keywords)
+    ]
+    confidences = [label["Confidence"] for label in labels]
+    summary = {
+        "total_labels": len(labels),
+        "max_confidence": max(confidences),
+        "avg_confidence": sum(confidences) / len(confidences),
+        "top_labels": [
+            label["Name"]
+            for label in sorted(labels, key=lambda x: x["Confidence"], reverse=True)[:5]
+        ],
+        "has_construction_content": len(related) > 0,
+    }
+    return categorized, summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--photos", type=int, default=10000)
+    parser.add_argument("--labels-per-photo", type=int, default=15)
+    args = parser.parse_args()
+
+    random.seed(0)
+    photos = [
+        [
+            {"Name": name, "Confidence": random.uniform(70, 99), "Parents": []}
+            for name in random.sample(LABEL_VOCABULARY, args.labels_per_photo)
+        ]
+        for _ in range(args.photos)
+    ]
+
+    with patch("boto3.client"):
+        service = RekognitionService()
+    keywords = RekognitionService.CONSTRUCTION_KEYWORDS
+
+    for labels in photos[:100]:
+        assert service.categorize_and_summarize(
+            labels
+        ) == naive_categorize_and_summarize(keywords, labels)
+
+    naive = min(
+        timeit.repeat(
+            lambda: [
+                naive_categorize_and_summarize(keywords, labels) for labels in photos
+            ],
+            number=1,
+            repeat=3,
+        )
+    )
+    compiled = min(
+        timeit.repeat(
+            lambda: [service.categorize_and_summarize(labels) for labels in photos],
+            number=1,
+            repeat=3,
+        )
+    )
+
+    print(f"photos={args.photos} labels/photo={args.labels_per_photo}")
+    print(f"naive:    {naive * 1000:.1f} ms ({naive / args.photos * 1e6:.1f} us/photo)")
+    print(
+        f"compiled: {compiled * 1000:.1f} ms ({compiled / args.photos * 1e6:.1f} us/photo)"
+    )
+    print(f"speedup:  {naive / compiled:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
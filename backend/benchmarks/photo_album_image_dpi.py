@@ -0,0 +1,93 @@
+"""
+写真帳PDFの画像縮小ベンチマーク
+
+写真相当のJPEG（既定 4000x3000）で写真帳PDFを作成し、レイアウトごとに
+縮小なし（image_dpi=0、元の画素数のまま再エンコード）と、表示サイズの印刷解像度まで
+縮小した場合（--dpi で指定）の出力サイズと作成時間を比較します。
+
+使い方:
+    cd backend
+    python -m benchmarks.photo_album_image_dpi --photos 12 --dpi 200 300 \\
+        --quality 85 --subsampling 4:2:0
+"""
+
+import argparse
+import os
+import random
+import tempfile
+import time
+from io import BytesIO
+
+from PIL import Image
+
+from app.services.photo_album_generator import LayoutType, PhotoAlbumGenerator
+
+
+def make_photo(width: int, height: int, rng: random.Random) -> bytes:
+    """写真相当のJPEG（低解像度のノイズを拡大し、細かいノイズを重ねた画像）"""
+    base = Image.frombytes(
+        "RGB",
+        (width // 16, height // 16),
+        bytes(rng.randrange(256) for _ in range(width // 16 * height // 16 * 3)),
+    ).resize((width, height), Image.Resampling.BICUBIC)
+    grain = Image.effect_noise((width, height), 24).convert("RGB")
+    output = BytesIO()
+    Image.blend(base, grain, 0.15).save(output, format="JPEG", quality=92)
+    return output.getvalue()
+
+
+def run(photos, generator: PhotoAlbumGenerator, layout: LayoutType):
+    """(作成時間, PDFサイズ) を返す"""
+    with tempfile.TemporaryDirectory() as tmp:
+        started = time.perf_counter()
+        result = generator.generate_pdf(
+            photos, os.path.join(tmp, "album.pdf"), layout_type=layout
+        )
+        elapsed = time.perf_counter() - started
+        assert result["success"], result["errors"]
+    return elapsed, result["file_size"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--photos", type=int, default=12)
+    parser.add_argument("--width", type=int, default=4000)
+    parser.add_argument("--height", type=int, default=3000)
+    parser.add_argument("--dpi", type=int, nargs="+", default=[200, 300])
+    parser.add_argument("--quality", type=int, default=85)
+    parser.add_argument("--subsampling", default="4:2:0")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    photos = [
+        {
+            "id": i + 1,
+            "title": f"写真{i + 1}",
+            "image_data": make_photo(args.width, args.height, rng),
+        }
+        for i in range(args.photos)
+    ]
+    source_mb = sum(len(photo["image_data"]) for photo in photos) / 1024 / 1024
+    print(
+        f"photos={args.photos} x {args.width}x{args.height} ({source_mb:.1f}MB), "
+        f"quality={args.quality}, subsampling={args.subsampling}"
+    )
+
+    for layout in LayoutType:
+        for dpi in [0, *args.dpi]:
+            generator = PhotoAlbumGenerator(
+                image_dpi=dpi,
+                jpeg_quality=args.quality,
+                jpeg_subsampling=args.subsampling,
+            )
+            elapsed, size = run(photos, generator, layout)
+            label = f"{dpi}dpi" if dpi else "original"
+            print(
+                f"{layout.value:<9} {label:<9} {elapsed:7.2f}s "
+                f"{elapsed / args.photos * 1000:7.0f}ms/photo  pdf={size / 1024 / 1024:7.2f}MB"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+写真帳PDFのJPEG埋め込みベンチマーク
+
+JPEG（既定 800x600、4枚に1枚はEXIFで縦向き指定）で写真帳PDFを作成し、
+従来方式（PILでデコードしてJPEGに再エンコード）と、縮小が不要な写真はデコードせずに
+元のJPEGデータをそのまま埋め込む方式で、作成時間・CPU時間・PDFサイズを比較します。
+既定のサイズは、詳細レイアウトでは全写真、標準レイアウトでは横向きの写真が
+200dpiの表示サイズ以下（そのまま埋め込み）で、それ以外は縮小されます。
+
+使い方:
+    cd backend
+    python -m benchmarks.photo_album_jpeg_passthrough --photos 200 --width 800 --height 600
+"""
+
+import argparse
+import os
+import random
+import tempfile
+import time
+from io import BytesIO
+
+from PIL import Image
+
+from app.services.photo_album_generator import LayoutType, PhotoAlbumGenerator
+
+
+class ReencodingPhotoAlbumGenerator(PhotoAlbumGenerator):
+    """従来方式: すべての画像をデコードして再エンコードする"""
+
+    def _can_embed_directly(self, img, width, height):
+        return False
+
+
+def make_photo(width: int, height: int, orientation: int, rng: random.Random) -> bytes:
+    """写真相当のJPEG（低解像度のノイズを拡大し、細かいノイズを重ねた画像）"""
+    base = Image.frombytes(
+        "RGB",
+        (width // 16, height // 16),
+        bytes(rng.randrange(256) for _ in range(width // 16 * height // 16 * 3)),
+    ).resize((width, height), Image.Resampling.BICUBIC)
+    grain = Image.effect_noise((width, height), 24).convert("RGB")
+    exif = Image.Exif()
+    exif[0x0112] = orientation
+    output = BytesIO()
+    Image.blend(base, grain, 0.15).save(output, format="JPEG", quality=90, exif=exif)
+    return output.getvalue()
+
+
+def run(photos, generator: PhotoAlbumGenerator, layout: LayoutType):
+    """(作成時間, CPU時間, PDFサイズ) を返す"""
+    with tempfile.TemporaryDirectory() as tmp:
+        started = time.perf_counter()
+        cpu_started = time.process_time()
+        result = generator.generate_pdf(
+            photos, os.path.join(tmp, "album.pdf"), layout_type=layout
+        )
+        cpu = time.process_time() - cpu_started
+        elapsed = time.perf_counter() - started
+        assert result["success"], result["errors"]
+    return elapsed, cpu, result["file_size"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--photos", type=int, default=200)
+    parser.add_argument("--width", type=int, default=800)
+    parser.add_argument("--height", type=int, default=600)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    # 4枚に1枚は縦向き（EXIF Orientation 6）
+    photos = [
+        {
+            "id": i + 1,
+            "title": f"写真{i + 1}",
+            "image_data": make_photo(
+                args.width, args.height, 6 if i % 4 == 3 else 1, rng
+            ),
+        }
+        for i in range(args.photos)
+    ]
+    print(f"photos={args.photos} x {args.width}x{args.height}")
+
+    for layout in LayoutType:
+        for label, generator in (
+            ("reencode", ReencodingPhotoAlbumGenerator()),
+            ("passthrough", PhotoAlbumGenerator()),
+        ):
+            elapsed, cpu, size = run(photos, generator, layout)
+            print(
+                f"{layout.value:<9} {label:<12} {elapsed:7.2f}s cpu={cpu:7.2f}s "
+                f"{elapsed / args.photos * 1000:7.1f}ms/photo  pdf={size / 1024 / 1024:7.2f}MB"
+            )
+
+
+if __name__ == "__main__":
+    main()
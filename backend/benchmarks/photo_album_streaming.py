@@ -0,0 +1,140 @@
+"""
+写真帳PDFの画像先読みベンチマーク
+
+S3代替クライアント（レイテンシ分布付き）に保存したJPEGで写真帳PDFを作成し、
+従来方式（全写真の画像を取得してから描画）と、ページごとに先読みイテレータから
+取り出す方式（PhotoAlbumGenerator.iter_images）で、所要時間とPythonヒープの
+ピーク使用量（tracemalloc。取得した画像データのバイト列を含む）を比較します。
+
+写真ごとに異なる画像として埋め込ませるため、JPEGの終端の後ろに写真ごとのバイト列を
+付けて保存します（同じ画像は reportlab が1つにまとめるため、ピークを過小評価する）。
+どちらの方式も reportlab は保存までページの画像を保持するため、ストリーミング方式の
+ピークは先読み数と部分PDF（--pages-per-part ページ）1つ分の画像で決まります。
+
+使い方:
+    cd backend
+    python -m benchmarks.photo_album_streaming --photos 200 --photo-mb 4 \\
+        --latency lognormal:60:0.5 --prefetch 4 --pages-per-part 10
+"""
+
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+from io import BytesIO
+
+from PIL import Image
+
+from app.services.fake_aws import FakeS3Client, FakeStreamingBody, LatencyModel
+from app.services.photo_album_generator import (
+    DEFAULT_IMAGE_DPI,
+    DEFAULT_PAGES_PER_PART,
+    LayoutType,
+    PhotoAlbumGenerator,
+)
+
+
+class DownloadingS3Client(FakeS3Client):
+    """取得のたびに新しいバイト列を返す（実際のダウンロードと同じくメモリを確保する）"""
+
+    def get_object(self, **kwargs):
+        response = super().get_object(**kwargs)
+        response["Body"] = FakeStreamingBody(bytes(bytearray(response["Body"].read())))
+        return response
+
+
+def make_jpeg(photo_mb: float) -> bytes:
+    """おおよそ指定サイズのJPEG（ノイズ画像）"""
+    side = 256
+    while True:
+        img = Image.frombytes(
+            "RGB", (side * 3 // 2, side), os.urandom(side * 3 // 2 * side * 3)
+        )
+        output = BytesIO()
+        img.save(output, format="JPEG", quality=90)
+        if output.tell() >= photo_mb * 1024 * 1024:
+            return output.getvalue()
+        side *= 2 if output.tell() * 4 < photo_mb * 1024 * 1024 else 1.2
+        side = int(side)
+
+
+def run(mode: str, photos, client, prefetch: int, layout: LayoutType, **options):
+    """(所要時間, ピーク使用量, PDFサイズ) を返す"""
+    generator = PhotoAlbumGenerator(**options)
+    with tempfile.TemporaryDirectory() as tmp:
+        tracemalloc.start()
+        started = time.perf_counter()
+        images = generator.iter_images(
+            photos, client, "bench", prefetch_concurrency=prefetch
+        )
+        if mode == "eager":
+            # 従来方式: 全写真の画像を取得してから描画
+            album_photos = [
+                {**photo, "image_data": image_data}
+                for photo, image_data in zip(photos, images)
+            ]
+            result = generator.generate_pdf(
+                album_photos, os.path.join(tmp, "album.pdf"), layout_type=layout
+            )
+        else:
+            result = generator.generate_pdf(
+                photos,
+                os.path.join(tmp, "album.pdf"),
+                layout_type=layout,
+                images=images,
+            )
+        elapsed = time.perf_counter() - started
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        assert result["success"], result["errors"]
+    return elapsed, peak, result["file_size"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--photos", type=int, default=200)
+    parser.add_argument("--photo-mb", type=float, default=4.0)
+    parser.add_argument("--latency", default="lognormal:60:0.5")
+    parser.add_argument("--prefetch", type=int, default=4)
+    parser.add_argument(
+        "--layout", default="standard", choices=[layout.value for layout in LayoutType]
+    )
+    parser.add_argument("--pages-per-part", type=int, default=DEFAULT_PAGES_PER_PART)
+    parser.add_argument("--dpi", type=int, default=DEFAULT_IMAGE_DPI)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    client = DownloadingS3Client(
+        latency=LatencyModel.parse(args.latency), seed=args.seed
+    )
+    jpeg = make_jpeg(args.photo_mb)
+    photos = []
+    for i in range(args.photos):
+        key = f"photos/P{i + 1:07d}.JPG"
+        client.put_object(Bucket="bench", Key=key, Body=jpeg + b"%08d" % i)
+        photos.append({"id": i + 1, "title": f"写真{i + 1}", "s3_key": key})
+    print(
+        f"photos={args.photos} x {len(jpeg) / 1024 / 1024:.1f}MB, "
+        f"latency={args.latency}, prefetch={args.prefetch}, layout={args.layout}, "
+        f"pages_per_part={args.pages_per_part}, dpi={args.dpi}"
+    )
+
+    for mode in ("eager", "streaming"):
+        elapsed, peak, size = run(
+            mode,
+            photos,
+            client,
+            args.prefetch,
+            LayoutType(args.layout),
+            image_dpi=args.dpi,
+            pages_per_part=args.pages_per_part,
+        )
+        print(
+            f"{mode:<10} {elapsed:8.2f}s  peak={peak / 1024 / 1024:8.1f}MB  "
+            f"pdf={size / 1024 / 1024:8.1f}MB"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+エクスポート事前バリデーションのベンチマーク
+
+一時SQLiteファイルに工事1件分の写真を投入し、従来方式（ORMで全写真を読み込み、
+1枚ずつ辞書化して validate_photo_data で検査）と、
+PhotoValidationService によるSQL集計を比較します。
+
+使い方:
+    cd backend
+    python -m benchmarks.photo_validation --photos 100000
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.database.models import Base, Photo
+from app.services.export_service import ExportService
+from app.services.photo_validation_service import PhotoValidationService
+from app.services.photo_xml_generator import PhotoXMLGenerator
+
+from benchmarks.title_regeneration import populate
+
+
+def legacy_validate(db, organization_id: int, photo_ids) -> int:
+    """従来方式（ORMで読み込み、Pythonで検査）。エラー・警告の件数を返す"""
+    photos = (
+        db.query(Photo)
+        .filter(Photo.id.in_(photo_ids), Photo.organization_id == organization_id)
+        .all()
+    )
+    generator = PhotoXMLGenerator()
+    issues = 0
+    photo_dicts = []
+    for photo in photos:
+        photo_dict = {
+            "id": photo.id,
+            "file_name": photo.file_name,
+            "title": photo.title or "",
+            "shooting_date": (
+                photo.shooting_date.isoformat() if photo.shooting_date else ""
+            ),
+            "major_category": photo.major_category or "",
+            "photo_metadata": photo.photo_metadata or {},
+        }
+        photo_dicts.append(photo_dict)
+        issues += len(generator.validate_photo_data(photo_dict))
+        if not photo.photo_metadata or not photo.photo_metadata.get("ocr_result"):
+            issues += 1
+    issues += len(ExportService().check_filename_duplication(photo_dicts))
+    return issues
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--photos", type=int, default=100000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+        Base.metadata.create_all(engine)
+        session_factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+        organization_id, _ = populate(session_factory, args.photos, args.seed)
+
+        db = session_factory()
+        photo_ids = [photo_id for (photo_id,) in db.query(Photo.id)]
+
+        started = time.perf_counter()
+        issues = legacy_validate(db, organization_id, photo_ids)
+        print(
+            f"legacy photos={len(photo_ids)}: {time.perf_counter() - started:.2f}s "
+            f"issues={issues}"
+        )
+        db.expunge_all()
+
+        started = time.perf_counter()
+        result = PhotoValidationService(db).validate(
+            photo_ids, organization_id=organization_id
+        )
+        print(
+            f"sql    photos={result['total']}: {time.perf_counter() - started:.2f}s "
+            f"invalid={result['invalid_photos']} offenders={result['offender_total']} "
+            f"errors={result['error_counts']} warnings={result['warning_counts']}"
+        )
+        db.close()
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
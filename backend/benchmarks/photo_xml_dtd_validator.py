@@ -0,0 +1,64 @@
+"""
+PHOTO.XML DTD適合チェックのオーバーヘッド測定
+
+PHOTO.XMLを逐次出力する時間と、同じ出力を64KBずつ PhotoXMLDTDValidator に
+渡して検査する時間を比較します。参考として、全要素をexpatで検査する方式
+（写真情報の高速経路なし）も測定します。
+
+使い方:
+    cd backend
+    python -m benchmarks.photo_xml_dtd_validator --photos 200000
+"""
+
+import argparse
+import io
+import time
+
+from app.services.photo_xml_dtd_validator import PhotoXMLDTDValidator
+from app.services.photo_xml_generator import WRITE_BUFFER_SIZE, PhotoXMLGenerator
+
+from benchmarks.photo_xml_writer import make_photos
+
+
+def run_validator(data: bytes, fast_path: bool = True):
+    """出力を書き込み単位ごとに検査し、(所要時間, チェッカー) を返す"""
+    validator = PhotoXMLDTDValidator()
+    if not fast_path:
+        validator._photo_pattern = None
+    started = time.perf_counter()
+    for offset in range(0, len(data), WRITE_BUFFER_SIZE):
+        validator.feed(data[offset : offset + WRITE_BUFFER_SIZE])
+    validator.close()
+    return time.perf_counter() - started, validator
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--photos", type=int, default=200000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    generator = PhotoXMLGenerator()
+    stream = io.BytesIO()
+    started = time.perf_counter()
+    generator.write_xml(make_photos(args.photos, args.seed), stream, pretty_print=True)
+    generation = time.perf_counter() - started
+    data = stream.getvalue()
+    print(f"generate    photos={args.photos}: {generation:.2f}s")
+
+    elapsed, validator = run_validator(data)
+    print(
+        f"validate    photos={validator.photo_count}: {elapsed:.2f}s "
+        f"({elapsed / generation:.0%} of generation) errors={validator.error_count}"
+    )
+    assert validator.is_valid
+
+    elapsed, validator = run_validator(data, fast_path=False)
+    print(
+        f"expat only  photos={validator.photo_count}: {elapsed:.2f}s "
+        f"({elapsed / generation:.0%} of generation)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+PHOTO.XML 写真情報フラグメントキャッシュのベンチマーク
+
+キャッシュなしの逐次出力、キャッシュが空の状態（全件生成して保存）、
+キャッシュ済みの状態（数%の写真だけ更新・並び順を変更）でPHOTO.XMLを組み立て、
+所要時間とヒット率を比較します。出力はキャッシュなしの場合と同一か検証します。
+
+使い方:
+    cd backend
+    python -m benchmarks.photo_xml_fragment_cache --photos 200000 --changed-ratio 0.02
+"""
+
+import argparse
+import hashlib
+import random
+import time
+from datetime import datetime, timedelta
+
+from app.services.photo_xml_fragment_cache import (
+    FragmentCacheStats,
+    InMemoryPhotoXMLFragmentCache,
+)
+from app.services.photo_xml_generator import PhotoXMLGenerator
+
+from benchmarks.photo_xml_writer import make_photos
+
+
+class DigestStream:
+    """書き込まれたバイト列のハッシュだけを保持するストリーム"""
+
+    def __init__(self):
+        self._hash = hashlib.sha256()
+
+    def write(self, data: bytes):
+        self._hash.update(data)
+
+    def hexdigest(self) -> str:
+        return self._hash.hexdigest()
+
+
+def assemble(generator, photos, cache=None):
+    """PHOTO.XMLを組み立て、(所要時間, ダイジェスト, 統計) を返す"""
+    stats = FragmentCacheStats()
+    stream = DigestStream()
+    started = time.perf_counter()
+    generator.write_xml(
+        photos, stream, pretty_print=True, fragment_cache=cache, cache_stats=stats
+    )
+    return time.perf_counter() - started, stream.hexdigest(), stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--photos", type=int, default=200000)
+    parser.add_argument("--changed-ratio", type=float, default=0.02)
+    parser.add_argument("--cache-mb", type=int, default=1024)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    generator = PhotoXMLGenerator()
+    cache = InMemoryPhotoXMLFragmentCache(args.cache_mb * 1024 * 1024)
+    updated_at = datetime(2024, 3, 15)
+    photos = [
+        {**photo, "updated_at": updated_at}
+        for photo in make_photos(args.photos, args.seed)
+    ]
+
+    elapsed, _, _ = assemble(generator, photos)
+    print(f"uncached  photos={args.photos}: {elapsed:.2f}s")
+
+    elapsed, _, stats = assemble(generator, photos, cache)
+    print(
+        f"cold      photos={args.photos}: {elapsed:.2f}s "
+        f"hit_rate={stats.hit_rate:.2%} cache={cache.size_bytes / 1024 / 1024:.0f}MB"
+    )
+
+    # 一部の写真を更新し、並び順（シリアル番号）も変更する
+    rng = random.Random(args.seed + 1)
+    for index in rng.sample(range(len(photos)), int(len(photos) * args.changed_ratio)):
+        photos[index] = {
+            **photos[index],
+            "title": photos[index]["title"] + "（修正）",
+            "updated_at": updated_at + timedelta(days=1),
+        }
+    rng.shuffle(photos)
+
+    elapsed, digest, stats = assemble(generator, photos, cache)
+    print(
+        f"warm      photos={args.photos}: {elapsed:.2f}s "
+        f"hits={stats.hits} misses={stats.misses} hit_rate={stats.hit_rate:.2%}"
+    )
+
+    elapsed, expected, _ = assemble(generator, photos)
+    print(f"uncached  (reordered): {elapsed:.2f}s identical={digest == expected}")
+    assert digest == expected
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""
+PHOTO.XML生成のメモリ・時間ベンチマーク
+
+従来方式（ElementTree全体を構築 → minidomで整形 → Shift_JISエンコード）と、
+写真情報を1枚ずつZIPエントリへ書き込む逐次出力を比較します。
+ピークメモリは tracemalloc で測定します（写真データ自体の保持分を含む）。
+
+使い方:
+    cd backend
+    python -m benchmarks.photo_xml_writer --photos 200000 --legacy-photos 20000
+"""
+
+import argparse
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+import xml.etree.ElementTree as ET
+import zipfile
+
+from app.services.photo_xml_generator import PhotoXMLGenerator
+
+WORK_TYPES = ["基礎工", "土工", "配筋工", "型枠工", "コンクリート工", "舗装工"]
+
+
+def make_photos(count: int, seed: int):
+    """写真データを生成（イテレータ）"""
+    rng = random.Random(seed)
+    for i in range(1, count + 1):
+        work_type = rng.choice(WORK_TYPES)
+        yield {
+            "id": i,
+            "file_name": f"P{i:07d}.JPG",
+            "title": f"{work_type}_No.{rng.randint(0, 99)}_施工状況_20240315",
+            "shooting_date": "2024-03-15",
+            "major_category": "工事",
+            "photo_type": "施工状況写真",
+            "work_type": work_type,
+            "work_kind": "配筋工",
+            "photo_metadata": {
+                "ocr_result": {
+                    "station": f"No.{rng.randint(0, 99)}+{rng.randint(0, 20)}",
+                    "design_dimension": 500,
+                    "actual_dimension": rng.randint(490, 510),
+                    "inspector": "山田太郎",
+                }
+            },
+        }
+
+
+def legacy_generate(generator: PhotoXMLGenerator, photos) -> bytes:
+    """従来方式（DOM全体を構築して整形）"""
+    root = ET.Element("photodata", attrib={"DTD_version": generator.dtd_version})
+    basic_info = ET.SubElement(root, "基礎情報")
+    ET.SubElement(basic_info, "写真フォルダ名").text = generator.photo_folder
+    ET.SubElement(basic_info, "適用要領基準").text = generator.standard
+    for idx, photo in enumerate(photos, start=1):
+        generator._add_photo_info(root, photo, idx)
+    xml = (
+        '<?xml version="1.0" encoding="Shift_JIS"?>\n'
+        '<!DOCTYPE photodata SYSTEM "PHOTO05.DTD">\n' + generator._prettify_xml(root)
+    )
+    return xml.encode("shift_jis")
+
+
+def measure(func):
+    """関数の実行時間とピークメモリを測定"""
+    tracemalloc.start()
+    started = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--photos", type=int, default=200000)
+    parser.add_argument("--legacy-photos", type=int, default=20000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    generator = PhotoXMLGenerator()
+    mb = 1024 * 1024
+
+    legacy_n = min(args.legacy_photos, args.photos)
+    data, elapsed, peak = measure(
+        lambda: legacy_generate(generator, list(make_photos(legacy_n, args.seed)))
+    )
+    print(
+        f"legacy    photos={legacy_n}: {elapsed:.2f}s peak={peak / mb:.0f}MB "
+        f"size={len(data) / mb:.1f}MB "
+        f"(~{elapsed * args.photos / legacy_n:.0f}s, "
+        f"~{peak * args.photos / legacy_n / mb:.0f}MB at {args.photos})"
+    )
+    assert data == generator.generate_xml(
+        list(make_photos(legacy_n, args.seed)), pretty_print=True
+    ).encode("shift_jis")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        zip_path = os.path.join(tmp, "export.zip")
+
+        def stream_to_zip():
+            with zipfile.ZipFile(zip_path, "w", zipfile.ZIP_DEFLATED) as zf:
+                with zf.open("PHOTO.XML", "w") as entry:
+                    return generator.write_xml(
+                        make_photos(args.photos, args.seed), entry, pretty_print=True
+                    )
+
+        written, elapsed, peak = measure(stream_to_zip)
+        print(
+            f"streaming photos={args.photos}: {elapsed:.2f}s peak={peak / mb:.1f}MB "
+            f"size={written / mb:.1f}MB zip={os.path.getsize(zip_path) / mb:.1f}MB"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+Rekognition 一括ラベル検出のベンチマーク
+
+逐次呼び出し（detect_labels_from_image）と一括呼び出し（detect_labels_batch）の
+スループットを、レイテンシとスロットリングを模擬したクライアントで比較します。
+
+使い方:
+    cd backend
+    python -m benchmarks.rekognition_batch --photos 200 --latency 0.05 --concurrency 8
+"""
+
+import argparse
+import random
+import threading
+import time
+from unittest.mock import patch
+
+from botocore.exceptions import ClientError
+
+from app.services.rekognition_service import RekognitionService
+
+
+class SimulatedRekognitionClient:
+    """一定のレイテンシと同時実行数超過時のスロットリングを模擬するクライアント"""
+
+    def __init__(self, latency: float, max_in_flight: int):
+        self.latency = latency
+        self.max_in_flight = max_in_flight
+        self._in_flight = 0
+        self._lock = threading.Lock()
+
+    def detect_labels(self, Image, MaxLabels, MinConfidence):
+        with self._lock:
+            self._in_flight += 1
+            throttled = self._in_flight > self.max_in_flight
+        try:
+            if throttled:
+                raise ClientError(
+                    {
+                        "Error": {
+                            "Code": "ThrottlingException",
+                            "Message": "Rate exceeded",
+                        }
+                    },
+                    "DetectLabels",
+                )
+            time.sleep(random.uniform(self.latency * 0.5, self.latency * 1.5))
+            return {
+                "Labels": [
+                    {"Name": "Construction", "Confidence": 95.0, "Parents": []},
+                    {"Name": "Excavator", "Confidence": 88.0, "Parents": []},
+                ]
+            }
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--photos", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument(
+        "--service-limit", type=int, default=6, help="模擬するAPI側の同時実行上限"
+    )
+    args = parser.parse_args()
+
+    client = SimulatedRekognitionClient(args.latency, args.service_limit)
+    with patch("boto3.client", return_value=client):
+        service = RekognitionService(confidence_threshold=70.0)
+
+    photos = [(i, f"photos/P{i:07d}.JPG") for i in range(1, args.photos + 1)]
+
+    started = time.perf_counter()
+    for _, s3_key in photos:
+        service.detect_labels_from_image(s3_bucket="bench", s3_key=s3_key)
+    sequential = time.perf_counter() - started
+
+    started = time.perf_counter()
+    results = list(
+        service.detect_labels_batch(
+            photos, s3_bucket="bench", max_concurrency=args.concurrency
+        )
+    )
+    batch = time.perf_counter() - started
+
+    succeeded = sum(1 for result in results if result.success)
+    retries = sum(result.attempts - 1 for result in results)
+    print(
+        f"photos={args.photos} latency={args.latency}s concurrency={args.concurrency}"
+    )
+    print(f"sequential: {sequential:.2f}s ({args.photos / sequential:.1f} photos/s)")
+    print(
+        f"batch:      {batch:.2f}s ({args.photos / batch:.1f} photos/s) "
+        f"succeeded={succeeded} retries={retries}"
+    )
+    print(f"speedup:    {sequential / batch:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,222 @@
+"""
+タイトル一括再生成のベンチマーク
+
+一時SQLiteファイルに工事1件分の写真を投入し、従来の1枚ずつの処理
+（ORMで読み込み→生成→コミット）と、TitleRegenerationService によるバッチ更新を比較します。
+従来方式は件数が多いと時間がかかるため、--baseline-photos 件で測定して外挿します。
+続けて、一部の写真のOCR結果だけを変更した場合の差分再生成を測定します。
+
+使い方:
+    cd backend
+    python -m benchmarks.title_regeneration --photos 100000
+"""
+
+import argparse
+import os
+import random
+import tempfile
+import time
+from datetime import datetime
+
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+
+from app.database.models import Base, Organization, Photo, Project
+from app.services.title_generation_service import TitleGenerationService
+from app.services.title_regeneration_service import (
+    TitleRegenerationService,
+    build_title_inputs,
+    generated_title_metadata,
+)
+
+WORK_TYPES = [
+    "基礎工",
+    "土工",
+    "配筋工",
+    "型枠工",
+    "コンクリート工",
+    "舗装工",
+    "擁壁工",
+]
+CATEGORIES = {
+    "equipment": ["crane", "excavator", "bulldozer"],
+    "people": ["worker", "person"],
+    "materials": ["concrete", "rebar"],
+}
+
+
+def random_metadata(rng: random.Random) -> dict:
+    """OCR・分類結果を含む写真メタデータを生成"""
+    metadata = {
+        "ocr_result": {
+            "shooting_date": f"2024-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+        },
+        "rekognition_labels": [
+            {"name": "Construction", "confidence": 95.0, "parents": []}
+        ],
+        "rekognition_categorized": {
+            category: [rng.choice(names)] for category, names in CATEGORIES.items()
+        },
+    }
+    if rng.random() < 0.8:
+        metadata["ocr_result"]["work_type"] = rng.choice(WORK_TYPES)
+        metadata["ocr_result"][
+            "station"
+        ] = f"No.{rng.randint(0, 99)}+{rng.randint(0, 20)}"
+    if rng.random() < 0.05:
+        metadata["manual_title"] = True
+    return metadata
+
+
+def populate(session_factory, photos: int, seed: int):
+    """組織・工事・写真を投入"""
+    db = session_factory()
+    org = Organization(name="Bench", subdomain="bench", is_active=True)
+    db.add(org)
+    db.commit()
+    project = Project(organization_id=org.id, name="Bench Project")
+    db.add(project)
+    db.commit()
+
+    rng = random.Random(seed)
+    now = datetime.utcnow()
+    batch = []
+    for i in range(photos):
+        batch.append(
+            {
+                "organization_id": org.id,
+                "project_id": project.id,
+                "file_name": f"P{i + 1:07d}.JPG",
+                "file_size": 1024,
+                "mime_type": "image/jpeg",
+                "s3_key": f"photos/P{i + 1:07d}.JPG",
+                "title": "旧タイトル",
+                "photo_metadata": random_metadata(rng),
+                "created_at": now,
+                "updated_at": now,
+            }
+        )
+        if len(batch) == 5000:
+            db.execute(insert(Photo), batch)
+            batch = []
+    if batch:
+        db.execute(insert(Photo), batch)
+    db.commit()
+    ids = (org.id, project.id)
+    db.close()
+    return ids
+
+
+def per_photo_baseline(session_factory, organization_id: int, limit: int) -> float:
+    """従来方式（1枚ずつ読み込み・生成・コミット）の所要時間"""
+    db = session_factory()
+    photo_ids = [
+        photo_id
+        for (photo_id,) in db.query(Photo.id)
+        .filter(Photo.organization_id == organization_id)
+        .order_by(Photo.id)
+        .limit(limit)
+    ]
+    service = TitleGenerationService()
+    started = time.perf_counter()
+    for photo_id in photo_ids:
+        photo = db.query(Photo).filter(Photo.id == photo_id).first()
+        ocr_data, classification_data = build_title_inputs(photo.photo_metadata)
+        result = service.generate_title_with_metadata(
+            ocr_data=ocr_data, classification_data=classification_data
+        )
+        photo.title = result["title"]
+        metadata = dict(photo.photo_metadata or {})
+        metadata["generated_title"] = generated_title_metadata(result)
+        photo.photo_metadata = metadata
+        db.commit()
+        db.refresh(photo)
+    elapsed = time.perf_counter() - started
+    db.rollback()
+    db.close()
+    return elapsed
+
+
+def touch_ocr_results(
+    session_factory, organization_id: int, ratio: float, seed: int
+) -> int:
+    """一部の写真のOCR結果（測点）を変更"""
+    db = session_factory()
+    rng = random.Random(seed + 1)
+    changed = 0
+    photos = db.query(Photo).filter(Photo.organization_id == organization_id).all()
+    for photo in rng.sample(photos, int(len(photos) * ratio)):
+        metadata = dict(photo.photo_metadata or {})
+        metadata["ocr_result"] = {
+            **metadata.get("ocr_result", {}),
+            "station": f"No.{rng.randint(100, 199)}",
+        }
+        photo.photo_metadata = metadata
+        changed += 1
+    db.commit()
+    db.close()
+    return changed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--photos", type=int, default=100000)
+    parser.add_argument("--baseline-photos", type=int, default=2000)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--changed-ratio", type=float, default=0.01)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+        Base.metadata.create_all(engine)
+        session_factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+        started = time.perf_counter()
+        organization_id, project_id = populate(session_factory, args.photos, args.seed)
+        print(f"photos={args.photos} populate={time.perf_counter() - started:.2f}s")
+
+        baseline_n = min(args.baseline_photos, args.photos)
+        baseline = per_photo_baseline(session_factory, organization_id, baseline_n)
+        extrapolated = baseline / baseline_n * args.photos
+        print(
+            f"per-photo:  {baseline:.2f}s for {baseline_n} "
+            f"({baseline_n / baseline:.0f} photos/s, ~{extrapolated:.0f}s extrapolated)"
+        )
+
+        db = session_factory()
+        service = TitleRegenerationService(db, batch_size=args.batch_size)
+        result = service.regenerate(organization_id, project_id)
+        print(
+            f"bulk:       {result['elapsed_seconds']:.2f}s "
+            f"({result['photos_per_second']:.0f} photos/s) "
+            f"updated={result['updated']} skipped_manual={result['skipped_manual']}"
+        )
+
+        result = service.regenerate(organization_id, project_id)
+        print(
+            f"bulk rerun: {result['elapsed_seconds']:.2f}s "
+            f"({result['photos_per_second']:.0f} photos/s) "
+            f"updated={result['updated']} unchanged={result['unchanged']}"
+        )
+
+        changed = touch_ocr_results(
+            session_factory, organization_id, args.changed_ratio, args.seed
+        )
+        result = service.regenerate(organization_id, project_id)
+        print(
+            f"incremental ({changed} OCR changed): {result['elapsed_seconds']:.2f}s "
+            f"updated={result['updated']} unchanged={result['unchanged']}"
+        )
+
+        result = service.regenerate(organization_id, project_id, force=True)
+        print(
+            f"forced:     {result['elapsed_seconds']:.2f}s "
+            f"({result['photos_per_second']:.0f} photos/s) updated={result['updated']}"
+        )
+        db.close()
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -12,6 +12,7 @@ from app.database.models import Base, Organization, User, Project
 from app.database.database import get_db
 from app.main import app
 from app.auth.jwt_handler import create_tokens
+from app.services.artifact_cache import get_artifact_cache
 
 # テスト用インメモリデータベース（全テストで共有するため、check_same_thread=Falseが必要）
 SQLALCHEMY_DATABASE_URL = "sqlite:///:memory:"
@@ -54,6 +55,8 @@ def client(db):
             pass  # dbのcloseはdb fixtureに任せる
 
     app.dependency_overrides[get_db] = override_get_db
+    # 前のテストで作成したパッケージ・写真帳を返さないよう成果物キャッシュを空にする
+    get_artifact_cache().clear()
 
     try:
         with TestClient(app) as test_client:
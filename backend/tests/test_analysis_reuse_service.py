@@ -0,0 +1,125 @@
+"""
+重複写真グループの解析結果再利用サービスのテスト
+"""
+
+import pytest
+
+from app.database.models import Photo, PhotoDuplicate, PhotoLabel
+from app.services.analysis_reuse_service import AnalysisReuseService
+from app.services.metrics import MetricsRegistry
+
+
+class TestAnalysisReuseService:
+    """AnalysisReuseService のテスト"""
+
+    @pytest.fixture
+    def registry(self):
+        """メトリクスレジストリのフィクスチャ"""
+        return MetricsRegistry()
+
+    @pytest.fixture
+    def group(self, db, test_org, test_project):
+        """代表写真（解析済み）とメンバー2枚の重複グループ"""
+        photos = []
+        for i in range(3):
+            photo = Photo(
+                organization_id=test_org.id,
+                project_id=test_project.id,
+                file_name=f"dup_{i}.jpg",
+                file_size=1024,
+                mime_type="image/jpeg",
+                s3_key=f"photos/dup_{i}.jpg",
+            )
+            db.add(photo)
+            photos.append(photo)
+        db.commit()
+
+        representative, member, low_similarity = photos
+        representative.photo_metadata = {
+            "rekognition_labels": [
+                {"name": "Excavator", "confidence": 92.0, "parents": []}
+            ],
+            "rekognition_categorized": {"equipment": ["Excavator"]},
+            "rekognition_summary": {"total_labels": 1},
+            "ocr_result": {"work_type": "土工"},
+            "ocr_text_blocks": [{"text": "工種: 土工", "confidence": 95.0}],
+        }
+        representative.work_type = "土工"
+        representative.is_processed = True
+        for photo, similarity in ((member, 0.99), (low_similarity, 0.80)):
+            db.add(
+                PhotoDuplicate(
+                    organization_id=test_org.id,
+                    photo1_id=representative.id,
+                    photo2_id=photo.id,
+                    similarity_score=similarity,
+                    status="confirmed",
+                )
+            )
+        db.commit()
+        return photos
+
+    def test_find_representative(self, db, group):
+        """類似度が閾値以上のメンバーのみ代表写真を持つ"""
+        representative, member, low_similarity = group
+        service = AnalysisReuseService(db, min_similarity=95.0)
+
+        assert service.find_representative(member).id == representative.id
+        assert service.find_representative(low_similarity) is None
+        assert service.find_representative(representative) is None
+
+    def test_propagate_labels(self, db, group, registry):
+        """ラベルの引き継ぎとAPI呼び出し削減数の記録"""
+        representative, member, low_similarity = group
+        service = AnalysisReuseService(db, min_similarity=95.0, metrics=registry)
+
+        assert service.propagate_labels(representative) == 1
+        db.commit()
+
+        assert member.photo_metadata["rekognition_inherited_from"] == representative.id
+        assert member.photo_metadata["rekognition_labels"][0]["name"] == "Excavator"
+        assert "rekognition_labels" not in (low_similarity.photo_metadata or {})
+        assert (
+            db.query(PhotoLabel).filter(PhotoLabel.photo_id == member.id).count() == 1
+        )
+        assert (
+            registry.get_counter(
+                "ai_calls_saved_total",
+                organization_id=representative.organization_id,
+                service="rekognition",
+            )
+            == 1
+        )
+
+    def test_propagate_ocr(self, db, group, registry):
+        """OCR結果の引き継ぎ"""
+        representative, member, _ = group
+        service = AnalysisReuseService(db, min_similarity=95.0, metrics=registry)
+
+        assert service.propagate_ocr(representative) == 1
+        db.commit()
+
+        assert member.work_type == "土工"
+        assert member.is_processed is True
+        assert member.photo_metadata["ocr_inherited_from"] == representative.id
+
+    def test_project_toggle_disables_reuse(self, db, group, test_project):
+        """工事で再利用を無効にすると引き継がない"""
+        representative, member, _ = group
+        test_project.reuse_duplicate_analysis = False
+        db.commit()
+        service = AnalysisReuseService(db, min_similarity=95.0)
+
+        assert service.find_representative(member) is None
+        assert service.propagate_labels(representative) == 0
+
+    def test_rejected_duplicate_is_ignored(self, db, group):
+        """却下された重複関係は再利用しない"""
+        _, member, _ = group
+        db.query(PhotoDuplicate).update({"status": "rejected"})
+        db.commit()
+
+        assert (
+            AnalysisReuseService(db, min_similarity=95.0).find_representative(member)
+            is None
+        )
@@ -3,7 +3,7 @@
 """
 
 import pytest
-from app.database.models import Organization, User, Project, Photo
+from app.database.models import Organization, User, Project, Photo, PhotoDuplicate
 from app.auth.jwt_handler import create_tokens
 
 
@@ -155,6 +155,76 @@ class TestDuplicateAPI:
         assert data["photo_id_deleted"] == photo2.id
         assert "重複として確定しました" in data["message"]
 
+    def test_duplicate_action_confirm_shares_analysis(
+        self, client, auth_headers, db, test_photos_with_phash
+    ):
+        """重複確定で重複関係を記録し、代表写真の解析結果を引き継ぐ"""
+        photo1 = test_photos_with_phash[0]
+        photo2 = test_photos_with_phash[1]
+        photo1.photo_metadata = {
+            **photo1.photo_metadata,
+            "rekognition_labels": [{"name": "Crane", "confidence": 91.0, "parents": []}],
+            "rekognition_categorized": {"equipment": ["Crane"]},
+        }
+        db.commit()
+
+        response = client.post(
+            "/api/v1/photos/duplicates/action",
+            headers=auth_headers,
+            json={
+                "photo_id_to_keep": photo1.id,
+                "photo_id_to_delete": photo2.id,
+                "action": "confirm",
+            },
+        )
+        assert response.status_code == 200
+
+        db.expire_all()
+        duplicate = db.query(PhotoDuplicate).one()
+        assert (duplicate.photo1_id, duplicate.photo2_id) == (photo1.id, photo2.id)
+        assert duplicate.status == "confirmed"
+        assert duplicate.similarity_score > 0.95
+        assert photo1.duplicate_group_id == photo2.duplicate_group_id is not None
+        assert photo2.photo_metadata["rekognition_inherited_from"] == photo1.id
+
+        # 却下すると重複関係も却下される
+        client.post(
+            "/api/v1/photos/duplicates/action",
+            headers=auth_headers,
+            json={
+                "photo_id_to_keep": photo1.id,
+                "photo_id_to_delete": photo2.id,
+                "action": "reject",
+            },
+        )
+        db.expire_all()
+        assert db.query(PhotoDuplicate).one().status == "rejected"
+
+    def test_duplicate_action_confirm_twice_keeps_single_row(
+        self, client, auth_headers, db, test_photos_with_phash
+    ):
+        """同じ組を再度確定（リトライ・却下後の再確定）しても重複関係は1行のまま更新される"""
+        photo1 = test_photos_with_phash[0]
+        photo2 = test_photos_with_phash[1]
+        payload = {
+            "photo_id_to_keep": photo1.id,
+            "photo_id_to_delete": photo2.id,
+        }
+
+        for action, similarity in (("confirm", None), ("reject", None), ("confirm", 97.0)):
+            response = client.post(
+                "/api/v1/photos/duplicates/action",
+                headers=auth_headers,
+                json={**payload, "action": action, "similarity": similarity},
+            )
+            assert response.status_code == 200
+
+        db.expire_all()
+        duplicate = db.query(PhotoDuplicate).one()
+        assert (duplicate.photo1_id, duplicate.photo2_id) == (photo1.id, photo2.id)
+        assert duplicate.status == "confirmed"
+        assert duplicate.similarity_score == pytest.approx(0.97)
+
     def test_duplicate_action_reject(self, client, auth_headers, test_photos_with_phash):
         """重複却下のテスト"""
         photo1 = test_photos_with_phash[0]
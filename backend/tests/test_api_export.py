@@ -2,10 +2,25 @@
 エクスポートAPIエンドポイントのテスト
 """
 
+import io
+import threading
+import time
+import zipfile
+
 import pytest
 from datetime import datetime
 from app.database.models import Organization, User, Photo, Project
 from app.auth.jwt_handler import create_tokens
+from app.config import settings
+from app.services.artifact_cache import get_artifact_cache
+from app.services.artifact_lifecycle import (
+    ADMISSION_RETRY_AFTER_SECONDS,
+    get_artifact_lifecycle,
+)
+from app.services.export_service import ExportService
+from app.services.job_scheduler import JobPriority, get_job_scheduler
+from app.services.stream_job_pool import get_stream_job_pool
+from app.services.photo_xml_fragment_cache import get_photo_xml_fragment_cache
 
 
 class TestExportAPI:
@@ -122,6 +137,378 @@ class TestExportAPI:
         # 実際のファイル生成で失敗するが、写真取得は成功
         assert response.status_code in [200, 500]
 
+    def test_export_package_reports_fragment_cache(
+        self, client, auth_headers, test_photos
+    ):
+        """2回目のエクスポートではPHOTO.XMLの写真情報がキャッシュから組み立てられる"""
+        get_photo_xml_fragment_cache().clear()
+        payload = {
+            "photo_ids": [p.id for p in test_photos],
+            "format": "photo_xml",
+            "project_name": "テストプロジェクト",
+            "include_photos": False,
+        }
+
+        first = client.post("/api/v1/export/package", headers=auth_headers, json=payload)
+        # 作成済みパッケージを返さず、PHOTO.XMLを組み立て直す
+        get_artifact_cache().clear()
+        second = client.post("/api/v1/export/package", headers=auth_headers, json=payload)
+
+        assert first.status_code == 200
+        assert first.json()["xml_fragment_cache"] == {
+            "hits": 0,
+            "misses": 3,
+            "hit_rate": 0.0,
+        }
+        assert second.json()["xml_fragment_cache"]["hit_rate"] == 1.0
+        assert second.json()["dtd_errors"] == []
+        assert second.json()["status"] == "success"
+
+    def test_export_package_returns_cached_artifact(
+        self, client, auth_headers, test_photos, db
+    ):
+        """同じ内容のエクスポートは作成済みのZIPを返し、写真が更新されると作り直す"""
+        payload = {
+            "photo_ids": [p.id for p in reversed(test_photos)],
+            "format": "photo_xml",
+            "project_name": "テストプロジェクト",
+            "include_photos": False,
+        }
+
+        first = client.post("/api/v1/export/package", headers=auth_headers, json=payload)
+        payload["photo_ids"] = [p.id for p in test_photos]
+        second = client.post("/api/v1/export/package", headers=auth_headers, json=payload)
+
+        assert first.json()["cached"] is False
+        assert second.json()["cached"] is True
+        assert second.json()["zip_path"] == first.json()["zip_path"]
+        assert second.json()["file_renames"] == first.json()["file_renames"]
+        assert second.json()["xml_fragment_cache"] is None
+
+        test_photos[0].title = "更新後のタイトル"
+        test_photos[0].updated_at = datetime(2030, 1, 1)
+        db.commit()
+        third = client.post("/api/v1/export/package", headers=auth_headers, json=payload)
+
+        assert third.json()["cached"] is False
+        assert third.json()["zip_path"] != first.json()["zip_path"]
+        download = client.get(third.json()["download_url"])
+        with zipfile.ZipFile(io.BytesIO(download.content)) as zf:
+            assert "更新後のタイトル" in zf.read("PHOTO.XML").decode("shift_jis")
+
+    def test_export_package_over_node_quota(self, client, auth_headers, test_photos):
+        """作成領域の空きが足りない場合は作成せずに 503 と Retry-After を返す"""
+        lifecycle = get_artifact_lifecycle()
+        lifecycle.quota_bytes = 0
+        try:
+            response = client.post(
+                "/api/v1/export/package",
+                headers=auth_headers,
+                json={
+                    "photo_ids": [p.id for p in test_photos],
+                    "format": "photo_xml",
+                    "project_name": "テストプロジェクト",
+                    "include_photos": False,
+                },
+            )
+        finally:
+            lifecycle.quota_bytes = settings.ARTIFACT_NODE_QUOTA_BYTES
+
+        assert response.status_code == 503
+        assert response.headers["retry-after"] == str(ADMISSION_RETRY_AFTER_SECONDS)
+        assert lifecycle.reserved_bytes == 0
+
+    def test_download_export_file(self, client, auth_headers, test_photos):
+        """署名付きトークンでダウンロードし、Range指定で部分取得できる"""
+        response = client.post(
+            "/api/v1/export/package",
+            headers=auth_headers,
+            json={
+                "photo_ids": [p.id for p in test_photos],
+                "format": "photo_xml",
+                "project_name": "テストプロジェクト",
+                "include_photos": False,
+            },
+        )
+        data = response.json()
+        assert data["download_url"].startswith("/api/v1/export/download/")
+        assert data["zip_path"] not in data["download_url"]
+
+        full = client.get(data["download_url"])
+        assert full.status_code == 200
+        assert full.headers["content-type"] == "application/zip"
+        assert full.headers["accept-ranges"] == "bytes"
+        assert len(full.content) == data["file_size"]
+        assert zipfile.ZipFile(io.BytesIO(full.content)).testzip() is None
+
+        partial = client.get(data["download_url"], headers={"Range": "bytes=10-"})
+        assert partial.status_code == 206
+        assert partial.headers["content-range"] == (
+            f"bytes 10-{data['file_size'] - 1}/{data['file_size']}"
+        )
+        assert partial.content == full.content[10:]
+
+        unsatisfiable = client.get(
+            data["download_url"], headers={"Range": f"bytes={data['file_size']}-"}
+        )
+        assert unsatisfiable.status_code == 416
+        assert unsatisfiable.headers["content-range"] == f"bytes */{data['file_size']}"
+
+    def test_resume_export_download(self, client, auth_headers, test_photos):
+        """ETag・If-Range・If-None-Match・HEAD による再開・分割ダウンロード"""
+        response = client.post(
+            "/api/v1/export/package",
+            headers=auth_headers,
+            json={
+                "photo_ids": [p.id for p in test_photos],
+                "format": "photo_xml",
+                "include_photos": False,
+            },
+        )
+        url = response.json()["download_url"]
+        size = response.json()["file_size"]
+
+        head = client.head(url)
+        assert head.status_code == 200
+        assert head.content == b""
+        assert head.headers["content-length"] == str(size)
+        etag = head.headers["etag"]
+        assert head.headers["last-modified"]
+
+        # 手元の部分データと同じ内容であれば続きを返す
+        resumed = client.get(url, headers={"Range": "bytes=100-", "If-Range": etag})
+        assert resumed.status_code == 206
+        assert len(resumed.content) == size - 100
+        by_date = client.get(
+            url,
+            headers={"Range": "bytes=100-", "If-Range": head.headers["last-modified"]},
+        )
+        assert by_date.status_code == 206
+
+        # 内容が変わっていれば全体を返す
+        changed = client.get(url, headers={"Range": "bytes=100-", "If-Range": '"old"'})
+        assert changed.status_code == 200
+        assert len(changed.content) == size
+
+        # 分割した範囲を並べると全体と一致する
+        half = size // 2
+        segments = [
+            client.get(url, headers={"Range": f"bytes=0-{half - 1}", "If-Range": etag}),
+            client.get(url, headers={"Range": f"bytes={half}-{size - 1}", "If-Range": etag}),
+        ]
+        assert b"".join(segment.content for segment in segments) == changed.content
+
+        not_modified = client.get(url, headers={"If-None-Match": etag})
+        assert not_modified.status_code == 304
+        assert not_modified.headers["etag"] == etag
+
+    def test_download_export_file_accel_redirect(
+        self, client, auth_headers, test_photos, monkeypatch
+    ):
+        """内部ロケーション設定時は X-Accel-Redirect でnginxに配信させる"""
+        monkeypatch.setattr(settings, "ARTIFACT_ACCEL_REDIRECT_PREFIX", "/_artifacts/")
+        response = client.post(
+            "/api/v1/export/package",
+            headers=auth_headers,
+            json={
+                "photo_ids": [p.id for p in test_photos],
+                "format": "photo_xml",
+                "include_photos": False,
+            },
+        )
+        data = response.json()
+
+        download = client.get(data["download_url"], headers={"Range": "bytes=0-9"})
+
+        assert download.status_code == 200
+        assert download.content == b""
+        assert download.headers["x-accel-redirect"] == f"/_artifacts/{data['zip_path']}"
+        assert download.headers["etag"]
+
+    def test_download_export_file_invalid_token(self, client, auth_headers):
+        """改ざん・期限切れのトークン、アクセストークンではダウンロードできない"""
+        access_token = auth_headers["Authorization"].split(" ", 1)[1]
+        for token in ("invalid-token", access_token):
+            response = client.get(f"/api/v1/export/download/{token}")
+            assert response.status_code == 403
+
+    def test_stream_export_package(self, client, auth_headers, test_photos):
+        """ZIPをファイルに保存せずレスポンスとして直接配信"""
+        response = client.post(
+            "/api/v1/export/stream",
+            headers=auth_headers,
+            json={
+                "photo_ids": [p.id for p in test_photos],
+                "format": "photo_xml",
+                "project_name": "テスト工事",
+                "include_photos": False,
+            },
+        )
+
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/zip"
+        assert "%E3%83%86%E3%82%B9%E3%83%88" in response.headers["content-disposition"]
+        assert response.headers["x-job-id"]
+        with zipfile.ZipFile(io.BytesIO(response.content)) as zf:
+            assert zf.testzip() is None
+            xml_content = zf.read("PHOTO.XML").decode("shift_jis")
+        assert xml_content.count("<写真情報>") == len(test_photos)
+
+    def test_stream_export_package_not_found(self, client, auth_headers):
+        """写真が存在しない場合は配信を開始しない"""
+        response = client.post(
+            "/api/v1/export/stream",
+            headers=auth_headers,
+            json={"photo_ids": [99999], "format": "photo_xml"},
+        )
+        assert response.status_code == 404
+
+    def test_export_package_volumes(self, client, auth_headers, test_photos):
+        """媒体分割時は巻ごとのZIPをvolumesに返す"""
+        payload = {
+            "photo_ids": [p.id for p in test_photos],
+            "format": "photo_xml",
+            "project_name": "テストプロジェクト",
+            "include_photos": False,
+        }
+        volume_size = ExportService().plan_volumes(
+            [{"id": 1}, {"id": 2}], 10**9, include_photo_files=False
+        )[0]["estimated_size"]
+
+        response = client.post(
+            "/api/v1/export/package",
+            headers=auth_headers,
+            json={**payload, "volume_size": volume_size},
+        )
+
+        assert response.status_code == 200
+        data = response.json()
+        assert [v["total_photos"] for v in data["volumes"]] == [2, 1]
+        assert data["volumes"][1]["serial_start"] == 3
+        assert data["zip_path"] == data["volumes"][0]["zip_path"]
+        assert data["file_size"] == sum(v["file_size"] for v in data["volumes"])
+
+        # ストリーミング配信では巻番号を指定して1巻ずつ取得
+        response = client.post(
+            "/api/v1/export/stream?volume=2",
+            headers=auth_headers,
+            json={**payload, "volume_size": volume_size},
+        )
+        assert response.status_code == 200
+        assert response.headers["x-volume-count"] == "2"
+        with zipfile.ZipFile(io.BytesIO(response.content)) as zf:
+            xml_content = zf.read("PHOTO.XML").decode("shift_jis")
+        assert "<シリアル番号>0000003</シリアル番号>" in xml_content
+
+        response = client.post(
+            "/api/v1/export/stream",
+            headers=auth_headers,
+            json={**payload, "volume_size": volume_size},
+        )
+        assert response.status_code == 400
+
+    def test_parallel_volume_streams_do_not_hold_job_workers(
+        self, client, auth_headers, test_org, test_photos, monkeypatch
+    ):
+        """巻の並行ダウンロード中も同じ組織の写真帳ジョブは待たされず、上限超過は503"""
+        release = threading.Event()
+
+        def stream_package(self, chunks, photos, **options):
+            # 最初のチャンクを渡した後、受信側が遅い配信と同じく書き込みを止める
+            chunks.write(b"\0" * chunks.chunk_size)
+            release.wait(10)
+            chunks.finish()
+            return {}
+
+        monkeypatch.setattr(ExportService, "stream_package", stream_package)
+        payload = {
+            "photo_ids": [p.id for p in test_photos],
+            "format": "photo_xml",
+            "include_photos": False,
+            "volume_size": ExportService().plan_volumes(
+                [{"id": 1}, {"id": 2}], 10**9, include_photo_files=False
+            )[0]["estimated_size"],
+        }
+        pool = get_stream_job_pool()
+        responses = {}
+
+        def download(volume):
+            responses[volume] = client.post(
+                f"/api/v1/export/stream?volume={volume}",
+                headers=auth_headers,
+                json=payload,
+            )
+
+        def wait_streams(count):
+            deadline = time.monotonic() + 5
+            while pool.running(test_org.id) < count:
+                assert time.monotonic() < deadline
+                time.sleep(0.01)
+
+        downloads = [threading.Thread(target=download, args=(v,)) for v in (1, 2)]
+        try:
+            for count, thread in enumerate(downloads, start=1):
+                thread.start()
+                wait_streams(count)
+
+            job = get_job_scheduler().submit(
+                test_org.id,
+                "photo_album",
+                lambda reporter: "done",
+                priority=JobPriority.STANDARD,
+            )
+            assert job.future.result(timeout=5) == "done"
+
+            response = client.post(
+                "/api/v1/export/stream?volume=1", headers=auth_headers, json=payload
+            )
+            assert response.status_code == 503
+            assert response.headers["retry-after"] == str(ADMISSION_RETRY_AFTER_SECONDS)
+        finally:
+            release.set()
+            for thread in downloads:
+                thread.join(timeout=10)
+
+        assert [responses[v].status_code for v in (1, 2)] == [200, 200]
+
+    def test_stream_first_chunk_timeout(
+        self, client, auth_headers, test_photos, monkeypatch
+    ):
+        """最初のチャンクが待機時間内に書き込まれない場合は503"""
+        release = threading.Event()
+
+        def stream_package(self, chunks, photos, **options):
+            release.wait(10)
+            chunks.write(b"\0" * chunks.chunk_size)
+
+        monkeypatch.setattr(ExportService, "stream_package", stream_package)
+        monkeypatch.setattr(settings, "EXPORT_STREAM_FIRST_CHUNK_TIMEOUT", 0.05)
+        try:
+            response = client.post(
+                "/api/v1/export/stream",
+                headers=auth_headers,
+                json={"photo_ids": [p.id for p in test_photos], "format": "photo_xml"},
+            )
+        finally:
+            release.set()
+
+        assert response.status_code == 503
+        assert response.headers["retry-after"] == str(ADMISSION_RETRY_AFTER_SECONDS)
+
+    def test_export_package_unknown_media(self, client, auth_headers, test_photos):
+        """未対応の媒体は400"""
+        response = client.post(
+            "/api/v1/export/package",
+            headers=auth_headers,
+            json={
+                "photo_ids": [p.id for p in test_photos],
+                "format": "photo_xml",
+                "media": "floppy",
+            },
+        )
+        assert response.status_code == 400
+        assert "未対応の媒体です" in response.json()["detail"]
+
     def test_validate_export_valid(self, client, auth_headers, test_photos):
         """エクスポートバリデーション - 有効"""
         photo_ids = [p.id for p in test_photos]
@@ -183,6 +570,29 @@ class TestExportAPI:
         assert response.status_code == 200
         data = response.json()
         assert len(data["warnings"]) > 0
+        assert data["warning_counts"]["missing_title"] == 1
+        assert data["offender_total"] == 1
+        assert data["offenders"][0]["photo_id"] == photo.id
+
+    def test_validate_export_pagination(self, client, auth_headers, test_photos):
+        """違反写真一覧はページ単位、件数は全写真分"""
+        photo_ids = [p.id for p in test_photos]
+        response = client.post(
+            "/api/v1/export/validate?offset=1&limit=1",
+            headers=auth_headers,
+            json={
+                "photo_ids": photo_ids,
+                "format": "photo_xml",
+                "project_name": "テストプロジェクト",
+            },
+        )
+        assert response.status_code == 200
+        data = response.json()
+        assert data["is_valid"] is True
+        assert data["warning_counts"]["missing_ocr"] == 3
+        assert data["offender_total"] == 3
+        assert [o["photo_id"] for o in data["offenders"]] == [photo_ids[1]]
+        assert data["warnings"] == [f"写真ID {photo_ids[1]}: OCRデータが未処理です"]
 
     def test_export_unauthorized(self, client, test_photos):
         """認証なしでエクスポート"""
@@ -0,0 +1,96 @@
+"""
+ジョブ進捗APIエンドポイントのテスト（マルチテナント対応）
+"""
+
+import json
+
+from app.services.job_event_bus import JobEvent, get_job_event_bus
+
+
+def _parse_sse(body: str):
+    """SSEレスポンスをイベントリストに変換"""
+    events = []
+    for block in body.strip().split("\n\n"):
+        fields = dict(
+            line.split(": ", 1)
+            for line in block.split("\n")
+            if not line.startswith(":")
+        )
+        if "data" in fields:
+            events.append((fields["event"], json.loads(fields["data"])))
+    return events
+
+
+class TestJobsAPI:
+    """ジョブ進捗API テスト"""
+
+    def test_get_job_status_queued(self, client, auth_headers, test_org):
+        """未開始ジョブの状態取得"""
+        job_id = get_job_event_bus().register_job(test_org.id, "classify")
+
+        response = client.get(f"/api/v1/jobs/{job_id}", headers=auth_headers)
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["job_id"] == job_id
+        assert data["status"] == "queued"
+
+    def test_get_job_status_running(self, client, auth_headers, test_org):
+        """実行中ジョブの状態取得"""
+        bus = get_job_event_bus()
+        job_id = bus.register_job(test_org.id, "classify")
+        bus.publish(
+            JobEvent(
+                job_id=job_id, event="progress", stage="classify", processed=5, total=10
+            )
+        )
+
+        response = client.get(f"/api/v1/jobs/{job_id}", headers=auth_headers)
+
+        data = response.json()
+        assert data["status"] == "running"
+        assert data["stage"] == "classify"
+        assert data["processed"] == 5
+
+    def test_get_job_other_organization(self, client, auth_headers, test_org):
+        """他組織のジョブは取得不可"""
+        job_id = get_job_event_bus().register_job(test_org.id + 1, "classify")
+
+        response = client.get(f"/api/v1/jobs/{job_id}", headers=auth_headers)
+
+        assert response.status_code == 404
+
+    def test_stream_events_until_completed(self, client, auth_headers, test_org):
+        """完了済みジョブのイベントストリームは終端イベントで閉じる"""
+        bus = get_job_event_bus()
+        job_id = bus.register_job(test_org.id, "classify")
+        bus.publish(JobEvent(job_id=job_id, event="progress", processed=1, total=2))
+        bus.publish(
+            JobEvent(
+                job_id=job_id,
+                event="completed",
+                processed=2,
+                total=2,
+                result={"succeeded": 2},
+            )
+        )
+
+        response = client.get(f"/api/v1/jobs/{job_id}/events", headers=auth_headers)
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/event-stream")
+        events = _parse_sse(response.text)
+        assert events[-1][0] == "completed"
+        assert events[-1][1]["result"] == {"succeeded": 2}
+
+    def test_stream_events_not_found(self, client, auth_headers):
+        """存在しないジョブ"""
+        response = client.get("/api/v1/jobs/unknown/events", headers=auth_headers)
+
+        assert response.status_code == 404
+
+    def test_stream_events_unauthenticated(self, client):
+        """認証なしでのアクセス"""
+        response = client.get("/api/v1/jobs/unknown/events")
+
+        assert response.status_code == 403
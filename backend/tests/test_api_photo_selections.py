@@ -0,0 +1,247 @@
+"""
+写真選択セットAPIのテスト
+"""
+
+import io
+import zipfile
+from datetime import datetime
+
+import pytest
+
+from app.auth.jwt_handler import create_tokens
+from app.database.models import Organization, Photo, PhotoSelectionMember, User
+
+
+class TestPhotoSelectionAPI:
+    """写真選択セットAPI テスト"""
+
+    @pytest.fixture
+    def test_photos(self, db, test_org, test_project):
+        """テスト用写真データ（工種A×3、工種B×2）"""
+        photos = []
+        for i in range(5):
+            photo = Photo(
+                file_name=f"P000000{i+1}.JPG",
+                file_size=1024000,
+                mime_type="image/jpeg",
+                s3_key=f"photos/P000000{i+1}.JPG",
+                organization_id=test_org.id,
+                project_id=test_project.id,
+                title=f"テスト写真{i+1}",
+                major_category="工事",
+                photo_type="施工状況写真",
+                work_type="工種A" if i < 3 else "工種B",
+                shooting_date=datetime(2024, 1, i + 1),
+            )
+            db.add(photo)
+            photos.append(photo)
+        db.commit()
+        for photo in photos:
+            db.refresh(photo)
+        return photos
+
+    @pytest.fixture
+    def other_headers(self, db):
+        """別組織のユーザーの認証ヘッダー"""
+        org = Organization(
+            name="Other Company", subdomain="othercompany", is_active=True
+        )
+        db.add(org)
+        db.commit()
+        user = User(
+            email="user@othercompany.com",
+            hashed_password="hashed",
+            organization_id=org.id,
+            is_active=True,
+        )
+        db.add(user)
+        db.commit()
+        tokens = create_tokens(user.id, user.email, user.organization_id)
+        return {"Authorization": f"Bearer {tokens['access_token']}"}
+
+    def create_selection(self, client, headers, **payload):
+        response = client.post(
+            "/api/v1/photo-selections", headers=headers, json=payload
+        )
+        assert response.status_code == 201, response.text
+        return response.json()
+
+    def test_create_from_ids(self, client, auth_headers, test_photos, db):
+        """写真IDリストから作成（重複IDは1件として扱う）"""
+        ids = [test_photos[2].id, test_photos[0].id, test_photos[0].id]
+        selection = self.create_selection(
+            client, auth_headers, name="納品分", photo_ids=ids
+        )
+
+        assert selection["source"] == "ids"
+        assert selection["name"] == "納品分"
+        assert selection["photo_count"] == 2
+        members = db.query(PhotoSelectionMember.photo_id).filter(
+            PhotoSelectionMember.selection_id == selection["id"]
+        )
+        assert sorted(photo_id for photo_id, in members) == sorted(set(ids))
+
+    def test_create_from_ids_missing(self, client, auth_headers, test_photos):
+        """自組織に存在しない写真IDを含む場合は作成しない"""
+        response = client.post(
+            "/api/v1/photo-selections",
+            headers=auth_headers,
+            json={"photo_ids": [test_photos[0].id, 99999]},
+        )
+
+        assert response.status_code == 400
+        assert "一部の写真が見つかりません" in response.json()["detail"]
+
+    def test_create_from_filter(self, client, auth_headers, test_photos):
+        """検索条件から作成"""
+        selection = self.create_selection(
+            client,
+            auth_headers,
+            filter={"work_type": "工種A", "date_from": "2024-01-02"},
+        )
+
+        assert selection["source"] == "filter"
+        assert selection["filter"]["work_type"] == "工種A"
+        assert selection["photo_count"] == 2
+
+    @pytest.mark.parametrize(
+        "payload",
+        [{}, {"photo_ids": [1], "filter": {"work_type": "工種A"}}],
+    )
+    def test_create_requires_one_source(self, client, auth_headers, payload):
+        """写真IDリストと検索条件のどちらか一方が必要"""
+        response = client.post(
+            "/api/v1/photo-selections", headers=auth_headers, json=payload
+        )
+        assert response.status_code == 422
+
+    def test_get_and_delete(self, client, auth_headers, other_headers, test_photos):
+        """自組織の選択セットのみ取得・削除できる"""
+        selection = self.create_selection(
+            client, auth_headers, photo_ids=[p.id for p in test_photos]
+        )
+        url = f"/api/v1/photo-selections/{selection['id']}"
+
+        assert client.get(url, headers=other_headers).status_code == 404
+        assert client.delete(url, headers=other_headers).status_code == 404
+        assert client.get(url, headers=auth_headers).json()["photo_count"] == 5
+
+        assert client.delete(url, headers=auth_headers).status_code == 204
+        assert client.get(url, headers=auth_headers).status_code == 404
+
+    def test_expired_selection(self, client, auth_headers, test_photos, monkeypatch):
+        """有効期限切れの選択セットは使用できない"""
+        from app.config import settings
+
+        monkeypatch.setattr(settings, "PHOTO_SELECTION_TTL_SECONDS", -1)
+        selection = self.create_selection(
+            client, auth_headers, photo_ids=[test_photos[0].id]
+        )
+
+        response = client.get(
+            f"/api/v1/photo-selections/{selection['id']}", headers=auth_headers
+        )
+        assert response.status_code == 404
+
+    def test_export_package_with_selection(self, client, auth_headers, test_photos):
+        """エクスポートに選択セットを指定（写真ID順に通し番号を付与）"""
+        selection = self.create_selection(
+            client, auth_headers, filter={"work_type": "工種A"}
+        )
+
+        response = client.post(
+            "/api/v1/export/package",
+            headers=auth_headers,
+            json={"selection_id": selection["id"], "include_photos": False},
+        )
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["success"] is True
+        assert data["total_photos"] == 3
+        assert [r["photo_id"] for r in data["file_renames"]] == [
+            p.id for p in test_photos[:3]
+        ]
+        download = client.get(data["download_url"])
+        with zipfile.ZipFile(io.BytesIO(download.content)) as zf:
+            xml = zf.read("PHOTO.XML").decode("shift_jis")
+        assert "テスト写真3" in xml and "テスト写真4" not in xml
+
+    def test_validate_with_selection(self, client, auth_headers, test_photos):
+        """エクスポート・PHOTO.XMLの事前バリデーションに選択セットを指定"""
+        selection = self.create_selection(
+            client, auth_headers, filter={"work_type": "工種B"}
+        )
+
+        export = client.post(
+            "/api/v1/export/validate",
+            headers=auth_headers,
+            json={"selection_id": selection["id"]},
+        )
+        photo_xml = client.post(
+            "/api/v1/photo-xml/validate",
+            headers=auth_headers,
+            json={"selection_id": selection["id"]},
+        )
+
+        assert export.status_code == 200
+        assert export.json()["total_photos"] == 2
+        assert photo_xml.status_code == 200
+        assert photo_xml.json()["is_valid"] is True
+
+    def test_photo_xml_with_selection(self, client, auth_headers, test_photos):
+        """PHOTO.XML生成に選択セットを指定（認証が必要）"""
+        selection = self.create_selection(
+            client, auth_headers, photo_ids=[p.id for p in test_photos]
+        )
+        payload = {"selection_id": selection["id"]}
+
+        response = client.post(
+            "/api/v1/photo-xml/generate", headers=auth_headers, json=payload
+        )
+        assert response.status_code == 200
+        assert response.json()["total_photos"] == 5
+
+        assert (
+            client.post("/api/v1/photo-xml/generate", json=payload).status_code == 401
+        )
+
+    def test_selection_of_other_organization(
+        self, client, auth_headers, other_headers, test_photos
+    ):
+        """他組織の選択セットは各APIで使用できない"""
+        selection = self.create_selection(
+            client, auth_headers, photo_ids=[p.id for p in test_photos]
+        )
+        payload = {"selection_id": selection["id"], "include_photos": False}
+
+        for url in (
+            "/api/v1/export/package",
+            "/api/v1/export/validate",
+            "/api/v1/photo-xml/generate",
+            "/api/v1/photo-album/generate-pdf",
+        ):
+            response = client.post(url, headers=other_headers, json=payload)
+            assert response.status_code == 404, url
+
+    def test_empty_selection(self, client, auth_headers, test_photos):
+        """該当写真のない選択セットは写真が見つからない扱い"""
+        selection = self.create_selection(
+            client, auth_headers, filter={"work_type": "なし"}
+        )
+        assert selection["photo_count"] == 0
+
+        response = client.post(
+            "/api/v1/export/package",
+            headers=auth_headers,
+            json={"selection_id": selection["id"]},
+        )
+        assert response.status_code == 404
+
+    def test_request_requires_one_target(self, client, auth_headers, test_photos):
+        """photo_ids と selection_id のどちらか一方が必要"""
+        for payload in ({}, {"photo_ids": [test_photos[0].id], "selection_id": 1}):
+            response = client.post(
+                "/api/v1/export/package", headers=auth_headers, json=payload
+            )
+            assert response.status_code == 422
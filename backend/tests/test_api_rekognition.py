@@ -2,10 +2,19 @@
 Amazon Rekognition API エンドポイントのテスト（マルチテナント対応）
 """
 
+import time
+
 import pytest
 from unittest.mock import Mock, patch
 
-from app.database.models import Photo, Organization, User, Project
+from app.database.models import (
+    Photo,
+    PhotoDuplicate,
+    PhotoLabel,
+    Organization,
+    User,
+    Project,
+)
 from app.auth.jwt_handler import create_tokens
 
 
@@ -71,7 +80,7 @@ class TestRekognitionAPI:
         db.refresh(photo)
         return photo.id
 
-    @patch("app.services.rekognition_service.boto3.client")
+    @patch("app.services.aws_clients.boto3.client")
     def test_classify_image_success(
         self, mock_boto_client, sample_photo, client, auth_headers
     ):
@@ -109,7 +118,7 @@ class TestRekognitionAPI:
         assert data["summary"]["total_labels"] == 4
         assert data["summary"]["has_construction_content"] is True
 
-    @patch("app.services.rekognition_service.boto3.client")
+    @patch("app.services.aws_clients.boto3.client")
     def test_classify_image_photo_not_found(
         self, mock_boto_client, client, auth_headers
     ):
@@ -121,7 +130,7 @@ class TestRekognitionAPI:
         assert response.status_code == 404
         assert "写真が見つかりません" in response.json()["detail"]
 
-    @patch("app.services.rekognition_service.boto3.client")
+    @patch("app.services.aws_clients.boto3.client")
     def test_classify_image_saves_to_database(
         self, mock_boto_client, sample_photo, client, auth_headers, db
     ):
@@ -149,6 +158,13 @@ class TestRekognitionAPI:
         assert "rekognition_labels" in photo.photo_metadata
         assert len(photo.photo_metadata["rekognition_labels"]) == 1
 
+        # 正規化テーブルにも保存される（再分類時は置き換え）
+        client.post(f"/api/v1/photos/{sample_photo}/classify", headers=auth_headers)
+        labels = db.query(PhotoLabel).filter(PhotoLabel.photo_id == sample_photo).all()
+        assert [(label.label, label.category) for label in labels] == [
+            ("Construction Site", "scene")
+        ]
+
     def test_get_classification_result_not_processed(
         self, sample_photo, client, auth_headers
     ):
@@ -163,7 +179,7 @@ class TestRekognitionAPI:
         assert data["status"] == "not_processed"
         assert data["labels"] == []
 
-    @patch("app.services.rekognition_service.boto3.client")
+    @patch("app.services.aws_clients.boto3.client")
     def test_get_classification_result_processed(
         self, mock_boto_client, sample_photo, client, auth_headers
     ):
@@ -197,6 +213,168 @@ class TestRekognitionAPI:
         assert response.status_code == 404
         assert "写真が見つかりません" in response.json()["detail"]
 
+    def _wait_for_job(self, client, auth_headers, job_id, timeout=5.0):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            data = client.get(f"/api/v1/jobs/{job_id}", headers=auth_headers).json()
+            if data["status"] in ("completed", "failed"):
+                return data
+            time.sleep(0.02)
+        pytest.fail("ジョブが完了しませんでした")
+
+    @patch("app.services.aws_clients.boto3.client")
+    def test_classify_batch_project(
+        self, mock_boto_client, client, auth_headers, db, test_org, test_project
+    ):
+        """工事単位の一括画像分類（一部失敗しても継続）"""
+        photo_ids = []
+        for i in range(4):
+            photo = Photo(
+                organization_id=test_org.id,
+                project_id=test_project.id,
+                file_name=f"photo_{i}.jpg",
+                file_size=1024,
+                mime_type="image/jpeg",
+                s3_key=f"photos/photo_{i}.jpg",
+            )
+            db.add(photo)
+            db.commit()
+            photo_ids.append(photo.id)
+
+        def detect_labels(Image, MaxLabels, MinConfidence):
+            if Image["S3Object"]["Name"] == "photos/photo_2.jpg":
+                raise RuntimeError("画像が破損しています")
+            return {
+                "Labels": [{"Name": "Excavator", "Confidence": 91.0, "Parents": []}]
+            }
+
+        mock_rekognition = Mock()
+        mock_rekognition.detect_labels.side_effect = detect_labels
+        mock_boto_client.return_value = mock_rekognition
+
+        response = client.post(
+            "/api/v1/photos/classify/batch",
+            json={"project_id": test_project.id, "max_concurrency": 2},
+            headers=auth_headers,
+        )
+
+        assert response.status_code == 202
+        data = response.json()
+        assert data["total"] == 4
+
+        job = self._wait_for_job(client, auth_headers, data["job_id"])
+        assert job["status"] == "completed"
+        assert job["result"]["succeeded"] == 3
+        assert job["result"]["failed"] == 1
+        assert job["result"]["failures"][0]["photo_id"] == photo_ids[2]
+        assert job["result"]["photos_per_second"] > 0
+
+        db.expire_all()
+        classified = db.query(Photo).filter(Photo.id == photo_ids[0]).first()
+        assert classified.photo_metadata["rekognition_labels"][0]["name"] == "Excavator"
+        failed = db.query(Photo).filter(Photo.id == photo_ids[2]).first()
+        assert not (failed.photo_metadata or {}).get("rekognition_labels")
+        assert (
+            db.query(PhotoLabel).filter(PhotoLabel.photo_id == photo_ids[0]).count()
+            == 1
+        )
+
+    @pytest.fixture
+    def duplicate_pair(self, db, test_org, test_project, sample_photo):
+        """確定済み重複（sample_photoが代表写真）"""
+        member = Photo(
+            organization_id=test_org.id,
+            project_id=test_project.id,
+            file_name="test_construction_2.jpg",
+            file_size=2048000,
+            mime_type="image/jpeg",
+            s3_key="photos/test_construction_2.jpg",
+        )
+        db.add(member)
+        db.commit()
+        db.add(
+            PhotoDuplicate(
+                organization_id=test_org.id,
+                photo1_id=sample_photo,
+                photo2_id=member.id,
+                similarity_score=0.99,
+                status="confirmed",
+            )
+        )
+        db.commit()
+        return sample_photo, member.id
+
+    @patch("app.services.aws_clients.boto3.client")
+    def test_classify_duplicate_member_inherits(
+        self, mock_boto_client, client, auth_headers, duplicate_pair
+    ):
+        """重複グループのメンバーは代表写真を解析して結果を引き継ぐ"""
+        representative_id, member_id = duplicate_pair
+        mock_rekognition = Mock()
+        mock_rekognition.detect_labels.return_value = {
+            "Labels": [{"Name": "Crane", "Confidence": 93.0, "Parents": []}]
+        }
+        mock_boto_client.return_value = mock_rekognition
+
+        response = client.post(
+            f"/api/v1/photos/{member_id}/classify", headers=auth_headers
+        )
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["status"] == "inherited"
+        assert data["inherited_from"] == representative_id
+        assert data["labels"][0]["name"] == "Crane"
+        # 代表写真のS3キーで1回だけ呼び出される
+        mock_rekognition.detect_labels.assert_called_once()
+        assert (
+            mock_rekognition.detect_labels.call_args.kwargs["Image"]["S3Object"]["Name"]
+            == "photos/test_construction.jpg"
+        )
+
+        # 代表写真は解析済みのため、再度の分類ではAPIを呼び出さない
+        response = client.post(
+            f"/api/v1/photos/{member_id}/classify", headers=auth_headers
+        )
+        assert response.json()["status"] == "inherited"
+        assert mock_rekognition.detect_labels.call_count == 1
+
+        result = client.get(
+            f"/api/v1/photos/{member_id}/classification", headers=auth_headers
+        ).json()
+        assert result["inherited_from"] == representative_id
+
+    @patch("app.services.aws_clients.boto3.client")
+    def test_classify_duplicate_member_force(
+        self, mock_boto_client, client, auth_headers, duplicate_pair
+    ):
+        """force=trueでメンバー自身を解析する"""
+        _, member_id = duplicate_pair
+        mock_rekognition = Mock()
+        mock_rekognition.detect_labels.return_value = {
+            "Labels": [{"Name": "Worker", "Confidence": 90.0, "Parents": []}]
+        }
+        mock_boto_client.return_value = mock_rekognition
+
+        response = client.post(
+            f"/api/v1/photos/{member_id}/classify?force=true", headers=auth_headers
+        )
+
+        data = response.json()
+        assert data["status"] == "completed"
+        assert data["inherited_from"] is None
+        assert (
+            mock_rekognition.detect_labels.call_args.kwargs["Image"]["S3Object"]["Name"]
+            == "photos/test_construction_2.jpg"
+        )
+
+    def test_classify_batch_requires_target(self, client, auth_headers):
+        """対象未指定の一括画像分類はエラー"""
+        response = client.post(
+            "/api/v1/photos/classify/batch", json={}, headers=auth_headers
+        )
+        assert response.status_code == 400
+
     def test_unauthenticated_rekognition_access(self, client):
         """認証なしRekognitionアクセスは拒否される"""
         # 認証なしで画像分類
@@ -4,7 +4,7 @@
 
 import pytest
 from datetime import datetime
-from app.database.models import Organization, User, Project
+from app.database.models import Organization, User, Project, PhotoLabel
 from app.auth.jwt_handler import create_tokens
 
 
@@ -298,6 +298,85 @@ class TestSearchAPI:
         for item in data["items"]:
             assert item["photo_type"] == "施工状況写真"
 
+    @pytest.fixture
+    def labeled_photos(self, db, test_org, sample_photos):
+        """ラベル付きの写真（photo_labels）"""
+        rows = [
+            (sample_photos[0], "Excavator", "equipment", 95.0),
+            (sample_photos[0], "Worker", "people", 88.0),
+            (sample_photos[1], "Rebar", "materials", 91.0),
+            (sample_photos[1], "Worker", "people", 85.0),
+            (sample_photos[2], "Excavator", "equipment", 90.0),
+        ]
+        for photo_id, label, category, confidence in rows:
+            db.add(
+                PhotoLabel(
+                    photo_id=photo_id,
+                    organization_id=test_org.id,
+                    label=label,
+                    category=category,
+                    confidence=confidence,
+                )
+            )
+        db.commit()
+        return sample_photos
+
+    def test_search_by_label(self, client, auth_headers, labeled_photos):
+        """ラベルフィルターのテスト"""
+        response = client.get(
+            "/api/v1/photos/search?label=Excavator", headers=auth_headers
+        )
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["total"] == 2
+        assert {item["id"] for item in data["items"]} == {
+            labeled_photos[0],
+            labeled_photos[2],
+        }
+
+    def test_search_by_label_category(self, client, auth_headers, labeled_photos):
+        """ラベルカテゴリフィルターと他の条件の組み合わせ"""
+        response = client.get(
+            "/api/v1/photos/search?label_category=people&work_type=基礎工",
+            headers=auth_headers,
+        )
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["total"] == 1
+        assert data["items"][0]["id"] == labeled_photos[1]
+
+    def test_search_facets(self, client, auth_headers, labeled_photos):
+        """ファセット件数のテスト"""
+        response = client.get(
+            "/api/v1/photos/search?work_type=土工&facets=true", headers=auth_headers
+        )
+
+        assert response.status_code == 200
+        facets = response.json()["facets"]
+        assert facets["labels"][0] == {"value": "Excavator", "count": 2}
+        assert {"value": "Worker", "count": 1} in facets["labels"]
+        assert {"value": "equipment", "count": 2} in facets["categories"]
+
+    def test_search_label_other_organization(
+        self, client, auth_headers, db, labeled_photos
+    ):
+        """他組織のラベルは検索・集計の対象外"""
+        other_org = Organization(name="Other", subdomain="other", is_active=True)
+        db.add(other_org)
+        db.commit()
+        db.query(PhotoLabel).update({"organization_id": other_org.id})
+        db.commit()
+
+        response = client.get(
+            "/api/v1/photos/search?label=Excavator&facets=true", headers=auth_headers
+        )
+
+        data = response.json()
+        assert data["total"] == 0
+        assert data["facets"]["labels"] == []
+
     def test_unauthenticated_search(self, client):
         """認証なし検索は拒否される"""
         response = client.get("/api/v1/photos/search")
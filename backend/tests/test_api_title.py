@@ -0,0 +1,135 @@
+"""
+タイトル生成 API のテスト
+"""
+
+import time
+
+import pytest
+
+from app.database.models import Photo
+
+
+class TestTitleAPI:
+    """タイトル生成 API のテスト"""
+
+    def _wait_for_job(self, client, auth_headers, job_id):
+        for _ in range(200):
+            data = client.get(f"/api/v1/jobs/{job_id}", headers=auth_headers).json()
+            if data["status"] in ("completed", "failed"):
+                return data
+            time.sleep(0.02)
+        pytest.fail("ジョブが完了しませんでした")
+
+    def test_generate_title_uses_categorized_labels(
+        self, client, db, test_org, test_project
+    ):
+        """分類済み写真はカテゴリ別ラベルから撮影対象を推定する"""
+        photo = Photo(
+            organization_id=test_org.id,
+            project_id=test_project.id,
+            file_name="photo.jpg",
+            file_size=1024,
+            mime_type="image/jpeg",
+            s3_key="photos/photo.jpg",
+            photo_metadata={
+                "rekognition_labels": [{"name": "crane", "confidence": 90.0}],
+                "rekognition_categorized": {"equipment": ["crane"]},
+                "ocr_result": {"shooting_date": "2024-03-15"},
+            },
+        )
+        db.add(photo)
+        db.commit()
+
+        response = client.post(f"/api/v1/photos/{photo.id}/generate-title")
+
+        assert response.status_code == 200
+        assert response.json()["title"] == "クレーン_20240315"
+        db.expire_all()
+        assert photo.photo_metadata["generated_title"]["subject"] == "クレーン"
+
+    def test_regenerate_titles(self, client, auth_headers, db, test_org, test_project):
+        """工事単位のタイトル一括再生成"""
+        for i, metadata in enumerate(
+            [
+                {"ocr_result": {"work_type": "土工", "shooting_date": "2024-03-15"}},
+                {"manual_title": True},
+            ]
+        ):
+            db.add(
+                Photo(
+                    organization_id=test_org.id,
+                    project_id=test_project.id,
+                    file_name=f"photo_{i}.jpg",
+                    file_size=1024,
+                    mime_type="image/jpeg",
+                    s3_key=f"photos/photo_{i}.jpg",
+                    title="旧タイトル",
+                    photo_metadata=metadata,
+                )
+            )
+        db.commit()
+
+        response = client.post(
+            "/api/v1/photos/titles/regenerate",
+            json={"project_id": test_project.id},
+            headers=auth_headers,
+        )
+
+        assert response.status_code == 202
+        assert response.json()["total"] == 2
+
+        job = self._wait_for_job(client, auth_headers, response.json()["job_id"])
+        assert job["status"] == "completed"
+        assert job["result"]["updated"] == 1
+        assert job["result"]["skipped_manual"] == 1
+
+        titles = sorted(title for (title,) in db.query(Photo.title).all())
+        assert titles == ["土工_土工作業_20240315", "旧タイトル"]
+
+    def test_manual_title_survives_regeneration(
+        self, client, auth_headers, db, test_org, test_project
+    ):
+        """メタデータのある写真を手動更新した場合も一括再生成で上書きしない"""
+        photo = Photo(
+            organization_id=test_org.id,
+            project_id=test_project.id,
+            file_name="photo.jpg",
+            file_size=1024,
+            mime_type="image/jpeg",
+            s3_key="photos/photo.jpg",
+            title="旧タイトル",
+            photo_metadata={
+                "ocr_result": {"work_type": "土工", "shooting_date": "2024-03-15"}
+            },
+        )
+        db.add(photo)
+        db.commit()
+
+        response = client.put(
+            f"/api/v1/photos/{photo.id}/title", json={"title": "手動タイトル"}
+        )
+        assert response.status_code == 200
+        db.expire_all()
+        assert photo.photo_metadata["manual_title"] is True
+        assert photo.photo_metadata["ocr_result"]["work_type"] == "土工"
+
+        response = client.post(
+            "/api/v1/photos/titles/regenerate",
+            json={"project_id": test_project.id},
+            headers=auth_headers,
+        )
+        job = self._wait_for_job(client, auth_headers, response.json()["job_id"])
+        assert job["result"]["skipped_manual"] == 1
+
+        db.expire_all()
+        assert photo.title == "手動タイトル"
+
+    def test_regenerate_titles_unknown_project(self, client, auth_headers):
+        """他組織・存在しない工事は404"""
+        response = client.post(
+            "/api/v1/photos/titles/regenerate",
+            json={"project_id": 9999},
+            headers=auth_headers,
+        )
+
+        assert response.status_code == 404
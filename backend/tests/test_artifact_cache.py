@@ -0,0 +1,209 @@
+"""
+成果物キャッシュのテスト
+"""
+
+import os
+import threading
+import time
+from datetime import datetime
+
+import pytest
+
+from app.services.artifact_cache import ArtifactCache, artifact_digest
+from app.services.artifact_store import LocalArtifactStore, S3ArtifactStore
+from app.services.fake_aws import FakeS3Client
+
+
+@pytest.fixture(params=["local", "s3"])
+def store(request, tmp_path):
+    """成果物ストア（ローカルディレクトリ・S3代替クライアント）"""
+    if request.param == "local":
+        return LocalArtifactStore(str(tmp_path / "artifacts"))
+    return S3ArtifactStore(FakeS3Client(generate_missing=False), "artifacts")
+
+
+@pytest.fixture
+def cache(store):
+    """1KB上限・1時間保持の成果物キャッシュ"""
+    return ArtifactCache(store, max_bytes=1024, ttl_seconds=3600)
+
+
+def write_artifact(size: int):
+    """指定サイズのファイルを作成する builder"""
+
+    def builder(path):
+        file_path = os.path.join(path, "package.zip")
+        with open(file_path, "wb") as f:
+            f.write(b"x" * size)
+        return {"success": True, "zip_path": file_path, "file_size": size}
+
+    return builder
+
+
+class TestArtifactDigest:
+    """artifact_digest のテスト"""
+
+    photos = [
+        {"id": 2, "updated_at": datetime(2024, 4, 1, 10, 0)},
+        {"id": 1, "updated_at": datetime(2024, 4, 1, 9, 0)},
+    ]
+
+    def test_photo_order_does_not_matter(self):
+        """写真の順序によらず同じダイジェスト"""
+        assert artifact_digest("export", self.photos, {}, "1") == artifact_digest(
+            "export", list(reversed(self.photos)), {}, "1"
+        )
+
+    @pytest.mark.parametrize(
+        "kind, photos, options, version",
+        [
+            ("photo_album", photos, {}, "1"),
+            (
+                "export",
+                [photos[0], {"id": 1, "updated_at": datetime(2024, 4, 2)}],
+                {},
+                "1",
+            ),
+            ("export", photos[:1], {}, "1"),
+            ("export", photos, {"project_name": "A"}, "1"),
+            ("export", photos, {}, "2"),
+        ],
+    )
+    def test_changes_with_inputs(self, kind, photos, options, version):
+        """種類・写真の更新・写真の増減・オプション・バージョンで別のダイジェスト"""
+        assert artifact_digest("export", self.photos, {}, "1") != artifact_digest(
+            kind, photos, options, version
+        )
+
+
+class TestArtifactCache:
+    """ArtifactCache のテスト"""
+
+    def test_build_then_hit(self, cache):
+        """2回目は作成せずに既存の成果物を返す（生成結果のパスはストアのキー）"""
+        result, cached = cache.build("export", "a" * 64, write_artifact(100))
+        assert not cached
+        assert result["zip_path"] == f"export/{'a' * 64}/package.zip"
+        assert cache.store.size(result["zip_path"]) == 100
+
+        calls = []
+        again, cached = cache.build(
+            "export", "a" * 64, lambda path: calls.append(path) or {}
+        )
+        assert cached
+        assert again == result
+        assert calls == []
+        assert cache.get("export", "a" * 64) == result
+        assert cache.size_bytes == 100
+
+    def test_failed_build_is_not_stored(self, cache):
+        """失敗した生成結果・保存しないと判定した生成結果は保存しない"""
+        result, _ = cache.build(
+            "export", "a" * 64, lambda path: {"success": False, "errors": ["x"]}
+        )
+        assert result["errors"] == ["x"]
+        assert list(cache.store.list_objects()) == []
+
+        result, _ = cache.build(
+            "export", "b" * 64, write_artifact(10), cacheable=lambda result: False
+        )
+        assert cache.store.size(result["zip_path"]) == 10
+        assert cache.get("export", "b" * 64) is None
+
+    def test_ttl_expiry(self, cache):
+        """保持期間を過ぎた成果物は削除"""
+        result, _ = cache.build("export", "a" * 64, write_artifact(10))
+        cache.ttl_seconds = 0
+        time.sleep(0.01)
+
+        assert cache.get("export", "a" * 64) is None
+        assert cache.store.size(result["zip_path"]) is None
+
+    def test_lru_eviction(self, cache):
+        """合計サイズが上限を超えると最終アクセスの古いものから削除"""
+        cache.build("export", "a" * 64, write_artifact(400))
+        cache.build("export", "b" * 64, write_artifact(400))
+        # a を参照して b を最も古いものにする
+        assert cache.get("export", "a" * 64) is not None
+        cache.build("export", "c" * 64, write_artifact(400))
+
+        assert cache.get("export", "a" * 64) is not None
+        assert cache.get("export", "b" * 64) is None
+        assert cache.get("export", "c" * 64) is not None
+        assert cache.size_bytes == 800
+
+    def test_oversize_artifact_is_kept_for_download(self, cache):
+        """合計サイズ上限を超える成果物も削除せず返す（再利用はせず保持期間の経過後に削除）"""
+        cache.build("export", "a" * 64, write_artifact(400))
+        result, cached = cache.build("export", "b" * 64, write_artifact(2000))
+
+        assert not cached
+        assert cache.store.size(result["zip_path"]) == 2000
+        assert cache.get("export", "b" * 64) is None
+        assert cache.get("export", "a" * 64) is not None
+        assert cache.size_bytes == 400
+
+        cache.ttl_seconds = 0
+        time.sleep(0.01)
+        cache.sweep()
+        assert cache.store.size(result["zip_path"]) is None
+
+    def test_missing_file_is_a_miss(self, cache):
+        """成果物のファイルが削除されていれば作り直す"""
+        result, _ = cache.build("export", "a" * 64, write_artifact(10))
+        cache.store.delete_prefix(result["zip_path"])
+
+        assert cache.get("export", "a" * 64) is None
+        _, cached = cache.build("export", "a" * 64, write_artifact(10))
+        assert not cached
+
+    def test_concurrent_builds_run_once(self, cache):
+        """同じダイジェストの同時作成は1回だけ"""
+        calls = []
+        started = threading.Event()
+
+        def slow_builder(path):
+            calls.append(path)
+            started.set()
+            time.sleep(0.05)
+            return write_artifact(10)(path)
+
+        results = []
+        threads = [
+            threading.Thread(
+                target=lambda: results.append(
+                    cache.build("export", "a" * 64, slow_builder)
+                )
+            )
+            for _ in range(4)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert len(calls) == 1
+        assert sorted(cached for _, cached in results) == [False, True, True, True]
+
+    def test_shared_between_nodes(self, cache):
+        """保存済みの成果物は同じストアを使う別インスタンス（別ノード・再起動後）からも参照できる"""
+        result, _ = cache.build("export", "a" * 64, write_artifact(10))
+
+        other_node = ArtifactCache(cache.store, max_bytes=1024, ttl_seconds=3600)
+        assert other_node.size_bytes == 10
+        assert other_node.build("export", "a" * 64, write_artifact(10)) == (
+            result,
+            True,
+        )
+
+    def test_sweep_removes_unstored_artifacts(self, cache):
+        """保存しなかった成果物も保持期間の経過後に削除"""
+        result, _ = cache.build(
+            "export", "a" * 64, write_artifact(10), cacheable=lambda result: False
+        )
+        cache.build("export", "b" * 64, write_artifact(10))
+        cache.ttl_seconds = 0
+        time.sleep(0.01)
+
+        assert cache.sweep() == 2
+        assert list(cache.store.list_objects()) == []
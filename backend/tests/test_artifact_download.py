@@ -0,0 +1,94 @@
+"""
+成果物ダウンロードのテスト（送信方式）
+"""
+
+import asyncio
+
+import pytest
+
+from app.routers.artifact_download import ZEROCOPY_EXTENSION, ArtifactResponse
+from app.services.artifact_store import LocalArtifactStore, S3ArtifactStore
+from app.services.fake_aws import FakeS3Client
+
+
+@pytest.fixture
+def local_store(tmp_path):
+    """1000バイトの成果物を保存したローカルストア"""
+    store = LocalArtifactStore(str(tmp_path / "artifacts"))
+    store.put_bytes("export/abc/package.zip", bytes(range(250)) * 4)
+    return store
+
+
+def send_response(response, extensions=None, method="GET"):
+    """レスポンスをASGIで送信し、送信されたメッセージを返す"""
+    messages = []
+
+    async def send(message):
+        if message["type"] == ZEROCOPY_EXTENSION:
+            # サーバーが行う sendfile の代わりに範囲を読み出す
+            message = {
+                **message,
+                "data": message["file"].read()[
+                    message["offset"] : message["offset"] + message["count"]
+                ],
+            }
+        messages.append(message)
+
+    async def receive():
+        return {"type": "http.disconnect"}
+
+    scope = {"type": "http", "method": method, "extensions": extensions or {}}
+    asyncio.run(response(scope, receive, send))
+    return messages
+
+
+def make_response(store, byte_range):
+    return ArtifactResponse(
+        store,
+        "export/abc/package.zip",
+        byte_range,
+        status_code=206,
+        headers={"Content-Length": str(byte_range[1] - byte_range[0] + 1)},
+        media_type="application/zip",
+    )
+
+
+class TestArtifactResponse:
+    """ArtifactResponse のテスト"""
+
+    def test_zerocopy_send(self, local_store):
+        """サーバーが zero-copy send に対応していればファイルを渡して送信させる"""
+        messages = send_response(
+            make_response(local_store, (10, 19)), extensions={ZEROCOPY_EXTENSION: {}}
+        )
+
+        assert messages[0]["status"] == 206
+        assert [message["type"] for message in messages[1:]] == [ZEROCOPY_EXTENSION]
+        assert messages[1]["offset"] == 10 and messages[1]["count"] == 10
+        assert messages[1]["data"] == bytes(range(10, 20))
+
+    def test_chunked_send(self, local_store):
+        """zero-copy send 非対応のサーバーには読み出したチャンクを送信"""
+        messages = send_response(make_response(local_store, (245, 254)))
+
+        body = b"".join(message.get("body", b"") for message in messages[1:])
+        assert body == bytes(range(245, 250)) + bytes(range(5))
+        assert messages[-1] == {"type": "http.response.body", "body": b""}
+
+    def test_s3_store_is_not_zerocopy(self):
+        """S3ストアの成果物はサーバーが対応していてもチャンクで送信"""
+        store = S3ArtifactStore(FakeS3Client(generate_missing=False), "artifacts")
+        store.put_bytes("export/abc/package.zip", b"0123456789")
+
+        messages = send_response(
+            make_response(store, (2, 5)), extensions={ZEROCOPY_EXTENSION: {}}
+        )
+
+        assert all(message["type"] != ZEROCOPY_EXTENSION for message in messages)
+        assert b"".join(message.get("body", b"") for message in messages[1:]) == b"2345"
+
+    def test_head_has_no_body(self, local_store):
+        """HEADでは本文を送信しない"""
+        messages = send_response(make_response(local_store, (0, 999)), method="HEAD")
+
+        assert messages[1:] == [{"type": "http.response.body", "body": b""}]
@@ -0,0 +1,171 @@
+"""
+成果物の作成領域の管理のテスト
+"""
+
+import asyncio
+import os
+import threading
+import time
+
+import pytest
+
+from app.services.artifact_cache import ArtifactCache
+from app.services.artifact_lifecycle import (
+    ArtifactLifecycleManager,
+    ArtifactQuotaExceeded,
+)
+from app.services.artifact_store import LocalArtifactStore
+from app.services.metrics import metrics
+
+
+def write_artifact(size: int):
+    """指定サイズのファイルを作成する builder"""
+
+    def builder(path):
+        file_path = os.path.join(path, "package.zip")
+        with open(file_path, "wb") as f:
+            f.write(b"x" * size)
+        return {"success": True, "zip_path": file_path}
+
+    return builder
+
+
+@pytest.fixture
+def cache(tmp_path):
+    """ローカルストアの成果物キャッシュ（キャッシュ自体の上限は十分大きくする）"""
+    store = LocalArtifactStore(str(tmp_path / "artifacts"))
+    return ArtifactCache(store, max_bytes=1024**3, ttl_seconds=3600)
+
+
+@pytest.fixture
+def lifecycle(cache, tmp_path):
+    """1000バイト上限の作成領域"""
+    return ArtifactLifecycleManager(cache, str(tmp_path / "scratch"), quota_bytes=1000)
+
+
+class TestArtifactLifecycleManager:
+    """ArtifactLifecycleManager のテスト"""
+
+    def test_admit_reserves_until_exit(self, lifecycle):
+        """受け付けた作成は完了まで見積もりサイズを予約する"""
+        with lifecycle.admit(600):
+            assert lifecycle.reserved_bytes == 600
+            assert metrics.get_gauge("artifact_disk_reserved_bytes") == 600
+            # 予約分と合わせて上限を超える作成は受け付けない
+            with pytest.raises(ArtifactQuotaExceeded):
+                with lifecycle.admit(500):
+                    pass
+        assert lifecycle.reserved_bytes == 0
+
+        with lifecycle.admit(500):
+            pass
+
+    def test_admit_async_measures_off_event_loop(self, lifecycle, monkeypatch):
+        """非同期版は使用量の計測をイベントループのスレッドの外で行う"""
+        measured_in = []
+        usage_bytes = lifecycle.usage_bytes
+
+        def record():
+            measured_in.append(threading.get_ident())
+            return usage_bytes()
+
+        monkeypatch.setattr(lifecycle, "usage_bytes", record)
+
+        async def admit():
+            async with lifecycle.admit_async(600):
+                assert lifecycle.reserved_bytes == 600
+            with pytest.raises(ArtifactQuotaExceeded):
+                async with lifecycle.admit_async(1500):
+                    pass
+            return threading.get_ident()
+
+        loop_thread = asyncio.run(admit())
+
+        assert len(measured_in) == 2
+        assert loop_thread not in measured_in
+        assert lifecycle.reserved_bytes == 0
+
+    def test_rejects_when_over_quota(self, lifecycle):
+        """作業ディレクトリの使用量で上限を超える場合は受け付けない"""
+        stale = os.path.join(lifecycle.scratch_dir, "artifact-abc")
+        os.makedirs(stale)
+        with open(os.path.join(stale, "package.zip"), "wb") as f:
+            f.write(b"x" * 900)
+        rejected = metrics.get_counter("artifact_admission_rejected_total")
+
+        with pytest.raises(ArtifactQuotaExceeded) as e:
+            with lifecycle.admit(200):
+                pass
+
+        assert e.value.available_bytes == 100
+        assert metrics.get_counter("artifact_admission_rejected_total") == rejected + 1
+        assert metrics.get_gauge("artifact_disk_usage_bytes") == 900
+
+    def test_evicts_stored_artifacts_to_make_room(self, lifecycle, cache):
+        """保存済みの成果物を最終アクセスの古い順に削除して空きを作る"""
+        cache.build("export", "a" * 64, write_artifact(400))
+        cache.build("export", "b" * 64, write_artifact(400))
+        assert cache.get("export", "a" * 64) is not None
+        # 成果物1つ分を削除すれば収まる上限にする（meta.json の分も使用量に含まれる）
+        lifecycle.quota_bytes = lifecycle.usage_bytes() + 100
+
+        with lifecycle.admit(300):
+            pass
+
+        assert cache.get("export", "a" * 64) is not None
+        assert cache.get("export", "b" * 64) is None
+
+    def test_does_not_evict_artifact_being_built(self, lifecycle, cache):
+        """作成中の成果物は削除せず、空きが足りなければ受け付けない"""
+
+        def builder(path):
+            result = write_artifact(900)(path)
+            with pytest.raises(ArtifactQuotaExceeded):
+                with lifecycle.admit(500):
+                    pass
+            return result
+
+        cache.build("export", "a" * 64, builder)
+
+        assert cache.get("export", "a" * 64) is not None
+
+    def test_sweep_removes_stale_scratch(self, lifecycle, cache):
+        """保持期間を過ぎた作業ディレクトリと成果物を削除する"""
+        cache.build("export", "a" * 64, write_artifact(10))
+        stale = os.path.join(lifecycle.scratch_dir, "artifact-old")
+        fresh = os.path.join(lifecycle.scratch_dir, "artifact-new")
+        os.makedirs(stale)
+        os.makedirs(fresh)
+        old = time.time() - 7200
+        os.utime(stale, (old, old))
+        cache.ttl_seconds = 3600
+
+        assert lifecycle.sweep() == 1
+        assert not os.path.exists(stale)
+        assert os.path.exists(fresh)
+
+        cache.ttl_seconds = 0
+        time.sleep(0.01)
+        assert lifecycle.sweep() == 2
+        assert lifecycle.usage_bytes() == 0
+        assert metrics.get_gauge("artifact_disk_usage_bytes") == 0
+
+    def test_sweeper_thread(self, cache, tmp_path):
+        """定期削除スレッドは最初の受け付けで起動する"""
+        lifecycle = ArtifactLifecycleManager(
+            cache,
+            str(tmp_path / "scratch"),
+            quota_bytes=1000,
+            sweep_interval_seconds=0.01,
+        )
+        cache.build("export", "a" * 64, write_artifact(10))
+        cache.ttl_seconds = 0
+        try:
+            with lifecycle.admit(10):
+                pass
+            deadline = time.time() + 2
+            while cache.store.local_usage_bytes() and time.time() < deadline:
+                time.sleep(0.01)
+            assert cache.store.local_usage_bytes() == 0
+        finally:
+            lifecycle.shutdown()
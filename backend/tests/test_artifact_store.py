@@ -0,0 +1,83 @@
+"""
+成果物ストアのテスト
+"""
+
+import pytest
+
+from app.services.artifact_store import (
+    LocalArtifactStore,
+    S3ArtifactStore,
+    parse_byte_range,
+)
+from app.services.fake_aws import FakeS3Client
+
+
+@pytest.fixture(params=["local", "s3"])
+def store(request, tmp_path):
+    """成果物ストア（ローカルディレクトリ・S3代替クライアント）"""
+    if request.param == "local":
+        return LocalArtifactStore(str(tmp_path / "artifacts"))
+    return S3ArtifactStore(FakeS3Client(generate_missing=False), "artifacts")
+
+
+class TestParseByteRange:
+    """parse_byte_range のテスト"""
+
+    @pytest.mark.parametrize(
+        "header, expected",
+        [
+            (None, None),
+            ("bytes=0-99", (0, 99)),
+            ("bytes=100-", (100, 999)),
+            ("bytes=-100", (900, 999)),
+            ("bytes=900-2000", (900, 999)),
+            ("bytes=-5000", (0, 999)),
+            # 解釈できない形式・複数範囲は無視して全体を返す
+            ("items=0-1", None),
+            ("bytes=a-b", None),
+            ("bytes=5-2", None),
+            ("bytes=0-1,5-6", None),
+        ],
+    )
+    def test_parse(self, header, expected):
+        assert parse_byte_range(header, 1000) == expected
+
+    @pytest.mark.parametrize("header", ["bytes=1000-", "bytes=-0"])
+    def test_unsatisfiable(self, header):
+        """サイズを超える範囲はエラー"""
+        with pytest.raises(ValueError):
+            parse_byte_range(header, 1000)
+
+
+class TestArtifactStore:
+    """LocalArtifactStore / S3ArtifactStore のテスト"""
+
+    def test_put_and_read(self, store, tmp_path):
+        """保存した成果物をサイズ・範囲指定で読み出す"""
+        path = tmp_path / "package.zip"
+        path.write_bytes(bytes(range(256)) * 4)
+        store.put_file("export/abc/package.zip", str(path))
+        store.put_bytes("export/abc/meta.json", b"{}")
+
+        assert store.size("export/abc/package.zip") == 1024
+        assert store.size("export/abc/missing.zip") is None
+        assert store.get_bytes("export/abc/meta.json") == b"{}"
+        assert store.get_bytes("export/abc/missing.json") is None
+        assert b"".join(
+            store.iter_range("export/abc/package.zip", 250, 261, 5)
+        ) == bytes([250, 251, 252, 253, 254, 255, 0, 1, 2, 3, 4, 5])
+        assert sorted(key for key, _, _ in store.list_objects("export/")) == [
+            "export/abc/meta.json",
+            "export/abc/package.zip",
+        ]
+
+    def test_delete_prefix(self, store, tmp_path):
+        """プレフィックス配下をまとめて削除"""
+        path = tmp_path / "a.pdf"
+        path.write_bytes(b"pdf")
+        store.put_file("photo_album/abc/a.pdf", str(path))
+        store.put_file("photo_album/def/a.pdf", str(path))
+
+        store.delete_prefix("photo_album/abc/")
+
+        assert [key for key, _, _ in store.list_objects()] == ["photo_album/def/a.pdf"]
@@ -2,13 +2,21 @@
 エクスポートサービスのテスト
 """
 
+import io
 import pytest
 import os
+import threading
 import zipfile
 from datetime import datetime
 from pathlib import Path
 
-from app.services.export_service import ExportService
+from app.services.export_service import (
+    PHOTO_XML_BYTES_PER_PHOTO,
+    ZIP_ENTRY_OVERHEAD,
+    ExportService,
+)
+from app.services.fake_aws import FakeS3Client
+from app.services.zip_writer import ZipChunkQueue
 
 
 class TestExportService:
@@ -229,6 +237,214 @@ class TestExportService:
         assert result["total_photos"] == 3
         assert os.path.exists(result["zip_path"])
 
+    def test_export_package_streams_photo_xml(
+        self, export_service, photo_data_list, tmp_path
+    ):
+        """PHOTO.XML未指定時は写真データからZIPエントリへ逐次生成"""
+        result = export_service.export_package(
+            photos=photo_data_list,
+            export_dir=str(tmp_path),
+            project_name="test_project",
+        )
+
+        assert result["success"] == True
+        with zipfile.ZipFile(result["zip_path"], "r") as zf:
+            xml_content = zf.read("PHOTO.XML").decode("shift_jis")
+        assert '<?xml version="1.0" encoding="Shift_JIS"?>' in xml_content
+        assert xml_content.count("<写真情報>") == len(photo_data_list)
+        assert not os.path.exists(tmp_path / "PHOTO" / "PHOTO.XML")
+
+    @pytest.fixture
+    def s3_client(self, photo_data_list):
+        """写真ファイルを保存済みのS3代替クライアント"""
+        client = FakeS3Client()
+        for photo in photo_data_list:
+            photo["s3_key"] = f"photos/{photo['file_name']}"
+            client.put_object(
+                Bucket="bucket",
+                Key=photo["s3_key"],
+                Body=b"\xff\xd8" + photo["file_name"].encode() * 1000 + b"\xff\xd9",
+            )
+        return client
+
+    def test_export_package_includes_photo_files(
+        self, export_service, photo_data_list, s3_client, tmp_path
+    ):
+        """S3の写真ファイルをリネーム後の名前でZIPに格納し、PHOTO.XMLも同じ名前を参照"""
+        result = export_service.export_package(
+            photos=photo_data_list,
+            export_dir=str(tmp_path),
+            project_name="test_project",
+            s3_client=s3_client,
+            bucket="bucket",
+            prefetch_concurrency=2,
+        )
+
+        assert result["success"] == True
+        assert result["photo_files"]["files"] == 3
+        with zipfile.ZipFile(result["zip_path"], "r") as zf:
+            assert zf.testzip() is None
+            for i, photo in enumerate(photo_data_list, start=1):
+                expected = s3_client.get_object(Bucket="bucket", Key=photo["s3_key"])
+                assert zf.read(f"PIC/P{i:07d}.JPG") == expected["Body"].read()
+            # 写真は無圧縮、XML・DTD・XSLはdeflate
+            assert zf.getinfo("PIC/P0000001.JPG").compress_type == zipfile.ZIP_STORED
+            assert zf.getinfo("PHOTO.XML").compress_type == zipfile.ZIP_DEFLATED
+            assert zf.getinfo("PHOTO05.DTD").compress_type == zipfile.ZIP_DEFLATED
+            xml_content = zf.read("PHOTO.XML").decode("shift_jis")
+        assert "<写真ファイル名>P0000001.JPG</写真ファイル名>" in xml_content
+        assert "IMG_0001.JPG" not in xml_content
+        # 作業フォルダは作らず、ZIPだけを出力
+        assert os.listdir(tmp_path) == ["test_project_export.zip"]
+        assert result["photo_files"]["bytes"] == sum(
+            len(b"\xff\xd8" + p["file_name"].encode() * 1000 + b"\xff\xd9")
+            for p in photo_data_list
+        )
+
+    def test_export_package_photo_file_errors(
+        self, export_service, photo_data_list, s3_client, tmp_path
+    ):
+        """S3キーがない・取得できない写真はエラー"""
+        photo_data_list[1]["s3_key"] = None
+        result = export_service.export_package(
+            photos=photo_data_list,
+            export_dir=str(tmp_path),
+            s3_client=s3_client,
+            bucket="bucket",
+        )
+        assert result["success"] == False
+        assert "写真のS3キーがありません（ID: 2）" in result["errors"]
+
+        photo_data_list[1]["s3_key"] = "photos/missing.jpg"
+        result = export_service.export_package(
+            photos=photo_data_list,
+            export_dir=str(tmp_path),
+            s3_client=FakeS3Client(error_rate=1.0),
+            bucket="bucket",
+        )
+        assert result["success"] == False
+        assert result["errors"][0].startswith("写真ファイルを取得できません（ID: 1")
+
+    def test_stream_package(self, export_service, photo_data_list, s3_client):
+        """チャンクキューへ書き込んだZIPは、ファイルへの出力と同じ内容"""
+        chunks = ZipChunkQueue(chunk_size=1024)
+        worker = threading.Thread(
+            target=export_service.stream_package,
+            args=(chunks, photo_data_list),
+            kwargs={"s3_client": s3_client, "bucket": "bucket"},
+        )
+        worker.start()
+        received = list(chunks.iter_chunks())
+        worker.join()
+
+        assert len(received) > 1
+        with zipfile.ZipFile(io.BytesIO(b"".join(received))) as zf:
+            assert zf.testzip() is None
+            assert sorted(zf.namelist()) == [
+                "PHOTO.XML",
+                "PHOTO05.DTD",
+                "PHOTO05.XSL",
+                "PIC/P0000001.JPG",
+                "PIC/P0000002.JPG",
+                "PIC/P0000003.JPG",
+            ]
+
+    def test_stream_package_error(self, export_service, photo_data_list):
+        """書き込み中の例外は読み出し側でも送出される"""
+        for photo in photo_data_list:
+            photo["s3_key"] = f"photos/{photo['file_name']}"
+        chunks = ZipChunkQueue()
+
+        def produce():
+            with pytest.raises(RuntimeError):
+                export_service.stream_package(
+                    chunks,
+                    photo_data_list,
+                    s3_client=FakeS3Client(error_rate=1.0),
+                    bucket="bucket",
+                )
+
+        worker = threading.Thread(target=produce)
+        worker.start()
+        with pytest.raises(RuntimeError, match="写真ファイルを取得できません"):
+            list(chunks.iter_chunks())
+        worker.join()
+
+    def test_volume_capacity(self, export_service):
+        """媒体名・最大サイズから1巻の容量を決定"""
+        assert export_service.volume_capacity() is None
+        assert export_service.volume_capacity("DVD-R") == 4_700_000_000
+        assert export_service.volume_capacity("cd-r", volume_size=1000) == 1000
+        with pytest.raises(ValueError, match="未対応の媒体です"):
+            export_service.volume_capacity("mo")
+
+    def test_plan_volumes(self, export_service):
+        """シリアル番号順に、見積もりサイズが容量以下になるよう分割"""
+        photos = [{"id": i, "file_size": 1000 * i} for i in range(1, 8)]
+        base = export_service.plan_volumes(photos[:1], 10**9)[0]["estimated_size"] - (
+            1000 + ZIP_ENTRY_OVERHEAD + PHOTO_XML_BYTES_PER_PHOTO
+        )
+        per_photo = ZIP_ENTRY_OVERHEAD + PHOTO_XML_BYTES_PER_PHOTO
+        volume_size = base + 3 * per_photo + 9000
+
+        plan = export_service.plan_volumes(photos, volume_size)
+
+        assert [[p["id"] for p in v["photos"]] for v in plan] == [
+            [1, 2, 3],
+            [4, 5],
+            [6],
+            [7],
+        ]
+        assert [v["first_serial"] for v in plan] == [1, 4, 6, 7]
+        assert all(v["estimated_size"] <= volume_size for v in plan)
+
+        with pytest.raises(ValueError, match="最大サイズを超える写真"):
+            export_service.plan_volumes(
+                photos + [{"id": 8, "file_size": 10**6}], volume_size
+            )
+        with pytest.raises(ValueError, match="ファイルサイズが不明"):
+            export_service.plan_volumes([{"id": 9}], volume_size)
+        # 写真ファイルを含めない場合はサイズ不要
+        assert len(export_service.plan_volumes([{"id": 9}], volume_size, False)) == 1
+
+    def test_export_volumes(self, export_service, photo_data_list, s3_client, tmp_path):
+        """巻ごとに独立したZIPを作成し、シリアル番号・ファイル名は通し番号"""
+        photos = photo_data_list * 2
+        photos = [
+            {**photo, "id": i, "file_size": 13004} for i, photo in enumerate(photos, 1)
+        ]
+        single = export_service.plan_volumes(photos[:2], 10**9)[0]["estimated_size"]
+
+        result = export_service.export_volumes(
+            photos,
+            single,
+            export_dir=str(tmp_path),
+            project_name="工事",
+            s3_client=s3_client,
+            bucket="bucket",
+        )
+
+        assert result["success"] == True
+        assert [v["volume"] for v in result["volumes"]] == [1, 2, 3]
+        assert [(v["serial_start"], v["serial_end"]) for v in result["volumes"]] == [
+            (1, 2),
+            (3, 4),
+            (5, 6),
+        ]
+        second = result["volumes"][1]
+        assert os.path.basename(second["zip_path"]) == "工事_export_vol02of03.zip"
+        assert second["file_size"] <= single
+        with zipfile.ZipFile(second["zip_path"]) as zf:
+            assert zf.testzip() is None
+            assert sorted(n for n in zf.namelist() if n.startswith("PIC/")) == [
+                "PIC/P0000003.JPG",
+                "PIC/P0000004.JPG",
+            ]
+            xml_content = zf.read("PHOTO.XML").decode("shift_jis")
+        assert xml_content.count("<写真情報>") == 2
+        assert "<シリアル番号>0000003</シリアル番号>" in xml_content
+        assert "<写真ファイル名>P0000004.JPG</写真ファイル名>" in xml_content
+
     def test_export_package_validation_errors(self, export_service, tmp_path):
         """エクスポート時バリデーションエラーテスト"""
         # 空の写真リスト
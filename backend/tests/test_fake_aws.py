@@ -0,0 +1,162 @@
+"""
+Textract・Rekognition・S3 代替実装とクライアントファクトリーのテスト
+"""
+
+import random
+from unittest.mock import patch
+
+import pytest
+from botocore.exceptions import ClientError
+
+from app.config import settings
+from app.services.aws_clients import create_aws_client, get_fake_client
+from app.services.fake_aws import (
+    FakeRekognitionClient,
+    FakeS3Client,
+    FakeTextractClient,
+    LatencyModel,
+)
+from app.services.ocr_service import OCRService
+from app.services.rekognition_service import RekognitionService, is_throttling_error
+
+
+class TestLatencyModel:
+    """LatencyModel のテスト"""
+
+    def test_parse_and_sample(self):
+        """指定形式の解析とサンプリング（秒単位）"""
+        rng = random.Random(0)
+
+        assert LatencyModel.parse("fixed:100").sample(rng) == pytest.approx(0.1)
+        assert 0.05 <= LatencyModel.parse("uniform:50:150").sample(rng) <= 0.15
+        assert LatencyModel.parse("lognormal:120:0.5").sample(rng) > 0
+        assert LatencyModel.parse("").sample(rng) == 0.0
+
+    def test_invalid_kind(self):
+        """未対応の分布はエラー"""
+        with pytest.raises(ValueError):
+            LatencyModel.parse("pareto:1:2")
+
+
+class TestFakeClients:
+    """代替クライアントのテスト"""
+
+    def test_rekognition_payload(self):
+        """detect_labelsのレスポンスがRekognitionServiceで解釈できる"""
+        client = FakeRekognitionClient()
+        response = client.detect_labels(
+            Image={"S3Object": {"Bucket": "b", "Name": "photos/P0000001.JPG"}},
+            MaxLabels=5,
+            MinConfidence=70.0,
+        )
+
+        assert len(response["Labels"]) <= 5
+        assert all(label["Confidence"] >= 70.0 for label in response["Labels"])
+        # 同じ写真には同じ結果を返す
+        again = client.detect_labels(
+            Image={"S3Object": {"Bucket": "b", "Name": "photos/P0000001.JPG"}},
+            MaxLabels=5,
+            MinConfidence=70.0,
+        )
+        assert [l["Name"] for l in again["Labels"]] == [
+            l["Name"] for l in response["Labels"]
+        ]
+
+        with patch(
+            "app.services.rekognition_service.create_aws_client", return_value=client
+        ):
+            service = RekognitionService(confidence_threshold=70.0)
+        labels = service.detect_labels_from_image("b", "photos/P0000002.JPG")
+        assert labels and all("Parents" in label for label in labels)
+
+    def test_textract_payload(self):
+        """detect_document_textのBlocksが黒板データとして解析できる"""
+        client = FakeTextractClient()
+        response = client.detect_document_text(
+            Document={"S3Object": {"Bucket": "b", "Name": "photos/P0000001.JPG"}}
+        )
+
+        block_types = {block["BlockType"] for block in response["Blocks"]}
+        assert block_types == {"PAGE", "LINE", "WORD"}
+        page = response["Blocks"][0]
+        lines = [b for b in response["Blocks"] if b["BlockType"] == "LINE"]
+        assert page["Relationships"][0]["Ids"] == [line["Id"] for line in lines]
+
+        with patch("app.services.ocr_service.create_aws_client", return_value=client):
+            service = OCRService(confidence_threshold=0.0)
+        data = service.parse_blackboard_text(
+            service.extract_text_from_image("b", "photos/P0000001.JPG")
+        )
+        assert data.work_name is not None
+        assert data.work_type is not None
+
+    def test_throttling(self):
+        """スロットリングはThrottlingExceptionのClientErrorとして返る"""
+        client = FakeRekognitionClient(throttle_rate=1.0)
+
+        with pytest.raises(ClientError) as exc_info:
+            client.detect_labels(Image={"S3Object": {"Bucket": "b", "Name": "x.jpg"}})
+
+        assert is_throttling_error(exc_info.value)
+        assert client.stats == {"calls": 1, "throttled": 1, "errors": 0}
+
+    def test_error_rate(self):
+        """入力エラーはスロットリング以外のエラーとして返る"""
+        client = FakeTextractClient(error_rate=1.0)
+
+        with pytest.raises(ClientError) as exc_info:
+            client.detect_document_text(
+                Document={"S3Object": {"Bucket": "b", "Name": "x.jpg"}}
+            )
+
+        assert not is_throttling_error(exc_info.value)
+        assert (
+            exc_info.value.response["Error"]["Code"] == "UnsupportedDocumentException"
+        )
+
+    def test_s3_get_object(self):
+        """保存済みオブジェクトはその内容、未登録キーは決定的なバイト列を返す"""
+        client = FakeS3Client(object_size=64)
+        client.put_object(Bucket="b", Key="photos/a.jpg", Body=b"abc")
+
+        assert (
+            client.get_object(Bucket="b", Key="photos/a.jpg")["Body"].read() == b"abc"
+        )
+        first = client.get_object(Bucket="b", Key="photos/x.jpg")
+        second = client.get_object(Bucket="b", Key="photos/x.jpg")
+        data = first["Body"].read()
+        assert first["ContentLength"] == len(data) == 64
+        assert data[:2] == b"\xff\xd8" and data[-2:] == b"\xff\xd9"
+        assert b"".join(second["Body"].iter_chunks(10)) == data
+
+
+class TestAWSClientFactory:
+    """create_aws_client のテスト"""
+
+    @patch("app.services.aws_clients.boto3.client")
+    def test_aws_backend(self, mock_boto_client):
+        """awsバックエンドはboto3クライアントを生成"""
+        create_aws_client("textract", region_name="ap-northeast-1")
+
+        mock_boto_client.assert_called_once_with(
+            "textract", region_name="ap-northeast-1"
+        )
+
+    @patch("app.services.aws_clients.boto3.client")
+    def test_fake_backend(self, mock_boto_client):
+        """fakeバックエンドは代替クライアントを共有して返す"""
+        with patch.object(settings, "AWS_CLIENT_BACKEND", "fake"):
+            client = create_aws_client("rekognition")
+            assert isinstance(client, FakeRekognitionClient)
+            assert create_aws_client("rekognition") is client
+            assert client is get_fake_client("rekognition")
+
+            # 代替実装のないサービスは通常のクライアント
+            create_aws_client("s3")
+            mock_boto_client.assert_called_once_with("s3")
+
+    def test_unknown_backend(self):
+        """未登録のバックエンドはエラー"""
+        with patch.object(settings, "AWS_CLIENT_BACKEND", "unknown"):
+            with pytest.raises(ValueError):
+                create_aws_client("rekognition")
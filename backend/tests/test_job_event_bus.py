@@ -0,0 +1,239 @@
+"""
+ジョブ進捗イベントバスのテスト
+"""
+
+import asyncio
+import threading
+
+import pytest
+
+from app.services.job_event_bus import (
+    InMemoryJobEventBus,
+    JobEvent,
+    JobProgressReporter,
+    JobSubscription,
+    RedisJobEventBus,
+)
+
+
+class FakeRedis:
+    """TTLを時計で進められるRedisクライアントの代替（RedisJobEventBusが使う操作のみ）"""
+
+    def __init__(self):
+        self.now = 0.0
+        self._values = {}
+        self._expires_at = {}
+
+    def _alive(self, key):
+        expires_at = self._expires_at.get(key)
+        if expires_at is not None and expires_at <= self.now:
+            self._values.pop(key, None)
+            self._expires_at.pop(key, None)
+        return key in self._values
+
+    def set(self, key, value, ex=None):
+        self._values[key] = value.encode() if isinstance(value, str) else value
+        self._expires_at[key] = self.now + ex if ex else None
+
+    def get(self, key):
+        return self._values[key] if self._alive(key) else None
+
+    def mget(self, *keys):
+        return [self.get(key) for key in keys]
+
+    def incr(self, key):
+        value = int(self.get(key) or 0) + 1
+        self._values[key] = str(value).encode()
+        self._expires_at.setdefault(key, None)
+        return value
+
+    def expire(self, key, seconds):
+        if self._alive(key):
+            self._expires_at[key] = self.now + seconds
+
+    def publish(self, channel, payload):
+        return 0
+
+    def pipeline(self):
+        return self
+
+    def execute(self):
+        return []
+
+
+class TestInMemoryJobEventBus:
+    """InMemoryJobEventBus のテスト"""
+
+    @pytest.fixture
+    def bus(self):
+        """イベントバスのフィクスチャ"""
+        return InMemoryJobEventBus(ttl_seconds=60)
+
+    def test_register_and_get_job(self, bus):
+        """ジョブ登録・取得テスト"""
+        job_id = bus.register_job(organization_id=1, job_type="classify")
+
+        job = bus.get_job(job_id)
+        assert job is not None
+        assert job.organization_id == 1
+        assert job.job_type == "classify"
+        assert job.last_event is None
+
+    def test_get_unknown_job(self, bus):
+        """未登録ジョブはNone"""
+        assert bus.get_job("unknown") is None
+
+    def test_publish_assigns_sequence(self, bus):
+        """イベント発行でシーケンス番号が付与される"""
+        job_id = bus.register_job(organization_id=1, job_type="classify")
+
+        first = bus.publish(JobEvent(job_id=job_id, event="stage", stage="download"))
+        second = bus.publish(JobEvent(job_id=job_id, event="progress", processed=1))
+
+        assert first.seq == 1
+        assert second.seq == 2
+        assert second.timestamp > 0
+        assert bus.get_job(job_id).last_event.seq == 2
+
+    def test_publish_unknown_job_raises(self, bus):
+        """未登録ジョブへの発行はエラー"""
+        with pytest.raises(KeyError):
+            bus.publish(JobEvent(job_id="unknown", event="progress"))
+
+    async def test_subscribe_receives_snapshot_and_events(self, bus):
+        """購読時にスナップショットとその後のイベントを受信"""
+        job_id = bus.register_job(organization_id=1, job_type="classify")
+        bus.publish(JobEvent(job_id=job_id, event="progress", processed=1, total=3))
+
+        subscription = await bus.subscribe(job_id)
+        snapshot = await subscription.get(timeout=1)
+        assert snapshot.processed == 1
+
+        # ワーカースレッドからの発行
+        worker = threading.Thread(
+            target=bus.publish,
+            args=(JobEvent(job_id=job_id, event="completed", processed=3, total=3),),
+        )
+        worker.start()
+        worker.join()
+
+        event = await subscription.get(timeout=1)
+        assert event.event == "completed"
+        assert event.is_terminal
+        await subscription.close()
+
+    async def test_subscribe_timeout_returns_none(self, bus):
+        """イベントがない場合はタイムアウトでNone"""
+        job_id = bus.register_job(organization_id=1, job_type="classify")
+
+        subscription = await bus.subscribe(job_id)
+        assert await subscription.get(timeout=0.05) is None
+        await subscription.close()
+
+    def test_subscription_requires_receive(self):
+        """_receive を実装していない購読クラスは生成時にエラー"""
+
+        class IncompleteSubscription(JobSubscription):
+            pass
+
+        with pytest.raises(TypeError):
+            IncompleteSubscription()
+
+    def test_to_sse(self, bus):
+        """SSE形式へのシリアライズ"""
+        job_id = bus.register_job(organization_id=1, job_type="classify")
+        event = bus.publish(JobEvent(job_id=job_id, event="progress"))
+
+        sse = event.to_sse()
+        assert sse.startswith("id: 1\nevent: progress\ndata: {")
+        assert sse.endswith("\n\n")
+
+
+class TestRedisJobEventBus:
+    """RedisJobEventBus のテスト（Redisクライアントは FakeRedis に置き換え）"""
+
+    @pytest.fixture
+    def redis_client(self):
+        """Redisクライアントのフィクスチャ"""
+        return FakeRedis()
+
+    @pytest.fixture
+    def bus(self, redis_client):
+        """イベントバスのフィクスチャ"""
+        bus = RedisJobEventBus("redis://localhost:6379/0", ttl_seconds=60)
+        bus._redis = redis_client
+        return bus
+
+    def test_publish_and_get_job(self, bus):
+        """発行したイベントがジョブ情報に反映される"""
+        job_id = bus.register_job(organization_id=1, job_type="export")
+
+        event = bus.publish(JobEvent(job_id=job_id, event="progress", processed=1))
+
+        assert event.seq == 1
+        job = bus.get_job(job_id)
+        assert job.job_type == "export"
+        assert job.last_event.processed == 1
+
+    def test_running_job_outlives_ttl(self, bus, redis_client):
+        """イベントを発行し続けているジョブはTTLを過ぎても取得できる"""
+        job_id = bus.register_job(organization_id=1, job_type="export")
+
+        for processed in range(1, 6):
+            redis_client.now += 30
+            bus.publish(JobEvent(job_id=job_id, event="progress", processed=processed))
+
+        job = bus.get_job(job_id)
+        assert job is not None
+        assert job.last_event.processed == 5
+
+        # 最後のイベントからTTLを過ぎると削除される
+        redis_client.now += 61
+        assert bus.get_job(job_id) is None
+
+
+class TestJobProgressReporter:
+    """JobProgressReporter のテスト"""
+
+    def test_stage_progress_complete(self):
+        """ステージ・進捗・完了の発行"""
+        bus = InMemoryJobEventBus()
+        job_id = bus.register_job(organization_id=1, job_type="classify")
+        reporter = JobProgressReporter(bus, job_id, total=4, min_interval=0)
+
+        reporter.stage("classify")
+        reporter.advance(2)
+        event = bus.get_job(job_id).last_event
+        assert event.stage == "classify"
+        assert event.processed == 2
+        assert event.progress == 0.5
+        assert event.eta_seconds is not None
+
+        reporter.complete(result={"succeeded": 4})
+        event = bus.get_job(job_id).last_event
+        assert event.event == "completed"
+        assert event.result == {"succeeded": 4}
+
+    def test_advance_is_throttled(self):
+        """最小発行間隔内の進捗は間引かれる（最終件は必ず発行）"""
+        bus = InMemoryJobEventBus()
+        job_id = bus.register_job(organization_id=1, job_type="classify")
+        reporter = JobProgressReporter(bus, job_id, total=100, min_interval=60)
+        reporter.stage("classify")
+
+        for _ in range(99):
+            reporter.advance()
+        assert bus.get_job(job_id).last_event.event == "stage"
+
+        reporter.advance()
+        assert bus.get_job(job_id).last_event.processed == 100
+
+    def test_fail(self):
+        """失敗の発行"""
+        bus = InMemoryJobEventBus()
+        job_id = bus.register_job(organization_id=1, job_type="classify")
+        JobProgressReporter(bus, job_id).fail("S3エラー")
+
+        event = bus.get_job(job_id).last_event
+        assert event.event == "failed"
+        assert event.message == "S3エラー"
@@ -0,0 +1,237 @@
+"""
+ジョブスケジューラーのテスト
+"""
+
+import threading
+import time
+
+import pytest
+
+from app.services.job_event_bus import InMemoryJobEventBus
+from app.services.job_scheduler import JobPriority, JobScheduler, parse_tenant_weights
+from app.services.metrics import MetricsRegistry
+
+
+class TestJobScheduler:
+    """JobScheduler のテスト"""
+
+    @pytest.fixture
+    def bus(self):
+        """イベントバスのフィクスチャ"""
+        return InMemoryJobEventBus()
+
+    @pytest.fixture
+    def registry(self):
+        """メトリクスレジストリのフィクスチャ"""
+        return MetricsRegistry()
+
+    def _make_scheduler(self, bus, registry, **kwargs):
+        return JobScheduler(bus=bus, metrics=registry, **kwargs)
+
+    def test_submit_and_result(self, bus, registry):
+        """ジョブの実行結果がfutureとイベントバスに反映される"""
+        scheduler = self._make_scheduler(bus, registry, max_workers=2)
+
+        job = scheduler.submit(1, "classify", lambda reporter: {"succeeded": 3})
+
+        assert job.future.result(timeout=5) == {"succeeded": 3}
+        time.sleep(0.05)
+        event = bus.get_job(job.job_id).last_event
+        assert event.event == "completed"
+        assert event.result == {"succeeded": 3}
+        scheduler.shutdown()
+
+    def test_failure_is_reported(self, bus, registry):
+        """例外はfutureとfailedイベントに伝播する"""
+        scheduler = self._make_scheduler(bus, registry, max_workers=1)
+
+        def failing(reporter):
+            raise ValueError("Rekognitionエラー")
+
+        job = scheduler.submit(1, "classify", failing)
+
+        with pytest.raises(ValueError):
+            job.future.result(timeout=5)
+        time.sleep(0.05)
+        assert bus.get_job(job.job_id).last_event.event == "failed"
+        assert (
+            registry.get_counter(
+                "jobs_failed_total", organization_id=1, job_type="classify"
+            )
+            == 1
+        )
+        scheduler.shutdown()
+
+    @pytest.mark.parametrize("fails", [False, True])
+    def test_publish_failure_does_not_block(self, bus, registry, monkeypatch, fails):
+        """イベントの発行に失敗してもfutureを解決し、実行枠を解放する"""
+        scheduler = self._make_scheduler(
+            bus, registry, max_workers=2, tenant_concurrency=1
+        )
+
+        def publish(event):
+            raise ConnectionError("Redis接続エラー")
+
+        monkeypatch.setattr(bus, "publish", publish)
+
+        def func(reporter):
+            if fails:
+                raise ValueError("Rekognitionエラー")
+            return {"succeeded": 1}
+
+        for _ in range(2):
+            job = scheduler.submit(1, "classify", func)
+            if fails:
+                with pytest.raises(ValueError):
+                    job.future.result(timeout=5)
+            else:
+                assert job.future.result(timeout=5) == {"succeeded": 1}
+
+        time.sleep(0.05)
+        assert scheduler.stats()[1]["running"] == 0
+        assert (
+            registry.get_counter("job_event_publish_errors_total", job_type="classify")
+            == 2
+        )
+        scheduler.shutdown()
+
+    def test_weighted_fair_queuing_interleaves_tenants(self, bus, registry):
+        """大量投入した組織の後から投入した組織も交互に実行される"""
+        scheduler = self._make_scheduler(bus, registry, max_workers=1)
+        gate = threading.Event()
+        order = []
+
+        def record(name, wait=False):
+            def run(reporter):
+                if wait:
+                    gate.wait(5)
+                order.append(name)
+
+            return run
+
+        jobs = [scheduler.submit(1, "bulk", record("A0", wait=True))]
+        jobs += [scheduler.submit(1, "bulk", record(f"A{i}")) for i in range(1, 6)]
+        jobs += [scheduler.submit(2, "bulk", record(f"B{i}")) for i in range(2)]
+        gate.set()
+        for job in jobs:
+            job.future.result(timeout=5)
+
+        assert order[:5] == ["A0", "B0", "A1", "B1", "A2"]
+        scheduler.shutdown()
+
+    def test_tenant_weight(self, bus, registry):
+        """重みの大きい組織ほど多く実行される"""
+        scheduler = self._make_scheduler(
+            bus, registry, max_workers=1, tenant_weights={2: 2.0}
+        )
+        gate = threading.Event()
+        order = []
+
+        def record(name, wait=False):
+            def run(reporter):
+                if wait:
+                    gate.wait(5)
+                order.append(name)
+
+            return run
+
+        jobs = [scheduler.submit(3, "bulk", record("blocker", wait=True))]
+        jobs += [scheduler.submit(1, "bulk", record("A")) for _ in range(4)]
+        jobs += [scheduler.submit(2, "bulk", record("B")) for _ in range(4)]
+        gate.set()
+        for job in jobs:
+            job.future.result(timeout=5)
+
+        # 先頭6件のうち重み2の組織Bが4件
+        assert order[1:7].count("B") == 4
+        scheduler.shutdown()
+
+    def test_tenant_concurrency_limit(self, bus, registry):
+        """組織ごとの同時実行数上限"""
+        scheduler = self._make_scheduler(
+            bus, registry, max_workers=4, tenant_concurrency=1, interactive_reserved=0
+        )
+        lock = threading.Lock()
+        state = {"running": 0, "max": 0}
+
+        def work(reporter):
+            with lock:
+                state["running"] += 1
+                state["max"] = max(state["max"], state["running"])
+            time.sleep(0.02)
+            with lock:
+                state["running"] -= 1
+
+        jobs = [scheduler.submit(1, "bulk", work) for _ in range(5)]
+        for job in jobs:
+            job.future.result(timeout=5)
+
+        assert state["max"] == 1
+        scheduler.shutdown()
+
+    def test_interactive_before_bulk(self, bus, registry):
+        """INTERACTIVEジョブは待機中のBULKジョブより先に実行される"""
+        scheduler = self._make_scheduler(
+            bus, registry, max_workers=1, interactive_reserved=0
+        )
+        gate = threading.Event()
+        order = []
+
+        jobs = [scheduler.submit(1, "bulk", lambda r: gate.wait(5))]
+        jobs += [
+            scheduler.submit(1, "bulk", lambda r, i=i: order.append(f"bulk{i}"))
+            for i in range(3)
+        ]
+        jobs.append(
+            scheduler.submit(
+                2,
+                "rekognition",
+                lambda r: order.append("interactive"),
+                priority=JobPriority.INTERACTIVE,
+            )
+        )
+        gate.set()
+        for job in jobs:
+            job.future.result(timeout=5)
+
+        assert order[0] == "interactive"
+        scheduler.shutdown()
+
+    def test_reserved_worker_for_interactive(self, bus, registry):
+        """BULKジョブで埋まっていてもINTERACTIVE用ワーカーは空いている"""
+        scheduler = self._make_scheduler(
+            bus, registry, max_workers=2, interactive_reserved=1
+        )
+        gate = threading.Event()
+
+        bulk = [scheduler.submit(i, "bulk", lambda r: gate.wait(5)) for i in range(2)]
+        interactive = scheduler.submit(
+            1, "rekognition", lambda r: "done", priority=JobPriority.INTERACTIVE
+        )
+
+        assert interactive.future.result(timeout=2) == "done"
+        gate.set()
+        for job in bulk:
+            job.future.result(timeout=5)
+        scheduler.shutdown()
+
+    def test_queue_wait_metrics(self, bus, registry):
+        """組織別のキュー待ち時間が記録される"""
+        scheduler = self._make_scheduler(bus, registry, max_workers=1)
+
+        scheduler.submit(7, "bulk", lambda r: None).future.result(timeout=5)
+
+        summaries = registry.snapshot()["summaries"]
+        wait = [
+            s
+            for s in summaries
+            if s["name"] == "job_queue_wait_seconds"
+            and s["labels"] == {"organization_id": "7", "priority": "bulk"}
+        ]
+        assert wait and wait[0]["count"] == 1
+        scheduler.shutdown()
+
+    def test_parse_tenant_weights(self):
+        """組織別重み設定の解析"""
+        assert parse_tenant_weights("1:2, 5:0.5") == {1: 2.0, 5: 0.5}
+        assert parse_tenant_weights("") == {}
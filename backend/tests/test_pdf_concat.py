@@ -0,0 +1,92 @@
+"""
+PDF連結のテスト
+"""
+
+import re
+
+import pytest
+from reportlab.lib.pagesizes import A4
+from reportlab.pdfgen import canvas
+
+from app.services.pdf_concat import PDFConcatError, _PDFPart, concatenate_pdfs
+
+
+def make_pdf(path, markers, title=None):
+    """ページごとにマーカー文字列を描画したPDF（ページ内容は圧縮しない）"""
+    c = canvas.Canvas(str(path), pagesize=A4, pageCompression=0)
+    if title:
+        c.setTitle(title)
+    for marker in markers:
+        c.drawString(100, 100, marker)
+        c.showPage()
+    c.save()
+    return str(path)
+
+
+def page_markers(path):
+    """連結後のPDFの各ページに描画されたマーカー"""
+    with open(path, "rb") as f:
+        part = _PDFPart(f)
+        markers = []
+        for page in part.pages:
+            contents = int(re.search(rb"/Contents (\d+) 0 R", part.read_body(page))[1])
+            f.seek(part.offsets[contents])
+            markers.append(re.search(rb"\((part\d-page\d)\) Tj", f.read(4096))[1])
+        return markers
+
+
+class TestConcatenatePdfs:
+    """concatenate_pdfs のテスト"""
+
+    def test_pages_in_order(self, tmp_path):
+        """各PDFのページを順に連結"""
+        parts = [
+            make_pdf(tmp_path / "a.pdf", ["part1-page1"]),
+            make_pdf(tmp_path / "b.pdf", ["part2-page1", "part2-page2"]),
+            make_pdf(tmp_path / "c.pdf", ["part3-page1"]),
+        ]
+        output = tmp_path / "merged.pdf"
+
+        assert concatenate_pdfs(parts, str(output)) == 4
+        assert page_markers(output) == [
+            b"part1-page1",
+            b"part2-page1",
+            b"part2-page2",
+            b"part3-page1",
+        ]
+
+    def test_xref_offsets(self, tmp_path):
+        """相互参照表の位置がすべてオブジェクトの先頭を指す"""
+        parts = [
+            make_pdf(tmp_path / f"{i}.pdf", [f"part{i}-page1", f"part{i}-page2"])
+            for i in range(3)
+        ]
+        output = tmp_path / "merged.pdf"
+        concatenate_pdfs(parts, str(output))
+
+        data = output.read_bytes()
+        with open(output, "rb") as f:
+            offsets = _PDFPart(f).offsets
+        for number, offset in offsets.items():
+            assert data.startswith(b"%d 0 obj" % number, offset)
+
+    def test_strings_are_not_renumbered(self, tmp_path):
+        """文字列中の参照に見える部分は書き換えない（文書情報は先頭のPDFのもの）"""
+        parts = [
+            make_pdf(tmp_path / "a.pdf", ["part1-page1"], title="see 1 0 R"),
+            make_pdf(tmp_path / "b.pdf", ["part2-page1"], title="second"),
+        ]
+        output = tmp_path / "merged.pdf"
+        concatenate_pdfs(parts, str(output))
+
+        data = output.read_bytes()
+        assert b"/Title (see 1 0 R)" in data
+        assert b"(second)" not in data
+
+    def test_not_pdf(self, tmp_path):
+        """PDF以外は連結できない"""
+        path = tmp_path / "a.pdf"
+        path.write_bytes(b"not a pdf")
+
+        with pytest.raises(PDFConcatError):
+            concatenate_pdfs([str(path)], str(tmp_path / "merged.pdf"))
@@ -3,13 +3,19 @@
 """
 
 import pytest
+import math
 import os
 from datetime import datetime
 from pathlib import Path
 from io import BytesIO
 from PIL import Image
 
-from app.services.photo_album_generator import PhotoAlbumGenerator, LayoutType
+from app.services.fake_aws import FakeS3Client
+from app.services.photo_album_generator import (
+    EXIF_ORIENTATION_MATRICES,
+    PhotoAlbumGenerator,
+    LayoutType,
+)
 
 
 class TestPhotoAlbumGenerator:
@@ -244,6 +250,144 @@ class TestPhotoAlbumGenerator:
         assert resized is not None
         assert len(resized) < len(dummy_image)  # リサイズ後はサイズが小さくなる
 
+    def test_resize_image_exif_orientation(self, album_generator):
+        """EXIFの向き（90度回転）を反映してリサイズ"""
+        img = Image.new("RGB", (800, 600), color="blue")
+        exif = Image.Exif()
+        exif[0x0112] = 6
+        data = BytesIO()
+        img.save(data, format="JPEG", exif=exif)
+
+        resized = Image.open(
+            BytesIO(album_generator.resize_image(data.getvalue(), 300, 400))
+        )
+
+        assert resized.size == (300, 400)
+
+    @pytest.mark.parametrize("subsampling, expected", [("4:4:4", 0), ("4:2:0", 2)])
+    def test_resize_image_jpeg_options(
+        self, album_generator, dummy_image, subsampling, expected
+    ):
+        """JPEG品質・クロマサブサンプリングを指定"""
+        from PIL import JpegImagePlugin
+
+        resized = album_generator.resize_image(
+            dummy_image, 400, 300, quality=60, subsampling=subsampling
+        )
+
+        assert JpegImagePlugin.get_sampling(Image.open(BytesIO(resized))) == expected
+
+    def test_images_downsampled_to_print_dpi(self, sample_photo_data, tmp_path):
+        """画像は枠の表示サイズの印刷解像度まで縮小して埋め込む"""
+        img = Image.effect_noise((4000, 3000), 64).convert("RGB")
+        data = BytesIO()
+        img.save(data, format="JPEG", quality=90)
+        sample_photo_data["image_data"] = data.getvalue()
+
+        sizes = {}
+        for dpi in (0, 100):
+            result = PhotoAlbumGenerator(image_dpi=dpi).generate_pdf(
+                photos=[sample_photo_data],
+                output_path=str(tmp_path / f"album_{dpi}.pdf"),
+                layout_type=LayoutType.DETAILED,
+            )
+            sizes[dpi] = result["file_size"]
+        assert sizes[100] < sizes[0] / 5
+
+        # 詳細レイアウトの枠幅（A4幅 - 余白40mm ≒ 482pt）は100dpiで約670画素
+        generator = PhotoAlbumGenerator(image_dpi=100)
+        frame_width = generator.page_width - 2 * generator.margin
+        rendered = generator._render_image(
+            sample_photo_data["image_data"], frame_width, frame_width * 3 / 4
+        )
+        width, _ = Image.open(BytesIO(rendered)).size
+        assert abs(width - math.ceil(frame_width / 72 * 100)) <= 1
+
+    def test_small_jpeg_embedded_without_decode(
+        self, album_generator, sample_photo_data, tmp_path, monkeypatch
+    ):
+        """表示サイズ以下のJPEGはデコード・再エンコードせずにそのまま埋め込む"""
+        from PIL import ImageFile
+
+        img = Image.new("RGB", (400, 300), color="blue")
+        exif = Image.Exif()
+        exif[0x0112] = 6
+        data = BytesIO()
+        img.save(data, format="JPEG", exif=exif)
+        image_data = data.getvalue()
+
+        decoded = []
+        original_load = ImageFile.ImageFile.load
+
+        def load(image):
+            decoded.append(image)
+            return original_load(image)
+
+        monkeypatch.setattr(ImageFile.ImageFile, "load", load)
+        output_path = tmp_path / "album.pdf"
+        result = album_generator.generate_pdf(
+            photos=[{**sample_photo_data, "image_data": image_data}] * 2,
+            output_path=str(output_path),
+            layout_type=LayoutType.STANDARD,
+        )
+
+        assert result["success"] is True
+        assert decoded == []
+        pdf = output_path.read_bytes()
+        # 同じ画像は1つの画像オブジェクトを共有し、元の画素数のまま（向きは変換行列で反映）
+        assert pdf.count(image_data) == 1
+        assert b"/Filter [ /DCTDecode ] /Height 300" in pdf
+        assert b"/Width 400" in pdf
+        # 描画したページのリソースに画像オブジェクトが登録されている
+        assert b"/XObject <<\n/FormXob.jpeg" in pdf
+
+    def test_non_jpeg_image_reencoded(
+        self, album_generator, sample_photo_data, tmp_path
+    ):
+        """JPEG以外の画像は従来どおりJPEGに変換して埋め込む"""
+        data = BytesIO()
+        Image.new("RGB", (400, 300), color="red").save(data, format="PNG")
+        output_path = tmp_path / "album.pdf"
+
+        result = album_generator.generate_pdf(
+            photos=[{**sample_photo_data, "image_data": data.getvalue()}],
+            output_path=str(output_path),
+            layout_type=LayoutType.STANDARD,
+        )
+
+        assert result["success"] is True
+        pdf = output_path.read_bytes()
+        assert data.getvalue() not in pdf
+        assert b"/DCTDecode" in pdf
+
+    @pytest.mark.parametrize("orientation", range(1, 9))
+    def test_exif_orientation_matrices(self, orientation):
+        """変換行列による向きの反映はPILの exif_transpose と一致する"""
+        from PIL import ImageOps
+
+        width, height = 3, 2
+        img = Image.new("L", (width, height))
+        img.putdata(range(width * height))
+        img.getexif()[0x0112] = orientation
+        transposed = ImageOps.exif_transpose(img)
+
+        a, b, c, d, e, f = EXIF_ORIENTATION_MATRICES[orientation]
+        for col in range(width):
+            for row in range(height):
+                # 画素の中心（PDFの画像空間はY軸が上向き）を表示向きの単位正方形に移す
+                u, v = (col + 0.5) / width, 1 - (row + 0.5) / height
+                x, y = a * u + c * v + e, b * u + d * v + f
+                position = (
+                    int(x * transposed.width),
+                    int((1 - y) * transposed.height),
+                )
+                assert transposed.getpixel(position) == img.getpixel((col, row))
+
+    def test_frame_pixels(self):
+        """表示サイズ（ポイント）と印刷解像度から画素数を計算"""
+        assert PhotoAlbumGenerator(image_dpi=200).frame_pixels(72, 144) == (200, 400)
+        assert PhotoAlbumGenerator(image_dpi=300).frame_pixels(36, 72.1) == (150, 301)
+
     def test_generate_thumbnail(self, album_generator, dummy_image):
         """サムネイル生成テスト"""
         thumbnail = album_generator.generate_thumbnail(
@@ -306,6 +450,146 @@ class TestPhotoAlbumGenerator:
         if not result["success"]:
             assert len(result["errors"]) > 0
 
+    def test_images_pulled_page_by_page(
+        self, album_generator, sample_photo_list, dummy_image, tmp_path
+    ):
+        """画像はページの描画直前にそのページの分だけ取り出す"""
+        pulled = []
+
+        def images():
+            for photo in sample_photo_list:
+                pulled.append(photo["id"])
+                yield dummy_image
+
+        drawn = []
+        draw_photo_page = album_generator._draw_photo_page
+
+        def record_page(c, photos, *args, **kwargs):
+            assert all(photo["image_data"] == dummy_image for photo in photos)
+            drawn.append(list(pulled))
+            draw_photo_page(c, photos, *args, **kwargs)
+
+        album_generator._draw_photo_page = record_page
+        result = album_generator.generate_pdf(
+            photos=sample_photo_list,
+            output_path=str(tmp_path / "album.pdf"),
+            layout_type=LayoutType.STANDARD,
+            images=images(),
+        )
+
+        assert result["success"] is True
+        assert drawn == [[1, 2], [1, 2, 3, 4]]
+        assert all(photo["image_data"] is None for photo in sample_photo_list)
+
+    def test_generate_pdf_in_parts(self, sample_photo_list, dummy_image, tmp_path):
+        """部分PDFに分けて保存したページを連結（部分PDFは削除される）"""
+        from app.services.pdf_concat import _PDFPart
+
+        generator = PhotoAlbumGenerator(pages_per_part=1)
+        photos = [
+            {**photo, "id": i, "image_data": dummy_image}
+            for i, photo in enumerate(sample_photo_list * 2)
+        ]
+        output_path = tmp_path / "album.pdf"
+        result = generator.generate_pdf(
+            photos=photos,
+            output_path=str(output_path),
+            layout_type=LayoutType.STANDARD,
+            cover_data={"project_name": "テスト工事"},
+            add_page_numbers=True,
+        )
+
+        assert result["success"] is True
+        assert result["total_pages"] == 5
+        with open(output_path, "rb") as f:
+            assert len(_PDFPart(f).pages) == 5
+        assert os.listdir(tmp_path) == ["album.pdf"]
+        # 同じ画像も部分PDFごとに埋め込まれる
+        assert output_path.read_bytes().count(b"/Subtype /Image") == 4
+
+    def test_peak_memory_does_not_scale_with_album_size(self, tmp_path):
+        """ピークメモリは写真の枚数ではなく部分PDFのページ数で決まる"""
+        import tracemalloc
+
+        img = Image.frombytes("RGB", (600, 400), os.urandom(600 * 400 * 3))
+        data = BytesIO()
+        img.save(data, format="JPEG", quality=90)
+        base = data.getvalue()
+
+        def peak(count):
+            photos = [{"id": i, "title": f"写真{i}"} for i in range(count)]
+            # JPEG終端の後ろに写真ごとに異なるバイト列を付け、別の画像として埋め込ませる
+            images = (base + b"%08d" % i for i in range(count))
+            generator = PhotoAlbumGenerator(image_dpi=0, pages_per_part=2)
+            tracemalloc.start()
+            try:
+                result = generator.generate_pdf(
+                    photos,
+                    str(tmp_path / f"album{count}.pdf"),
+                    layout_type=LayoutType.STANDARD,
+                    images=images,
+                )
+                return tracemalloc.get_traced_memory()[1]
+            finally:
+                tracemalloc.stop()
+                assert result["success"] is True
+
+        small = peak(8)
+        large = peak(40)
+
+        assert large < small * 1.5
+
+    def test_progress_reported_per_page(self, sample_photo_list, dummy_image, tmp_path):
+        """ページの描画ごとにそのページの写真枚数分の進捗を発行"""
+        from app.services.job_event_bus import InMemoryJobEventBus, JobProgressReporter
+
+        bus = InMemoryJobEventBus()
+        job_id = bus.register_job(organization_id=1, job_type="photo_album")
+        events = []
+        publish = bus.publish
+
+        def record(event):
+            events.append(event)
+            return publish(event)
+
+        bus.publish = record
+        reporter = JobProgressReporter(bus, job_id, min_interval=0)
+        photos = [{**photo, "image_data": dummy_image} for photo in sample_photo_list]
+        result = PhotoAlbumGenerator(pages_per_part=1).generate_pdf(
+            photos=photos[:3],
+            output_path=str(tmp_path / "album.pdf"),
+            layout_type=LayoutType.STANDARD,
+            reporter=reporter,
+        )
+
+        assert result["success"] is True
+        assert [(event.event, event.stage) for event in events] == [
+            ("stage", "pages"),
+            ("progress", "pages"),
+            ("progress", "pages"),
+        ]
+        assert [event.processed for event in events] == [0, 2, 3]
+        assert events[-1].total == 3
+        assert events[-1].progress == 1.0
+
+    def test_iter_images(self, album_generator):
+        """S3から写真の順に取得し、キーがない・取得に失敗した写真はNone"""
+        client = FakeS3Client(generate_missing=False)
+        client.put_object(Bucket="b", Key="photos/1.jpg", Body=b"one")
+        client.put_object(Bucket="b", Key="photos/4.jpg", Body=b"four")
+        photos = [
+            {"id": 1, "s3_key": "photos/1.jpg"},
+            {"id": 2, "s3_key": None},
+            {"id": 3, "s3_key": "photos/missing.jpg"},
+            {"id": 4, "s3_key": "photos/4.jpg"},
+        ]
+
+        images = album_generator.iter_images(
+            photos, client, "b", prefetch_concurrency=2
+        )
+
+        assert list(images) == [b"one", None, None, b"four"]
+
     def test_get_page_count(self, album_generator):
         """ページ数計算テスト"""
         # 標準レイアウト（1ページ2枚）
@@ -0,0 +1,144 @@
+"""
+事前バリデーションサービスのテスト
+"""
+
+from datetime import datetime
+
+import pytest
+
+from app.database.models import Organization, Photo, Project
+from app.services.photo_validation_service import (
+    PhotoValidationService,
+    validation_messages,
+)
+from app.services.photo_xml_generator import PhotoXMLGenerator
+
+
+class TestPhotoValidationService:
+    """PhotoValidationService のテスト"""
+
+    @pytest.fixture
+    def photos(self, db, test_org, test_project):
+        """正常・必須項目不足・形式不正・重複を含む写真"""
+        rows = [
+            (
+                "P0000001.JPG",
+                "着手前",
+                datetime(2024, 3, 15),
+                "工事",
+                {"ocr_result": {"station": "No.1"}, "classification": {"a": 1}},
+            ),
+            ("bad.jpg", "", None, "工事", {"ocr_result": {}}),
+            ("P0000001.JPG", "長" * 130, datetime(2024, 3, 15), None, None),
+            (
+                "P0000004.JPG",
+                "完成",
+                datetime(2024, 3, 16),
+                "工事",
+                {"ocr_result": {"station": "No.4"}},
+            ),
+        ]
+        photos = []
+        for i, (file_name, title, shooting_date, category, metadata) in enumerate(rows):
+            photo = Photo(
+                organization_id=test_org.id,
+                project_id=test_project.id,
+                file_name=file_name,
+                file_size=1024,
+                mime_type="image/jpeg",
+                s3_key=f"photos/{i}.jpg",
+                title=title,
+                shooting_date=shooting_date,
+                major_category=category,
+                photo_metadata=metadata,
+            )
+            db.add(photo)
+            photos.append(photo)
+        db.commit()
+        return photos
+
+    def test_counts(self, db, test_org, photos):
+        """全写真の件数を集計"""
+        result = PhotoValidationService(db).validate(
+            [p.id for p in photos], organization_id=test_org.id
+        )
+
+        assert result["total"] == 4
+        assert result["invalid_photos"] == 2
+        assert result["error_counts"] == {
+            "missing_file_name": 0,
+            "missing_title": 1,
+            "missing_shooting_date": 1,
+            "missing_major_category": 1,
+            "invalid_file_name": 1,
+            "title_too_long": 1,
+            "duplicate_file_name": 1,
+        }
+        assert result["warning_counts"] == {"missing_title": 1, "missing_ocr": 2}
+        assert result["offender_total"] == 2
+        assert result["duplicate_file_names"] == ["P0000001.JPG"]
+
+    def test_matches_python_validation(self, db, photos):
+        """エラーメッセージは validate_photo_data と同じ"""
+        generator = PhotoXMLGenerator()
+        result = PhotoValidationService(db).validate([p.id for p in photos])
+
+        for offender in result["offenders"]:
+            photo = next(p for p in photos if p.id == offender["photo_id"])
+            expected = generator.validate_photo_data(
+                {
+                    "id": photo.id,
+                    "file_name": photo.file_name,
+                    "title": photo.title or "",
+                    "shooting_date": photo.shooting_date,
+                    "major_category": photo.major_category or "",
+                }
+            )
+            assert offender["errors"] == expected
+
+    def test_pagination(self, db, photos):
+        """違反写真一覧はoffset/limitの範囲のみ、件数は全体"""
+        service = PhotoValidationService(db)
+        ids = [p.id for p in photos]
+
+        first = service.validate(ids, offset=0, limit=1)
+        second = service.validate(ids, offset=1, limit=1)
+
+        assert [o["photo_id"] for o in first["offenders"]] == [photos[1].id]
+        assert [o["photo_id"] for o in second["offenders"]] == [photos[2].id]
+        assert first["offender_total"] == second["offender_total"] == 2
+
+    def test_warning_selection_and_messages(self, db, photos):
+        """検査する警告項目の指定とメッセージの組み立て"""
+        result = PhotoValidationService(db).validate(
+            [photos[3].id],
+            warnings=("missing_classification",),
+            check_duplicates=False,
+        )
+
+        assert result["warning_counts"] == {"missing_classification": 1}
+        assert "duplicate_file_name" not in result["error_counts"]
+        errors, warnings = validation_messages(result)
+        assert errors == []
+        assert warnings == [f"写真ID {photos[3].id}: 分類データが未処理です"]
+
+    def test_other_organization_excluded(self, db, photos):
+        """組織指定時は他組織の写真を対象外とする"""
+        other = Organization(name="Other", subdomain="other", is_active=True)
+        db.add(other)
+        db.commit()
+
+        result = PhotoValidationService(db).validate(
+            [p.id for p in photos], organization_id=other.id
+        )
+
+        assert result["total"] == 0
+        assert result["offenders"] == []
+
+    def test_many_ids(self, db, photos):
+        """バインド変数の上限を超える件数のIDでも1文で検査できる"""
+        ids = list(range(1, 50001)) + [p.id for p in photos]
+
+        result = PhotoValidationService(db).validate(ids)
+
+        assert result["total"] == 4
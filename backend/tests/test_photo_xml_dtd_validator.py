@@ -0,0 +1,155 @@
+"""
+PHOTO.XML DTD適合チェックのテスト
+"""
+
+import io
+
+import pytest
+
+from app.services.photo_xml_dtd_validator import (
+    DTDValidatingStream,
+    PhotoXMLDTDValidator,
+    PhotoXMLSchema,
+    get_photo05_schema,
+)
+from app.services.photo_xml_generator import PhotoXMLGenerator
+
+
+def validate(xml: str, chunk_size: int = 7):
+    """XMLを小さな単位に分けて検査"""
+    validator = PhotoXMLDTDValidator()
+    data = xml.encode("shift_jis")
+    for i in range(0, len(data), chunk_size):
+        validator.feed(data[i : i + chunk_size])
+    return validator, validator.close()
+
+
+class TestPhotoXMLSchema:
+    """DTDのコンパイルのテスト"""
+
+    def test_compile_photo05(self):
+        """要素の並びと必須要素を取り出す"""
+        schema = get_photo05_schema()
+
+        assert schema.root == "photodata"
+        assert schema.elements["写真情報"].required == ("写真ファイル情報", "撮影情報")
+        assert schema.elements["撮影工種区分"].required == ("工種",)
+        assert schema.fixed_attributes == {"photodata": {"DTD_version": "05"}}
+        assert schema.fragment_pattern("写真情報") is not None
+
+    def test_recursive_model_has_no_fragment_pattern(self):
+        """再帰的な定義は高速経路を使わない"""
+        schema = PhotoXMLSchema("<!ELEMENT a (b?)>\n<!ELEMENT b (a?)>")
+
+        assert schema.fragment_pattern("a") is None
+
+
+class TestPhotoXMLDTDValidator:
+    """PhotoXMLDTDValidator のテスト"""
+
+    @pytest.fixture
+    def xml_generator(self):
+        """XMLジェネレーターのフィクスチャ"""
+        return PhotoXMLGenerator()
+
+    @pytest.fixture
+    def photos(self):
+        """実体参照・空値を含む写真データ"""
+        return [
+            {
+                "file_name": "P0000001.JPG",
+                "title": "配筋状況 A&B <検査>",
+                "shooting_date": "2024-03-15",
+                "photo_type": "施工状況写真",
+                "work_type": "基礎工",
+                "work_kind": "配筋工",
+                "photo_metadata": {
+                    "ocr_result": {"station": "No.1", "design_dimension": 500}
+                },
+            },
+            {"file_name": "P0000002.JPG", "title": "", "photo_metadata": {}},
+        ]
+
+    @pytest.mark.parametrize("pretty_print", [False, True])
+    def test_generated_xml_conforms(self, xml_generator, photos, pretty_print):
+        """生成したPHOTO.XMLはエラーなし"""
+        validator, errors = validate(
+            xml_generator.generate_xml(photos * 3, pretty_print=pretty_print)
+        )
+
+        assert errors == []
+        assert validator.is_valid
+        assert validator.photo_count == 6
+
+    def test_errors_report_serial_number(self, xml_generator, photos):
+        """並び順・必須要素・文字数のエラーをシリアル番号付きで報告"""
+        photos[1]["title"] = "長" * 128
+        xml = (
+            xml_generator.generate_xml(photos, pretty_print=True)
+            .replace("<写真ファイル名>P0000001.JPG</写真ファイル名>", "", 1)
+            .replace("<撮影情報>", "<撮影情報><検査員>山田</検査員>", 1)
+        )
+
+        _, errors = validate(xml)
+
+        assert [(e.serial_number, e.element) for e in errors] == [
+            ("0000001", "写真ファイル情報"),
+            ("0000001", "撮影情報"),
+            ("0000002", "写真タイトル"),
+        ]
+        assert errors[0].message == "必須要素 <写真ファイル名> がありません"
+        assert "子要素の並びが不正です" in errors[1].message
+        assert errors[2].message == "127文字を超えています（128文字）"
+        assert str(errors[2]).startswith("シリアル番号 0000002: <写真タイトル>")
+
+    def test_document_level_errors(self, xml_generator):
+        """写真情報がない・固定属性の不一致・未定義要素"""
+        xml = (
+            xml_generator.generate_xml([], pretty_print=False)
+            .replace('DTD_version="05"', 'DTD_version="04"')
+            .replace("</基礎情報>", "<独自項目>x</独自項目></基礎情報>")
+        )
+
+        _, errors = validate(xml)
+        messages = {(e.serial_number, e.element, e.message) for e in errors}
+
+        assert (
+            None,
+            "photodata",
+            '属性 DTD_version は "05" である必要があります',
+        ) in messages
+        assert (None, "独自項目", "DTDで宣言されていない要素です") in messages
+        assert (None, "photodata", "必須要素 <写真情報> がありません") in messages
+
+    def test_malformed_xml(self):
+        """構文エラーで検査を打ち切る"""
+        validator, errors = validate(
+            '<?xml version="1.0" encoding="Shift_JIS"?>\n<photodata><基礎情報></photodata>'
+        )
+
+        assert len(errors) == 1
+        assert errors[0].message.startswith("XMLの構文が不正です")
+        validator.feed(b"<more/>")
+        assert len(validator.close()) == 1
+
+    def test_max_errors(self, xml_generator):
+        """記録するエラー数は上限まで、件数は全件"""
+        photos = [{"file_name": "P0000001.JPG", "title": "長" * 200}] * 5
+        validator = PhotoXMLDTDValidator(max_errors=2)
+        validator.feed(xml_generator.generate_xml(photos).encode("shift_jis"))
+
+        assert len(validator.close()) == 2
+        assert validator.error_count == 5
+
+    def test_validating_stream(self, xml_generator, photos):
+        """書き込みと並行して検査し、出力は変わらない"""
+        buffer = io.BytesIO()
+        validator = PhotoXMLDTDValidator()
+        xml_generator.write_xml(
+            photos, DTDValidatingStream(buffer, validator), pretty_print=True
+        )
+
+        assert validator.close() == []
+        assert buffer.getvalue() == xml_generator.generate_xml(
+            photos, pretty_print=True
+        ).encode("shift_jis")
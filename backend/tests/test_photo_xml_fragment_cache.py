@@ -0,0 +1,173 @@
+"""
+PHOTO.XML 写真情報フラグメントキャッシュのテスト
+"""
+
+import io
+from datetime import datetime
+
+import pytest
+
+from app.services.photo_xml_fragment_cache import (
+    FragmentCacheStats,
+    InMemoryPhotoXMLFragmentCache,
+    PhotoXMLFragment,
+)
+from app.services.photo_xml_generator import PhotoXMLGenerator
+
+
+class TestPhotoXMLFragment:
+    """PhotoXMLFragment のテスト"""
+
+    def test_with_serial(self):
+        """シリアル番号の位置を差し替える"""
+        fragment = PhotoXMLFragment(data=b"<s>0000001</s>", serial_offsets=(3,))
+
+        assert fragment.with_serial(b"0000042") == b"<s>0000042</s>"
+        assert fragment.data == b"<s>0000001</s>"
+
+    def test_encode_decode(self):
+        """保存形式との相互変換（データ中の区切り文字も保持）"""
+        fragment = PhotoXMLFragment(data=b"a|b,c", serial_offsets=(1, 10))
+
+        assert PhotoXMLFragment.decode(fragment.encode()) == fragment
+        empty = PhotoXMLFragment(data=b"x", serial_offsets=())
+        assert PhotoXMLFragment.decode(empty.encode()) == empty
+
+    def test_stats_hit_rate(self):
+        """ヒット率の計算"""
+        assert FragmentCacheStats().hit_rate == 0.0
+        assert FragmentCacheStats(hits=3, misses=1).as_dict() == {
+            "hits": 3,
+            "misses": 1,
+            "hit_rate": 0.75,
+        }
+
+
+class TestInMemoryPhotoXMLFragmentCache:
+    """InMemoryPhotoXMLFragmentCache のテスト"""
+
+    def test_get_put_many(self):
+        """まとめて保存・取得（存在しないキーは含まれない）"""
+        cache = InMemoryPhotoXMLFragmentCache()
+        fragment = PhotoXMLFragment(data=b"abc", serial_offsets=(0,))
+        cache.put_many({"a": fragment})
+
+        assert cache.get_many(["a", "b"]) == {"a": fragment}
+        assert cache.size_bytes == 3
+
+    def test_lru_eviction_by_bytes(self):
+        """合計バイト数の上限を超えると最も古く使われたエントリから削除"""
+        cache = InMemoryPhotoXMLFragmentCache(max_bytes=10)
+        cache.put_many({"a": PhotoXMLFragment(b"1234", ())})
+        cache.put_many({"b": PhotoXMLFragment(b"1234", ())})
+        cache.get_many(["a"])
+        cache.put_many({"c": PhotoXMLFragment(b"1234", ())})
+
+        assert set(cache.get_many(["a", "b", "c"])) == {"a", "c"}
+        assert cache.size_bytes == 8
+
+    def test_replace_and_oversized(self):
+        """同じキーの上書きはサイズを差し替え、上限超のエントリは保存しない"""
+        cache = InMemoryPhotoXMLFragmentCache(max_bytes=10)
+        cache.put_many({"a": PhotoXMLFragment(b"1234", ())})
+        cache.put_many({"a": PhotoXMLFragment(b"12", ())})
+        cache.put_many({"big": PhotoXMLFragment(b"x" * 11, ())})
+
+        assert cache.size_bytes == 2
+        assert cache.get_many(["big"]) == {}
+
+
+class TestPhotoXMLGeneratorWithFragmentCache:
+    """フラグメントキャッシュを使ったPHOTO.XML組み立てのテスト"""
+
+    @pytest.fixture
+    def xml_generator(self):
+        """XMLジェネレーターのフィクスチャ"""
+        return PhotoXMLGenerator()
+
+    @pytest.fixture
+    def photos(self):
+        """updated_at付きの写真データ"""
+        return [
+            {
+                "id": i,
+                "updated_at": datetime(2024, 3, 15, 10, 0, i),
+                "file_name": f"P{i:07d}.JPG",
+                "title": f"配筋状況 No.{i} & <検査>",
+                "shooting_date": "2024-03-15",
+                "work_type": "基礎工",
+                "photo_metadata": {"ocr_result": {"station": f"No.{i}"}},
+            }
+            for i in range(1, 8)
+        ]
+
+    def _write(self, generator, photos, cache, pretty_print=True):
+        stats = FragmentCacheStats()
+        stream = io.BytesIO()
+        generator.write_xml(
+            photos,
+            stream,
+            pretty_print=pretty_print,
+            fragment_cache=cache,
+            cache_stats=stats,
+        )
+        return stream.getvalue(), stats
+
+    @pytest.mark.parametrize("pretty_print", [False, True])
+    def test_cached_output_identical(self, xml_generator, photos, pretty_print):
+        """キャッシュ利用時も、並び順が変わってもキャッシュなしと同一の出力"""
+        cache = InMemoryPhotoXMLFragmentCache()
+
+        data, stats = self._write(xml_generator, photos, cache, pretty_print)
+        assert (stats.hits, stats.misses) == (0, len(photos))
+        assert data == xml_generator.generate_xml(
+            photos, pretty_print=pretty_print
+        ).encode("shift_jis")
+
+        reordered = list(reversed(photos))
+        data, stats = self._write(xml_generator, reordered, cache, pretty_print)
+        assert (stats.hits, stats.misses) == (len(photos), 0)
+        assert data == xml_generator.generate_xml(
+            reordered, pretty_print=pretty_print
+        ).encode("shift_jis")
+
+    def test_updated_photo_is_rendered_again(self, xml_generator, photos):
+        """updated_atが変わった写真はキャッシュを使わない"""
+        cache = InMemoryPhotoXMLFragmentCache()
+        self._write(xml_generator, photos, cache)
+
+        photos[2] = {
+            **photos[2],
+            "title": "変更後タイトル",
+            "updated_at": datetime(2024, 4, 1),
+        }
+        data, stats = self._write(xml_generator, photos, cache)
+
+        assert (stats.hits, stats.misses) == (len(photos) - 1, 1)
+        assert stats.hit_rate == round(6 / 7, 4)
+        assert "変更後タイトル".encode("shift_jis") in data
+
+    def test_version_and_layout_are_part_of_key(self, xml_generator, photos):
+        """整形有無・生成器バージョンが異なるとキャッシュを共有しない"""
+        cache = InMemoryPhotoXMLFragmentCache()
+        self._write(xml_generator, photos, cache, pretty_print=True)
+
+        _, stats = self._write(xml_generator, photos, cache, pretty_print=False)
+        assert stats.hits == 0
+
+        class NextVersionGenerator(PhotoXMLGenerator):
+            FRAGMENT_VERSION = "next"
+
+        _, stats = self._write(NextVersionGenerator(), photos, cache)
+        assert stats.hits == 0
+
+    def test_photos_without_key_are_not_cached(self, xml_generator, photos):
+        """idまたはupdated_atのない写真はキャッシュしない"""
+        cache = InMemoryPhotoXMLFragmentCache()
+        photos = [{k: v for k, v in p.items() if k != "updated_at"} for p in photos]
+
+        self._write(xml_generator, photos, cache)
+        _, stats = self._write(xml_generator, photos, cache)
+
+        assert stats.hits == 0
+        assert cache.size_bytes == 0
@@ -2,6 +2,9 @@
 PHOTO.XML生成サービスのテスト
 """
 
+import io
+import zipfile
+
 import pytest
 from datetime import datetime
 import xml.etree.ElementTree as ET
@@ -192,6 +195,7 @@ class TestPhotoXMLGenerator:
         assert xml_generator.format_date_ccyymmdd("2024-03-15") == "2024-03-15"
         assert xml_generator.format_date_ccyymmdd("20240315") == "2024-03-15"
         assert xml_generator.format_date_ccyymmdd("2024/03/15") == "2024-03-15"
+        assert xml_generator.format_date_ccyymmdd("2024-03-15T09:30:00") == "2024-03-15"
 
     def test_validate_filename_format(self, xml_generator):
         """ファイル名形式バリデーションテスト"""
@@ -257,3 +261,102 @@ class TestPhotoXMLGenerator:
         # インデントが含まれているか確認
         assert "\n" in xml_string
         assert "  " in xml_string or "\t" in xml_string
+
+
+class TestPhotoXMLStreamingWriter:
+    """PHOTO.XML逐次出力のテストクラス"""
+
+    @pytest.fixture
+    def xml_generator(self):
+        """XMLジェネレーターのフィクスチャ"""
+        return PhotoXMLGenerator()
+
+    @pytest.fixture
+    def photos(self):
+        """特殊文字・改行・空値を含む写真データ"""
+        return [
+            {
+                "id": 1,
+                "file_name": "P0000001.JPG",
+                "title": "着手前全景",
+                "shooting_date": "2024-03-15",
+                "photo_type": "着手前及び完成写真",
+            },
+            {
+                "id": 2,
+                "file_name": "P0000002.JPG",
+                "title": "A&B <x> \"q\" 's'\r\n2行目",
+                "shooting_date": "20240315",
+                "work_type": "基礎工",
+                "work_kind": "配筋工",
+                "work_detail": "",
+                "photo_metadata": {
+                    "ocr_result": {
+                        "station": "No.15+20.5",
+                        "design_dimension": '5<"0"&',
+                        "actual_dimension": 498,
+                        "inspector": "山田太郎",
+                    }
+                },
+            },
+            {"id": 3, "file_name": "", "title": None, "photo_metadata": {}},
+        ]
+
+    def _legacy_xml(self, generator, photos, pretty_print):
+        """ElementTree全体を組み立ててから直列化する従来方式"""
+        root = ET.Element("photodata", attrib={"DTD_version": generator.dtd_version})
+        basic_info = ET.SubElement(root, "基礎情報")
+        ET.SubElement(basic_info, "写真フォルダ名").text = generator.photo_folder
+        ET.SubElement(basic_info, "適用要領基準").text = generator.standard
+        for idx, photo in enumerate(photos, start=1):
+            generator._add_photo_info(root, photo, idx)
+
+        if pretty_print:
+            body = generator._prettify_xml(root)
+        else:
+            body = ET.tostring(root, encoding="unicode")
+        return (
+            '<?xml version="1.0" encoding="Shift_JIS"?>\n'
+            '<!DOCTYPE photodata SYSTEM "PHOTO05.DTD">\n' + body
+        )
+
+    @pytest.mark.parametrize("pretty_print", [False, True])
+    def test_identical_to_legacy_output(self, xml_generator, photos, pretty_print):
+        """従来方式と同一の出力"""
+        expected = self._legacy_xml(xml_generator, photos, pretty_print)
+
+        assert xml_generator.generate_xml(photos, pretty_print=pretty_print) == expected
+
+        stream = io.BytesIO()
+        written = xml_generator.write_xml(
+            iter(photos), stream, pretty_print=pretty_print
+        )
+        assert stream.getvalue() == expected.encode("shift_jis")
+        assert written == len(stream.getvalue())
+
+    def test_empty_photo_list(self, xml_generator):
+        """写真0件でも基礎情報のみの文書を出力"""
+        for pretty_print in (False, True):
+            assert xml_generator.generate_xml(
+                [], pretty_print=pretty_print
+            ) == self._legacy_xml(xml_generator, [], pretty_print)
+
+    def test_iter_xml_yields_per_photo(self, xml_generator, photos):
+        """写真情報は1枚ごとの断片として出力される"""
+        chunks = list(xml_generator.iter_xml(photos, pretty_print=True))
+
+        assert len(chunks) == len(photos) + 2
+        assert chunks[1].startswith("  <写真情報>")
+        assert "<シリアル番号>0000002</シリアル番号>" in chunks[2]
+
+    def test_write_xml_to_zip_entry(self, xml_generator, photos):
+        """ZIPエントリへ直接書き込み"""
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as zf:
+            with zf.open("PHOTO.XML", "w") as entry:
+                xml_generator.write_xml(photos, entry, pretty_print=True)
+
+        with zipfile.ZipFile(buffer) as zf:
+            assert zf.read("PHOTO.XML") == xml_generator.generate_xml(
+                photos, pretty_print=True
+            ).encode("shift_jis")
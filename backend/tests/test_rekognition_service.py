@@ -4,7 +4,15 @@ Amazon Rekognition サービスのテスト
 
 import pytest
 from unittest.mock import Mock, patch
-from app.services.rekognition_service import RekognitionService, ImageLabel
+
+from botocore.exceptions import ClientError
+
+from app.services.rekognition_service import (
+    AdaptiveConcurrencyLimiter,
+    ConstructionLabelMatcher,
+    RekognitionService,
+    ImageLabel,
+)
 
 
 class TestRekognitionService:
@@ -193,3 +201,171 @@ class TestRekognitionService:
         assert summary["avg_confidence"] == 0.0
         assert summary["top_labels"] == []
         assert summary["has_construction_content"] is False
+
+
+class TestRekognitionBatch:
+    """一括ラベル検出のテスト"""
+
+    @staticmethod
+    def _throttling_error():
+        return ClientError(
+            {"Error": {"Code": "ThrottlingException", "Message": "Rate exceeded"}},
+            "DetectLabels",
+        )
+
+    @patch("boto3.client")
+    def test_detect_labels_batch_partial_failure(self, mock_boto_client):
+        """一部の写真が失敗してもバッチは中断しない"""
+        mock_rekognition = Mock()
+
+        def detect_labels(Image, MaxLabels, MinConfidence):
+            if Image["S3Object"]["Name"] == "broken.jpg":
+                raise ClientError(
+                    {
+                        "Error": {
+                            "Code": "InvalidImageFormatException",
+                            "Message": "bad",
+                        }
+                    },
+                    "DetectLabels",
+                )
+            return {"Labels": [{"Name": "Crane", "Confidence": 90.0, "Parents": []}]}
+
+        mock_rekognition.detect_labels.side_effect = detect_labels
+        mock_boto_client.return_value = mock_rekognition
+
+        service = RekognitionService(confidence_threshold=80.0)
+        results = list(
+            service.detect_labels_batch(
+                [(1, "a.jpg"), (2, "broken.jpg"), (3, "c.jpg")],
+                s3_bucket="test-bucket",
+                max_concurrency=2,
+            )
+        )
+
+        by_id = {result.photo_id: result for result in results}
+        assert len(results) == 3
+        assert by_id[1].success and by_id[1].labels[0]["Name"] == "Crane"
+        assert by_id[3].success
+        assert not by_id[2].success
+        assert "InvalidImageFormatException" in by_id[2].error
+
+    @patch("app.services.rekognition_service.time.sleep")
+    @patch("boto3.client")
+    def test_detect_labels_batch_retries_throttling(self, mock_boto_client, mock_sleep):
+        """スロットリング時はリトライし、同時実行数を絞る"""
+        mock_rekognition = Mock()
+        mock_rekognition.detect_labels.side_effect = [
+            self._throttling_error(),
+            self._throttling_error(),
+            {"Labels": [{"Name": "Worker", "Confidence": 95.0, "Parents": []}]},
+        ]
+        mock_boto_client.return_value = mock_rekognition
+
+        service = RekognitionService(confidence_threshold=80.0)
+        limiter = AdaptiveConcurrencyLimiter(max_concurrency=4)
+        results = list(
+            service.detect_labels_batch(
+                [(1, "a.jpg")], s3_bucket="test-bucket", limiter=limiter
+            )
+        )
+
+        assert results[0].success
+        assert results[0].attempts == 3
+        assert limiter.throttle_count == 2
+        assert limiter.limit < 4
+        assert mock_sleep.call_count == 2
+
+    @patch("app.services.rekognition_service.time.sleep")
+    @patch("boto3.client")
+    def test_detect_labels_batch_gives_up_after_max_retries(
+        self, mock_boto_client, mock_sleep
+    ):
+        """最大リトライ回数を超えたら失敗として返す"""
+        mock_rekognition = Mock()
+        mock_rekognition.detect_labels.side_effect = self._throttling_error()
+        mock_boto_client.return_value = mock_rekognition
+
+        service = RekognitionService(confidence_threshold=80.0)
+        results = list(
+            service.detect_labels_batch(
+                [(1, "a.jpg")], s3_bucket="test-bucket", max_retries=2
+            )
+        )
+
+        assert not results[0].success
+        assert results[0].attempts == 3
+
+    def test_limiter_recovers_after_successes(self):
+        """成功が続くと同時実行数の上限が戻る"""
+        limiter = AdaptiveConcurrencyLimiter(max_concurrency=4, base_delay=0.01)
+
+        delay = limiter.on_throttle(0)
+        assert 0.005 <= delay <= 0.01
+        assert limiter.limit == 2
+
+        for _ in range(2):
+            limiter.on_success()
+        assert limiter.limit == 3
+
+
+class TestConstructionLabelMatcher:
+    """建設関連キーワードマッチャーのテスト"""
+
+    LABEL_NAMES = [
+        "Excavator",
+        "Dump Truck",
+        "Steel Truck",
+        "Hard Hat",
+        "Person",
+        "Construction Site",
+        "Rebar",
+        "Tree",
+        "Sky",
+        "Safety Vest",
+        "Road Roller",
+        "Wood Pipe",
+    ]
+
+    @staticmethod
+    def _naive_category(keywords, label_name):
+        """従来の入れ子ループによる判定"""
+        name = label_name.lower()
+        for category, words in keywords.items():
+            if any(word in name for word in words):
+                return category
+        return None
+
+    def test_matches_naive_scan(self):
+        """従来の判定と同じ結果になる"""
+        keywords = RekognitionService.CONSTRUCTION_KEYWORDS
+        matcher = ConstructionLabelMatcher(keywords)
+
+        for name in self.LABEL_NAMES:
+            assert matcher.match(name) == self._naive_category(keywords, name), name
+
+    def test_category_priority(self):
+        """複数カテゴリに該当する場合は定義順で先のカテゴリ"""
+        matcher = RekognitionService.LABEL_MATCHER
+
+        # equipment（truck）が materials（steel）より優先
+        assert matcher.match("Steel Truck") == "equipment"
+        assert matcher.match("tree") is None
+
+    def test_cache_size_limit(self):
+        """キャッシュは上限を超えて増えない"""
+        matcher = ConstructionLabelMatcher({"scene": ["road"]}, cache_size=2)
+
+        for i in range(10):
+            matcher.match(f"label {i}")
+
+        assert len(matcher._cache) <= 2
+        assert matcher.match("Road") == "scene"
+
+    @patch("boto3.client")
+    def test_classify_label(self, mock_boto_client):
+        """カテゴリと建設関連フラグを同時に返す"""
+        service = RekognitionService()
+
+        assert service.classify_label("Excavator") == ("equipment", True)
+        assert service.classify_label("Sky") == ("other", False)
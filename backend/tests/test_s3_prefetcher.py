@@ -0,0 +1,56 @@
+"""
+S3オブジェクト先読みのテスト
+"""
+
+import pytest
+from botocore.exceptions import ClientError
+
+from app.services.fake_aws import FakeS3Client, LatencyModel
+from app.services.s3_prefetcher import S3ObjectPrefetcher
+
+
+class TestS3ObjectPrefetcher:
+    """S3ObjectPrefetcher のテスト"""
+
+    def test_preserves_order_within_concurrency(self):
+        """レイテンシがばらついても順番どおりに返し、同時取得数の上限を超えない"""
+        # 上限を超えて呼び出すとスロットリングエラーになる代替クライアント
+        client = FakeS3Client(
+            object_size=16,
+            latency=LatencyModel("uniform", 1, 20),
+            max_concurrency=3,
+            seed=0,
+        )
+        keys = [f"photos/{i}.jpg" for i in range(20)]
+
+        results = list(S3ObjectPrefetcher(client, "b", 3).iter_objects(keys))
+
+        assert [key for key, _ in results] == keys
+        assert (
+            results[5][1] == client.get_object(Bucket="b", Key=keys[5])["Body"].read()
+        )
+        assert client.stats["throttled"] == 0
+
+    def test_error_raised_in_order(self):
+        """取得に失敗したキーの順番で例外を送出"""
+        client = FakeS3Client(object_size=16, error_rate=1.0, seed=0)
+        objects = S3ObjectPrefetcher(client, "b", 2).iter_objects(["a", "b", "c"])
+
+        with pytest.raises(ClientError):
+            next(objects)
+
+    def test_return_exceptions(self):
+        """return_exceptions指定時は失敗したキーの例外を返して後続の取得を続ける"""
+        client = FakeS3Client(generate_missing=False)
+        client.put_object(Bucket="b", Key="a", Body=b"A")
+        client.put_object(Bucket="b", Key="c", Body=b"C")
+
+        results = list(
+            S3ObjectPrefetcher(client, "b", 2).iter_objects(
+                ["a", "missing", "c"], return_exceptions=True
+            )
+        )
+
+        assert [key for key, _ in results] == ["a", "missing", "c"]
+        assert results[0][1] == b"A" and results[2][1] == b"C"
+        assert isinstance(results[1][1], ClientError)
@@ -0,0 +1,95 @@
+"""
+ストリーミング配信ジョブプールのテスト
+"""
+
+import threading
+import time
+
+import pytest
+
+from app.services.job_event_bus import InMemoryJobEventBus
+from app.services.metrics import MetricsRegistry
+from app.services.stream_job_pool import StreamJobPool, StreamPoolBusy
+
+
+def wait_until(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+
+
+class TestStreamJobPool:
+    """StreamJobPool のテスト"""
+
+    @pytest.fixture
+    def bus(self):
+        """イベントバスのフィクスチャ"""
+        return InMemoryJobEventBus()
+
+    @pytest.fixture
+    def registry(self):
+        """メトリクスレジストリのフィクスチャ"""
+        return MetricsRegistry()
+
+    def test_result_is_reported(self, bus, registry):
+        """結果と失敗がイベントバスに反映される"""
+        pool = StreamJobPool(bus=bus, metrics=registry)
+
+        def failing(reporter):
+            raise ValueError("S3エラー")
+
+        completed = pool.submit(1, "export", lambda reporter: {"total_photos": 3})
+        failed = pool.submit(1, "export", failing)
+
+        wait_until(lambda: pool.running() == 0)
+        event = bus.get_job(completed).last_event
+        assert event.event == "completed"
+        assert event.result == {"total_photos": 3}
+        assert bus.get_job(failed).last_event.message == "S3エラー"
+        assert (
+            registry.get_counter(
+                "jobs_failed_total", organization_id=1, job_type="export"
+            )
+            == 1
+        )
+
+    def test_limits(self, bus, registry):
+        """組織ごと・全体の上限を超える配信は待たせずに拒否し、終了すると再び受け付ける"""
+        pool = StreamJobPool(max_streams=3, tenant_streams=2, bus=bus, metrics=registry)
+        release = threading.Event()
+
+        def stream(reporter):
+            release.wait(5)
+
+        pool.submit(1, "export", stream)
+        pool.submit(1, "export", stream)
+        with pytest.raises(StreamPoolBusy):
+            pool.submit(1, "export", stream)
+        pool.submit(2, "export", stream)
+        with pytest.raises(StreamPoolBusy):
+            pool.submit(3, "export", stream)
+        assert pool.running(1) == 2
+        assert (
+            registry.get_counter("stream_jobs_rejected_total", organization_id=1) == 1
+        )
+
+        release.set()
+        wait_until(lambda: pool.running() == 0)
+        pool.submit(1, "export", lambda reporter: None)
+
+    def test_publish_failure_releases_slot(self, bus, registry, monkeypatch):
+        """イベントの発行に失敗しても配信数を解放する"""
+        pool = StreamJobPool(tenant_streams=1, bus=bus, metrics=registry)
+
+        def publish(event):
+            raise ConnectionError("Redis接続エラー")
+
+        monkeypatch.setattr(bus, "publish", publish)
+        pool.submit(1, "export", lambda reporter: {"total_photos": 1})
+
+        wait_until(lambda: pool.running() == 0)
+        assert (
+            registry.get_counter("job_event_publish_errors_total", job_type="export")
+            == 1
+        )
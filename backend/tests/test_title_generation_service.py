@@ -242,3 +242,42 @@ class TestTitleGenerationService:
         assert isinstance(result["title"], str)
         assert isinstance(result["confidence"], float)
         assert 0 <= result["confidence"] <= 100
+
+    def test_input_fingerprint(self, title_service, ocr_data_full, classification_data):
+        """入力フィンガープリントは入力とバージョンが同じなら一致する"""
+        fingerprint = title_service.input_fingerprint(
+            ocr_data_full, classification_data
+        )
+
+        assert fingerprint == TitleGenerationService().input_fingerprint(
+            dict(ocr_data_full), classification_data
+        )
+        assert fingerprint != title_service.input_fingerprint(
+            {**ocr_data_full, "station": "No.99"}, classification_data
+        )
+        assert (
+            title_service.generate_title_with_metadata(
+                ocr_data=ocr_data_full, classification_data=classification_data
+            )["fingerprint"]
+            == fingerprint
+        )
+
+    def test_input_fingerprint_changes_with_mapping(
+        self, title_service, ocr_data_full, classification_data
+    ):
+        """マッピングやバージョンを変更するとフィンガープリントが変わる"""
+
+        class NextVersionService(TitleGenerationService):
+            VERSION = "next"
+
+        version = title_service.version
+        fingerprint = title_service.input_fingerprint(
+            ocr_data_full, classification_data
+        )
+        assert (
+            NextVersionService().input_fingerprint(ocr_data_full, classification_data)
+            != fingerprint
+        )
+
+        title_service.work_type_to_subject["基礎工"] = "基礎配筋"
+        assert title_service._compute_version() != version
@@ -0,0 +1,180 @@
+"""
+タイトル一括再生成サービスのテスト
+"""
+
+from datetime import datetime
+
+import pytest
+
+from app.database.models import Organization, Photo, Project
+from app.services.title_generation_service import TitleGenerationService
+from app.services.title_regeneration_service import (
+    TitleRegenerationService,
+    build_title_inputs,
+)
+
+
+class TestTitleRegenerationService:
+    """TitleRegenerationService のテスト"""
+
+    @pytest.fixture
+    def photos(self, db, test_org, test_project):
+        """OCR済み・分類済み・手動タイトルの写真"""
+        metadata_list = [
+            {
+                "ocr_result": {
+                    "work_type": "基礎工",
+                    "station": "No.15",
+                    "shooting_date": "2024-03-15",
+                }
+            },
+            {"ocr_result": {"work_type": "土工", "shooting_date": "2024-03-16"}},
+            {
+                "rekognition_categorized": {"equipment": ["crane"]},
+                "ocr_result": {"shooting_date": "2024-03-17"},
+            },
+            {"manual_title": True, "ocr_result": {"work_type": "舗装工"}},
+            None,
+        ]
+        photos = []
+        for i, metadata in enumerate(metadata_list):
+            photo = Photo(
+                organization_id=test_org.id,
+                project_id=test_project.id,
+                file_name=f"photo_{i}.jpg",
+                file_size=1024,
+                mime_type="image/jpeg",
+                s3_key=f"photos/photo_{i}.jpg",
+                title="旧タイトル",
+                photo_metadata=metadata,
+            )
+            db.add(photo)
+            photos.append(photo)
+        db.commit()
+        return photos
+
+    def test_build_title_inputs(self):
+        """メタデータからOCRデータとカテゴリ別ラベルを取り出す"""
+        ocr_data, classification_data = build_title_inputs(
+            {
+                "ocr_result": {"work_type": "土工", "station": "No.3", "extra": 1},
+                "rekognition_categorized": {"equipment": ["crane"]},
+            }
+        )
+
+        assert ocr_data["work_type"] == "土工"
+        assert ocr_data["station"] == "No.3"
+        assert "extra" not in ocr_data
+        assert classification_data == {"categorized_labels": {"equipment": ["crane"]}}
+        assert build_title_inputs(None) == ({}, {})
+
+    def test_regenerate(self, db, test_org, test_project, photos):
+        """複数バッチにまたがる再生成と手動タイトルのスキップ"""
+        service = TitleRegenerationService(db, batch_size=2)
+        result = service.regenerate(test_org.id, test_project.id)
+
+        assert result["total"] == 5
+        assert result["updated"] == 4
+        assert result["skipped_manual"] == 1
+        assert result["conflicts"] == 0
+
+        db.expire_all()
+        assert photos[0].title == "基礎工_No.15_基礎施工_20240315"
+        assert photos[0].photo_metadata["generated_title"]["confidence"] == 100.0
+        assert photos[0].photo_metadata["ocr_result"]["station"] == "No.15"
+        assert photos[1].title == "土工_土工作業_20240316"
+        assert photos[2].title == "クレーン_20240317"
+        assert photos[3].title == "旧タイトル"
+        assert "generated_title" not in photos[3].photo_metadata
+
+    def test_regenerate_is_idempotent(self, db, test_org, test_project, photos):
+        """2回目は変更のない写真を書き込まない"""
+        service = TitleRegenerationService(db)
+        service.regenerate(test_org.id, test_project.id)
+        result = service.regenerate(test_org.id, test_project.id)
+
+        assert result["updated"] == 0
+        assert result["unchanged"] == 4
+
+    def test_concurrent_update_is_not_overwritten(
+        self, db, test_org, test_project, photos
+    ):
+        """読み出し後に更新された写真は上書きしない"""
+        service = TitleRegenerationService(db)
+        photo = photos[0]
+        stale_updated_at = photo.updated_at
+
+        photo.title = "手動タイトル"
+        photo.photo_metadata = {"manual_title": True}
+        photo.updated_at = datetime(2030, 1, 1)
+        db.commit()
+
+        written = service._write_batch(
+            test_org.id, [(photo.id, stale_updated_at, "自動タイトル", {})]
+        )
+        db.commit()
+
+        assert written == 0
+        db.expire_all()
+        assert photo.title == "手動タイトル"
+        assert photo.photo_metadata == {"manual_title": True}
+
+    def test_other_organization_untouched(self, db, test_org, test_project, photos):
+        """他組織の写真は対象外"""
+        other_org = Organization(name="Other", subdomain="other", is_active=True)
+        db.add(other_org)
+        db.commit()
+        other_project = Project(organization_id=other_org.id, name="Other Project")
+        db.add(other_project)
+        db.commit()
+        other_photo = Photo(
+            organization_id=other_org.id,
+            project_id=other_project.id,
+            file_name="other.jpg",
+            file_size=1024,
+            mime_type="image/jpeg",
+            s3_key="photos/other.jpg",
+            title="他組織",
+            photo_metadata={"ocr_result": {"work_type": "土工"}},
+        )
+        db.add(other_photo)
+        db.commit()
+
+        result = TitleRegenerationService(db).regenerate(test_org.id, other_project.id)
+
+        assert result["total"] == 0
+        db.expire_all()
+        assert other_photo.title == "他組織"
+
+    def test_regenerate_only_changed_inputs(self, db, test_org, test_project, photos):
+        """入力が変わった写真のみ再生成し、forceでは全件再生成する"""
+        service = TitleRegenerationService(db)
+        service.regenerate(test_org.id, test_project.id)
+
+        metadata = dict(photos[1].photo_metadata)
+        metadata["ocr_result"] = {"work_type": "舗装工", "shooting_date": "2024-03-16"}
+        photos[1].photo_metadata = metadata
+        db.commit()
+
+        result = service.regenerate(test_org.id, test_project.id)
+        assert result["updated"] == 1
+        assert result["unchanged"] == 3
+        db.expire_all()
+        assert photos[1].title == "舗装工_舗装施工_20240316"
+
+        result = service.regenerate(test_org.id, test_project.id, force=True)
+        assert result["updated"] == 4
+
+    def test_regenerate_after_version_change(self, db, test_org, test_project, photos):
+        """生成サービスのバージョンが変わると全件再生成する"""
+        TitleRegenerationService(db).regenerate(test_org.id, test_project.id)
+
+        class NextVersionService(TitleGenerationService):
+            VERSION = "next"
+
+        result = TitleRegenerationService(
+            db, title_service=NextVersionService()
+        ).regenerate(test_org.id)
+
+        assert result["updated"] == 4
+        assert result["skipped_manual"] == 1
@@ -0,0 +1,200 @@
+"""
+ZIPアーカイブ逐次書き込みのテスト
+"""
+
+import io
+import os
+import threading
+import zipfile
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from app.services.zip_writer import (
+    ZIP_DEFLATED,
+    ZIP_STORED,
+    ZipChunkQueue,
+    ZipStreamCancelled,
+    ZipStreamTimeout,
+    ZipStreamWriter,
+    compression_for,
+    deflate_block,
+)
+
+
+class WriteOnlyStream:
+    """write のみを持つ出力先（シーク不可のストリーム）"""
+
+    def __init__(self):
+        self.buffer = io.BytesIO()
+
+    def write(self, data) -> int:
+        return self.buffer.write(data)
+
+
+@pytest.fixture
+def xml_data():
+    """圧縮の効くXML風データ"""
+    return "".join(
+        f"<写真情報><シリアル番号>{i}</シリアル番号><写真タイトル>配筋状況 No.{i}</写真タイトル></写真情報>\n"
+        for i in range(3000)
+    ).encode("shift_jis")
+
+
+class TestCompressionPolicy:
+    """エントリごとの圧縮方式のテスト"""
+
+    @pytest.mark.parametrize(
+        "arcname, expected",
+        [
+            ("PIC/P0000001.JPG", ZIP_STORED),
+            ("PIC/P0000002.jpeg", ZIP_STORED),
+            ("DRA/D0000001.TIF", ZIP_STORED),
+            ("PHOTO.XML", ZIP_DEFLATED),
+            ("PHOTO05.DTD", ZIP_DEFLATED),
+            ("PHOTO05.XSL", ZIP_DEFLATED),
+        ],
+    )
+    def test_compression_for(self, arcname, expected):
+        """JPEG/TIFFは無圧縮、それ以外はdeflate"""
+        assert compression_for(arcname) == expected
+
+    def test_deflate_blocks_concatenate(self, xml_data):
+        """前ブロックの末尾を辞書にしたブロックを連結すると1つのdeflateストリームになる"""
+        first, second = xml_data[:50000], xml_data[50000:]
+        stream = (
+            deflate_block(first)
+            + deflate_block(second, zdict=first[-32768:])
+            + b"\x03\x00"
+        )
+
+        assert zlib.decompress(stream, -15) == xml_data
+
+
+class TestZipStreamWriter:
+    """ZipStreamWriter のテスト"""
+
+    def _write_package(self, stream, xml_data, jpeg_data, **kwargs):
+        with ZipStreamWriter(stream, **kwargs) as zip_writer:
+            zip_writer.write("PIC/P0000001.JPG", jpeg_data)
+            with zip_writer.open("PHOTO.XML") as entry:
+                for offset in range(0, len(xml_data), 7000):
+                    entry.write(xml_data[offset : offset + 7000])
+            zip_writer.write("写真.DTD", b"")
+
+    @pytest.mark.parametrize("parallel", [False, True])
+    def test_readable_by_zipfile(self, xml_data, parallel):
+        """シーク不可の出力先へ書き込んだZIPを標準のzipfileで読める"""
+        stream = WriteOnlyStream()
+        jpeg_data = b"\xff\xd8" + os.urandom(100000) + b"\xff\xd9"
+        executor = ThreadPoolExecutor(max_workers=4) if parallel else None
+        self._write_package(
+            stream, xml_data, jpeg_data, executor=executor, block_size=16 * 1024
+        )
+
+        with zipfile.ZipFile(io.BytesIO(stream.buffer.getvalue())) as zf:
+            assert zf.testzip() is None
+            assert zf.read("PHOTO.XML") == xml_data
+            assert zf.read("PIC/P0000001.JPG") == jpeg_data
+            assert zf.read("写真.DTD") == b""
+            infos = {info.filename: info for info in zf.infolist()}
+        assert infos["PIC/P0000001.JPG"].compress_type == zipfile.ZIP_STORED
+        assert infos["PHOTO.XML"].compress_type == zipfile.ZIP_DEFLATED
+        # 並列圧縮でも圧縮率は単一スレッドとほぼ同じ
+        assert infos["PHOTO.XML"].compress_size < len(zlib.compress(xml_data)) * 1.05
+
+    def test_force_zip64(self, xml_data):
+        """ZIP64終端レコード付きのアーカイブも読める"""
+        stream = WriteOnlyStream()
+        self._write_package(stream, xml_data, b"jpeg", force_zip64=True)
+        data = stream.buffer.getvalue()
+
+        assert b"PK\x06\x06" in data and b"PK\x06\x07" in data
+        with zipfile.ZipFile(io.BytesIO(data)) as zf:
+            assert zf.testzip() is None
+            assert zf.read("PHOTO.XML") == xml_data
+
+    def test_zip64_central_directory(self):
+        """4GBを超えるオフセットはZIP64拡張フィールドに書き込む"""
+        stream = WriteOnlyStream()
+        zip_writer = ZipStreamWriter(stream)
+        zip_writer.write("a.txt", b"a")
+        # 先頭エントリの後に4GB分のデータがあるものとしてオフセットを進める
+        zip_writer.offset += 0x100000000
+        header_offset = zip_writer.offset
+        zip_writer.write("b.txt", b"b")
+        zip_writer.close()
+        data = stream.buffer.getvalue()
+
+        zip64_extra = b"\x01\x00\x08\x00" + header_offset.to_bytes(8, "little")
+        assert data.count(zip64_extra) == 1
+        assert b"PK\x06\x06" in data
+
+    def test_open_errors(self):
+        """重複したパス・書き込み中の別エントリはエラー"""
+        zip_writer = ZipStreamWriter(WriteOnlyStream())
+        zip_writer.write("a.txt", b"a")
+        with pytest.raises(ValueError):
+            zip_writer.write("a.txt", b"a")
+
+        zip_writer.open("b.txt")
+        with pytest.raises(ValueError):
+            zip_writer.open("c.txt")
+
+
+class TestZipChunkQueue:
+    """ZipChunkQueue のテスト"""
+
+    def test_chunks_and_finish(self):
+        """チャンクサイズ単位で受け渡し、終了時に残りを渡す"""
+        chunks = ZipChunkQueue(chunk_size=4, max_chunks=10)
+        chunks.write(b"abc")
+        chunks.write(b"defgh")
+        chunks.write(b"ij")
+        chunks.finish()
+
+        assert list(chunks.iter_chunks()) == [b"abcdefgh", b"ij"]
+
+    def test_error_is_raised_to_reader(self):
+        """書き込み側の例外を読み出し側で送出"""
+        chunks = ZipChunkQueue(chunk_size=1)
+        chunks.write(b"a")
+        chunks.finish(RuntimeError("failed"))
+
+        received = chunks.iter_chunks()
+        assert next(received) == b"a"
+        with pytest.raises(RuntimeError, match="failed"):
+            next(received)
+
+    def test_first_chunk_timeout(self):
+        """最初のチャンクが待機時間内に届かない場合は ZipStreamTimeout、書き込み側も停止"""
+        chunks = ZipChunkQueue(chunk_size=1)
+
+        with pytest.raises(ZipStreamTimeout):
+            next(chunks.iter_chunks(first_chunk_timeout=0.05))
+        with pytest.raises(ZipStreamCancelled):
+            chunks.write(b"a")
+
+    def test_reader_disconnect_stops_writer(self):
+        """読み出し側が途中で閉じると、待機中の書き込み側は ZipStreamCancelled で停止"""
+        chunks = ZipChunkQueue(chunk_size=1, max_chunks=1)
+        errors = []
+
+        def produce():
+            try:
+                with ZipStreamWriter(chunks) as zip_writer:
+                    for i in range(1000):
+                        zip_writer.write(f"{i}.txt", b"x" * 100)
+            except ZipStreamCancelled as e:
+                errors.append(e)
+
+        writer = threading.Thread(target=produce)
+        writer.start()
+        received = chunks.iter_chunks()
+        next(received)
+        received.close()
+        writer.join(timeout=5)
+
+        assert not writer.is_alive()
+        assert len(errors) == 1